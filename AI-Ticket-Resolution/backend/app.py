@@ -1,17 +1,46 @@
-from flask import Flask, send_from_directory, jsonify, request
+from flask import Flask, send_from_directory, jsonify, request, Response, stream_with_context, g
+import atexit
+import click
+import io
+import logging
 import os
-import json
 from datetime import datetime
 import pickle
 import sys
+import time
 
 # Add the model directory to the path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'model'))
 sys.path.append(os.path.join(os.path.dirname(__file__), 'database'))
 
+from config import Config
+from utils.logging_config import configure_logging
+
+# Before anything that logs while loading (database service, models)
+configure_logging(Config.LOG_LEVEL, Config.LOG_FORMAT, Config.LOG_SAMPLE_RATE, Config.LOG_RATE_BURST,
+                  Config.LOG_RATE_WINDOW)
+
 # Import our database service
 from database.database_service import db_service
+from database.errors import StorageError, ConstraintViolationError
 from database.models import Ticket
+from database.bulk import detect_format, read_ticket_rows, import_tickets, export_ticket_lines, export_tickets
+from database.write_behind import WriteBehindQueue, IngestQueueFull
+from database.serialization import dumps, to_dict, iter_json_listing
+from utils.keyword_matcher import KeywordMatcher, load_keyword_model
+from utils.knowledge_search import KnowledgeBase, load_knowledge_base, load_vector_knowledge_base, \
+    find_similar_questions_batch
+from utils.query_cache import QueryCache
+from utils.hybrid_search import HybridRetriever
+from utils.sharded_search import ShardedKnowledgeBase
+from utils.linear_classifier import LinearIntentClassifier, ticket_text
+from utils.online_learning import OnlineTrainer
+from utils.artifact_manager import ArtifactHandle, ArtifactManager
+from utils.artifact_store import ArtifactError
+from utils.metrics import REGISTRY, CONTENT_TYPE, REQUEST_SECONDS, CLASSIFY_SECONDS, KB_SEARCH_SECONDS, \
+    watch_cache, watch_queue, method_label
+
+logger = logging.getLogger(__name__)
 
 # Get the absolute path to the frontend directory
 FRONTEND_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'frontend')
@@ -20,47 +49,304 @@ app = Flask(__name__)
 
 # Load the trained model
 def load_model():
+    if Config.INTENT_MODEL == 'linear':
+        try:
+            # Hashed n-gram logistic regression, weights memory-mapped from the artifact
+            model = LinearIntentClassifier.load(Config.path(Config.LINEAR_MODEL_PATH))
+            logger.info("Linear AI model loaded successfully")
+            return model
+        except (ArtifactError, ValueError) as e:
+            logger.warning("No trained linear model (%s), falling back to the keyword model", e)
+    try:
+        artifact_path = Config.path(Config.MODEL_ARTIFACT_PATH)
+        if os.path.exists(artifact_path):
+            # Memory-mapped artifact written by train_model.py, nothing to unpickle
+            model = load_keyword_model(artifact_path)
+        else:
+            with open(Config.path(Config.LEGACY_MODEL_PATH), 'rb') as f:
+                model = pickle.load(f)
+        # Compile the keyword lists once so classification is a single pass over the text
+        matcher = KeywordMatcher(model)
+        logger.info("AI model loaded successfully")
+        return matcher
+    except FileNotFoundError:
+        logger.warning("No trained model found. Using fallback classification.")
+        return None
+
+# Load the knowledge base used to attach answers to AI responses
+def load_app_knowledge_base():
+    try:
+        return load_vector_knowledge_base()
+    except Exception as e:
+        logger.warning("No trained knowledge base index (%s), falling back to BM25 over the CSV", e)
     try:
-        with open('intent_model.pkl', 'rb') as f:
-            model = pickle.load(f)
-        print("AI model loaded successfully")
-        return model
+        return load_knowledge_base(Config.path(Config.KNOWLEDGE_BASE_PATH))
     except FileNotFoundError:
-        print("No trained model found. Using fallback classification.")
+        logger.warning("No knowledge base found. AI responses will not include KB answers.")
+        return None
+
+def validate_model(model):
+    """Reject a model that cannot classify before it replaces the serving one"""
+    if not isinstance(model.classify("I cannot reset my password"), str):
+        raise ValueError("model.classify did not return a category")
+
+def validate_knowledge_base(kb):
+    """Reject an empty or unsearchable knowledge base"""
+    if len(kb) == 0:
+        raise ValueError("knowledge base is empty")
+    find_similar_questions_batch(["reset password"], kb, top_k=1)
+
+# Model and knowledge base are loaded at startup and reloaded in the
+# background when their files change (or, for the model, by online
+# learning). Requests read model_handle.value / knowledge_base_handle.value
+# once and keep that version until they finish. Knowledge base entries
+# written through the API are applied on top of the loaded version (see
+# apply_knowledge_base_change) and carried over when it is reloaded.
+model_handle = ArtifactHandle("model")
+knowledge_base_handle = ArtifactHandle("knowledge_base", carry=lambda old, new: new.with_changes(old.changes))
+artifact_manager = ArtifactManager(Config.ARTIFACT_POLL_INTERVAL)
+artifact_manager.register(
+    model_handle,
+    [Config.path(path) for path in (Config.LINEAR_MODEL_PATH, Config.MODEL_ARTIFACT_PATH, Config.LEGACY_MODEL_PATH)],
+    load_model, validate_model)
+artifact_manager.register(
+    knowledge_base_handle,
+    [Config.path(path) for path in (Config.KB_ARTIFACT_PATH, Config.VECTORIZER_PATH, Config.KB_MATRIX_PATH,
+                                    Config.KB_ENTRIES_PATH, Config.ANN_INDEX_PATH, Config.KNOWLEDGE_BASE_PATH)],
+    load_app_knowledge_base, validate_knowledge_base)
+
+def apply_knowledge_base_change(event):
+    """
+    Change listener: serve knowledge base writes without waiting for a
+    retrain
+    """
+    if event.table == "knowledge_base":
+        knowledge_base_handle.update(
+            lambda kb: (kb if kb is not None else KnowledgeBase([])).with_change(event))
+
+db_service.subscribe(apply_knowledge_base_change)
+
+def start_sharded_search():
+    """Process pool over the KB shards, when KB_SEARCH_WORKERS > 0 and shards were built"""
+    if Config.KB_SEARCH_WORKERS <= 0:
+        return None
+    try:
+        shards = ShardedKnowledgeBase(Config.path(Config.KB_SHARDS_DIR), Config.KB_SEARCH_WORKERS)
+    except FileNotFoundError as e:
+        logger.info("No sharded KB index (%s), searching in-process", e)
         return None
+    logger.info("Sharded KB search: %d shards, %d worker processes", len(shards.manifest['shards']), shards.warm_up())
+    return shards
+
+# Workers are forked before any background thread starts
+kb_shards = start_sharded_search()
+artifact_manager.start()
+
+def find_kb_matches(queries, knowledge_base, top_k=1):
+    """KB matches for a chunk of queries, fanned out to the shard workers when enabled"""
+    start = time.perf_counter()
+    if kb_shards is not None:
+        matches = kb_shards.search_batch(queries, top_k)
+        KB_SEARCH_SECONDS.labels("batch_sharded").observe(time.perf_counter() - start)
+    else:
+        matches = find_similar_questions_batch(queries, knowledge_base, top_k)
+        KB_SEARCH_SECONDS.labels("batch").observe(time.perf_counter() - start)
+    return matches
+
+def model_name(model):
+    """Label of the serving model on /metrics"""
+    return "fallback" if model is None else type(model).__name__
 
-# Load the model when the app starts
-ai_model = load_model()
+def fallback_classify(text):
+    """Keyword rules used when no trained model is loaded"""
+    text_lower = text.lower()
+    if any(keyword in text_lower for keyword in ['password', 'account', 'login']):
+        return 'account_access'
+    elif any(keyword in text_lower for keyword in ['billing', 'payment', 'charge']):
+        return 'billing'
+    elif any(keyword in text_lower for keyword in ['bug', 'crash', 'error']):
+        return 'bug_report'
+    elif any(keyword in text_lower for keyword in ['feature', 'request']):
+        return 'feature_request'
+    else:
+        return 'general_inquiry'
 
 # Simple classification function using the loaded model
 def classify_text(text, model):
     """Classify text using the loaded model"""
+    start = time.perf_counter()
     if model is None:
-        # Fallback classification
-        text_lower = text.lower()
-        if any(keyword in text_lower for keyword in ['password', 'account', 'login']):
-            return 'account_access'
-        elif any(keyword in text_lower for keyword in ['billing', 'payment', 'charge']):
-            return 'billing'
-        elif any(keyword in text_lower for keyword in ['bug', 'crash', 'error']):
-            return 'bug_report'
-        elif any(keyword in text_lower for keyword in ['feature', 'request']):
-            return 'feature_request'
-        else:
-            return 'general_inquiry'
-    
-    # Use the trained model
-    text_lower = text.lower()
-    scores = {}
-    for category, keywords in model.items():
-        score = sum(1 for keyword in keywords if keyword in text_lower)
-        scores[category] = score
-    
-    # Return category with highest score, or 'general' if no matches
-    if max(scores.values()) > 0:
-        return max(scores.items(), key=lambda x: x[1])[0]
+        classification = fallback_classify(text)
     else:
-        return 'general_inquiry'
+        # Use the trained model
+        matcher = KeywordMatcher(model) if isinstance(model, dict) else model
+        classification = matcher.classify(text)
+    CLASSIFY_SECONDS.labels(model_name(model), "single").observe(time.perf_counter() - start)
+    return classification
+
+def classify_texts(texts, model):
+    """Classify a batch of texts with one call into the model"""
+    start = time.perf_counter()
+    if model is None:
+        classifications = [fallback_classify(text) for text in texts]
+    else:
+        matcher = KeywordMatcher(model) if isinstance(model, dict) else model
+        classifications = matcher.classify_batch(texts)
+    CLASSIFY_SECONDS.labels(model_name(model), "batch").observe(time.perf_counter() - start)
+    return classifications
+
+# Canned AI responses; '{query}' is replaced by the user's query
+RESPONSE_TEMPLATES = {
+    'account_access': "I understand you're having an account access issue: '{query}'. To reset your password, please go to the login page and click 'Forgot Password'. If you're locked out, please contact our support team.",
+    'billing': "This appears to be a billing-related query: '{query}'. For billing issues, you can update your payment method in Account Settings or contact our billing department at billing@example.com.",
+    'bug_report': "Thanks for reporting this bug: '{query}'. Our development team will investigate this issue. Please provide any additional details that might help us reproduce the problem.",
+    'feature_request': "Thank you for your feature request: '{query}'. We appreciate your feedback and will consider it for future development.",
+    'data': "I see you're asking about data: '{query}'. You can export your data from Account Settings > Privacy > Data Export. For data deletion requests, please contact privacy@example.com.",
+    'general_inquiry': "Thank you for your inquiry: '{query}'. This is an AI-generated response. A human agent will review your ticket and respond shortly."
+}
+DEFAULT_RESPONSE_TEMPLATE = "Thank you for your query: '{query}'. This is an AI-generated response. A human agent will review your ticket and respond shortly."
+
+def compile_templates(templates):
+    """Split each template around '{query}' once, so a response is a single concatenation"""
+    return {name: tuple(template.split('{query}', 1)) for name, template in templates.items()}
+
+COMPILED_TEMPLATES = compile_templates(RESPONSE_TEMPLATES)
+COMPILED_DEFAULT_TEMPLATE = tuple(DEFAULT_RESPONSE_TEMPLATE.split('{query}', 1))
+
+def build_response(query, classification):
+    """Generate the canned AI response for a classified query"""
+    head, tail = COMPILED_TEMPLATES.get(classification, COMPILED_DEFAULT_TEMPLATE)
+    return head + query + tail
+
+# Classifications of recent queries, shared by paraphrases of the same question
+response_cache = QueryCache(Config.RESPONSE_CACHE_SIZE, Config.RESPONSE_CACHE_SIMILARITY) \
+    if Config.RESPONSE_CACHE_SIZE > 0 else None
+
+if response_cache is not None:
+    # Cached classifications belong to the model that produced them
+    model_handle.on_swap(lambda model: response_cache.clear())
+
+def start_online_learning():
+    """Background partial_fit updates from resolved tickets (ONLINE_LEARNING=1, linear model only)"""
+    if not Config.ONLINE_LEARNING:
+        return None
+    if not isinstance(model_handle.value, LinearIntentClassifier):
+        logger.warning("Online learning needs INTENT_MODEL=linear and a trained model; disabled")
+        return None
+    return OnlineTrainer(model_handle, Config.path(Config.MODEL_SNAPSHOT_DIR), Config.path(Config.LINEAR_MODEL_PATH),
+                         Config.ONLINE_BATCH_SIZE, Config.ONLINE_FLUSH_INTERVAL, Config.MODEL_SNAPSHOTS_KEPT).start()
+
+online_trainer = start_online_learning()
+
+def learn_from_resolved_ticket(event):
+    """
+    Change listener: an update that resolves a ticket and sets its category
+    in the same request (the agent confirming the category) becomes a
+    training example
+    """
+    changes = event.changes
+    if (event.table == "tickets" and event.action == "updated" and event.record is not None
+            and changes.get("status") == "resolved" and changes.get("category")):
+        online_trainer.submit(ticket_text(vars(event.record)), changes["category"])
+
+if online_trainer is not None:
+    db_service.subscribe(learn_from_resolved_ticket)
+
+def start_write_behind():
+    """Journaled write-behind queue for new tickets (WRITE_BEHIND=1)"""
+    if not Config.WRITE_BEHIND:
+        return None
+    ingest = WriteBehindQueue(db_service, Config.path(Config.INGEST_JOURNAL_DIR), Config.INGEST_QUEUE_SIZE,
+                              Config.INGEST_BATCH_SIZE, Config.INGEST_LINGER, Config.INGEST_ENQUEUE_TIMEOUT,
+                              Config.INGEST_FSYNC).start()
+    # Commit whatever is still queued when the server shuts down
+    atexit.register(ingest.stop)
+    return ingest
+
+ticket_queue = start_write_behind()
+
+# Cache hit ratios and queue depths, read when /metrics is scraped
+if hasattr(db_service, "cache_stats"):
+    watch_cache("db", db_service.cache_stats)
+if response_cache is not None:
+    watch_cache("response", response_cache.stats)
+if ticket_queue is not None:
+    watch_queue("ingest", lambda: ticket_queue.stats()["outstanding"])
+if online_trainer is not None:
+    watch_queue("online_learning", lambda: online_trainer.stats()["pending"])
+
+def classify_query(query):
+    """classify_text through the response cache"""
+    if response_cache is None:
+        return classify_text(query, model_handle.value)
+    classification = response_cache.get(query)
+    if classification is None:
+        classification = classify_text(query, model_handle.value)
+        response_cache.put(query, classification)
+    return classification
+
+# Hybrid BM25 + vector KB search, narrowed by the query's predicted category
+kb_retriever = HybridRetriever(Config.KB_FUSION, Config.KB_VECTOR_WEIGHT,
+                               None if Config.KB_CATEGORY_MODE == 'none' else Config.KB_CATEGORY_MODE,
+                               Config.KB_CATEGORY_BOOST, Config.KB_PARALLEL_SEARCH)
+
+def search_knowledge(data):
+    """Run a POST /api/ai/search body; returns (result, error_message)"""
+    query = (data or {}).get("query")
+    if not isinstance(query, str) or not query.strip():
+        return None, "'query' must be a non-empty string"
+    top_k = data.get("top_k", 5)
+    if type(top_k) is not int or not 1 <= top_k <= Config.KB_MAX_TOP_K:
+        return None, f"'top_k' must be an integer between 1 and {Config.KB_MAX_TOP_K}"
+    category = data.get("category")
+    model, knowledge_base = model_handle.value, knowledge_base_handle.value
+    result = kb_retriever.search(query, knowledge_base, top_k, category,
+                                 classify=lambda text: classify_text(text, model))
+    for stage, milliseconds in result.timings.items():
+        KB_SEARCH_SECONDS.labels(stage).observe(milliseconds / 1e3)
+    return result.to_dict(), None
+
+def read_batch(data, field):
+    """Validate a batch request body; returns (items, error_response)"""
+    items = (data or {}).get(field)
+    if not isinstance(items, list) or not all(isinstance(item, str) for item in items):
+        return None, (jsonify({"error": f"'{field}' must be a list of strings"}), 400)
+    if len(items) > Config.MAX_BATCH_SIZE:
+        return None, (jsonify({"error": f"At most {Config.MAX_BATCH_SIZE} items per batch"}), 413)
+    return items, None
+
+def json_response(payload, status=200, headers=None):
+    """JSON response encoded by the shared serializer (orjson when installed)"""
+    return Response(dumps(payload), status, headers, mimetype='application/json')
+
+def stream_ndjson(items, process_chunk):
+    """
+    Stream results as NDJSON, one line per item, processing the batch in
+    chunks so the client receives the first lines before the batch finishes
+    """
+    def generate():
+        for start in range(0, len(items), Config.BATCH_CHUNK_SIZE):
+            chunk = items[start:start + Config.BATCH_CHUNK_SIZE]
+            lines = [dumps({"index": start + offset, **result}) for offset, result in enumerate(process_chunk(chunk))]
+            yield b"\n".join(lines) + b"\n"
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.before_request
+def start_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_time(response):
+    # Labelled by the route template, never the raw path, to keep the label set small
+    route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+    REQUEST_SECONDS.labels(route, method_label(request.method), str(response.status_code)).observe(
+        time.perf_counter() - g.request_started)
+    return response
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus text exposition of this process's metrics"""
+    return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
 
 # Serve frontend files
 @app.route('/')
@@ -80,26 +366,41 @@ def serve_static(path):
 # API routes for tickets
 @app.route('/api/tickets', methods=['GET'])
 def get_tickets():
+    """
+    One page of tickets, newest first. Query parameters: status, priority,
+    category, user_id (filters), fields (comma-separated columns), limit and
+    cursor (the next_cursor of the previous page)
+    """
+    filters = {key: request.args.get(key) for key in ("status", "priority", "category", "user_id")}
+    fields = request.args.get("fields")
+    columns = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+    limit = max(1, min(request.args.get("limit", Config.TICKETS_PAGE_SIZE, type=int), Config.MAX_TICKETS_PAGE_SIZE))
     try:
-        tickets = db_service.get_all_tickets()
-        # Convert Ticket objects to dictionaries for JSON serialization
-        tickets_data = []
-        for ticket in tickets:
-            tickets_data.append({
-                "id": ticket.id,
-                "subject": ticket.subject,
-                "description": ticket.description,
-                "priority": ticket.priority,
-                "status": ticket.status,
-                "category": ticket.category,
-                "created_at": ticket.created_at,
-                "updated_at": ticket.updated_at,
-                "user_id": ticket.user_id
-            })
-        return jsonify({"tickets": tickets_data})
-    except Exception as e:
-        print(f"Error getting tickets: {e}")
-        return jsonify({"tickets": []})
+        tickets_data, next_cursor = db_service.get_tickets_page(
+            filters, limit, request.args.get("cursor"), columns
+        )
+        # Encoded and sent a chunk of tickets at a time
+        body = iter_json_listing("tickets", tickets_data, {"next_cursor": next_cursor}, Config.JSON_CHUNK_SIZE)
+        return Response(body, mimetype='application/json')
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except StorageError as e:
+        logger.error("Error getting tickets: %s", e)
+        return jsonify({"error": "Ticket storage unavailable"}), 503
+
+@app.route('/api/tickets/summary', methods=['GET'])
+def ticket_summary():
+    """
+    Ticket counts per status, priority and category, filtered and counted
+    by the database. Accepts the same filters as GET /api/tickets
+    """
+    filters = {key: request.args.get(key) for key in ("status", "priority", "category", "user_id")
+               if request.args.get(key)}
+    try:
+        return jsonify(db_service.get_ticket_counts(filters, Config.EXPORT_PAGE_SIZE))
+    except StorageError as e:
+        logger.error("Error summarizing tickets: %s", e)
+        return jsonify({"error": "Ticket storage unavailable"}), 503
 
 @app.route('/api/tickets', methods=['POST'])
 def create_ticket():
@@ -112,90 +413,234 @@ def create_ticket():
             description=data.get("description", ""),
             priority=data.get("priority", "medium"),
             status="open",
-            category=classify_text(data.get("description", ""), ai_model),
+            # Subject and description, the text the models are trained on
+            category=classify_text(ticket_text(data), model_handle.value),
             created_at=datetime.now().isoformat(),
             updated_at=datetime.now().isoformat()
         )
         
+        if ticket_queue is not None:
+            # Journaled and queued; the flusher inserts it with the next batch
+            provisional_id = ticket_queue.submit(ticket)
+            ticket_data = to_dict(ticket)
+            del ticket_data["id"]
+            return json_response({
+                "message": "Ticket accepted",
+                "provisional_id": provisional_id,
+                "status_url": f"/api/tickets/pending/{provisional_id}",
+                "ticket": ticket_data
+            }, 202)
+
         # Save to database
         created_ticket = db_service.create_ticket(ticket)
         
         if created_ticket:
-            # Convert to dictionary for JSON response
-            ticket_data = {
-                "id": created_ticket.id,
-                "subject": created_ticket.subject,
-                "description": created_ticket.description,
-                "priority": created_ticket.priority,
-                "status": created_ticket.status,
-                "category": created_ticket.category,
-                "created_at": created_ticket.created_at,
-                "updated_at": created_ticket.updated_at,
-                "user_id": created_ticket.user_id
-            }
-            return jsonify({"message": "Ticket created", "ticket": ticket_data}), 201
+            return json_response({"message": "Ticket created", "ticket": to_dict(created_ticket)}, 201)
         else:
             return jsonify({"error": "Failed to create ticket"}), 500
-    except Exception as e:
-        print(f"Error creating ticket: {e}")
+    except IngestQueueFull:
+        return jsonify({"error": "Too many tickets being created, retry shortly"}), 503, {"Retry-After": "1"}
+    except Exception:
+        logger.exception("Error creating ticket")
         return jsonify({"error": "Failed to create ticket"}), 500
 
+@app.route('/api/tickets/pending/<provisional_id>', methods=['GET'])
+def get_pending_ticket(provisional_id):
+    """What became of a ticket accepted with 202: queued, committed (with its id) or failed"""
+    status = ticket_queue.status(provisional_id) if ticket_queue is not None else None
+    if status is None:
+        return jsonify({"error": "Unknown provisional id"}), 404
+    return jsonify(status)
+
+@app.route('/api/tickets/import', methods=['POST'])
+def import_tickets_route():
+    """Stream a CSV/NDJSON upload (raw body or multipart 'file') into batched inserts"""
+    try:
+        upload = request.files.get("file")
+        binary = upload.stream if upload else io.BufferedReader(request.stream)
+        fmt = request.args.get("format") or detect_format(upload.filename if upload else "", "csv")
+        batch_size = request.args.get("batch_size", Config.IMPORT_BATCH_SIZE, type=int)
+        if batch_size < 1:
+            return jsonify({"error": "batch_size must be at least 1"}), 400
+        stream = io.TextIOWrapper(binary, encoding="utf-8", newline="")
+        stats = import_tickets(read_ticket_rows(stream, fmt), db_service,
+                               lambda texts: classify_texts(texts, model_handle.value), batch_size)
+        return jsonify(stats)
+    except (ValueError, UnicodeDecodeError) as e:
+        return jsonify({"error": f"Invalid import file: {e}"}), 400
+    except Exception:
+        logger.exception("Error importing tickets")
+        return jsonify({"error": "Failed to import tickets"}), 500
+
+@app.route('/api/tickets/export', methods=['GET'])
+def export_tickets_route():
+    """Stream the tickets table out as NDJSON (default) or CSV"""
+    fmt = request.args.get("format", "ndjson")
+    if fmt not in ("ndjson", "csv"):
+        return jsonify({"error": "format must be 'ndjson' or 'csv'"}), 400
+    page_size = request.args.get("page_size", Config.EXPORT_PAGE_SIZE, type=int)
+    if page_size < 1:
+        return jsonify({"error": "page_size must be at least 1"}), 400
+    mimetype = 'application/x-ndjson' if fmt == "ndjson" else 'text/csv'
+    return Response(stream_with_context(export_ticket_lines(db_service, fmt, page_size)), mimetype=mimetype)
+
 @app.route('/api/tickets/<int:ticket_id>', methods=['GET'])
 def get_ticket(ticket_id):
     try:
         ticket = db_service.get_ticket_by_id(ticket_id)
         if ticket:
-            # Convert to dictionary for JSON response
-            ticket_data = {
-                "id": ticket.id,
-                "subject": ticket.subject,
-                "description": ticket.description,
-                "priority": ticket.priority,
-                "status": ticket.status,
-                "category": ticket.category,
-                "created_at": ticket.created_at,
-                "updated_at": ticket.updated_at,
-                "user_id": ticket.user_id
-            }
-            return jsonify({"ticket": ticket_data})
+            return json_response({"ticket": to_dict(ticket)})
         else:
             return jsonify({"error": "Ticket not found"}), 404
-    except Exception as e:
-        print(f"Error getting ticket {ticket_id}: {e}")
+    except Exception:
+        logger.exception("Error getting ticket %s", ticket_id)
         return jsonify({"error": "Failed to get ticket"}), 500
 
+@app.route('/api/tickets/<int:ticket_id>', methods=['PATCH'])
+def update_ticket(ticket_id):
+    """Update a ticket's fields; resolving it with a category feeds online learning"""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Expected a JSON object"}), 400
+    try:
+        ticket = db_service.update_ticket(ticket_id, dict(data))
+    except ConstraintViolationError as e:
+        return jsonify({"error": str(e)}), 400
+    except StorageError as e:
+        logger.error("Error updating ticket %s: %s", ticket_id, e)
+        return jsonify({"error": "Ticket storage unavailable"}), 503
+    if ticket is None:
+        return jsonify({"error": "Ticket not found"}), 404
+    return json_response({"message": "Ticket updated", "ticket": to_dict(ticket)})
+
+# Admin reports, shared with the ASGI app
+def model_report():
+    """Serving model and online learning counters"""
+    return {
+        "model": type(model_handle.value).__name__,
+        "version": model_handle.version,
+        "online_learning": online_trainer.stats() if online_trainer is not None else None
+    }
+
+def artifact_report():
+    """Loaded model/knowledge base versions, load times and watched files"""
+    return {"artifacts": artifact_manager.status()}
+
+def ingest_report():
+    """Write-behind queue depth and counters"""
+    return ticket_queue.stats() if ticket_queue is not None else {"enabled": False}
+
+def cache_report(service):
+    """Hit/miss/eviction counters of ``service``'s read cache and the AI response cache"""
+    return {
+        "cache": service.cache_stats() if hasattr(service, "cache_stats") else None,
+        "response_cache": response_cache.stats() if response_cache is not None else None
+    }
+
+@app.route('/api/admin/model', methods=['GET'])
+def model_status():
+    return jsonify(model_report())
+
+@app.route('/api/admin/artifacts', methods=['GET'])
+def artifact_status():
+    return jsonify(artifact_report())
+
+@app.route('/api/admin/ingest', methods=['GET'])
+def ingest_status():
+    return jsonify(ingest_report())
+
+@app.route('/api/admin/cache', methods=['GET'])
+def cache_stats():
+    return jsonify(cache_report(db_service))
+
 # API routes for AI responses
 @app.route('/api/ai/respond', methods=['POST'])
 def get_ai_response():
     data = request.get_json()
     query = data.get("query", "")
     
-    # Use the trained model to classify the query
-    classification = classify_text(query, ai_model)
+    # Use the trained model to classify the query (repeated questions come from the cache)
+    classification = classify_query(query)
     
     # Generate a response based on classification
-    responses = {
-        'account_access': f"I understand you're having an account access issue: '{query}'. To reset your password, please go to the login page and click 'Forgot Password'. If you're locked out, please contact our support team.",
-        'billing': f"This appears to be a billing-related query: '{query}'. For billing issues, you can update your payment method in Account Settings or contact our billing department at billing@example.com.",
-        'bug_report': f"Thanks for reporting this bug: '{query}'. Our development team will investigate this issue. Please provide any additional details that might help us reproduce the problem.",
-        'feature_request': f"Thank you for your feature request: '{query}'. We appreciate your feedback and will consider it for future development.",
-        'data': f"I see you're asking about data: '{query}'. You can export your data from Account Settings > Privacy > Data Export. For data deletion requests, please contact privacy@example.com.",
-        'general_inquiry': f"Thank you for your inquiry: '{query}'. This is an AI-generated response. A human agent will review your ticket and respond shortly."
-    }
-    
-    response = responses.get(classification, f"Thank you for your query: '{query}'. This is an AI-generated response. A human agent will review your ticket and respond shortly.")
+    response = build_response(query, classification)
     
     return jsonify({"response": response, "classification": classification})
 
+@app.route('/api/ai/respond/batch', methods=['POST'])
+def get_ai_responses_batch():
+    queries, error = read_batch(request.get_json(silent=True), "queries")
+    if error:
+        return error
+    # The whole stream is answered by the versions loaded when it started
+    model, knowledge_base = model_handle.value, knowledge_base_handle.value
+
+    def process_chunk(chunk):
+        classifications = classify_texts(chunk, model)
+        # One vectorized KB search for the whole chunk (or one task per shard)
+        matches = find_kb_matches(chunk, knowledge_base, top_k=1)
+        for query, classification, match in zip(chunk, classifications, matches):
+            yield {
+                "response": build_response(query, classification),
+                "classification": classification,
+                "answer": match[0].get("answer") if match else None
+            }
+
+    return stream_ndjson(queries, process_chunk)
+
+@app.route('/api/ai/search', methods=['POST'])
+def search_knowledge_base_route():
+    """Scored top-k KB entries for a query, with per-stage timings"""
+    result, error = search_knowledge(request.get_json(silent=True))
+    if error:
+        return jsonify({"error": error}), 400
+    return jsonify(result)
+
 @app.route('/api/ai/classify', methods=['POST'])
 def classify_ticket():
     data = request.get_json()
     ticket_text = data.get("text", "")
     
     # Use the trained model to classify the ticket
-    classification = classify_text(ticket_text, ai_model)
+    classification = classify_text(ticket_text, model_handle.value)
     
     return jsonify({"classification": classification})
 
+@app.route('/api/ai/classify/batch', methods=['POST'])
+def classify_tickets_batch():
+    texts, error = read_batch(request.get_json(silent=True), "texts")
+    if error:
+        return error
+    model = model_handle.value
+
+    def process_chunk(chunk):
+        return ({"classification": classification} for classification in classify_texts(chunk, model))
+
+    return stream_ndjson(texts, process_chunk)
+
+@app.cli.command("import-tickets")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--format", "fmt", type=click.Choice(["csv", "ndjson"]), default=None)
+@click.option("--batch-size", type=click.IntRange(min=1), default=Config.IMPORT_BATCH_SIZE, show_default=True)
+def import_tickets_command(path, fmt, batch_size):
+    """Bulk import tickets from a CSV or NDJSON file"""
+    with open(path, newline="", encoding="utf-8") as f:
+        stats = import_tickets(read_ticket_rows(f, fmt or detect_format(path)), db_service,
+                               lambda texts: classify_texts(texts, model_handle.value), batch_size)
+    click.echo(f"Imported {stats['inserted']}/{stats['rows']} tickets in {stats['seconds']} s "
+               f"({stats['rows_per_sec']} rows/sec), {stats['rejected']} rejected")
+    for error in stats["errors"]:
+        click.echo(f"  row {error['row']}: {error['error']}")
+
+@app.cli.command("export-tickets")
+@click.argument("path", type=click.Path(dir_okay=False, writable=True))
+@click.option("--format", "fmt", type=click.Choice(["csv", "ndjson"]), default=None)
+@click.option("--page-size", type=click.IntRange(min=1), default=Config.EXPORT_PAGE_SIZE, show_default=True)
+def export_tickets_command(path, fmt, page_size):
+    """Export the tickets table to a CSV or NDJSON file"""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        stats = export_tickets(db_service, f, fmt or detect_format(path, "ndjson"), page_size)
+    click.echo(f"Exported {stats['rows']} tickets in {stats['seconds']} s ({stats['rows_per_sec']} rows/sec)")
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,384 @@
+"""
+ASGI variant of the ticket and AI endpoints in app.py.
+
+Same routes and JSON shapes, but database calls are awaited on a pooled,
+keep-alive HTTP client instead of blocking a worker thread per request,
+so one process keeps thousands of slow database round trips in flight.
+Classification and knowledge base search run on the thread pool.
+
+Bulk import and export go through the Flask app's (blocking) database
+service on worker threads, so they need both services on one store.
+Import takes the file as the raw request body only; multipart uploads
+are served by the Flask app alone. The frontend and the CLI commands stay
+in app.py.
+
+Run with:
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+"""
+import io
+import logging
+import os
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware import Middleware
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Match, Route
+
+from config import Config
+from database.async_service import create_async_database_service
+from database.database_service import db_service as flask_db_service
+from database.errors import StorageError, ConstraintViolationError
+from database.models import Ticket
+from database.bulk import read_ticket_rows, import_tickets, export_ticket_lines
+from database.write_behind import IngestQueueFull
+from database.serialization import dumps, to_dict, iter_json_listing
+from utils.linear_classifier import ticket_text
+from utils.metrics import REGISTRY, CONTENT_TYPE, REQUEST_SECONDS, method_label
+# Model, knowledge base and response logic are shared with the Flask app
+from app import model_handle, knowledge_base_handle, classify_text, classify_texts, build_response, classify_query, \
+    online_trainer, learn_from_resolved_ticket, apply_knowledge_base_change, search_knowledge, find_kb_matches, \
+    ticket_queue, model_report, artifact_report, ingest_report, cache_report
+
+logger = logging.getLogger(__name__)
+
+def create_db_service():
+    """
+    Async database service on the store of the Flask app's service, through
+    which the write-behind queue commits: local stores are shared, remote
+    ones reached over HTTP
+    """
+    # The blocking backend under the (cached, timed) Flask service
+    shared = getattr(flask_db_service, "service", flask_db_service).backend.backend
+    service = create_async_database_service(os.environ.get("DATABASE_URL"), shared)
+    # The Flask service fell back to in-memory storage (no supabase package):
+    # what it writes would never show up here
+    same_store = shared.name not in ("memory", "sqlite") \
+        or getattr(service.backend.backend, "backend", None) is shared
+    if ticket_queue is not None and not same_store:
+        raise RuntimeError(f"WRITE_BEHIND needs the Flask and ASGI services on one store, but they use "
+                           f"{shared.name} and {service.backend.name}; set DATABASE_URL or install supabase")
+    return service, same_store
+
+db_service, flask_store_shared = create_db_service()
+db_service.subscribe(apply_knowledge_base_change)
+if online_trainer is not None:
+    db_service.subscribe(learn_from_resolved_ticket)
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse encoded by the shared serializer (orjson when installed)
+    """
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+async def read_json(request):
+    try:
+        return await request.json()
+    except ValueError:
+        return None
+
+def read_batch(data, field):
+    """Validate a batch request body; returns (items, error_response)"""
+    items = (data or {}).get(field)
+    if not isinstance(items, list) or not all(isinstance(item, str) for item in items):
+        return None, JSONResponse({"error": f"'{field}' must be a list of strings"}, 400)
+    if len(items) > Config.MAX_BATCH_SIZE:
+        return None, JSONResponse({"error": f"At most {Config.MAX_BATCH_SIZE} items per batch"}, 413)
+    return items, None
+
+def stream_ndjson(items, process_chunk):
+    """
+    Stream results as NDJSON like app.stream_ndjson; each chunk is processed
+    on a worker thread so classification never stalls the event loop
+    """
+    async def generate():
+        for start in range(0, len(items), Config.BATCH_CHUNK_SIZE):
+            chunk = items[start:start + Config.BATCH_CHUNK_SIZE]
+            results = await run_in_threadpool(lambda: list(process_chunk(chunk)))
+            lines = [dumps({"index": start + offset, **result}) for offset, result in enumerate(results)]
+            yield b"\n".join(lines) + b"\n"
+    return StreamingResponse(generate(), media_type='application/x-ndjson')
+
+def bulk_unavailable():
+    """Error response for import/export when the Flask service is on another store, else None"""
+    if flask_store_shared:
+        return None
+    return JSONResponse({"error": "Bulk import and export need DATABASE_URL (or the supabase package) so the "
+                                  "Flask and ASGI services share one store"}, 503)
+
+# API routes for tickets
+async def get_tickets(request):
+    params = request.query_params
+    filters = {key: params.get(key) for key in ("status", "priority", "category", "user_id")}
+    fields = params.get("fields")
+    columns = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+    try:
+        limit = int(params.get("limit", Config.TICKETS_PAGE_SIZE))
+    except ValueError:
+        limit = Config.TICKETS_PAGE_SIZE
+    limit = max(1, min(limit, Config.MAX_TICKETS_PAGE_SIZE))
+    try:
+        tickets_data, next_cursor = await db_service.get_tickets_page(filters, limit, params.get("cursor"), columns)
+        body = iter_json_listing("tickets", tickets_data, {"next_cursor": next_cursor}, Config.JSON_CHUNK_SIZE)
+        return StreamingResponse(body, media_type='application/json')
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, 400)
+    except StorageError as e:
+        logger.error("Error getting tickets: %s", e)
+        return JSONResponse({"error": "Ticket storage unavailable"}, 503)
+
+async def ticket_summary(request):
+    params = request.query_params
+    filters = {key: params.get(key) for key in ("status", "priority", "category", "user_id") if params.get(key)}
+    try:
+        return JSONResponse(await db_service.get_ticket_counts(filters, Config.EXPORT_PAGE_SIZE))
+    except StorageError as e:
+        logger.error("Error summarizing tickets: %s", e)
+        return JSONResponse({"error": "Ticket storage unavailable"}, 503)
+
+async def import_tickets_route(request):
+    """
+    Import a CSV/NDJSON request body. The body is spooled to a temporary
+    file first, then classified and inserted in batches on a worker thread
+    """
+    error = bulk_unavailable()
+    if error:
+        return error
+    if request.headers.get("content-type", "").startswith("multipart/"):
+        return JSONResponse({"error": "Send the file as the request body (multipart uploads: Flask app)"}, 415)
+    try:
+        batch_size = int(request.query_params.get("batch_size", Config.IMPORT_BATCH_SIZE))
+    except ValueError:
+        batch_size = 0
+    if batch_size < 1:
+        return JSONResponse({"error": "batch_size must be at least 1"}, 400)
+    fmt = request.query_params.get("format", "csv")
+    model = model_handle.value
+    with tempfile.TemporaryFile() as body:
+        async for chunk in request.stream():
+            body.write(chunk)
+        body.seek(0)
+        stream = io.TextIOWrapper(body, encoding="utf-8", newline="")
+        try:
+            stats = await run_in_threadpool(import_tickets, read_ticket_rows(stream, fmt), flask_db_service,
+                                            lambda texts: classify_texts(texts, model), batch_size)
+        except (ValueError, UnicodeDecodeError) as e:
+            return JSONResponse({"error": f"Invalid import file: {e}"}, 400)
+        except Exception:
+            logger.exception("Error importing tickets")
+            return JSONResponse({"error": "Failed to import tickets"}, 500)
+        finally:
+            stream.detach()
+    return JSONResponse(stats)
+
+async def export_tickets_route(request):
+    """Stream the tickets table out as NDJSON (default) or CSV, pages read on worker threads"""
+    error = bulk_unavailable()
+    if error:
+        return error
+    fmt = request.query_params.get("format", "ndjson")
+    if fmt not in ("ndjson", "csv"):
+        return JSONResponse({"error": "format must be 'ndjson' or 'csv'"}, 400)
+    try:
+        page_size = int(request.query_params.get("page_size", Config.EXPORT_PAGE_SIZE))
+    except ValueError:
+        page_size = 0
+    if page_size < 1:
+        return JSONResponse({"error": "page_size must be at least 1"}, 400)
+    media_type = 'application/x-ndjson' if fmt == "ndjson" else 'text/csv'
+    # A plain iterator: Starlette advances it on the thread pool
+    return StreamingResponse(export_ticket_lines(flask_db_service, fmt, page_size), media_type=media_type)
+
+async def create_ticket(request):
+    try:
+        data = await read_json(request) or {}
+        # Subject and description, the text the models are trained on
+        category = await run_in_threadpool(classify_text, ticket_text(data), model_handle.value)
+        ticket = Ticket(
+            subject=data.get("subject", ""),
+            description=data.get("description", ""),
+            priority=data.get("priority", "medium"),
+            status="open",
+            category=category,
+            created_at=datetime.now().isoformat(),
+            updated_at=datetime.now().isoformat()
+        )
+        if ticket_queue is not None:
+            # A full queue blocks submit for a moment, so keep it off the event loop
+            provisional_id = await run_in_threadpool(ticket_queue.submit, ticket)
+            ticket_data = to_dict(ticket)
+            del ticket_data["id"]
+            return FastJSONResponse({
+                "message": "Ticket accepted",
+                "provisional_id": provisional_id,
+                "status_url": f"/api/tickets/pending/{provisional_id}",
+                "ticket": ticket_data
+            }, 202)
+        created_ticket = await db_service.create_ticket(ticket)
+        if created_ticket:
+            return FastJSONResponse({"message": "Ticket created", "ticket": to_dict(created_ticket)}, 201)
+        return JSONResponse({"error": "Failed to create ticket"}, 500)
+    except IngestQueueFull:
+        return JSONResponse({"error": "Too many tickets being created, retry shortly"}, 503, {"Retry-After": "1"})
+    except Exception:
+        logger.exception("Error creating ticket")
+        return JSONResponse({"error": "Failed to create ticket"}, 500)
+
+async def get_pending_ticket(request):
+    provisional_id = request.path_params["provisional_id"]
+    status = ticket_queue.status(provisional_id) if ticket_queue is not None else None
+    if status is None:
+        return JSONResponse({"error": "Unknown provisional id"}, 404)
+    return JSONResponse(status)
+
+async def get_ticket(request):
+    ticket_id = request.path_params["ticket_id"]
+    try:
+        ticket = await db_service.get_ticket_by_id(ticket_id)
+        if ticket:
+            return FastJSONResponse({"ticket": to_dict(ticket)})
+        return JSONResponse({"error": "Ticket not found"}, 404)
+    except Exception:
+        logger.exception("Error getting ticket %s", ticket_id)
+        return JSONResponse({"error": "Failed to get ticket"}, 500)
+
+async def update_ticket(request):
+    ticket_id = request.path_params["ticket_id"]
+    data = await read_json(request)
+    if not isinstance(data, dict):
+        return JSONResponse({"error": "Expected a JSON object"}, 400)
+    try:
+        ticket = await db_service.update_ticket(ticket_id, dict(data))
+    except ConstraintViolationError as e:
+        return JSONResponse({"error": str(e)}, 400)
+    except StorageError as e:
+        logger.error("Error updating ticket %s: %s", ticket_id, e)
+        return JSONResponse({"error": "Ticket storage unavailable"}, 503)
+    if ticket is None:
+        return JSONResponse({"error": "Ticket not found"}, 404)
+    return FastJSONResponse({"message": "Ticket updated", "ticket": to_dict(ticket)})
+
+# API routes for AI responses
+async def get_ai_response(request):
+    data = await read_json(request) or {}
+    query = data.get("query", "")
+    classification = await run_in_threadpool(classify_query, query)
+    return JSONResponse({"response": build_response(query, classification), "classification": classification})
+
+async def get_ai_responses_batch(request):
+    queries, error = read_batch(await read_json(request), "queries")
+    if error:
+        return error
+    # The whole stream is answered by the versions loaded when it started
+    model, knowledge_base = model_handle.value, knowledge_base_handle.value
+
+    def process_chunk(chunk):
+        classifications = classify_texts(chunk, model)
+        matches = find_kb_matches(chunk, knowledge_base, top_k=1)
+        for query, classification, match in zip(chunk, classifications, matches):
+            yield {
+                "response": build_response(query, classification),
+                "classification": classification,
+                "answer": match[0].get("answer") if match else None
+            }
+
+    return stream_ndjson(queries, process_chunk)
+
+async def search_knowledge_base(request):
+    # CPU-bound; keep it off the event loop
+    result, error = await run_in_threadpool(search_knowledge, await read_json(request))
+    if error:
+        return JSONResponse({"error": error}, 400)
+    return JSONResponse(result)
+
+async def classify_ticket(request):
+    data = await read_json(request) or {}
+    classification = await run_in_threadpool(classify_text, data.get("text", ""), model_handle.value)
+    return JSONResponse({"classification": classification})
+
+async def classify_tickets_batch(request):
+    texts, error = read_batch(await read_json(request), "texts")
+    if error:
+        return error
+    model = model_handle.value
+
+    def process_chunk(chunk):
+        return ({"classification": classification} for classification in classify_texts(chunk, model))
+
+    return stream_ndjson(texts, process_chunk)
+
+# Admin reports, as in the Flask app
+async def model_status(request):
+    return JSONResponse(model_report())
+
+async def artifact_status(request):
+    return JSONResponse(artifact_report())
+
+async def ingest_status(request):
+    return JSONResponse(ingest_report())
+
+async def cache_stats(request):
+    return JSONResponse(cache_report(db_service))
+
+async def metrics(request):
+    """Prometheus text exposition of this process's metrics"""
+    return Response(REGISTRY.render(), headers={"Content-Type": CONTENT_TYPE})
+
+class RequestTimer:
+    """
+    ASGI middleware observing http_request_duration_seconds per route
+    template, up to the start of the response like the Flask after_request
+    hook
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        started = time.perf_counter()
+        route = next((route.path for route in routes if route.matches(scope)[0] is not Match.NONE), "unmatched")
+
+        async def timed_send(message):
+            if message["type"] == "http.response.start":
+                REQUEST_SECONDS.labels(route, method_label(scope["method"]), str(message["status"])).observe(
+                    time.perf_counter() - started)
+            await send(message)
+
+        await self.app(scope, receive, timed_send)
+
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    # Close pooled database connections on shutdown
+    await db_service.close()
+
+routes = [
+    Route('/api/tickets', get_tickets, methods=['GET']),
+    Route('/api/tickets', create_ticket, methods=['POST']),
+    Route('/api/tickets/summary', ticket_summary, methods=['GET']),
+    Route('/api/tickets/import', import_tickets_route, methods=['POST']),
+    Route('/api/tickets/export', export_tickets_route, methods=['GET']),
+    Route('/api/tickets/{ticket_id:int}', get_ticket, methods=['GET']),
+    Route('/api/tickets/pending/{provisional_id}', get_pending_ticket, methods=['GET']),
+    Route('/api/tickets/{ticket_id:int}', update_ticket, methods=['PATCH']),
+    Route('/api/ai/respond', get_ai_response, methods=['POST']),
+    Route('/api/ai/respond/batch', get_ai_responses_batch, methods=['POST']),
+    Route('/api/ai/search', search_knowledge_base, methods=['POST']),
+    Route('/api/ai/classify', classify_ticket, methods=['POST']),
+    Route('/api/ai/classify/batch', classify_tickets_batch, methods=['POST']),
+    Route('/api/admin/model', model_status, methods=['GET']),
+    Route('/api/admin/artifacts', artifact_status, methods=['GET']),
+    Route('/api/admin/ingest', ingest_status, methods=['GET']),
+    Route('/api/admin/cache', cache_stats, methods=['GET']),
+    Route('/metrics', metrics, methods=['GET']),
+]
+
+app = Starlette(routes=routes, lifespan=lifespan, middleware=[Middleware(RequestTimer)])
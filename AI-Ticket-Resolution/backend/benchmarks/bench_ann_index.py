@@ -0,0 +1,73 @@
+"""
+Benchmark: IVF recall@k and latency vs brute-force cosine search
+
+Usage:
+    python benchmarks/bench_ann_index.py [vectors] [dimensions]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add the backend directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.ann_index import IVFIndex, normalize_rows
+from utils.vector_search import top_k_rows
+
+NPROBES = (1, 2, 4, 8, 16, 32, 64)
+
+def clustered_vectors(rng, count, dimensions, clusters=500):
+    """Gaussian blobs on the sphere, roughly how topic embeddings look"""
+    centers = normalize_rows(rng.standard_normal((clusters, dimensions)))
+    labels = rng.integers(0, clusters, size=count)
+    noise = rng.standard_normal((count, dimensions)) / np.sqrt(dimensions)
+    return normalize_rows(centers[labels] + 0.6 * noise)
+
+def brute_force(vectors, queries, top_k):
+    return top_k_rows(queries @ vectors.T, top_k)
+
+def recall(approximate, exact):
+    hits = sum(len(set(a) & set(e)) for a, e in zip(approximate.tolist(), exact.tolist()))
+    return hits / exact.size
+
+def run(count, dimensions, query_count=200, top_k=10):
+    rng = np.random.default_rng(3)
+    vectors = clustered_vectors(rng, count, dimensions)
+    queries = clustered_vectors(rng, query_count, dimensions)
+
+    start = time.perf_counter()
+    index = IVFIndex.train(vectors)
+    print(f"{count} vectors x {dimensions} dims, {index.nlist} lists, trained in {time.perf_counter() - start:.1f} s")
+
+    start = time.perf_counter()
+    exact_ids, _ = brute_force(vectors, queries, top_k)
+    brute_time = (time.perf_counter() - start) / query_count
+    print(f"  brute force      : recall@{top_k} 1.000, {brute_time * 1e3:8.3f} ms/query (batched matmul)")
+
+    start = time.perf_counter()
+    for query in queries:
+        brute_force(vectors, query[None, :], top_k)
+    single_time = (time.perf_counter() - start) / query_count
+    print(f"  brute force (1q) : recall@{top_k} 1.000, {single_time * 1e3:8.3f} ms/query")
+
+    for nprobe in NPROBES:
+        if nprobe > index.nlist:
+            break
+        start = time.perf_counter()
+        ids = np.vstack([index.search(query, top_k, nprobe)[0] for query in queries])
+        elapsed = (time.perf_counter() - start) / query_count
+        print(f"  IVF nprobe={nprobe:<4}: recall@{top_k} {recall(ids, exact_ids):.3f}, {elapsed * 1e3:8.3f} ms/query")
+
+    # Incremental inserts are searchable straight away
+    extra = clustered_vectors(rng, 1000, dimensions)
+    index.add(extra)
+    ids, _ = index.search(extra[:50], 1, nprobe=index.nprobe)
+    found = np.mean(ids[:, 0] == np.arange(count, count + 50))
+    print(f"  after inserting 1000 vectors: {found:.2f} of inserted vectors find themselves")
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    dimensions = int(sys.argv[2]) if len(sys.argv) > 2 else 128
+    run(count, dimensions)
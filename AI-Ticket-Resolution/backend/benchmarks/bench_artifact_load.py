@@ -0,0 +1,75 @@
+"""
+Benchmark: worker start-up cost of pickle/npz artifacts vs the memory-mapped artifact
+
+Usage:
+    python benchmarks/bench_artifact_load.py [entries]
+"""
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+# Add the backend directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+LOAD_PICKLE = """
+import sys, time
+sys.path.insert(0, {backend!r})
+from utils.vector_search import VectorSearchIndex, load_entries
+start = time.perf_counter()
+index = VectorSearchIndex.load({vectorizer!r}, {matrix!r})
+entries = load_entries({entries!r})
+index.search('password reset account', 5)
+print(time.perf_counter() - start)
+"""
+
+LOAD_ARTIFACT = """
+import sys, time
+sys.path.insert(0, {backend!r})
+from utils.knowledge_search import open_knowledge_base_artifact, find_similar_questions
+import utils.vector_search
+start = time.perf_counter()
+kb = open_knowledge_base_artifact({artifact!r})
+find_similar_questions('password reset account', kb, 5)
+print(time.perf_counter() - start)
+"""
+
+def child_time(code):
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+def run(size):
+    from bench_vector_search import synthetic_texts
+    from utils.vector_search import VectorSearchIndex, save_entries
+
+    texts, _, _ = synthetic_texts(random.Random(5), size)
+    entries = [{"question": text[:60], "answer": text, "category": "general"} for text in texts]
+    index = VectorSearchIndex.build(texts)
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = {
+            'backend': BACKEND_DIR,
+            'vectorizer': os.path.join(directory, 'vectorizer.pkl'),
+            'matrix': os.path.join(directory, 'kb_matrix.npz'),
+            'entries': os.path.join(directory, 'kb_entries.json'),
+            'artifact': os.path.join(directory, 'kb_index.bin'),
+        }
+        index.save(paths['vectorizer'], paths['matrix'])
+        save_entries(entries, paths['entries'])
+        start = time.perf_counter()
+        index.save_artifact(paths['artifact'], entries)
+        print(f"{size} entries: artifact written in {time.perf_counter() - start:.2f} s, "
+              f"{os.path.getsize(paths['artifact']) / 1e6:.1f} MB")
+
+        pickle_time = min(child_time(LOAD_PICKLE.format(**paths)) for _ in range(3))
+        artifact_time = min(child_time(LOAD_ARTIFACT.format(**paths)) for _ in range(3))
+        print(f"  pickle/npz load + first query : {pickle_time * 1e3:8.1f} ms")
+        print(f"  mmap artifact open + first query: {artifact_time * 1e3:8.1f} ms")
+
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(__file__))
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
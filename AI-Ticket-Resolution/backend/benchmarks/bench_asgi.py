@@ -0,0 +1,118 @@
+"""
+Load test: Flask app on a fixed pool of blocking workers vs the ASGI app,
+both reading tickets from a local PostgREST stand-in that adds a fixed
+round-trip latency per database request.
+
+Usage:
+    python benchmarks/bench_asgi.py [requests] [latency_ms] [sync_workers] [async_concurrency]
+"""
+import asyncio
+import os
+import random
+import socket
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import uvicorn
+
+# Add the backend directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmarks.postgrest_standin import create_standin
+from database.memory_backend import MemoryBackend
+
+TICKET_COUNT = 5000
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_standin(latency):
+    backend = MemoryBackend()
+    backend.insert_tickets([{
+        "subject": f"Ticket {i}", "description": "Cannot log in to my account",
+        "priority": "medium", "status": ("open", "resolved")[i % 2], "category": "account_access",
+        "created_at": f"2024-01-01T00:00:{i:06d}", "updated_at": None, "user_id": None,
+    } for i in range(TICKET_COUNT)])
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(create_standin(latency, backend), host="127.0.0.1", port=port,
+                                          log_level="warning", backlog=4096))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, port
+
+def workload(count):
+    rng = random.Random(5)
+    paths = []
+    for _ in range(count):
+        if rng.random() < 0.7:
+            paths.append(f"/api/tickets/{rng.randint(1, TICKET_COUNT)}")
+        else:
+            paths.append("/api/tickets?status=open&limit=20&fields=id,subject,status")
+    return paths
+
+def report(name, latencies, elapsed):
+    latencies = sorted(latencies)
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"  {name:<34}: {len(latencies) / elapsed:8.1f} req/s, "
+          f"p50 {statistics.median(latencies) * 1e3:7.1f} ms, p99 {p99 * 1e3:7.1f} ms")
+    return len(latencies) / elapsed
+
+def run_sync(paths, workers):
+    import app as flask_app
+    client = flask_app.app.test_client()
+
+    def call(path):
+        start = time.perf_counter()
+        response = client.get(path)
+        assert response.status_code == 200, response.data
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(workers) as pool:
+        latencies = list(pool.map(call, paths))
+    return report(f"Flask, {workers} blocking workers", latencies, time.perf_counter() - start)
+
+async def run_async(paths, concurrency):
+    import asgi
+    slots = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=asgi.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://asgi") as client:
+        async def call(path):
+            async with slots:
+                start = time.perf_counter()
+                response = await client.get(path)
+                assert response.status_code == 200, response.text
+                return time.perf_counter() - start
+
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*(call(path) for path in paths))
+        elapsed = time.perf_counter() - start
+    await asgi.db_service.close()
+    return report(f"ASGI, {concurrency} concurrent requests", latencies, elapsed)
+
+def run(count, latency_ms, workers, concurrency):
+    server, port = start_standin(latency_ms / 1000)
+    # Both apps pick their storage backend from DATABASE_URL at import time
+    os.environ["DATABASE_URL"] = f"http://127.0.0.1:{port}"
+    # Measure the database path itself, not the Flask app's read cache
+    os.environ["CACHE_BACKEND"] = "none"
+    print(f"{count} requests, {latency_ms:.0f} ms database round trip, {TICKET_COUNT} tickets")
+    paths = workload(count)
+    sync_rate = run_sync(paths, workers)
+    async_rate = asyncio.run(run_async(paths, concurrency))
+    print(f"  throughput gain: {async_rate / sync_rate:.1f}x")
+    server.should_exit = True
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 20
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+    concurrency = int(sys.argv[4]) if len(sys.argv) > 4 else 128
+    run(count, latency_ms, workers, concurrency)
@@ -0,0 +1,81 @@
+"""
+Benchmark: BM25Index MaxScore top-k queries vs exhaustive BM25 scoring
+
+Usage:
+    python benchmarks/bench_bm25_index.py [entries] [queries]
+"""
+import csv
+import itertools
+import os
+import random
+import sys
+import time
+
+# Add the backend directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.bm25_index import BM25Index
+from utils.preprocess import preprocess_pipeline
+
+KB_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'knowledge_base.csv')
+
+def synthetic_corpus(rng, size):
+    """Recombine the shipped KB questions/answers with a Zipf-like vocabulary"""
+    with open(KB_PATH, newline='', encoding='utf-8') as f:
+        seed_words = []
+        for row in csv.DictReader(f):
+            seed_words.extend(preprocess_pipeline(row['question'] + ' ' + row['answer']))
+    vocabulary = sorted(set(seed_words)) + [f"term{i}" for i in range(50000)]
+    cum_weights = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(len(vocabulary))))
+    documents = []
+    for _ in range(size):
+        documents.append(' '.join(rng.choices(vocabulary, cum_weights=cum_weights, k=rng.randint(15, 40))))
+    return documents, vocabulary, cum_weights
+
+def exhaustive_search(index, query, top_k):
+    """Score every document that shares a term with the query"""
+    scores = {}
+    for term in index.tokenizer(query):
+        if term not in index._doc_ids:
+            continue
+        idf = index._idf[term]
+        for doc_id, tf in zip(index._doc_ids[term], index._freqs[term]):
+            norm = index._norms[doc_id]
+            scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (index.k1 + 1) / (tf + norm)
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+    return ranked[:top_k]
+
+def run(size, query_count, top_k=10):
+    rng = random.Random(7)
+    documents, vocabulary, cum_weights = synthetic_corpus(rng, size)
+
+    start = time.perf_counter()
+    index = BM25Index.build(documents)
+    build_time = time.perf_counter() - start
+
+    queries = [' '.join(rng.choices(vocabulary[:2000], cum_weights=cum_weights[:2000], k=rng.randint(2, 5)))
+               for _ in range(query_count)]
+
+    mismatches = 0
+    start = time.perf_counter()
+    results = [index.search(query, top_k) for query in queries]
+    maxscore_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected = [exhaustive_search(index, query, top_k) for query in queries]
+    exhaustive_time = time.perf_counter() - start
+
+    for got, want in zip(results, expected):
+        if [doc_id for doc_id, _ in got] != [doc_id for doc_id, _ in want]:
+            mismatches += 1
+
+    print(f"{size:>8} entries: build {build_time:6.1f} s, "
+          f"MaxScore {maxscore_time / query_count * 1e3:8.3f} ms/query, "
+          f"exhaustive {exhaustive_time / query_count * 1e3:8.3f} ms/query, "
+          f"mismatches {mismatches}/{query_count}")
+    return mismatches
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    query_count = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    sys.exit(1 if run(size, query_count) else 0)
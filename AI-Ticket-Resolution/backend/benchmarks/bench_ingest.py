@@ -0,0 +1,77 @@
+"""
+Ticket creation under a burst: POST /api/tickets on the Flask app with a
+synchronous insert per request vs. the journaled write-behind queue, against
+a local PostgREST stand-in that adds a fixed round-trip latency per
+database request.
+
+Usage:
+    python benchmarks/bench_ingest.py [requests] [latency_ms] [workers]
+"""
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the backend directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmarks.bench_asgi import start_standin
+from database.write_behind import WriteBehindQueue
+
+def report(name, latencies, elapsed):
+    latencies = sorted(latencies)
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"  {name:<24}: {len(latencies) / elapsed:8.1f} req/s, "
+          f"p50 {statistics.median(latencies) * 1e3:7.1f} ms, p99 {p99 * 1e3:7.1f} ms")
+
+def post_all(client, count, workers, expected_status):
+    def call(number):
+        start = time.perf_counter()
+        response = client.post('/api/tickets', json={
+            "subject": f"Outage report {number}",
+            "description": "The VPN disconnects every few minutes and I cannot log in",
+            "priority": "high",
+        })
+        assert response.status_code == expected_status, response.data
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(workers) as pool:
+        latencies = list(pool.map(call, range(count)))
+    return latencies, time.perf_counter() - start
+
+def run(count, latency_ms, workers):
+    server, port = start_standin(latency_ms / 1000)
+    os.environ["DATABASE_URL"] = f"http://127.0.0.1:{port}"
+    os.environ["CACHE_BACKEND"] = "none"
+    import app as flask_app
+    client = flask_app.app.test_client()
+    print(f"{count} tickets from {workers} concurrent clients, {latency_ms:.0f} ms database round trip")
+
+    latencies, elapsed = post_all(client, count, workers, 201)
+    report("synchronous insert", latencies, elapsed)
+
+    journal_dir = tempfile.mkdtemp(prefix="ingest_")
+    try:
+        flask_app.ticket_queue = WriteBehindQueue(flask_app.db_service, journal_dir, max_pending=count).start()
+        latencies, elapsed = post_all(client, count, workers, 202)
+        report("write-behind (202)", latencies, elapsed)
+        start = time.perf_counter()
+        flask_app.ticket_queue.stop()
+        drained = elapsed + time.perf_counter() - start
+        stats = flask_app.ticket_queue.stats()
+        print(f"  all committed after {drained:.2f} s in {stats['batches']} batches "
+              f"({stats['committed']} tickets, {stats['committed'] / drained:.1f} tickets/s)")
+    finally:
+        flask_app.ticket_queue = None
+        shutil.rmtree(journal_dir)
+    server.should_exit = True
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 20
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else 16
+    run(count, latency_ms, workers)
@@ -0,0 +1,97 @@
+"""
+Accuracy and latency: hashed n-gram logistic regression vs the keyword model,
+on a synthetic labeled ticket corpus shaped like data/sample_tickets.csv.
+Training streams the corpus in mini-batches; 20% is held out for testing.
+
+Usage:
+    python benchmarks/bench_intent_classifier.py [tickets] [epochs]
+"""
+import os
+import random
+import sys
+import time
+
+# Add the backend directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.keyword_matcher import KeywordMatcher
+from utils.linear_classifier import LinearIntentClassifier, labeled_batches
+
+# The keyword model written by model/train_model.py
+KEYWORD_MODEL = {
+    'account_access': ['password', 'account', 'login', 'signin', 'username', 'locked'],
+    'billing': ['billing', 'payment', 'charge', 'subscription', 'refund', 'invoice'],
+    'feature_request': ['feature', 'request', 'enhancement', 'improvement'],
+    'bug_report': ['bug', 'crash', 'error', 'issue', 'problem', 'not working'],
+    'data': ['data', 'export', 'import', 'privacy', 'gdpr']
+}
+
+# Phrases per category; several share words with other categories' keywords
+PHRASES = {
+    'account_access': ["can't sign in", "forgot my password", "two factor code never arrives", "locked out",
+                       "reset link expired", "cannot log into my account", "username not recognized",
+                       "session keeps logging me out"],
+    'billing': ["charged twice", "refund for last month", "update my credit card", "invoice is wrong",
+                "cancel my subscription", "payment failed", "billing issue with my plan", "overcharged"],
+    'feature_request': ["please add dark mode", "would love an api", "support for calendar sync",
+                        "request a bulk edit option", "add keyboard shortcuts", "wish list integration",
+                        "an enhancement for reports", "option to export to pdf"],
+    'bug_report': ["app crashes on startup", "button does nothing", "error 500 when saving", "page not loading",
+                   "the upload is broken", "problem with notifications", "screen freezes", "not working on mobile"],
+    'data': ["download all my records", "delete my personal information", "gdpr request", "export my data",
+             "import contacts from csv", "where is my data stored", "privacy settings", "data retention policy"],
+    'general_inquiry': ["what are your opening hours", "how does the product work", "who do i contact",
+                        "question about your company", "do you have a phone number", "where are you located",
+                        "general question", "talk to a human"],
+}
+FILLER = ["hi", "hello", "please help", "thanks", "urgent", "asap", "since yesterday", "on my account",
+          "for my team", "again", "today", "this morning", "on the website", "in the app", "problem"]
+
+def build_corpus(rng, count):
+    rows = []
+    categories = list(PHRASES)
+    for _ in range(count):
+        category = rng.choice(categories)
+        words = [rng.choice(PHRASES[category])]
+        words += [rng.choice(FILLER) for _ in range(rng.randint(0, 3))]
+        if rng.random() < 0.3:
+            # A phrase from another category, as in "billing issue" tickets
+            words.append(rng.choice(PHRASES[rng.choice(categories)]).split()[-1])
+        rng.shuffle(words)
+        rows.append({"subject": words[0].capitalize(), "description": ' '.join(words[1:]), "category": category})
+    return rows
+
+def text_of(row):
+    return f"{row['subject']} {row['description']}"
+
+def measure(name, model, texts, labels):
+    start = time.perf_counter()
+    predictions = [model.classify(text) for text in texts]
+    single = (time.perf_counter() - start) / len(texts)
+    start = time.perf_counter()
+    batch_predictions = model.classify_batch(texts)
+    batch = (time.perf_counter() - start) / len(texts)
+    assert predictions == batch_predictions
+    accuracy = sum(prediction == label for prediction, label in zip(predictions, labels)) / len(labels)
+    print(f"  {name:<22}: accuracy {accuracy:6.1%}, {single * 1e6:6.1f} us/ticket single, "
+          f"{batch * 1e6:6.1f} us/ticket batched")
+
+def run(count, epochs):
+    rng = random.Random(11)
+    rows = build_corpus(rng, count)
+    split = int(len(rows) * 0.8)
+    train, test = rows[:split], rows[split:]
+    texts, labels = [text_of(row) for row in test], [row['category'] for row in test]
+
+    start = time.perf_counter()
+    model = LinearIntentClassifier().fit_stream(lambda: labeled_batches(train, 256), epochs)
+    elapsed = time.perf_counter() - start
+    print(f"{len(train)} training / {len(test)} test tickets, {epochs} epochs "
+          f"({len(train) * epochs / elapsed:.0f} tickets/sec training)")
+    measure("keyword baseline", KeywordMatcher(KEYWORD_MODEL), texts, labels)
+    measure("hashed n-gram logistic", model, texts, labels)
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    epochs = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    run(count, epochs)
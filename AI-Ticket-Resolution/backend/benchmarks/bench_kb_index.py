@@ -0,0 +1,87 @@
+"""
+Cost of keeping the KB search index current under writes: rebuilding the
+BM25 index after every write vs. applying each write as a delta to the
+segmented (LSM-style) index, plus search latency while segments pile up
+and after compaction
+
+Usage:
+    python benchmarks/bench_kb_index.py [entries] [writes] [queries]
+"""
+import os
+import random
+import sys
+import time
+
+# Add the backend directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.bm25_index import BM25Index
+from utils.knowledge_search import entry_text
+from utils.segmented_index import SegmentedKnowledgeIndex
+
+CATEGORIES = ["account_access", "billing", "bug_report", "feature_request", "data"]
+
+def build_entry(rng, entry_id, vocabulary):
+    return {"id": entry_id, "question": ' '.join(rng.choice(vocabulary) for _ in range(rng.randint(4, 16))),
+            "answer": ' '.join(rng.choice(vocabulary) for _ in range(rng.randint(8, 24))),
+            "category": rng.choice(CATEGORIES)}
+
+def search_rate(index, queries):
+    start = time.perf_counter()
+    for query in queries:
+        index.search(query, 5)
+    return len(queries) / (time.perf_counter() - start)
+
+def run(entries_count, write_count, query_count):
+    rng = random.Random(5)
+    vocabulary = [f"term{i}" for i in range(20000)]
+    entries = [build_entry(rng, i, vocabulary) for i in range(entries_count)]
+    queries = [' '.join(rng.choice(vocabulary) for _ in range(rng.randint(3, 8))) for _ in range(query_count)]
+    # A mix of inserts, updates and deletes
+    writes = []
+    next_id = entries_count
+    for _ in range(write_count):
+        roll = rng.random()
+        if roll < 0.5:
+            writes.append(("upsert", build_entry(rng, next_id, vocabulary)))
+            next_id += 1
+        elif roll < 0.8:
+            writes.append(("upsert", build_entry(rng, rng.randrange(entries_count), vocabulary)))
+        else:
+            writes.append(("delete", rng.randrange(entries_count)))
+    print(f"{entries_count} entries, {write_count} writes, {query_count} queries")
+
+    # Full rebuild per write, timed over a sample and extrapolated
+    sample = min(write_count, 5)
+    start = time.perf_counter()
+    for _ in range(sample):
+        BM25Index.build(entry_text(entry) for entry in entries)
+    rebuild = (time.perf_counter() - start) / sample
+    print(f"  full rebuild per write      : {rebuild * 1e3:10.2f} ms  ({1 / rebuild:10,.1f} writes/sec)")
+
+    index = SegmentedKnowledgeIndex(entries).start()
+    print(f"  search, one segment         : {search_rate(index, queries):10,.0f} queries/sec")
+    start = time.perf_counter()
+    for action, payload in writes:
+        if action == "upsert":
+            index.upsert(payload)
+        else:
+            index.delete(payload)
+    elapsed = time.perf_counter() - start
+    print(f"  segmented delta per write   : {elapsed / write_count * 1e3:10.4f} ms  "
+          f"({write_count / elapsed:10,.0f} writes/sec)")
+    stats = index.stats()
+    print(f"  segments after writes       : {stats['segments']} + {stats['memtable']} in memtable, "
+          f"{stats['merges']} merges")
+    print(f"  search, after writes        : {search_rate(index, queries):10,.0f} queries/sec")
+    index.stop()
+    start = time.perf_counter()
+    index.compact()
+    print(f"  compaction                  : {(time.perf_counter() - start) * 1e3:10.2f} ms")
+    print(f"  search, compacted           : {search_rate(index, queries):10,.0f} queries/sec")
+
+if __name__ == "__main__":
+    entries_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    write_count = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    query_count = int(sys.argv[3]) if len(sys.argv) > 3 else 1000
+    run(entries_count, write_count, query_count)
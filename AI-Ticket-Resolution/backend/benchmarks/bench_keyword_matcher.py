@@ -0,0 +1,90 @@
+"""
+Microbenchmark: compiled KeywordMatcher vs the per-keyword substring loop
+
+Usage:
+    python benchmarks/bench_keyword_matcher.py [categories] [keywords_per_category]
+"""
+import os
+import random
+import string
+import sys
+import time
+
+# Add the backend directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.keyword_matcher import KeywordMatcher
+
+def legacy_classify_text(text, model):
+    """The original classify_text loop, kept here as the baseline"""
+    text_lower = text.lower()
+    scores = {}
+    for category, keywords in model.items():
+        score = sum(1 for keyword in keywords if keyword in text_lower)
+        scores[category] = score
+    if max(scores.values()) > 0:
+        return max(scores.items(), key=lambda x: x[1])[0]
+    else:
+        return 'general_inquiry'
+
+def random_word(rng, min_len=3, max_len=9):
+    return ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(min_len, max_len)))
+
+def build_model(rng, categories, keywords_per_category):
+    vocabulary = [random_word(rng) for _ in range(categories * keywords_per_category // 2 + 1)]
+    model = {}
+    for index in range(categories):
+        keywords = [rng.choice(vocabulary) for _ in range(keywords_per_category)]
+        # Some multi-word keywords, like 'not working' in the shipped model
+        keywords.append('%s %s' % (rng.choice(vocabulary), rng.choice(vocabulary)))
+        model[f"category_{index}"] = keywords
+    return model, vocabulary
+
+def build_texts(rng, vocabulary, count, words):
+    filler = [random_word(rng) for _ in range(200)]
+    texts = []
+    for _ in range(count):
+        tokens = [rng.choice(vocabulary) if rng.random() < 0.2 else rng.choice(filler) for _ in range(words)]
+        texts.append(' '.join(tokens).capitalize())
+    return texts
+
+def time_it(func, texts, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def run(categories, keywords_per_category, text_count=200, words=60):
+    rng = random.Random(42)
+    model, vocabulary = build_model(rng, categories, keywords_per_category)
+    texts = build_texts(rng, vocabulary, text_count, words)
+
+    start = time.perf_counter()
+    matcher = KeywordMatcher(model)
+    compile_time = time.perf_counter() - start
+
+    mismatches = sum(1 for text in texts if legacy_classify_text(text, model) != matcher.classify(text))
+
+    legacy = time_it(lambda text: legacy_classify_text(text, model), texts)
+    compiled = time_it(matcher.classify, texts)
+    keyword_count = sum(len(keywords) for keywords in model.values())
+
+    print(f"{categories:>5} categories, {keyword_count:>6} keywords: "
+          f"legacy {legacy / text_count * 1e6:9.1f} us/text, "
+          f"compiled {compiled / text_count * 1e6:9.1f} us/text, "
+          f"speedup {legacy / compiled:6.1f}x, "
+          f"compile {compile_time * 1e3:7.1f} ms, mismatches {mismatches}")
+    return mismatches
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        sizes = [(int(sys.argv[1]), int(sys.argv[2]))]
+    else:
+        sizes = [(5, 6), (50, 20), (200, 20), (500, 10)]
+    failures = 0
+    for categories, keywords_per_category in sizes:
+        failures += run(categories, keywords_per_category)
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,80 @@
+"""
+Memory and time of holding a large ticket result set as Ticket dataclasses
+or one columnar TicketBatch: build from
+backend rows, filter on status/priority, count per category, and the cost
+of a full garbage collection while the result set is alive
+
+Usage:
+    python benchmarks/bench_models.py [tickets]
+"""
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import Counter
+
+# Add the backend directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from database.columnar import TicketBatch
+from database.models import Ticket, TICKET_PRIORITIES, TICKET_STATUSES, row_to_model
+
+CATEGORIES = ["account_access", "billing", "bug_report", "feature_request", "data", "general_inquiry"]
+
+def build_rows(count):
+    rng = random.Random(3)
+    return [{
+        "id": i + 1, "subject": f"Ticket {i}", "description": f"Cannot log in to account {i}",
+        "priority": rng.choice(TICKET_PRIORITIES), "status": rng.choice(TICKET_STATUSES),
+        "category": rng.choice(CATEGORIES), "created_at": f"2024-01-01T00:{i // 60 % 60:02d}:{i % 60:02d}",
+        "updated_at": None, "user_id": None,
+    } for i in range(count)]
+
+def measure(label, build, select, count_categories):
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    gc.collect()
+    # Timed again without tracemalloc's per-allocation overhead
+    start = time.perf_counter()
+    result = build()
+    built = time.perf_counter() - start
+    start = time.perf_counter()
+    selected = select(result)
+    filtered = time.perf_counter() - start
+    start = time.perf_counter()
+    count_categories(result)
+    counted = time.perf_counter() - start
+    start = time.perf_counter()
+    gc.collect()
+    collected = time.perf_counter() - start
+    print(f"  {label:<18}: {memory / 2 ** 20:7.1f} MiB, build {built * 1e3:7.1f} ms, "
+          f"filter {filtered * 1e3:6.1f} ms ({selected} rows), count {counted * 1e3:6.1f} ms, "
+          f"gc {collected * 1e3:6.1f} ms")
+    return result
+
+def run(count):
+    rows = build_rows(count)
+    print(f"{count} tickets (memory excludes the shared backend rows and strings)")
+    start = time.perf_counter()
+    gc.collect()
+    print(f"  gc with only the backend rows alive: {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+    def filter_objects(tickets):
+        return len([t for t in tickets if t.status == "open" and t.priority == "high"])
+
+    def count_objects(tickets):
+        return Counter(t.category for t in tickets)
+
+    measure("Ticket", lambda: [row_to_model(Ticket, row) for row in rows], filter_objects, count_objects)
+    measure("TicketBatch", lambda: TicketBatch.from_rows(rows),
+            lambda batch: len(batch.where(status="open", priority="high")),
+            lambda batch: batch.counts("category"))
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -0,0 +1,73 @@
+"""
+Cost of the instrumentation: a histogram observation, a storage backend
+call with and without the latency wrapper, rendering /metrics, and a log
+line written with print() vs. through the queued, sampled logging setup
+(output goes to /dev/null in both cases)
+
+Usage:
+    python benchmarks/bench_observability.py [calls]
+"""
+import logging
+import os
+import sys
+import time
+
+# Add the backend directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from database.memory_backend import MemoryBackend
+from database.timing import TimedBackend
+from utils.logging_config import configure_logging
+from utils.metrics import REGISTRY, REQUEST_SECONDS
+
+def per_call(label, function, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        function()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<40}: {elapsed / calls * 1e9:10,.0f} ns/call")
+
+def run(calls):
+    child = REQUEST_SECONDS.labels("/api/bench", "GET", "200")
+    per_call("histogram observe", lambda: child.observe(0.003), calls)
+    per_call("labels() + observe", lambda: REQUEST_SECONDS.labels("/api/bench", "GET", "200").observe(0.003), calls)
+
+    backend = MemoryBackend()
+    backend.insert_tickets([{"subject": "Cannot log in", "description": "VPN drops", "priority": "high",
+                             "status": "open", "category": "account_access"}])
+    timed = TimedBackend(backend)
+    per_call("backend.get_ticket", lambda: backend.get_ticket(1), calls)
+    per_call("TimedBackend.get_ticket", lambda: timed.get_ticket(1), calls)
+
+    start = time.perf_counter()
+    body = REGISTRY.render()
+    print(f"  {'render /metrics':<40}: {(time.perf_counter() - start) * 1e3:10.2f} ms "
+          f"({body.count(chr(10))} lines)")
+
+    devnull = open(os.devnull, "w")
+    stdout, stderr = sys.stdout, sys.stderr
+    sys.stdout = sys.stderr = devnull
+    try:
+        start = time.perf_counter()
+        for i in range(calls):
+            print(f"Ticket batch insert failed, retrying in 0.5s: attempt {i}")
+        printed = time.perf_counter() - start
+        # The stream handler binds sys.stderr (now /dev/null) when configured
+        configure_logging("INFO", "json", sample_rate=1.0, burst=calls, window=60.0, max_queue=calls)
+        logger = logging.getLogger("bench")
+        start = time.perf_counter()
+        for i in range(calls):
+            logger.info("Ticket batch insert failed, retrying in %.1fs: attempt %d", 0.5, i)
+        logged = time.perf_counter() - start
+        start = time.perf_counter()
+        for i in range(calls):
+            logger.debug("Not emitted at INFO: attempt %d", i)
+        filtered = time.perf_counter() - start
+    finally:
+        sys.stdout, sys.stderr = stdout, stderr
+    print(f"  {'print()':<40}: {printed / calls * 1e9:10,.0f} ns/call")
+    print(f"  {'logger.info, queued JSON':<40}: {logged / calls * 1e9:10,.0f} ns/call (caller side)")
+    print(f"  {'logger.debug below level':<40}: {filtered / calls * 1e9:10,.0f} ns/call")
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
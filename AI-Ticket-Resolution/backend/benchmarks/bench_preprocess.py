@@ -0,0 +1,64 @@
+"""
+Throughput (texts/sec) of the preprocessing pipeline: the original
+clean_text/tokenize_text, the current preprocess_pipeline, batched and
+streaming calls, and the optional normalization/stopword/stemming and
+vocabulary interning stages
+
+Usage:
+    python benchmarks/bench_preprocess.py [texts] [words_per_text]
+"""
+import os
+import random
+import re
+import string
+import sys
+import time
+
+# Add the backend directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.preprocess import (TextPreprocessor, Vocabulary, preprocess_batch, preprocess_pipeline,
+                              preprocess_stream)
+
+WORDS = ["password", "reset", "account", "locked", "billing", "charged", "twice", "refund", "crash", "error",
+         "export", "data", "feature", "request", "the", "my", "I", "can't", "please", "help", "app", "login"]
+
+def legacy_preprocess_pipeline(text):
+    """The original clean_text + tokenize_text, kept here as the baseline"""
+    text = text.lower()
+    text = text.translate(str.maketrans('', '', string.punctuation))
+    text = re.sub(r'\s+', ' ', text).strip()
+    return text.split()
+
+def build_texts(rng, count, words):
+    texts = []
+    for _ in range(count):
+        tokens = [rng.choice(WORDS) for _ in range(words)]
+        tokens[-1] += rng.choice(["?", "!", ".", "..."])
+        texts.append(' '.join(tokens).capitalize())
+    return texts
+
+def timed(label, fn, count):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<36}: {count / elapsed:12,.0f} texts/sec")
+
+def run(count, words):
+    rng = random.Random(7)
+    texts = build_texts(rng, count, words)
+    assert preprocess_batch(texts) == [legacy_preprocess_pipeline(text) for text in texts]
+    print(f"{count} texts of {words} words")
+    timed("legacy clean_text + tokenize", lambda: [legacy_preprocess_pipeline(text) for text in texts], count)
+    timed("preprocess_pipeline", lambda: [preprocess_pipeline(text) for text in texts], count)
+    timed("preprocess_batch", lambda: preprocess_batch(texts), count)
+    timed("preprocess_stream", lambda: sum(1 for _ in preprocess_stream(iter(texts))), count)
+    full = TextPreprocessor(normalize='NFKC', stopwords=True, stem=True)
+    timed("NFKC + stopwords + stemming, batch", lambda: full.batch(texts), count)
+    vocabulary = Vocabulary()
+    timed("batch + vocabulary ids", lambda: [vocabulary.encode(tokens) for tokens in preprocess_batch(texts)], count)
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    words = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+    run(count, words)
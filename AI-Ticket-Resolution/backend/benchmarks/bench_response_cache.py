@@ -0,0 +1,75 @@
+"""
+Microbenchmark: classify + build the /api/ai/respond answer for a repetitive
+query stream, uncached vs through the normalized-query cache, and the
+precompiled response templates vs rebuilding the f-string dict per call
+
+Usage:
+    python benchmarks/bench_response_cache.py [queries] [distinct_questions]
+"""
+import os
+import random
+import sys
+import time
+
+# Add the backend directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import app
+from utils.query_cache import QueryCache
+
+OPENERS = ["how do i", "how can i", "how to", "i need to", "please help me", "can you help me"]
+TOPICS = ["reset my password", "update my payment method", "export my data", "cancel my subscription",
+          "report a crash on login", "request a dark mode feature", "change my email address"]
+TAILS = ["", "?", " asap", " thanks", " please", "!!", " for my account"]
+
+def legacy_build_response(query, classification):
+    """The original build_response, kept here as the baseline"""
+    responses = {
+        'account_access': f"I understand you're having an account access issue: '{query}'. To reset your password, please go to the login page and click 'Forgot Password'. If you're locked out, please contact our support team.",
+        'billing': f"This appears to be a billing-related query: '{query}'. For billing issues, you can update your payment method in Account Settings or contact our billing department at billing@example.com.",
+        'bug_report': f"Thanks for reporting this bug: '{query}'. Our development team will investigate this issue. Please provide any additional details that might help us reproduce the problem.",
+        'feature_request': f"Thank you for your feature request: '{query}'. We appreciate your feedback and will consider it for future development.",
+        'data': f"I see you're asking about data: '{query}'. You can export your data from Account Settings > Privacy > Data Export. For data deletion requests, please contact privacy@example.com.",
+        'general_inquiry': f"Thank you for your inquiry: '{query}'. This is an AI-generated response. A human agent will review your ticket and respond shortly."
+    }
+    return responses.get(classification, f"Thank you for your query: '{query}'. This is an AI-generated response. A human agent will review your ticket and respond shortly.")
+
+def build_queries(rng, count, distinct):
+    questions = [f"{rng.choice(OPENERS)} {rng.choice(TOPICS)}" for _ in range(distinct)]
+    return [rng.choice(questions).capitalize() + rng.choice(TAILS) for _ in range(count)]
+
+def timed(label, fn, queries):
+    start = time.perf_counter()
+    for query in queries:
+        fn(query)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28}: {elapsed / len(queries) * 1e6:7.2f} us/query")
+
+def run(count, distinct):
+    rng = random.Random(3)
+    queries = build_queries(rng, count, distinct)
+    model = app.model_handle.value
+    cache = QueryCache()
+
+    def cached(query):
+        classification = cache.get(query)
+        if classification is None:
+            classification = app.classify_text(query, model)
+            cache.put(query, classification)
+        return app.build_response(query, classification)
+
+    print(f"{count} queries drawn from {distinct} questions")
+    timed("uncached, legacy templates", lambda q: legacy_build_response(q, app.classify_text(q, model)), queries)
+    timed("uncached, compiled templates", lambda q: app.build_response(q, app.classify_text(q, model)), queries)
+    timed("query cache", cached, queries)
+    stats = cache.stats()
+    print(f"  cache: {stats['entries']} entries, {stats['hits']} exact hits, "
+          f"{stats['near_hits']} near-duplicate hits, {stats['misses']} misses")
+    disagreements = sum(cached(query) != app.build_response(query, app.classify_text(query, model))
+                        for query in queries)
+    print(f"  answers differing from uncached classification: {disagreements}")
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    distinct = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    run(count, distinct)
@@ -0,0 +1,70 @@
+"""
+Ticket serialization: the old hand-built nine-field dict + stdlib json vs.
+the shared serializer (precomputed field getters, orjson when installed,
+stdlib fallback), and peak memory of encoding a large listing in one piece
+vs. streaming it chunk by chunk
+
+Usage:
+    python benchmarks/bench_serialization.py [tickets] [rounds]
+"""
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+# Add the backend directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from database import serialization
+from database.models import Ticket
+from database.serialization import iter_json_listing, to_dict
+
+def hand_built(ticket):
+    return {
+        "id": ticket.id,
+        "subject": ticket.subject,
+        "description": ticket.description,
+        "priority": ticket.priority,
+        "status": ticket.status,
+        "category": ticket.category,
+        "created_at": ticket.created_at,
+        "updated_at": ticket.updated_at,
+        "user_id": ticket.user_id
+    }
+
+def timed(label, encode, tickets, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        encode(tickets)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<34}: {len(tickets) * rounds / elapsed:12,.0f} tickets/sec")
+
+def peak(label, encode):
+    tracemalloc.start()
+    encode()
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<34}: {peak_bytes / 2 ** 20:8.1f} MiB peak")
+
+def run(count, rounds):
+    tickets = [Ticket(id=i, subject=f"Cannot log in {i}", description="The VPN drops every few minutes " * 4,
+                      priority="high", status="open", category="account_access",
+                      created_at="2024-01-01T00:00:00", updated_at="2024-01-01T00:00:00") for i in range(count)]
+    print(f"{count} tickets x {rounds} rounds, encoder: {serialization.ENCODER}")
+    timed("hand-built dict + json.dumps", lambda batch: json.dumps([hand_built(t) for t in batch]).encode(),
+          tickets, rounds)
+    timed("to_dict + stdlib encoder", lambda batch: serialization._stdlib_encoder.encode(
+        [to_dict(t) for t in batch]).encode(), tickets, rounds)
+    timed("to_dict + dumps", lambda batch: serialization.dumps([to_dict(t) for t in batch]), tickets, rounds)
+    timed("dumps(models) directly", serialization.dumps, tickets, rounds)
+
+    rows = [to_dict(ticket) for ticket in tickets]
+    peak("whole body at once", lambda: serialization.dumps({"tickets": rows, "next_cursor": None}))
+    peak("streamed, 100 tickets per chunk",
+         lambda: sum(len(chunk) for chunk in iter_json_listing("tickets", rows, {"next_cursor": None}, 100)))
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    run(count, rounds)
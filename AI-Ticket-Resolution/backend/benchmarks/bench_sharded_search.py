@@ -0,0 +1,65 @@
+"""
+Throughput of sharded KB search: batches of queries answered by one
+in-process vector index vs. fanned out over a process pool of shard
+workers, for increasing worker counts (shards = workers)
+
+Usage:
+    python benchmarks/bench_sharded_search.py [entries] [queries] [batch_size]
+"""
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+# Add the backend directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.knowledge_search import entry_text
+from utils.sharded_search import ShardedKnowledgeBase, build_shards
+from utils.vector_search import VectorSearchIndex
+
+CATEGORIES = ["account_access", "billing", "bug_report", "feature_request", "data"]
+
+def build_entries(rng, count, vocabulary):
+    return [{"id": i, "question": ' '.join(rng.choice(vocabulary) for _ in range(rng.randint(4, 16))),
+             "answer": ' '.join(rng.choice(vocabulary) for _ in range(rng.randint(8, 24))),
+             "category": rng.choice(CATEGORIES)} for i in range(count)]
+
+def timed(label, search, queries, batch_size):
+    start = time.perf_counter()
+    for offset in range(0, len(queries), batch_size):
+        search(queries[offset:offset + batch_size])
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28}: {len(queries) / elapsed:10,.0f} queries/sec")
+
+def run(entries_count, query_count, batch_size):
+    rng = random.Random(11)
+    vocabulary = [f"term{i}" for i in range(20000)]
+    entries = build_entries(rng, entries_count, vocabulary)
+    queries = [' '.join(rng.choice(vocabulary) for _ in range(rng.randint(3, 8))) for _ in range(query_count)]
+    print(f"{entries_count} entries, {query_count} queries in batches of {batch_size}, {os.cpu_count()} cores")
+
+    single = VectorSearchIndex.build([entry_text(entry) for entry in entries])
+    timed("in-process index", lambda batch: single.search_batch(batch, 5), queries, batch_size)
+
+    directory = tempfile.mkdtemp(prefix="kb_shards_")
+    try:
+        workers = 1
+        while workers <= os.cpu_count():
+            build_shards(entries, directory, workers)
+            shards = ShardedKnowledgeBase(directory, workers)
+            shards.warm_up()
+            timed(f"{workers} shards / {workers} workers", lambda batch: shards.search_batch(batch, 5),
+                  queries, batch_size)
+            shards.close()
+            workers *= 2
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    entries_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    query_count = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    batch_size = int(sys.argv[3]) if len(sys.argv) > 3 else 256
+    run(entries_count, query_count, batch_size)
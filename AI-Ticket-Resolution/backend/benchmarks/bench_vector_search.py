@@ -0,0 +1,70 @@
+"""
+Benchmark: VectorSearchIndex throughput (queries/sec) for batch sizes 1, 64 and 1024
+
+Usage:
+    python benchmarks/bench_vector_search.py [entries]
+"""
+import csv
+import itertools
+import os
+import random
+import sys
+import time
+
+# Add the backend directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.preprocess import preprocess_pipeline
+from utils.vector_search import VectorSearchIndex
+
+KB_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'knowledge_base.csv')
+BATCH_SIZES = (1, 64, 1024)
+
+def synthetic_texts(rng, size):
+    with open(KB_PATH, newline='', encoding='utf-8') as f:
+        seed_words = []
+        for row in csv.DictReader(f):
+            seed_words.extend(preprocess_pipeline(row['question'] + ' ' + row['answer']))
+    vocabulary = sorted(set(seed_words)) + [f"term{i}" for i in range(20000)]
+    cum_weights = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(len(vocabulary))))
+    texts = [' '.join(rng.choices(vocabulary, cum_weights=cum_weights, k=rng.randint(15, 40)))
+             for _ in range(size)]
+    return texts, vocabulary, cum_weights
+
+def row_loop_search(index, query, top_k):
+    """Baseline: one Python-level dot product per KB row"""
+    vector = index.embed([query])
+    scores = [(row, float(vector.multiply(index.matrix[row]).sum())) for row in range(len(index))]
+    return sorted(scores, key=lambda item: -item[1])[:top_k]
+
+def run(size, top_k=5):
+    rng = random.Random(11)
+    texts, vocabulary, cum_weights = synthetic_texts(rng, size)
+
+    start = time.perf_counter()
+    index = VectorSearchIndex.build(texts)
+    print(f"{size} entries, {index.matrix.shape[1]} features, built in {time.perf_counter() - start:.1f} s")
+
+    queries = [' '.join(rng.choices(vocabulary, cum_weights=cum_weights, k=rng.randint(3, 8)))
+               for _ in range(max(BATCH_SIZES) * 2)]
+
+    for batch_size in BATCH_SIZES:
+        batches = [queries[i:i + batch_size] for i in range(0, len(queries), batch_size)][:max(2, 64 // batch_size)]
+        start = time.perf_counter()
+        answered = 0
+        for batch in batches:
+            index.search_batch(batch, top_k)
+            answered += len(batch)
+        elapsed = time.perf_counter() - start
+        print(f"  batch {batch_size:>5}: {answered / elapsed:10.1f} queries/s "
+              f"({elapsed / len(batches) * 1e3:8.2f} ms/batch)")
+
+    sample = queries[:3]
+    start = time.perf_counter()
+    for query in sample:
+        row_loop_search(index, query, top_k)
+    elapsed = time.perf_counter() - start
+    print(f"  per-row loop baseline: {len(sample) / elapsed:10.1f} queries/s")
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
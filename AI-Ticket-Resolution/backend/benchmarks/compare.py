@@ -0,0 +1,75 @@
+"""
+Compare two benchmark suite results (benchmarks/suite.py) metric by metric:
+latencies and durations (``*_ms`` except the single-sample ``max_ms``,
+``*_s``, ``seconds``) regress when they grow, throughputs (``*_per_sec``)
+when they shrink. Changes beyond the threshold are listed, and the exit
+status is 1 when anything regressed. Only compare runs made on the same
+machine with the same settings.
+
+Usage:
+    python benchmarks/compare.py baseline.json current.json [threshold]
+"""
+import json
+import sys
+from typing import Any, Dict, Iterator, List, Tuple
+
+DEFAULT_THRESHOLD = 0.10
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def flatten(value: Any, prefix: str = "") -> Iterator[Tuple[str, float]]:
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from flatten(item, f"{prefix}/{key}" if prefix else key)
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        yield prefix, value
+
+def direction(metric: str) -> int:
+    """
+    1 if a larger value is better, -1 if smaller is better, 0 if neither
+    """
+    name = metric.rsplit("/", 1)[-1]
+    if name == "max_ms":
+        # A single sample: too noisy to call a regression
+        return 0
+    if name.endswith("_per_sec"):
+        return 1
+    if name.endswith(("_ms", "_s")) or name == "seconds":
+        return -1
+    return 0
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """
+    Print the metrics that changed by more than ``threshold``; returns the
+    regressed ones
+    """
+    before = dict(flatten(baseline["results"]))
+    after = dict(flatten(current["results"]))
+    regressions = []
+    for metric in sorted(before.keys() & after.keys()):
+        sign = direction(metric)
+        old, new = before[metric], after[metric]
+        if not sign or not old:
+            continue
+        change = (new - old) / old
+        if abs(change) <= threshold:
+            continue
+        worse = change * sign < 0
+        if worse:
+            regressions.append(metric)
+        print(f"{'REGRESSED' if worse else 'improved ':<9}  {metric:<72} {old:>14,.4f} -> {new:>14,.4f} "
+              f"({change:+.0%})")
+    missing = sorted(before.keys() - after.keys())
+    if missing:
+        print(f"{len(missing)} metrics of the baseline are missing from the current run")
+    print(f"{len(regressions)} regressions beyond {threshold:.0%} "
+          f"(baseline {baseline['meta'].get('commit')}, current {current['meta'].get('commit')})")
+    return regressions
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        sys.exit(__doc__)
+    threshold = float(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_THRESHOLD
+    sys.exit(1 if compare(load(sys.argv[1]), load(sys.argv[2]), threshold) else 0)
@@ -0,0 +1,180 @@
+"""
+Synthetic ticket and knowledge base corpora for the benchmark suite, grown
+from the shapes of data/sample_tickets.csv and data/knowledge_base.csv:
+every generated row starts from a seed row of the same category, keeps its
+wording, and adds phrases from the knowledge base answers of that category
+and filler words from a vocabulary that grows with the corpus. The same
+scale and seed always give the same rows.
+
+Usage:
+    python benchmarks/corpus.py [scale] [output_dir] [seed]
+
+writes tickets-<scale>.csv and knowledge_base-<scale>.csv in the columns
+of the seed files (scale: 1k, 100k, 1m or a row count)
+"""
+import csv
+import os
+import random
+import re
+import string
+import sys
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List
+
+# Add the backend directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config import Config
+from database.models import TICKET_STATUSES
+from utils.knowledge_search import read_knowledge_base_csv
+
+SCALES = {"1k": 1000, "100k": 100000, "1m": 1000000}
+DEFAULT_SEED = 7
+# Share of generated tickets per status; the sample file only has open ones
+STATUS_WEIGHTS = {"open": 0.4, "in_progress": 0.2, "resolved": 0.3, "closed": 0.1}
+START_TIME = datetime(2024, 1, 1)
+
+def parse_scale(scale: str) -> int:
+    """
+    Row count of a scale name (1k, 100k, 1m) or a plain number
+    """
+    return SCALES.get(scale.lower()) or int(scale)
+
+def read_sample_tickets(path: str = None) -> List[Dict[str, str]]:
+    with open(path or Config.path(Config.TICKETS_CSV_PATH), newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+class CorpusGenerator:
+    """
+    Deterministic ticket, knowledge base entry and query generator
+    """
+
+    def __init__(self, seed: int = DEFAULT_SEED, tickets: List[Dict[str, str]] = None,
+                 knowledge_base: List[Dict[str, Any]] = None):
+        self.seed = seed
+        tickets = tickets or read_sample_tickets()
+        knowledge_base = knowledge_base or read_knowledge_base_csv(Config.path(Config.KNOWLEDGE_BASE_PATH))
+        self.tickets_by_category: Dict[str, List[Dict[str, str]]] = {}
+        for row in tickets:
+            self.tickets_by_category.setdefault(row["category"], []).append(row)
+        self.entries_by_category: Dict[str, List[Dict[str, Any]]] = {}
+        for entry in knowledge_base:
+            self.entries_by_category.setdefault(entry["category"], []).append(entry)
+        # Categories weighted as in the sample tickets, priorities likewise
+        category_counts = Counter(row["category"] for row in tickets)
+        self.categories = list(category_counts)
+        self.category_weights = [category_counts[name] for name in self.categories]
+        priority_counts = Counter(row["priority"] for row in tickets)
+        self.priorities = list(priority_counts)
+        self.priority_weights = [priority_counts[name] for name in self.priorities]
+        self.statuses = [status for status in STATUS_WEIGHTS if status in TICKET_STATUSES]
+        self.status_weights = [STATUS_WEIGHTS[status] for status in self.statuses]
+        # Sentences of the answers, appended to descriptions and questions as context
+        self.phrases_by_category = {
+            category: [sentence.strip() for entry in entries for sentence in re.split(r"(?<=[.!?])\s+", entry["answer"])
+                       if sentence.strip()]
+            for category, entries in self.entries_by_category.items()
+        }
+
+    def _vocabulary(self, rng: random.Random, count: int) -> List[str]:
+        # Filler words: more distinct words in larger corpora, drawn with a
+        # skew so a few are common and most are rare, like real ticket text
+        size = 2000 + int(count ** 0.6)
+        return ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9))) for _ in range(size)]
+
+    @staticmethod
+    def _filler(rng: random.Random, vocabulary: List[str], most: int) -> str:
+        size = len(vocabulary)
+        return " ".join(vocabulary[int(size * rng.random() ** 3)] for _ in range(rng.randint(0, most)))
+
+    def _text(self, rng: random.Random, vocabulary: List[str], base: str, category: str) -> str:
+        parts = [base]
+        phrases = self.phrases_by_category.get(category)
+        if phrases and rng.random() < 0.5:
+            parts.append(rng.choice(phrases))
+        filler = self._filler(rng, vocabulary, 8)
+        if filler:
+            parts.append(filler)
+        return " ".join(parts)
+
+    def tickets(self, count: int) -> Iterator[Dict[str, Any]]:
+        """
+        ``count`` ticket rows (no id) in the columns of the tickets table
+        """
+        rng = random.Random(f"tickets-{self.seed}-{count}")
+        vocabulary = self._vocabulary(rng, count)
+        created = START_TIME
+        for number in range(count):
+            category = rng.choices(self.categories, self.category_weights)[0]
+            template = rng.choice(self.tickets_by_category[category])
+            created += timedelta(seconds=rng.randint(1, 120))
+            timestamp = created.isoformat()
+            yield {
+                "subject": template["subject"] if rng.random() < 0.7 else f"{template['subject']} #{number}",
+                "description": self._text(rng, vocabulary, template["description"], category),
+                "priority": rng.choices(self.priorities, self.priority_weights)[0],
+                "status": rng.choices(self.statuses, self.status_weights)[0],
+                "category": category,
+                "created_at": timestamp,
+                "updated_at": timestamp,
+                "user_id": None
+            }
+
+    def knowledge_base(self, count: int) -> Iterator[Dict[str, Any]]:
+        """
+        ``count`` knowledge base rows (question, answer, category)
+        """
+        rng = random.Random(f"knowledge_base-{self.seed}-{count}")
+        vocabulary = self._vocabulary(rng, count)
+        categories = list(self.entries_by_category)
+        for _ in range(count):
+            category = rng.choice(categories)
+            template = rng.choice(self.entries_by_category[category])
+            filler = self._filler(rng, vocabulary, 4)
+            yield {
+                "question": f"{template['question']} {filler}" if filler else template["question"],
+                "answer": self._text(rng, vocabulary, template["answer"], category),
+                "category": category
+            }
+
+    def queries(self, count: int) -> List[str]:
+        """
+        ``count`` user queries: ticket descriptions and knowledge base
+        questions of another seed than the corpora
+        """
+        rng = random.Random(f"queries-{self.seed}-{count}")
+        vocabulary = self._vocabulary(rng, count)
+        queries = []
+        for _ in range(count):
+            category = rng.choices(self.categories, self.category_weights)[0]
+            if rng.random() < 0.5 and category in self.entries_by_category:
+                base = rng.choice(self.entries_by_category[category])["question"]
+            else:
+                base = rng.choice(self.tickets_by_category[category])["description"]
+            filler = self._filler(rng, vocabulary, 3)
+            queries.append(f"{base} {filler}" if filler else base)
+        return queries
+
+def write_csv(path: str, rows: Iterator[Dict[str, Any]], columns: List[str], with_id: bool = False) -> int:
+    written = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow((["id"] if with_id else []) + columns)
+        for written, row in enumerate(rows, 1):
+            writer.writerow(([written] if with_id else []) + [row[column] for column in columns])
+    return written
+
+if __name__ == "__main__":
+    scale = sys.argv[1] if len(sys.argv) > 1 else "1k"
+    output_dir = sys.argv[2] if len(sys.argv) > 2 else "."
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_SEED
+    count = parse_scale(scale)
+    generator = CorpusGenerator(seed)
+    os.makedirs(output_dir, exist_ok=True)
+    tickets_path = os.path.join(output_dir, f"tickets-{scale}.csv")
+    kb_path = os.path.join(output_dir, f"knowledge_base-{scale}.csv")
+    write_csv(tickets_path, generator.tickets(count), ["subject", "description", "priority", "status", "category"],
+              with_id=True)
+    write_csv(kb_path, generator.knowledge_base(count), ["question", "answer", "category"])
+    print(f"Wrote {count} tickets to {tickets_path} and {count} entries to {kb_path}")
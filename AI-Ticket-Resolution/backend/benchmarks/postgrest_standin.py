@@ -0,0 +1,104 @@
+"""
+Local stand-in for the Supabase REST (PostgREST) API, backed by the
+in-memory storage backend, with a configurable delay per request to model
+the network round trip to a hosted database. Only the requests sent by
+database/rest_backend.py are understood.
+
+Usage:
+    python benchmarks/postgrest_standin.py [port] [latency_ms]
+"""
+import asyncio
+import os
+import re
+import sys
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+# Add the backend directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from database.errors import ConstraintViolationError
+from database.memory_backend import MemoryBackend
+from database.pagination import TICKET_COLUMNS
+
+KEYSET = re.compile(r'\(created_at\.lt\."(.*?)",and\(created_at\.eq\."(.*?)",id\.lt\.(\d+)\)\)')
+
+def create_standin(latency=0.02, backend=None):
+    """
+    ASGI app serving /tickets, /users and /knowledge_base from ``backend``
+    (a fresh MemoryBackend by default), sleeping ``latency`` seconds per request
+    """
+    backend = backend or MemoryBackend()
+
+    def columns_of(params):
+        select = params.get("select", "*")
+        return list(TICKET_COLUMNS) if select == "*" else select.split(",")
+
+    def ticket_rows(params):
+        row_id = params.get("id", "")
+        if row_id.startswith("eq."):
+            row = backend.get_ticket(int(row_id[3:]))
+            return [row] if row else []
+        if row_id.startswith("gt."):
+            rows, last_id, limit = [], int(row_id[3:]), int(params.get("limit", 1000))
+            for row in backend.iter_ticket_rows(limit, columns_of(params)):
+                if row["id"] > last_id:
+                    rows.append(row)
+                    if len(rows) == limit:
+                        break
+            return rows
+        filters = {column: params[column][3:] for column in ("status", "priority", "category", "user_id")
+                   if column in params}
+        keyset = None
+        if "or" in params:
+            created_at, _, ticket_id = KEYSET.fullmatch(params["or"]).groups()
+            keyset = (created_at, int(ticket_id))
+        if "limit" not in params:
+            return backend.list_tickets()
+        return backend.ticket_page(filters, keyset, columns_of(params), int(params["limit"]))
+
+    async def tickets(request):
+        await asyncio.sleep(latency)
+        params = request.query_params
+        try:
+            if request.method == "GET":
+                return JSONResponse(ticket_rows(params))
+            ticket_id = int(params.get("id", "eq.0")[3:])
+            if request.method == "POST":
+                body = await request.json()
+                return JSONResponse(backend.insert_tickets(body if isinstance(body, list) else [body]), 201)
+            if request.method == "PATCH":
+                row = backend.update_ticket(ticket_id, await request.json())
+                return JSONResponse([row] if row else [])
+            row = backend.get_ticket(ticket_id)
+            return JSONResponse([row] if row and backend.delete_ticket(ticket_id) else [])
+        except ConstraintViolationError as e:
+            return JSONResponse({"code": "23514", "message": str(e)}, 400)
+
+    async def users(request):
+        await asyncio.sleep(latency)
+        if request.method == "POST":
+            try:
+                return JSONResponse([backend.insert_user(await request.json())], 201)
+            except ConstraintViolationError as e:
+                return JSONResponse({"code": "23505", "message": str(e)}, 409)
+        row = backend.get_user(request.query_params.get("id", "eq.")[3:])
+        return JSONResponse([row] if row else [])
+
+    async def knowledge_base(request):
+        await asyncio.sleep(latency)
+        return JSONResponse(backend.knowledge_base_rows())
+
+    return Starlette(routes=[
+        Route('/tickets', tickets, methods=['GET', 'POST', 'PATCH', 'DELETE']),
+        Route('/users', users, methods=['GET', 'POST']),
+        Route('/knowledge_base', knowledge_base, methods=['GET']),
+    ])
+
+if __name__ == "__main__":
+    import uvicorn
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 20
+    uvicorn.run(create_standin(latency_ms / 1000), host="127.0.0.1", port=port, log_level="warning")
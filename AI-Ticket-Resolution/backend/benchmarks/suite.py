@@ -0,0 +1,308 @@
+"""
+Benchmark suite: intent classification, text preprocessing, knowledge base
+search, the DatabaseService backends (in-memory and SQLite) and the Flask
+API through its test client, on synthetic corpora (benchmarks/corpus.py) of
+each requested scale. Latencies are reported as percentiles, throughputs
+as operations per second, and everything is written to one JSON file so
+runs can be compared with benchmarks/compare.py.
+
+Each latency measurement runs until it has made ``--calls`` calls or spent
+``--budget`` seconds, whichever comes first, but makes at least 20 calls
+unless those take three times the budget; so slow operations at 1m rows
+still finish. The number of calls is recorded with the percentiles.
+
+Usage:
+    python benchmarks/suite.py [--scales=1k,100k,1m] [--only=classify,preprocess,kb,db,flask]
+                               [--calls=2000] [--budget=10] [--seed=7] [--output=path.json]
+                               [--baseline=previous.json]
+"""
+import gc
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Sequence
+
+# The app and database service are created on import: keep them in memory
+# and quiet, unless the caller chose otherwise
+os.environ.setdefault("DATABASE_URL", "memory://")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("WRITE_BEHIND", "0")
+
+# Add the backend directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmarks.corpus import CorpusGenerator, DEFAULT_SEED, parse_scale
+
+SECTIONS = ("classify", "preprocess", "kb", "db", "flask")
+INSERT_BATCH_SIZE = 1000
+KB_BATCH_SIZE = 32
+MIN_CALLS = 20
+FORMAT_VERSION = 1
+
+def latency_stats(latencies: List[float], elapsed: float) -> Dict[str, Any]:
+    """
+    Calls, calls per second and nearest-rank latency percentiles in ms
+    """
+    latencies = sorted(latencies)
+    count = len(latencies)
+
+    def percentile(share):
+        return round(latencies[max(0, math.ceil(share * count) - 1)] * 1e3, 4)
+
+    return {
+        "calls": count,
+        "ops_per_sec": round(count / elapsed, 1) if elapsed else None,
+        "mean_ms": round(sum(latencies) / count * 1e3, 4),
+        "p50_ms": percentile(0.5),
+        "p90_ms": percentile(0.9),
+        "p99_ms": percentile(0.99),
+        "p999_ms": percentile(0.999),
+        "max_ms": round(latencies[-1] * 1e3, 4)
+    }
+
+def measure(function: Callable[[Any], Any], inputs: Sequence[Any], settings: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Time ``function(item)`` per call over ``inputs`` (cycled), within the
+    call and time budget of ``settings``
+    """
+    latencies = []
+    clock = time.perf_counter
+    started = clock()
+    deadline = started + settings["budget"]
+    hard_deadline = started + 3 * settings["budget"]
+    for number in range(settings["calls"]):
+        item = inputs[number % len(inputs)]
+        start = clock()
+        function(item)
+        end = clock()
+        latencies.append(end - start)
+        if end > deadline and (number >= MIN_CALLS - 1 or end > hard_deadline):
+            break
+    return latency_stats(latencies, clock() - started)
+
+def throughput(function: Callable[[], int]) -> Dict[str, Any]:
+    """
+    Items per second of ``function()``, which returns how many it processed
+    """
+    start = time.perf_counter()
+    items = function()
+    seconds = time.perf_counter() - start
+    return {"items": items, "seconds": round(seconds, 4), "items_per_sec": round(items / seconds, 1) if seconds else None}
+
+def chunks(items: Sequence[Any], size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def bench_classify(generator: CorpusGenerator, count: int, settings: Dict[str, Any]) -> Dict[str, Any]:
+    from app import classify_text, classify_texts, model_handle, model_name
+    model = model_handle.value
+    texts = [row["description"] for row in generator.tickets(count)]
+    return {
+        "model": model_name(model),
+        "classify_text": measure(lambda text: classify_text(text, model), texts, settings),
+        "classify_texts": throughput(lambda: sum(len(classify_texts(chunk, model)) for chunk in chunks(texts, 256)))
+    }
+
+def bench_preprocess(generator: CorpusGenerator, count: int, settings: Dict[str, Any]) -> Dict[str, Any]:
+    from utils.preprocess import preprocess_pipeline
+    texts = [row["description"] for row in generator.tickets(count)]
+    return {
+        "preprocess_pipeline": measure(preprocess_pipeline, texts, settings),
+        "corpus": throughput(lambda: sum(1 for text in texts if preprocess_pipeline(text) is not None))
+    }
+
+def bench_kb(generator: CorpusGenerator, count: int, settings: Dict[str, Any]) -> Dict[str, Any]:
+    from database.database_service import DatabaseService
+    from database.memory_backend import MemoryBackend
+    from database.models import KnowledgeBaseEntry
+    from utils.knowledge_search import KnowledgeBase, find_similar_questions, find_similar_questions_batch
+    entries = [dict(entry, id=number) for number, entry in enumerate(generator.knowledge_base(count), 1)]
+    queries = generator.queries(1000)
+    results = {"batch_size": KB_BATCH_SIZE}
+
+    # BM25 over the CSV-style knowledge base, as the app searches it without trained artifacts
+    knowledge_base = KnowledgeBase(entries)
+    start = time.perf_counter()
+    knowledge_base.index
+    results["bm25_build_s"] = round(time.perf_counter() - start, 4)
+    results["find_similar_questions"] = measure(lambda query: find_similar_questions(query, knowledge_base, 5),
+                                                queries, settings)
+    batches = list(chunks(queries, KB_BATCH_SIZE))
+    results["find_similar_questions_batch"] = measure(
+        lambda batch: find_similar_questions_batch(batch, knowledge_base, 5), batches, settings)
+    del knowledge_base
+    gc.collect()
+
+    # The storage backend's segmented index: built on first search, then kept current by deltas
+    service = DatabaseService(MemoryBackend())
+    for entry in entries:
+        service.backend.insert_knowledge_base_entry({key: value for key, value in entry.items() if key != "id"})
+    del entries
+    gc.collect()
+    start = time.perf_counter()
+    service.search_knowledge_base(queries[0], 5)
+    results["index_build_s"] = round(time.perf_counter() - start, 4)
+    results["service_search"] = measure(lambda query: service.search_knowledge_base(query, 5), queries, settings)
+    results["service_create_entry"] = measure(
+        lambda query: service.create_knowledge_base_entry(KnowledgeBaseEntry(question=query, answer=query,
+                                                                             category="general_inquiry")),
+        queries, settings)
+    service.backend.close()
+    return results
+
+def bench_backend(service, generator: CorpusGenerator, count: int, settings: Dict[str, Any]) -> Dict[str, Any]:
+    from database.models import Ticket
+    rng = random.Random(generator.seed)
+    # Generated up front so the insert timing is only the inserts
+    tickets = [Ticket(**row) for row in generator.tickets(count)]
+    results = {"insert": throughput(lambda: sum(service.bulk_create_tickets(batch)
+                                                for batch in chunks(tickets, INSERT_BATCH_SIZE)))}
+    del tickets
+    ids = [rng.randint(1, count) for _ in range(1000)]
+    filters = [{"status": rng.choice(generator.statuses), "category": rng.choice(generator.categories)}
+               for _ in range(100)]
+    results["get_ticket_by_id"] = measure(service.get_ticket_by_id, ids, settings)
+    results["get_tickets_page"] = measure(lambda query: service.get_tickets_page(query, 50), filters, settings)
+    results["update_ticket"] = measure(lambda ticket_id: service.update_ticket(ticket_id, {"status": "in_progress"}),
+                                       ids, settings)
+    results["scan"] = throughput(lambda: len(service.get_ticket_batch("status,priority,category")))
+    return results
+
+def bench_db(generator: CorpusGenerator, count: int, settings: Dict[str, Any]) -> Dict[str, Any]:
+    from database.database_service import DatabaseService
+    from database.memory_backend import MemoryBackend
+    from database.sqlite_backend import SQLiteBackend
+    results = {}
+    service = DatabaseService(MemoryBackend())
+    results["memory"] = bench_backend(service, generator, count, settings)
+    service.backend.close()
+    del service
+    gc.collect()
+    directory = tempfile.mkdtemp(prefix="bench-suite-")
+    try:
+        service = DatabaseService(SQLiteBackend(os.path.join(directory, "tickets.db")))
+        results["sqlite"] = bench_backend(service, generator, count, settings)
+        service.backend.close()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return results
+
+def bench_flask(generator: CorpusGenerator, count: int, settings: Dict[str, Any]) -> Dict[str, Any]:
+    from app import app, db_service
+    from database.models import Ticket
+    rng = random.Random(generator.seed)
+    loaded = 0
+    batch = []
+    # On top of whatever earlier scales left in the app's store
+    first_id = len(db_service.get_ticket_batch("id")) + 1
+    for row in generator.tickets(count):
+        batch.append(Ticket(**row))
+        if len(batch) == INSERT_BATCH_SIZE:
+            loaded += db_service.bulk_create_tickets(batch)
+            batch = []
+    loaded += db_service.bulk_create_tickets(batch)
+    client = app.test_client()
+    queries = generator.queries(1000)
+    ids = [rng.randint(first_id, first_id + count - 1) for _ in range(1000)]
+    statuses = [rng.choice(generator.statuses) for _ in range(100)]
+    errors = {}
+
+    def call(name, method, path, body=None):
+        response = client.open(path, method=method, json=body)
+        response.get_data()
+        if response.status_code >= 400:
+            errors[name] = errors.get(name, 0) + 1
+
+    endpoints = {
+        "GET /api/tickets/<id>": (lambda ticket_id: call("GET /api/tickets/<id>", "GET", f"/api/tickets/{ticket_id}"),
+                                  ids),
+        "GET /api/tickets": (lambda status: call("GET /api/tickets", "GET", f"/api/tickets?status={status}&limit=50"),
+                             statuses),
+        "GET /api/tickets/summary": (lambda status: call("GET /api/tickets/summary", "GET",
+                                                         f"/api/tickets/summary?status={status}"), statuses),
+        "POST /api/tickets": (lambda query: call("POST /api/tickets", "POST", "/api/tickets",
+                                                 {"subject": query[:40], "description": query}), queries),
+        "POST /api/ai/classify": (lambda query: call("POST /api/ai/classify", "POST", "/api/ai/classify",
+                                                     {"text": query}), queries),
+        "POST /api/ai/respond": (lambda query: call("POST /api/ai/respond", "POST", "/api/ai/respond",
+                                                    {"query": query}), queries),
+        "POST /api/ai/search": (lambda query: call("POST /api/ai/search", "POST", "/api/ai/search",
+                                                   {"query": query, "top_k": 5}), queries),
+    }
+    results = {"tickets_loaded": loaded}
+    for name, (function, inputs) in endpoints.items():
+        results[name] = measure(function, inputs, settings)
+    results["errors"] = errors
+    return results
+
+BENCHMARKS = {
+    "classify": bench_classify,
+    "preprocess": bench_preprocess,
+    "kb": bench_kb,
+    "db": bench_db,
+    "flask": bench_flask,
+}
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(scales: List[str], sections: List[str], settings: Dict[str, Any]) -> Dict[str, Any]:
+    from database.serialization import ENCODER
+    generator = CorpusGenerator(settings["seed"])
+    document = {
+        "format": FORMAT_VERSION,
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "json_encoder": ENCODER,
+            "database_url": os.environ["DATABASE_URL"],
+            **settings
+        },
+        "results": {}
+    }
+    for scale in scales:
+        count = parse_scale(scale)
+        results = document["results"][scale] = {}
+        for section in sections:
+            print(f"[{scale}] {section} ...", file=sys.stderr, flush=True)
+            start = time.perf_counter()
+            results[section] = BENCHMARKS[section](generator, count, settings)
+            results[section]["section_seconds"] = round(time.perf_counter() - start, 2)
+            gc.collect()
+    return document
+
+if __name__ == "__main__":
+    options = dict(argument[2:].split("=", 1) for argument in sys.argv[1:] if argument.startswith("--") and "=" in argument)
+    scales = options.get("scales", "1k").split(",")
+    sections = options["only"].split(",") if "only" in options else list(SECTIONS)
+    unknown = [section for section in sections if section not in BENCHMARKS]
+    if unknown:
+        sys.exit(f"Unknown sections {unknown}; choose from {', '.join(SECTIONS)}")
+    settings = {
+        "calls": int(options.get("calls", 2000)),
+        "budget": float(options.get("budget", 10.0)),
+        "seed": int(options.get("seed", DEFAULT_SEED))
+    }
+    output = options.get("output") or f"benchmark-results-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    document = run(scales, sections, settings)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2)
+    print(f"Wrote {output}", file=sys.stderr)
+    if "baseline" in options:
+        from benchmarks.compare import compare, load
+        sys.exit(1 if compare(load(options["baseline"]), document) else 0)
@@ -3,5 +3,105 @@ import os
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key'
     DATABASE_URL = os.environ.get('DATABASE_URL') or 'sqlite:///tickets.db'
+    # Batch AI endpoints: request size limit and items processed per streamed chunk
+    MAX_BATCH_SIZE = int(os.environ.get('MAX_BATCH_SIZE', 50000))
+    BATCH_CHUNK_SIZE = 256
+    # GET /api/tickets page size (default and upper bound)
+    TICKETS_PAGE_SIZE = 50
+    MAX_TICKETS_PAGE_SIZE = 500
+    # Tickets encoded per chunk when a listing is streamed as JSON
+    JSON_CHUNK_SIZE = 100
+    # Bulk ticket import/export: rows per multi-row insert and rows per export page
+    IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', 500))
+    EXPORT_PAGE_SIZE = int(os.environ.get('EXPORT_PAGE_SIZE', 1000))
+    # Write-behind ticket ingestion (POST /api/tickets answers 202 with a
+    # provisional id): queued tickets are journaled under INGEST_JOURNAL_DIR
+    # and group-committed up to INGEST_BATCH_SIZE at a time, waiting at most
+    # INGEST_LINGER seconds for a batch to fill. A full queue (INGEST_QUEUE_SIZE)
+    # makes requests wait up to INGEST_ENQUEUE_TIMEOUT seconds, then get a 503.
+    # INGEST_FSYNC=1 syncs the journal to disk on every ticket
+    WRITE_BEHIND = os.environ.get('WRITE_BEHIND', '0') == '1'
+    INGEST_JOURNAL_DIR = 'ingest_journal'
+    INGEST_QUEUE_SIZE = int(os.environ.get('INGEST_QUEUE_SIZE', 10000))
+    INGEST_BATCH_SIZE = int(os.environ.get('INGEST_BATCH_SIZE', 500))
+    INGEST_LINGER = float(os.environ.get('INGEST_LINGER', 0.01))
+    INGEST_ENQUEUE_TIMEOUT = float(os.environ.get('INGEST_ENQUEUE_TIMEOUT', 0.5))
+    INGEST_FSYNC = os.environ.get('INGEST_FSYNC', '0') == '1'
+    # HTTP database clients (REST backends, ASGI app): pooled keep-alive
+    # connections, cap on in-flight requests, per-request timeout in seconds
+    DATABASE_API_KEY = os.environ.get('DATABASE_API_KEY')
+    DB_MAX_CONNECTIONS = int(os.environ.get('DB_MAX_CONNECTIONS', 100))
+    DB_MAX_CONCURRENCY = int(os.environ.get('DB_MAX_CONCURRENCY', 64))
+    DB_TIMEOUT = float(os.environ.get('DB_TIMEOUT', 10.0))
+    # Read-through cache in front of the database: 'memory' (per process),
+    # 'shared' (one store for all workers on the host, in a private directory
+    # under /dev/shm unless CACHE_SHARED_PATH is set) or 'none'; TTLs in seconds
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'memory')
+    CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', 10000))
+    CACHE_SHARED_PATH = os.environ.get('CACHE_SHARED_PATH')
+    CACHE_TICKET_TTL = float(os.environ.get('CACHE_TICKET_TTL', 30))
+    CACHE_KB_TTL = float(os.environ.get('CACHE_KB_TTL', 300))
+    # /api/ai/respond classification cache: entries kept and the token-set
+    # Jaccard similarity at which a paraphrase counts as a hit. Off (0) by
+    # default: a lookup costs more than the keyword model's classification,
+    # so enable it for slower classifiers
+    RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', 0))
+    RESPONSE_CACHE_SIMILARITY = float(os.environ.get('RESPONSE_CACHE_SIMILARITY', 0.8))
+    # Artifact paths are relative to the backend directory
+    BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
     MODEL_PATH = 'model/intent_model.pkl'
-    VECTORIZER_PATH = 'model/vectorizer.pkl'
\ No newline at end of file
+    VECTORIZER_PATH = 'model/vectorizer.pkl'
+    KB_MATRIX_PATH = 'model/kb_matrix.npz'
+    KB_ENTRIES_PATH = 'model/kb_entries.json'
+    ANN_INDEX_PATH = 'model/kb_ann.npz'
+    # Memory-mapped artifacts shared by all worker processes
+    KB_ARTIFACT_PATH = 'model/kb_index.bin'
+    MODEL_ARTIFACT_PATH = 'model/intent_model.bin'
+    # Pickled keyword model from model/train_model.py
+    LEGACY_MODEL_PATH = 'intent_model.pkl'
+    # Seconds between checks of the model/knowledge base files for changes (0 disables hot reload)
+    ARTIFACT_POLL_INTERVAL = float(os.environ.get('ARTIFACT_POLL_INTERVAL', 2.0))
+    # Trained intent classifier (model/train_model.py --linear); used instead
+    # of the keyword model when INTENT_MODEL=linear
+    LINEAR_MODEL_PATH = 'model/intent_linear.bin'
+    TICKETS_CSV_PATH = '../data/sample_tickets.csv'
+    INTENT_MODEL = os.environ.get('INTENT_MODEL', 'keyword')
+    # Online learning: partial_fit on tickets resolved with a confirmed
+    # category, published as numbered snapshots that every worker swaps in
+    ONLINE_LEARNING = os.environ.get('ONLINE_LEARNING', '0') == '1'
+    ONLINE_BATCH_SIZE = int(os.environ.get('ONLINE_BATCH_SIZE', 32))
+    ONLINE_FLUSH_INTERVAL = float(os.environ.get('ONLINE_FLUSH_INTERVAL', 5.0))
+    MODEL_SNAPSHOT_DIR = 'model/snapshots'
+    MODEL_SNAPSHOTS_KEPT = 5
+    KNOWLEDGE_BASE_PATH = '../data/knowledge_base.csv'
+    # Hybrid KB search (POST /api/ai/search, KB answers): 'rrf' or 'weighted'
+    # fusion of BM25 and vector candidates, the vector share of the weighted
+    # score, and how the predicted category is used: 'boost' (same-category
+    # entries scored KB_CATEGORY_BOOST higher), 'filter' or 'none'.
+    # KB_PARALLEL_SEARCH runs BM25 and vector retrieval on two threads
+    KB_FUSION = os.environ.get('KB_FUSION', 'rrf')
+    KB_VECTOR_WEIGHT = float(os.environ.get('KB_VECTOR_WEIGHT', 0.5))
+    KB_CATEGORY_MODE = os.environ.get('KB_CATEGORY_MODE', 'boost')
+    KB_CATEGORY_BOOST = float(os.environ.get('KB_CATEGORY_BOOST', 0.5))
+    KB_PARALLEL_SEARCH = os.environ.get('KB_PARALLEL_SEARCH', '0') == '1'
+    KB_MAX_TOP_K = 50
+    # Sharded KB search (model/train_model.py --shards=N): shard artifacts are
+    # memory-mapped by KB_SEARCH_WORKERS processes that batch KB lookups fan
+    # out to; 0 workers keeps search in-process
+    KB_SHARDS_DIR = 'model/kb_shards'
+    KB_SHARD_PARTITION = os.environ.get('KB_SHARD_PARTITION', 'hash')
+    KB_SEARCH_WORKERS = int(os.environ.get('KB_SEARCH_WORKERS', 0))
+    # Logging: level, 'json' (one object per line) or 'text' format, the
+    # share of DEBUG/INFO records kept, and at most LOG_RATE_BURST records per
+    # call site every LOG_RATE_WINDOW seconds. Records are written by a
+    # background thread; GET /metrics exposes request/DB/search latencies
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+    LOG_FORMAT = os.environ.get('LOG_FORMAT', 'json')
+    LOG_SAMPLE_RATE = float(os.environ.get('LOG_SAMPLE_RATE', 1.0))
+    LOG_RATE_BURST = int(os.environ.get('LOG_RATE_BURST', 20))
+    LOG_RATE_WINDOW = float(os.environ.get('LOG_RATE_WINDOW', 10.0))
+
+    @classmethod
+    def path(cls, relative_path):
+        """Resolve one of the paths above against the backend directory"""
+        return os.path.join(cls.BACKEND_DIR, relative_path)
\ No newline at end of file
@@ -0,0 +1,226 @@
+import asyncio
+import functools
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import Config
+from .models import Ticket, User, KnowledgeBaseEntry, ticket_to_dict, knowledge_base_entry_to_dict, row_to_model
+from .pagination import TICKET_UPDATE_COLUMNS, KB_UPDATE_COLUMNS, TICKET_COUNT_COLUMNS, decode_cursor, page_query, \
+    finish_page
+from .events import ChangeEvent, EventEmitter
+from .columnar import KBBatch
+from .storage import Row, StorageBackend, AsyncStorageBackend
+from .supabase_client import SUPABASE_URL, SUPABASE_KEY
+from .timing import TimedBackend
+
+class ThreadedBackend(AsyncStorageBackend):
+    """
+    Runs a blocking StorageBackend (SQLite, in-memory) on worker threads so
+    the event loop never waits on it; at most ``max_concurrency`` calls run
+    at once
+    """
+
+    def __init__(self, backend: StorageBackend, max_concurrency: int = 64):
+        super().__init__()
+        self.backend = backend
+        self.name = backend.name
+        self._slots = asyncio.Semaphore(max_concurrency)
+
+    async def _call(self, method, *args):
+        async with self._slots:
+            return await asyncio.get_running_loop().run_in_executor(None, functools.partial(method, *args))
+
+    async def close(self):
+        self.backend.close()
+
+    async def list_tickets(self) -> List[Row]:
+        return await self._call(self.backend.list_tickets)
+
+    async def insert_tickets(self, rows: List[Row]) -> List[Row]:
+        return await self._call(self.backend.insert_tickets, rows)
+
+    async def get_ticket(self, ticket_id: int) -> Optional[Row]:
+        return await self._call(self.backend.get_ticket, ticket_id)
+
+    async def update_ticket(self, ticket_id: int, changes: Row) -> Optional[Row]:
+        return await self._call(self.backend.update_ticket, ticket_id, changes)
+
+    async def delete_ticket(self, ticket_id: int) -> bool:
+        return await self._call(self.backend.delete_ticket, ticket_id)
+
+    async def ticket_page(self, filters: Row, keyset: Optional[Tuple[str, int]],
+                          columns: List[str], limit: int) -> List[Row]:
+        return await self._call(self.backend.ticket_page, filters, keyset, columns, limit)
+
+    async def ticket_counts(self, filters: Row, columns: List[str], page_size: int) -> Dict[str, Dict[Any, int]]:
+        return await self._call(self.backend.ticket_counts, filters, columns, page_size)
+
+    async def get_user(self, user_id: str) -> Optional[Row]:
+        return await self._call(self.backend.get_user, user_id)
+
+    async def insert_user(self, row: Row) -> Row:
+        return await self._call(self.backend.insert_user, row)
+
+    async def knowledge_base_rows(self) -> List[Row]:
+        return await self._call(self.backend.knowledge_base_rows)
+
+    async def insert_knowledge_base_entry(self, row: Row) -> Row:
+        return await self._call(self.backend.insert_knowledge_base_entry, row)
+
+    async def update_knowledge_base_entry(self, entry_id: int, changes: Row) -> Optional[Row]:
+        return await self._call(self.backend.update_knowledge_base_entry, entry_id, changes)
+
+    async def delete_knowledge_base_entry(self, entry_id: int) -> bool:
+        return await self._call(self.backend.delete_knowledge_base_entry, entry_id)
+
+    async def search_knowledge_base(self, query: str, top_k: int) -> List[Row]:
+        return await self._call(self.backend.search_knowledge_base, query, top_k)
+
+    async def refresh_knowledge_base_index(self):
+        await self._call(self.backend.refresh_knowledge_base_index)
+
+    def apply_knowledge_base_change(self, event):
+        # The wrapped backend owns the search index
+        self.backend.apply_knowledge_base_change(event)
+
+class AsyncDatabaseService(EventEmitter):
+    """
+    Coroutine counterpart of DatabaseService for the ASGI app: same methods,
+    dataclasses and errors, over an AsyncStorageBackend
+    """
+
+    def __init__(self, backend: AsyncStorageBackend):
+        super().__init__()
+        self.backend = TimedBackend(backend)
+        self.subscribe(backend.apply_knowledge_base_change)
+
+    async def close(self):
+        await self.backend.close()
+
+    # Ticket operations
+    async def get_all_tickets(self) -> List[Ticket]:
+        return [row_to_model(Ticket, row) for row in await self.backend.list_tickets()]
+
+    async def bulk_create_tickets(self, tickets: List[Ticket]) -> int:
+        if not tickets:
+            return 0
+        return len(await self.backend.insert_tickets([ticket_to_dict(ticket) for ticket in tickets]))
+
+    async def get_tickets_page(self, filters: Optional[Dict[str, Any]] = None, limit: int = 50,
+                               cursor: Optional[str] = None,
+                               columns: Optional[List[str]] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        filters, columns, selected = page_query(filters, columns)
+        keyset = decode_cursor(cursor) if cursor else None
+        rows = await self.backend.ticket_page(filters, keyset, selected, limit + 1)
+        return finish_page(rows, limit, columns, selected)
+
+    async def get_ticket_counts(self, filters: Optional[Dict[str, Any]] = None,
+                                page_size: int = 1000) -> Dict[str, Any]:
+        filters, _, _ = page_query(filters, None)
+        counts = await self.backend.ticket_counts(filters, list(TICKET_COUNT_COLUMNS), page_size)
+        return {"total": sum(counts["status"].values()), **counts}
+
+    async def get_ticket_by_id(self, ticket_id: int) -> Optional[Ticket]:
+        row = await self.backend.get_ticket(ticket_id)
+        return row_to_model(Ticket, row) if row else None
+
+    async def create_ticket(self, ticket: Ticket) -> Optional[Ticket]:
+        rows = await self.backend.insert_tickets([ticket_to_dict(ticket)])
+        if not rows:
+            return None
+        created = row_to_model(Ticket, rows[0])
+        self.emit(ChangeEvent("tickets", "created", created.id, created, rows[0]))
+        return created
+
+    async def update_ticket(self, ticket_id: int, ticket_data: Dict[str, Any]) -> Optional[Ticket]:
+        ticket_data["updated_at"] = datetime.now().isoformat()
+        changes = {column: ticket_data[column] for column in TICKET_UPDATE_COLUMNS if column in ticket_data}
+        row = await self.backend.update_ticket(ticket_id, changes)
+        if not row:
+            return None
+        updated = row_to_model(Ticket, row)
+        self.emit(ChangeEvent("tickets", "updated", ticket_id, updated, changes))
+        return updated
+
+    async def delete_ticket(self, ticket_id: int) -> bool:
+        deleted = await self.backend.delete_ticket(ticket_id)
+        if deleted:
+            self.emit(ChangeEvent("tickets", "deleted", ticket_id))
+        return deleted
+
+    # User operations
+    async def get_user_by_id(self, user_id: str) -> Optional[User]:
+        row = await self.backend.get_user(user_id)
+        return row_to_model(User, row) if row else None
+
+    async def create_user(self, user: User) -> Optional[User]:
+        row = await self.backend.insert_user({
+            "email": user.email,
+            "name": user.name,
+            "created_at": user.created_at or datetime.now().isoformat()
+        })
+        return row_to_model(User, row) if row else None
+
+    # Knowledge base operations
+    async def get_knowledge_base_entries(self) -> List[KnowledgeBaseEntry]:
+        return [row_to_model(KnowledgeBaseEntry, row) for row in await self.backend.knowledge_base_rows()]
+
+    async def get_knowledge_base_batch(self) -> KBBatch:
+        return KBBatch.from_rows(await self.backend.knowledge_base_rows())
+
+    async def search_knowledge_base(self, query: str, top_k: int = 10) -> List[KnowledgeBaseEntry]:
+        rows = await self.backend.search_knowledge_base(query, top_k)
+        return [row_to_model(KnowledgeBaseEntry, row) for row in rows]
+
+    async def create_knowledge_base_entry(self, entry: KnowledgeBaseEntry) -> Optional[KnowledgeBaseEntry]:
+        row = await self.backend.insert_knowledge_base_entry(knowledge_base_entry_to_dict(entry))
+        if not row:
+            return None
+        created = row_to_model(KnowledgeBaseEntry, row)
+        self.emit(ChangeEvent("knowledge_base", "created", created.id, created, row))
+        return created
+
+    async def update_knowledge_base_entry(self, entry_id: int,
+                                          entry_data: Dict[str, Any]) -> Optional[KnowledgeBaseEntry]:
+        entry_data["updated_at"] = datetime.now().isoformat()
+        changes = {column: entry_data[column] for column in KB_UPDATE_COLUMNS if column in entry_data}
+        row = await self.backend.update_knowledge_base_entry(entry_id, changes)
+        if not row:
+            return None
+        updated = row_to_model(KnowledgeBaseEntry, row)
+        self.emit(ChangeEvent("knowledge_base", "updated", entry_id, updated, changes))
+        return updated
+
+    async def delete_knowledge_base_entry(self, entry_id: int) -> bool:
+        deleted = await self.backend.delete_knowledge_base_entry(entry_id)
+        if deleted:
+            self.emit(ChangeEvent("knowledge_base", "deleted", entry_id))
+        return deleted
+
+    async def refresh_knowledge_base_index(self):
+        await self.backend.refresh_knowledge_base_index()
+
+def create_async_backend(database_url: Optional[str] = None,
+                         shared: Optional[StorageBackend] = None) -> AsyncStorageBackend:
+    """
+    Async counterpart of database_service.create_backend: ``http(s)://`` URLs
+    and the default Supabase project are reached over pooled HTTP (no
+    supabase package needed), SQLite and in-memory stores run on threads.
+    ``shared`` is the blocking backend for the same URL, if the process
+    already has one; local stores then use it, since an in-memory store
+    exists once per backend instance
+    """
+    from .rest_backend import AsyncRestBackend
+    if database_url and database_url.startswith(("sqlite:", "memory:")):
+        from .database_service import create_backend
+        return ThreadedBackend(shared or create_backend(database_url), Config.DB_MAX_CONCURRENCY)
+    if database_url and database_url.startswith(("http://", "https://")):
+        base_url, api_key = database_url, Config.DATABASE_API_KEY
+    else:
+        base_url, api_key = f"{SUPABASE_URL}/rest/v1", SUPABASE_KEY
+    return AsyncRestBackend(base_url, api_key, Config.DB_MAX_CONNECTIONS,
+                            Config.DB_MAX_CONCURRENCY, Config.DB_TIMEOUT)
+
+def create_async_database_service(database_url: Optional[str] = None,
+                                  shared: Optional[StorageBackend] = None) -> AsyncDatabaseService:
+    return AsyncDatabaseService(create_async_backend(database_url, shared))
@@ -0,0 +1,175 @@
+import csv
+import io
+import json
+import time
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from utils.linear_classifier import ticket_text
+
+from .errors import ConstraintViolationError
+from .models import Ticket
+from .serialization import dumps
+
+TICKET_EXPORT_FIELDS = [
+    "id", "subject", "description", "priority", "status", "category",
+    "created_at", "updated_at", "user_id"
+]
+# Rejected rows listed in import results; the rest are only counted
+MAX_REPORTED_ERRORS = 20
+
+def detect_format(filename: str, default: str = "csv") -> str:
+    """
+    Pick 'csv' or 'ndjson' from a file name
+    """
+    lowered = (filename or "").lower()
+    if lowered.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    if lowered.endswith(".csv"):
+        return "csv"
+    return default
+
+def read_ticket_rows(stream: TextIO, fmt: str = "csv") -> Iterator[Dict[str, Any]]:
+    """
+    Lazily yield one dict per ticket from a CSV or NDJSON text stream
+    """
+    if fmt == "csv":
+        for row in csv.DictReader(stream):
+            yield row
+    elif fmt == "ndjson":
+        for line in stream:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+def chunked(iterable: Iterable, size: int) -> Iterator[List]:
+    """
+    Split an iterable into lists of at most ``size`` items
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def row_to_ticket(row: Dict[str, Any], category: Optional[str] = None) -> Ticket:
+    """
+    Build a new Ticket from an imported row; ids are assigned by the database
+    """
+    return Ticket(
+        subject=row.get("subject") or "",
+        description=row.get("description") or "",
+        priority=row.get("priority") or "medium",
+        status=row.get("status") or "open",
+        category=category or row.get("category") or "general",
+        created_at=row.get("created_at") or None,
+        updated_at=row.get("updated_at") or None,
+        user_id=row.get("user_id") or None
+    )
+
+def _reject(errors: List[Dict[str, Any]], row_number: int, error: Exception):
+    if len(errors) < MAX_REPORTED_ERRORS:
+        errors.append({"row": row_number, "error": str(error)})
+
+def _insert_chunk(db, tickets: List[Ticket], first_row: int, errors: List[Dict[str, Any]]) -> Tuple[int, int]:
+    # (inserted, rejected); a chunk the database rejects by a constraint is
+    # retried ticket by ticket, so one bad row fails only itself
+    try:
+        return db.bulk_create_tickets(tickets), 0
+    except ConstraintViolationError as e:
+        if len(tickets) == 1:
+            _reject(errors, first_row, e)
+            return 0, 1
+    inserted = rejected = 0
+    for row_number, ticket in enumerate(tickets, first_row):
+        try:
+            inserted += db.bulk_create_tickets([ticket])
+        except ConstraintViolationError as e:
+            rejected += 1
+            _reject(errors, row_number, e)
+    return inserted, rejected
+
+def import_tickets(rows: Iterable[Dict[str, Any]], db, classify_batch: Callable[[List[str]], List[str]],
+                   batch_size: int = 500) -> Dict[str, Any]:
+    """
+    Classify and insert rows in chunks of ``batch_size`` using multi-row inserts.
+    Rows that already carry a category keep it; the rest are classified per chunk.
+    Rows violating a constraint are skipped and counted as rejected, the
+    first few listed with their row number (1 = first data row).
+    Returns row counts and throughput.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+    start = time.perf_counter()
+    read = inserted = rejected = 0
+    errors: List[Dict[str, Any]] = []
+    for chunk in chunked(rows, batch_size):
+        first_row = read + 1
+        read += len(chunk)
+        missing = [index for index, row in enumerate(chunk) if not row.get("category")]
+        categories = [None] * len(chunk)
+        if missing:
+            # Subject and description, as for tickets created through the API
+            predicted = classify_batch([ticket_text(chunk[index]) for index in missing])
+            for index, category in zip(missing, predicted):
+                categories[index] = category
+        tickets = [row_to_ticket(row, category) for row, category in zip(chunk, categories)]
+        chunk_inserted, chunk_rejected = _insert_chunk(db, tickets, first_row, errors)
+        inserted += chunk_inserted
+        rejected += chunk_rejected
+    elapsed = time.perf_counter() - start
+    return {
+        "rows": read,
+        "inserted": inserted,
+        "rejected": rejected,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(read / elapsed, 1) if elapsed > 0 else None
+    }
+
+def _export_pages(db, fmt: str, page_size: int) -> Iterator[Tuple[str, int]]:
+    if page_size < 1:
+        raise ValueError("page_size must be at least 1")
+    rows = db.iter_ticket_rows(page_size=page_size, columns=",".join(TICKET_EXPORT_FIELDS))
+    if fmt == "ndjson":
+        for page in chunked(rows, page_size):
+            yield (b"\n".join(map(dumps, page)) + b"\n").decode("utf-8"), len(page)
+    elif fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=TICKET_EXPORT_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        for page in chunked(rows, page_size):
+            writer.writerows(page)
+            yield buffer.getvalue(), len(page)
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue(), 0
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+def export_ticket_lines(db, fmt: str = "ndjson", page_size: int = 1000) -> Iterator[str]:
+    """
+    Yield the tickets table as CSV or NDJSON text, one page of rows at a time
+    """
+    for text, _ in _export_pages(db, fmt, page_size):
+        yield text
+
+def export_tickets(db, out: TextIO, fmt: str = "ndjson", page_size: int = 1000) -> Dict[str, Any]:
+    """
+    Write the tickets table to ``out``; returns row counts and throughput
+    """
+    start = time.perf_counter()
+    written = 0
+    for text, count in _export_pages(db, fmt, page_size):
+        out.write(text)
+        written += count
+    elapsed = time.perf_counter() - start
+    return {
+        "rows": written,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(written / elapsed, 1) if elapsed > 0 else None
+    }
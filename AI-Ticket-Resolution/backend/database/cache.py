@@ -0,0 +1,435 @@
+import dataclasses
+import hashlib
+import json
+import os
+import sqlite3
+import stat
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from .models import Ticket, KnowledgeBaseEntry
+from .serialization import to_dict
+from .sqlite_backend import ThreadConnections
+
+_MISSING = object()
+
+class CacheStore:
+    """
+    Key/value store with per-entry TTL and a bound on the number of entries;
+    the least recently used entry is evicted first
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str, record: bool = True) -> Any:
+        """
+        Cached value, or the module's _MISSING sentinel; ``record=False``
+        leaves the hit/miss counters alone
+        """
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: float):
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def __len__(self):
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "store": self.name,
+            "entries": len(self),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+class MemoryCacheStore(CacheStore):
+    """
+    In-process LRU: an OrderedDict of key -> (expires_at, value), moved to
+    the end on every hit
+    """
+    name = "memory"
+
+    def __init__(self, max_entries: int = 10000):
+        super().__init__(max_entries)
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, record: bool = True) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += record
+                return _MISSING
+            self._entries.move_to_end(key)
+            self.hits += record
+            return entry[1]
+
+    def set(self, key: str, value: Any, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+# Models a shared cache value may hold. Values are stored as JSON with these
+# tagged by name, never pickled, so the cache file cannot carry code
+_CACHED_MODELS = {model.__name__: model for model in (Ticket, KnowledgeBaseEntry)}
+# Cache hits of a process update recency in batches of this many keys
+TOUCH_BATCH = 256
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, list):
+        return [_encode(item) for item in value]
+    if _CACHED_MODELS.get(type(value).__name__) is type(value):
+        return {"__model__": type(value).__name__, **to_dict(value)}
+    return value
+
+def _decode(obj: Dict[str, Any]) -> Any:
+    model = _CACHED_MODELS.get(obj.pop("__model__", None))
+    return model(**obj) if model is not None else obj
+
+def _check_private(path: str):
+    """
+    Refuse a cache file or directory another local user could write
+    """
+    info = os.lstat(path)
+    if hasattr(os, "getuid") and (stat.S_ISLNK(info.st_mode) or info.st_uid != os.getuid()
+                                  or info.st_mode & 0o077):
+        raise PermissionError(f"{path} must be owned by this user and not accessible to others")
+
+def default_shared_path() -> str:
+    """
+    Shared cache file in a 0700 directory of this user and this checkout of
+    the app, on tmpfs (``/dev/shm``) where there is one
+    """
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    app = hashlib.sha1(os.path.dirname(os.path.dirname(os.path.abspath(__file__))).encode()).hexdigest()[:12]
+    owner = os.getuid() if hasattr(os, "getuid") else "user"
+    directory = os.path.join(base, f"ticket_cache-{owner}-{app}")
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    _check_private(directory)
+    return os.path.join(directory, "cache.db")
+
+class SharedCacheStore(CacheStore):
+    """
+    LRU shared by every worker process on the host: a SQLite database on a
+    tmpfs path (see default_shared_path), so it lives in shared memory and
+    an invalidation in one worker is seen by all. Values are stored as JSON
+    and the file must be private to the user (0600); each process keeps its
+    own hit/miss counters.
+
+    Hits do not write: the keys a process read are buffered and their
+    recency written in one transaction every TOUCH_BATCH hits or before an
+    eviction, so the LRU order is approximate across processes. The entry
+    count is kept by triggers in a one-row table instead of being counted.
+    """
+    name = "shared"
+
+    SCHEMA = """
+        BEGIN IMMEDIATE;
+        CREATE TABLE IF NOT EXISTS cache (
+            key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, used_at REAL NOT NULL);
+        CREATE INDEX IF NOT EXISTS cache_used_at ON cache (used_at);
+        CREATE TABLE IF NOT EXISTS cache_size (id INTEGER PRIMARY KEY CHECK (id = 0), entries INTEGER NOT NULL);
+        INSERT OR IGNORE INTO cache_size (id, entries) SELECT 0, COUNT(*) FROM cache;
+        CREATE TRIGGER IF NOT EXISTS cache_added AFTER INSERT ON cache
+            BEGIN UPDATE cache_size SET entries = entries + 1; END;
+        CREATE TRIGGER IF NOT EXISTS cache_removed AFTER DELETE ON cache
+            BEGIN UPDATE cache_size SET entries = entries - 1; END;
+        COMMIT;
+    """
+
+    def __init__(self, path: str, max_entries: int = 10000):
+        super().__init__(max_entries)
+        self.path = path
+        try:
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600))
+        except FileExistsError:
+            pass
+        _check_private(path)
+        self._connections = ThreadConnections(self._connect)
+        self._lock = threading.Lock()
+        self._touched: Dict[str, float] = {}
+        self._connections.get().executescript(self.SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=OFF")
+        # INSERT OR REPLACE fires the delete trigger only with this on
+        connection.execute("PRAGMA recursive_triggers=ON")
+        return connection
+
+    def _touch(self, key: str, now: float):
+        with self._lock:
+            self._touched[key] = now
+            if len(self._touched) < TOUCH_BATCH:
+                return
+        self._write_touches()
+
+    def _write_touches(self):
+        with self._lock:
+            touched, self._touched = self._touched, {}
+        if not touched:
+            return
+        connection = self._connections.get()
+        connection.execute("BEGIN")
+        try:
+            connection.executemany("UPDATE cache SET used_at = ? WHERE key = ?",
+                                   [(used_at, key) for key, used_at in touched.items()])
+        finally:
+            connection.execute("COMMIT")
+
+    def get(self, key: str, record: bool = True) -> Any:
+        # Wall-clock time: monotonic clocks are not comparable across processes
+        now = time.time()
+        connection = self._connections.get()
+        row = connection.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is not None and row[1] < now:
+            connection.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self.expirations += 1
+            row = None
+        if row is not None:
+            try:
+                value = json.loads(row[0], object_hook=_decode)
+            except (TypeError, ValueError):
+                # Not in this encoding (an entry from an older version)
+                connection.execute("DELETE FROM cache WHERE key = ?", (key,))
+                row = None
+        if row is None:
+            self.misses += record
+            return _MISSING
+        self._touch(key, now)
+        self.hits += record
+        return value
+
+    def set(self, key: str, value: Any, ttl: float):
+        now = time.time()
+        connection = self._connections.get()
+        connection.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at, used_at) VALUES (?, ?, ?, ?)",
+            (key, json.dumps(_encode(value)), now + ttl, now)
+        )
+        excess = len(self) - self.max_entries
+        if excess > 0:
+            # This process's recent hits count before anything is evicted
+            self._write_touches()
+            evicted = connection.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY used_at LIMIT ?)", (excess,)
+            ).rowcount
+            self.evictions += evicted
+
+    def delete(self, key: str):
+        self._connections.get().execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock:
+            self._touched.clear()
+        self._connections.get().execute("DELETE FROM cache")
+
+    def __len__(self):
+        return self._connections.get().execute("SELECT entries FROM cache_size").fetchone()[0]
+
+    def close(self):
+        self._connections.close()
+
+class CachedDatabaseService:
+    """
+    Read-through cache in front of a DatabaseService.
+
+    Ticket lookups by id and knowledge base reads/searches are served from
+    ``store`` until their TTL runs out; create/update/delete of a ticket
+    drop exactly that ticket's entry. Knowledge base entries are keyed by a
+    generation number kept in the store, so ``invalidate_knowledge_base()``
+    retires every cached KB read at once (in every worker, with the shared
+    store) and the old entries age out of the LRU. Every other method is
+    passed straight through to the wrapped service.
+
+    The generation also tells a worker that another one wrote to the
+    knowledge base: when it changed without a write through this service,
+    the wrapped service's search index is rebuilt from storage
+    (``refresh_knowledge_base_index``) before the next knowledge base read,
+    so nothing stale is read or cached under the new generation.
+    """
+
+    def __init__(self, service, store: CacheStore, ticket_ttl: float = 30.0, knowledge_base_ttl: float = 300.0):
+        self.service = service
+        self.store = store
+        self.ticket_ttl = ticket_ttl
+        self.knowledge_base_ttl = knowledge_base_ttl
+        # Last generation this worker read or set; None until the first one
+        self._seen_generation: Optional[int] = None
+        self._generation_lock = threading.Lock()
+        self.foreign_refreshes = 0
+
+    def __getattr__(self, name):
+        return getattr(self.service, name)
+
+    @staticmethod
+    def _ticket_key(ticket_id: int) -> str:
+        return f"ticket:{ticket_id}"
+
+    def _kb_generation(self) -> int:
+        generation = self.store.get("kb:generation", record=False)
+        if generation != self._seen_generation:
+            with self._generation_lock:
+                generation = self.store.get("kb:generation", record=False)
+                if generation != self._seen_generation:
+                    # Another worker wrote to the knowledge base, or the LRU
+                    # evicted the key and we cannot tell: our index may be stale
+                    self._refresh_foreign()
+                    if generation is _MISSING:
+                        # A fresh value, never a counter restarting at 0: if the LRU evicts
+                        # this key, entries cached under an older generation must stay dead
+                        generation = time.time_ns()
+                        self.store.set("kb:generation", generation, float("inf"))
+                    self._seen_generation = generation
+        return generation
+
+    def _new_kb_generation(self) -> int:
+        with self._generation_lock:
+            if self.store.get("kb:generation", record=False) != self._seen_generation:
+                # Catch up on a write made by another worker since our last read
+                self._refresh_foreign()
+            generation = time.time_ns()
+            self.store.set("kb:generation", generation, float("inf"))
+            self._seen_generation = generation
+            return generation
+
+    def _refresh_foreign(self):
+        # Nothing to catch up on before this worker's first knowledge base read
+        if self._seen_generation is not None:
+            self.foreign_refreshes += 1
+            self.service.refresh_knowledge_base_index()
+
+    # Ticket operations
+    def get_ticket_by_id(self, ticket_id: int) -> Optional[Ticket]:
+        key = self._ticket_key(ticket_id)
+        ticket = self.store.get(key)
+        if ticket is _MISSING:
+            ticket = self.service.get_ticket_by_id(ticket_id)
+            # Unknown ids are not cached: a bulk import may create them at any time
+            if ticket is None:
+                return None
+            self.store.set(key, ticket, self.ticket_ttl)
+        # Callers get their own copy; the cached object is never handed out
+        return dataclasses.replace(ticket)
+
+    def create_ticket(self, ticket: Ticket) -> Optional[Ticket]:
+        created = self.service.create_ticket(ticket)
+        if created is not None and created.id is not None:
+            self.store.delete(self._ticket_key(created.id))
+        return created
+
+    def create_tickets(self, tickets: List[Ticket]) -> List[Ticket]:
+        created = self.service.create_tickets(tickets)
+        for ticket in created:
+            if ticket.id is not None:
+                self.store.delete(self._ticket_key(ticket.id))
+        return created
+
+    def update_ticket(self, ticket_id: int, ticket_data: Dict[str, Any]) -> Optional[Ticket]:
+        updated = self.service.update_ticket(ticket_id, ticket_data)
+        self.store.delete(self._ticket_key(ticket_id))
+        return updated
+
+    def delete_ticket(self, ticket_id: int) -> bool:
+        deleted = self.service.delete_ticket(ticket_id)
+        self.store.delete(self._ticket_key(ticket_id))
+        return deleted
+
+    # Knowledge base operations
+    def get_knowledge_base_entries(self) -> List[KnowledgeBaseEntry]:
+        key = f"kb:{self._kb_generation()}:entries"
+        entries = self.store.get(key)
+        if entries is _MISSING:
+            entries = self.service.get_knowledge_base_entries()
+            self.store.set(key, entries, self.knowledge_base_ttl)
+        # Copies, as for tickets: callers may modify what they get
+        return [dataclasses.replace(entry) for entry in entries]
+
+    def search_knowledge_base(self, query: str, top_k: int = 10) -> List[KnowledgeBaseEntry]:
+        key = f"kb:{self._kb_generation()}:search:{top_k}:{query}"
+        entries = self.store.get(key)
+        if entries is _MISSING:
+            entries = self.service.search_knowledge_base(query, top_k)
+            self.store.set(key, entries, self.knowledge_base_ttl)
+        # Copies, as for tickets: callers may modify what they get
+        return [dataclasses.replace(entry) for entry in entries]
+
+    def create_knowledge_base_entry(self, entry: KnowledgeBaseEntry) -> Optional[KnowledgeBaseEntry]:
+        created = self.service.create_knowledge_base_entry(entry)
+        self.invalidate_knowledge_base()
+        return created
+
+    def update_knowledge_base_entry(self, entry_id: int, entry_data: Dict[str, Any]) -> Optional[KnowledgeBaseEntry]:
+        updated = self.service.update_knowledge_base_entry(entry_id, entry_data)
+        self.invalidate_knowledge_base()
+        return updated
+
+    def delete_knowledge_base_entry(self, entry_id: int) -> bool:
+        deleted = self.service.delete_knowledge_base_entry(entry_id)
+        self.invalidate_knowledge_base()
+        return deleted
+
+    def refresh_knowledge_base_index(self):
+        self.service.refresh_knowledge_base_index()
+        self.invalidate_knowledge_base()
+
+    def invalidate_knowledge_base(self):
+        """
+        Retire every cached knowledge base read
+        """
+        self._new_kb_generation()
+
+    def cache_stats(self) -> Dict[str, Any]:
+        stats = self.store.stats()
+        stats["kb_foreign_refreshes"] = self.foreign_refreshes
+        return stats
+
+def create_cache_store(kind: str, max_entries: int, shared_path: Optional[str] = None) -> Optional[CacheStore]:
+    """
+    'memory' for a per-process LRU, 'shared' for one shared by all workers on
+    the host (at ``shared_path``, by default a private per-app path), 'none'
+    (or anything else) for no cache
+    """
+    if kind == "memory":
+        return MemoryCacheStore(max_entries)
+    if kind == "shared":
+        return SharedCacheStore(shared_path or default_shared_path(), max_entries)
+    return None
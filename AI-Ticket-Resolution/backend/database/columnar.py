@@ -0,0 +1,185 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from .models import TICKET_PRIORITIES, TICKET_STATUSES
+from .pagination import TICKET_COLUMNS
+
+KB_COLUMNS = ("id", "question", "answer", "category", "created_at", "updated_at")
+
+class InternedColumn:
+    """
+    Column of a few distinct values (status, priority, category) stored as
+    small integer codes into ``labels``. Comparisons and counts run on the
+    code array; the strings exist once, in ``labels``.
+    """
+
+    def __init__(self, labels: Sequence[Any] = (), codes: Optional[np.ndarray] = None):
+        self.labels: List[Any] = list(labels)
+        self._index = {label: code for code, label in enumerate(self.labels)}
+        self.codes = codes if codes is not None else np.empty(0, dtype=np.uint16)
+
+    def code(self, value) -> int:
+        """
+        Code of ``value``, interning it on first sight
+        """
+        code = self._index.get(value)
+        if code is None:
+            code = self._index[value] = len(self.labels)
+            self.labels.append(value)
+        return code
+
+    @classmethod
+    def from_values(cls, values: Sequence[Any], labels: Sequence[Any] = ()) -> 'InternedColumn':
+        column = cls(labels)
+        column.codes = np.fromiter(map(column.code, values), dtype=np.uint16, count=len(values))
+        return column
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, position: int):
+        return self.labels[self.codes[position]]
+
+    def mask(self, value) -> np.ndarray:
+        code = self._index.get(value)
+        if code is None:
+            return np.zeros(len(self.codes), dtype=bool)
+        return self.codes == code
+
+    def take(self, positions: np.ndarray) -> 'InternedColumn':
+        # Labels are shared: the subset decodes the same way
+        column = InternedColumn.__new__(InternedColumn)
+        column.labels, column._index, column.codes = self.labels, self._index, self.codes[positions]
+        return column
+
+    def counts(self) -> Dict[Any, int]:
+        counts = np.bincount(self.codes, minlength=len(self.labels))
+        return {label: int(count) for label, count in zip(self.labels, counts) if count}
+
+    def tolist(self) -> List[Any]:
+        return [self.labels[code] for code in self.codes.tolist()]
+
+class ColumnBatch:
+    """
+    Columnar result set: one column per field instead of one object per row.
+
+    ``id`` is an int64 array (a plain list if some ids are missing), the
+    fields in ``enums`` are InternedColumns seeded with their allowed values,
+    and free text stays in plain lists of the strings the backend returned.
+    Filtering and counting work on whole columns, and rows are only built,
+    as dicts, when something asks for them. A batch may hold a subset of
+    ``fields`` (a projection).
+    """
+    fields: Sequence[str] = ()
+    enums: Dict[str, Sequence[str]] = {}
+
+    def __init__(self, columns: Dict[str, Any], length: int):
+        self.columns = columns
+        self._length = length
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, Any]], columns: Optional[Sequence[str]] = None) -> 'ColumnBatch':
+        """
+        Transpose backend rows (dicts) into columns in one pass
+        """
+        names = list(columns or cls.fields)
+        values: Dict[str, list] = {name: [] for name in names}
+        appends = [(name, values[name].append) for name in names]
+        for row in rows:
+            for name, append in appends:
+                append(row.get(name))
+        return cls.from_columns(values)
+
+    @classmethod
+    def from_columns(cls, values: Dict[str, list]) -> 'ColumnBatch':
+        columns: Dict[str, Any] = {}
+        length = 0
+        for name, column in values.items():
+            length = len(column)
+            if name == "id" and None not in column:
+                columns[name] = np.array(column, dtype=np.int64)
+            elif name in cls.enums:
+                columns[name] = InternedColumn.from_values(column, cls.enums[name])
+            else:
+                columns[name] = column
+        return cls(columns, length)
+
+    def __len__(self):
+        return self._length
+
+    @property
+    def names(self) -> List[str]:
+        return list(self.columns)
+
+    def column(self, name: str) -> List[Any]:
+        """
+        Values of one column as a plain list
+        """
+        column = self.columns[name]
+        return column.tolist() if isinstance(column, (InternedColumn, np.ndarray)) else list(column)
+
+    def mask(self, **equals) -> np.ndarray:
+        """
+        Rows where every given column equals its value
+        """
+        selected = np.ones(self._length, dtype=bool)
+        for name, value in equals.items():
+            column = self.columns[name]
+            if isinstance(column, InternedColumn):
+                selected &= column.mask(value)
+            elif isinstance(column, np.ndarray):
+                selected &= column == value
+            else:
+                selected &= np.fromiter((item == value for item in column), dtype=bool, count=self._length)
+        return selected
+
+    def take(self, positions) -> 'ColumnBatch':
+        """
+        New batch with the rows at ``positions`` (indices or a boolean mask)
+        """
+        positions = np.asarray(positions)
+        if positions.dtype == bool:
+            positions = np.flatnonzero(positions)
+        columns: Dict[str, Any] = {}
+        for name, column in self.columns.items():
+            if isinstance(column, InternedColumn):
+                columns[name] = column.take(positions)
+            elif isinstance(column, np.ndarray):
+                columns[name] = column[positions]
+            else:
+                columns[name] = [column[position] for position in positions.tolist()]
+        return type(self)(columns, len(positions))
+
+    def where(self, **equals) -> 'ColumnBatch':
+        return self.take(self.mask(**equals))
+
+    def counts(self, name: str) -> Dict[Any, int]:
+        """
+        Number of rows per distinct value of an interned column
+        """
+        return self.columns[name].counts()
+
+    def to_columns(self, names: Optional[Sequence[str]] = None) -> Dict[str, List[Any]]:
+        """
+        JSON-ready columnar form: column name -> list of values
+        """
+        return {name: self.column(name) for name in (names or self.columns)}
+
+    def to_dicts(self, names: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        names = list(names or self.columns)
+        return [dict(zip(names, values)) for values in zip(*(self.column(name) for name in names))]
+
+class TicketBatch(ColumnBatch):
+    """
+    Columnar tickets; priority, status and category are interned
+    """
+    fields = TICKET_COLUMNS
+    enums = {"priority": TICKET_PRIORITIES, "status": TICKET_STATUSES, "category": ()}
+
+class KBBatch(ColumnBatch):
+    """
+    Columnar knowledge base entries; category is interned
+    """
+    fields = KB_COLUMNS
+    enums = {"category": ()}
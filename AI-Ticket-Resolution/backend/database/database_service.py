@@ -1,286 +1,267 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterator, Tuple
 from datetime import datetime
+import logging
+import os
 from .supabase_client import supabase
-from .models import Ticket, User, KnowledgeBaseEntry, ticket_to_dict, dict_to_ticket
+from .models import Ticket, User, KnowledgeBaseEntry, ticket_to_dict, knowledge_base_entry_to_dict, row_to_model
+from .pagination import TICKET_UPDATE_COLUMNS, KB_UPDATE_COLUMNS, TICKET_COUNT_COLUMNS, decode_cursor, page_query, \
+    finish_page, ticket_columns
+from .events import ChangeEvent, EventEmitter
+from .columnar import TicketBatch, KBBatch
+from .storage import StorageBackend
+from .cache import CachedDatabaseService, create_cache_store
+from .memory_backend import MemoryBackend
+from .sqlite_backend import SQLiteBackend, sqlite_path
+from .supabase_backend import SupabaseBackend
+from .timing import TimedBackend
 
-class DatabaseService:
+logger = logging.getLogger(__name__)
+
+class DatabaseService(EventEmitter):
     """
-    Service class to handle all database operations with Supabase
+    Service class to handle all database operations.
+
+    The storage backend (Supabase, SQLite or in-memory) is chosen once when
+    the service is created; this class maps between dataclasses and backend
+    rows and validates queries. Backend failures surface as the errors in
+    errors.py rather than as empty results. Successful ticket and knowledge
+    base writes are published to ``subscribe``d listeners as ChangeEvents;
+    the backend's knowledge base search index is one of them, so it takes
+    every write as a delta instead of being rebuilt. Every backend call is
+    timed into the ``db_call_duration_seconds`` histogram on /metrics.
     """
-    
-    def __init__(self):
-        self.client = supabase
-    
-    def _handle_response(self, response):
-        """Helper method to handle both real and mock responses"""
-        if isinstance(response, dict):
-            return response.get('data', []), response.get('status', 200)
-        else:
-            # Real Supabase client response
-            return getattr(response, 'data', []), getattr(response, 'status', 200)
-    
+
+    def __init__(self, backend: StorageBackend):
+        super().__init__()
+        self.backend = TimedBackend(backend)
+        self.subscribe(backend.apply_knowledge_base_change)
+
     # Ticket operations
     def get_all_tickets(self) -> List[Ticket]:
         """
         Retrieve all tickets from the database
         """
-        try:
-            if hasattr(self.client, 'from_'):
-                # Try real Supabase client
-                try:
-                    response = self.client.from_("tickets").select("*").execute()
-                    data, _ = self._handle_response(response)
-                    tickets = [dict_to_ticket(ticket_data) for ticket_data in data]
-                    return tickets
-                except Exception as e:
-                    print(f"Real client error: {e}, using mock")
-                    # Fall back to mock behavior
-                    print("Mock: Getting all tickets")
-                    return []
-            else:
-                # Mock implementation
-                print("Mock: Getting all tickets")
-                return []
-        except Exception as e:
-            print(f"Error fetching tickets: {e}")
-            return []
-    
+        return [row_to_model(Ticket, row) for row in self.backend.list_tickets()]
+
+    def bulk_create_tickets(self, tickets: List[Ticket]) -> int:
+        """
+        Insert many tickets with a single multi-row insert; returns the number inserted
+        """
+        if not tickets:
+            return 0
+        return len(self.backend.insert_tickets([ticket_to_dict(ticket) for ticket in tickets]))
+
+    def iter_ticket_rows(self, page_size: int = 1000, columns: str = "*") -> Iterator[Dict[str, Any]]:
+        """
+        Yield raw ticket rows page by page using keyset pagination on id,
+        so memory stays bounded by one page whatever the table size
+        """
+        names = None
+        if columns != "*":
+            names = ticket_columns([column.strip() for column in columns.split(",")])
+            # The keyset column has to be part of the projection
+            if "id" not in names:
+                names.insert(0, "id")
+        return self.backend.iter_ticket_rows(page_size, names)
+
+    def get_ticket_batch(self, columns: str = "*", page_size: int = 1000) -> TicketBatch:
+        """
+        The whole tickets table (or a projection of it) as one columnar
+        batch, read page by page without building a Ticket per row
+        """
+        names = None
+        if columns != "*":
+            names = ticket_columns([column.strip() for column in columns.split(",")])
+        return TicketBatch.from_rows(self.iter_ticket_rows(page_size, columns), names)
+
+    def get_tickets_page(self, filters: Optional[Dict[str, Any]] = None, limit: int = 50,
+                         cursor: Optional[str] = None,
+                         columns: Optional[List[str]] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Fetch one page of tickets, newest first, as raw rows.
+
+        Filters are pushed down as equality predicates, only ``columns`` are
+        selected, and paging uses a (created_at, id) keyset instead of offsets
+        so every page costs the same. Returns the rows and the cursor of the
+        next page (None on the last page).
+        """
+        filters, columns, selected = page_query(filters, columns)
+        keyset = decode_cursor(cursor) if cursor else None
+        # One extra row tells us whether another page exists
+        rows = self.backend.ticket_page(filters, keyset, selected, limit + 1)
+        return finish_page(rows, limit, columns, selected)
+
+    def get_ticket_counts(self, filters: Optional[Dict[str, Any]] = None, page_size: int = 1000) -> Dict[str, Any]:
+        """
+        Number of tickets matching the equality ``filters``, in total and per
+        status, priority and category. Filtering and counting happen in the
+        backend; no ticket rows are returned for the whole table.
+        """
+        filters, _, _ = page_query(filters, None)
+        counts = self.backend.ticket_counts(filters, list(TICKET_COUNT_COLUMNS), page_size)
+        return {"total": sum(counts["status"].values()), **counts}
+
     def get_ticket_by_id(self, ticket_id: int) -> Optional[Ticket]:
         """
         Retrieve a specific ticket by ID
         """
-        try:
-            if hasattr(self.client, 'from_'):
-                try:
-                    response = self.client.from_("tickets").select("*").eq("id", ticket_id).execute()
-                    data, _ = self._handle_response(response)
-                    if data:
-                        return dict_to_ticket(data[0])
-                    return None
-                except Exception as e:
-                    print(f"Real client error: {e}, using mock")
-                    print(f"Mock: Getting ticket by ID {ticket_id}")
-                    return None
-            else:
-                # Mock implementation
-                print(f"Mock: Getting ticket by ID {ticket_id}")
-                return None
-        except Exception as e:
-            print(f"Error fetching ticket {ticket_id}: {e}")
-            return None
-    
+        row = self.backend.get_ticket(ticket_id)
+        return row_to_model(Ticket, row) if row else None
+
     def create_ticket(self, ticket: Ticket) -> Optional[Ticket]:
         """
         Create a new ticket in the database
         """
-        try:
-            ticket_data = ticket_to_dict(ticket)
-            if hasattr(self.client, 'from_'):
-                try:
-                    response = self.client.from_("tickets").insert(ticket_data).execute()
-                    data, _ = self._handle_response(response)
-                    if data:
-                        created_ticket = dict_to_ticket(data[0])
-                        return created_ticket
-                    return None
-                except Exception as e:
-                    print(f"Real client error: {e}, using mock")
-                    print(f"Mock: Creating ticket: {ticket_data}")
-                    return ticket
-            else:
-                # Mock implementation
-                print(f"Mock: Creating ticket: {ticket_data}")
-                return ticket
-        except Exception as e:
-            print(f"Error creating ticket: {e}")
+        rows = self.backend.insert_tickets([ticket_to_dict(ticket)])
+        if not rows:
             return None
-    
+        created = row_to_model(Ticket, rows[0])
+        self.emit(ChangeEvent("tickets", "created", created.id, created, rows[0]))
+        return created
+
+    def create_tickets(self, tickets: List[Ticket]) -> List[Ticket]:
+        """
+        Create many tickets with a single multi-row insert and return them as stored
+        """
+        if not tickets:
+            return []
+        rows = self.backend.insert_tickets([ticket_to_dict(ticket) for ticket in tickets])
+        created = [row_to_model(Ticket, row) for row in rows]
+        for ticket, row in zip(created, rows):
+            self.emit(ChangeEvent("tickets", "created", ticket.id, ticket, row))
+        return created
+
     def update_ticket(self, ticket_id: int, ticket_data: Dict[str, Any]) -> Optional[Ticket]:
         """
-        Update an existing ticket
-        """
-        try:
-            ticket_data["updated_at"] = datetime.now().isoformat()
-            if hasattr(self.client, 'from_'):
-                try:
-                    response = self.client.from_("tickets").update(ticket_data).eq("id", ticket_id).execute()
-                    data, _ = self._handle_response(response)
-                    if data:
-                        return dict_to_ticket(data[0])
-                    return None
-                except Exception as e:
-                    print(f"Real client error: {e}, using mock")
-                    print(f"Mock: Updating ticket {ticket_id} with data: {ticket_data}")
-                    return None
-            else:
-                # Mock implementation
-                print(f"Mock: Updating ticket {ticket_id} with data: {ticket_data}")
-                return None
-        except Exception as e:
-            print(f"Error updating ticket {ticket_id}: {e}")
+        Update an existing ticket; keys that are not updatable columns are ignored
+        """
+        ticket_data["updated_at"] = datetime.now().isoformat()
+        changes = {column: ticket_data[column] for column in TICKET_UPDATE_COLUMNS if column in ticket_data}
+        row = self.backend.update_ticket(ticket_id, changes)
+        if not row:
             return None
-    
+        updated = row_to_model(Ticket, row)
+        self.emit(ChangeEvent("tickets", "updated", ticket_id, updated, changes))
+        return updated
+
     def delete_ticket(self, ticket_id: int) -> bool:
         """
         Delete a ticket from the database
         """
-        try:
-            if hasattr(self.client, 'from_'):
-                try:
-                    response = self.client.from_("tickets").delete().eq("id", ticket_id).execute()
-                    _, status = self._handle_response(response)
-                    return status == 200
-                except Exception as e:
-                    print(f"Real client error: {e}, using mock")
-                    print(f"Mock: Deleting ticket {ticket_id}")
-                    return True
-            else:
-                # Mock implementation
-                print(f"Mock: Deleting ticket {ticket_id}")
-                return True
-        except Exception as e:
-            print(f"Error deleting ticket {ticket_id}: {e}")
-            return False
-    
+        deleted = self.backend.delete_ticket(ticket_id)
+        if deleted:
+            self.emit(ChangeEvent("tickets", "deleted", ticket_id))
+        return deleted
+
     # User operations
     def get_user_by_id(self, user_id: str) -> Optional[User]:
         """
         Retrieve a user by ID
         """
-        try:
-            if hasattr(self.client, 'from_'):
-                try:
-                    response = self.client.from_("users").select("*").eq("id", user_id).execute()
-                    data, _ = self._handle_response(response)
-                    if data:
-                        user_data = data[0]
-                        return User(
-                            id=user_data.get("id"),
-                            email=user_data.get("email", ""),
-                            name=user_data.get("name", ""),
-                            created_at=user_data.get("created_at")
-                        )
-                    return None
-                except Exception as e:
-                    print(f"Real client error: {e}, using mock")
-                    print(f"Mock: Getting user by ID {user_id}")
-                    return None
-            else:
-                # Mock implementation
-                print(f"Mock: Getting user by ID {user_id}")
-                return None
-        except Exception as e:
-            print(f"Error fetching user {user_id}: {e}")
-            return None
-    
+        row = self.backend.get_user(user_id)
+        return row_to_model(User, row) if row else None
+
     def create_user(self, user: User) -> Optional[User]:
         """
         Create a new user in the database
         """
-        try:
-            user_data = {
-                "email": user.email,
-                "name": user.name,
-                "created_at": user.created_at or datetime.now().isoformat()
-            }
-            if hasattr(self.client, 'from_'):
-                try:
-                    response = self.client.from_("users").insert(user_data).execute()
-                    data, _ = self._handle_response(response)
-                    if data:
-                        created_user = data[0]
-                        return User(
-                            id=created_user.get("id"),
-                            email=created_user.get("email", ""),
-                            name=created_user.get("name", ""),
-                            created_at=created_user.get("created_at")
-                        )
-                    return None
-                except Exception as e:
-                    print(f"Real client error: {e}, using mock")
-                    print(f"Mock: Creating user: {user_data}")
-                    return user
-            else:
-                # Mock implementation
-                print(f"Mock: Creating user: {user_data}")
-                return user
-        except Exception as e:
-            print(f"Error creating user: {e}")
-            return None
-    
+        row = self.backend.insert_user({
+            "email": user.email,
+            "name": user.name,
+            "created_at": user.created_at or datetime.now().isoformat()
+        })
+        return row_to_model(User, row) if row else None
+
     # Knowledge base operations
     def get_knowledge_base_entries(self) -> List[KnowledgeBaseEntry]:
         """
         Retrieve all knowledge base entries
         """
-        try:
-            if hasattr(self.client, 'from_'):
-                try:
-                    response = self.client.from_("knowledge_base").select("*").execute()
-                    data, _ = self._handle_response(response)
-                    entries = []
-                    for entry_data in data:
-                        entry = KnowledgeBaseEntry(
-                            id=entry_data.get("id"),
-                            question=entry_data.get("question", ""),
-                            answer=entry_data.get("answer", ""),
-                            category=entry_data.get("category", ""),
-                            created_at=entry_data.get("created_at"),
-                            updated_at=entry_data.get("updated_at")
-                        )
-                        entries.append(entry)
-                    return entries
-                except Exception as e:
-                    print(f"Real client error: {e}, using mock")
-                    print("Mock: Getting knowledge base entries")
-                    return []
-            else:
-                # Mock implementation
-                print("Mock: Getting knowledge base entries")
-                return []
-        except Exception as e:
-            print(f"Error fetching knowledge base entries: {e}")
-            return []
-    
-    def search_knowledge_base(self, query: str) -> List[KnowledgeBaseEntry]:
-        """
-        Search knowledge base entries by query
-        """
-        try:
-            # This is a simple implementation - in production, you might want to use
-            # full-text search or vector search
-            if hasattr(self.client, 'from_'):
-                try:
-                    response = self.client.from_("knowledge_base").select("*").execute()
-                    data, _ = self._handle_response(response)
-                    matching_entries = []
-                    query_lower = query.lower()
-                    
-                    for entry_data in data:
-                        if (query_lower in entry_data.get("question", "").lower() or 
-                            query_lower in entry_data.get("answer", "").lower()):
-                            entry = KnowledgeBaseEntry(
-                                id=entry_data.get("id"),
-                                question=entry_data.get("question", ""),
-                                answer=entry_data.get("answer", ""),
-                                category=entry_data.get("category", ""),
-                                created_at=entry_data.get("created_at"),
-                                updated_at=entry_data.get("updated_at")
-                            )
-                            matching_entries.append(entry)
-                    
-                    return matching_entries
-                except Exception as e:
-                    print(f"Real client error: {e}, using mock")
-                    print(f"Mock: Searching knowledge base for: {query}")
-                    return []
-            else:
-                # Mock implementation
-                print(f"Mock: Searching knowledge base for: {query}")
-                return []
-        except Exception as e:
-            print(f"Error searching knowledge base: {e}")
-            return []
+        return [row_to_model(KnowledgeBaseEntry, row) for row in self.backend.knowledge_base_rows()]
+
+    def get_knowledge_base_batch(self) -> KBBatch:
+        """
+        All knowledge base entries as one columnar batch
+        """
+        return KBBatch.from_rows(self.backend.knowledge_base_rows())
+
+    def search_knowledge_base(self, query: str, top_k: int = 10) -> List[KnowledgeBaseEntry]:
+        """
+        Search knowledge base entries by query, best match first
+        """
+        return [row_to_model(KnowledgeBaseEntry, row) for row in self.backend.search_knowledge_base(query, top_k)]
+
+    def create_knowledge_base_entry(self, entry: KnowledgeBaseEntry) -> Optional[KnowledgeBaseEntry]:
+        """
+        Add an entry to the knowledge base
+        """
+        row = self.backend.insert_knowledge_base_entry(knowledge_base_entry_to_dict(entry))
+        if not row:
+            return None
+        created = row_to_model(KnowledgeBaseEntry, row)
+        self.emit(ChangeEvent("knowledge_base", "created", created.id, created, row))
+        return created
+
+    def update_knowledge_base_entry(self, entry_id: int, entry_data: Dict[str, Any]) -> Optional[KnowledgeBaseEntry]:
+        """
+        Update a knowledge base entry; keys that are not updatable columns are ignored
+        """
+        entry_data["updated_at"] = datetime.now().isoformat()
+        changes = {column: entry_data[column] for column in KB_UPDATE_COLUMNS if column in entry_data}
+        row = self.backend.update_knowledge_base_entry(entry_id, changes)
+        if not row:
+            return None
+        updated = row_to_model(KnowledgeBaseEntry, row)
+        self.emit(ChangeEvent("knowledge_base", "updated", entry_id, updated, changes))
+        return updated
+
+    def delete_knowledge_base_entry(self, entry_id: int) -> bool:
+        """
+        Remove an entry from the knowledge base
+        """
+        deleted = self.backend.delete_knowledge_base_entry(entry_id)
+        if deleted:
+            self.emit(ChangeEvent("knowledge_base", "deleted", entry_id))
+        return deleted
+
+    def refresh_knowledge_base_index(self):
+        """
+        Rebuild the backend's knowledge base search index, if it keeps one
+        """
+        self.backend.refresh_knowledge_base_index()
+
+def create_backend(database_url: Optional[str] = None) -> StorageBackend:
+    """
+    Pick the storage backend from a DATABASE_URL: ``sqlite:///path`` gives
+    SQLite, ``memory://`` the in-memory store, ``http(s)://`` a PostgREST
+    endpoint, anything else (or nothing) Supabase, or the in-memory store
+    when the supabase package is missing
+    """
+    if database_url and database_url.startswith(("http://", "https://")):
+        from config import Config
+        from .rest_backend import RestBackend
+        return RestBackend(database_url, Config.DATABASE_API_KEY, Config.DB_MAX_CONNECTIONS, Config.DB_TIMEOUT)
+    if database_url and database_url.startswith("sqlite:"):
+        return SQLiteBackend(sqlite_path(database_url))
+    if database_url and database_url.startswith("memory:"):
+        return MemoryBackend()
+    if supabase is None:
+        logger.warning("Supabase client unavailable, using in-memory storage")
+        return MemoryBackend()
+    return SupabaseBackend(supabase)
+
+def create_database_service(database_url: Optional[str] = None, cache: Optional[str] = None):
+    """
+    DatabaseService on the backend for ``database_url``, behind a read-through
+    cache unless ``cache`` (default: Config.CACHE_BACKEND) is 'none'
+    """
+    from config import Config
+    service = DatabaseService(create_backend(database_url))
+    store = create_cache_store(cache or Config.CACHE_BACKEND, Config.CACHE_MAX_ENTRIES, Config.CACHE_SHARED_PATH)
+    if store is None:
+        return service
+    return CachedDatabaseService(service, store, Config.CACHE_TICKET_TTL, Config.CACHE_KB_TTL)
 
-# Global instance of the database service
-db_service = DatabaseService()
\ No newline at end of file
+# Global instance of the database service. Only an explicitly set DATABASE_URL
+# switches backends, so deployments without one keep using Supabase.
+db_service = create_database_service(os.environ.get("DATABASE_URL"))
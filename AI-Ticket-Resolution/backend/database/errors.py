@@ -0,0 +1,19 @@
+class StorageError(Exception):
+    """
+    Base class for failures reported by a storage backend
+    """
+
+class StorageUnavailableError(StorageError):
+    """
+    The backend could not be reached or did not answer
+    """
+
+class ConstraintViolationError(StorageError):
+    """
+    A write was rejected by a schema constraint (check, unique, foreign key)
+    """
+
+class InvalidQueryError(StorageError, ValueError):
+    """
+    A request asked for an unknown column or filter, or sent a malformed cursor
+    """
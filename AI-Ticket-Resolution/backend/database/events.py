@@ -0,0 +1,46 @@
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class ChangeEvent:
+    """
+    A committed write: ``action`` ('created', 'updated', 'deleted') on a row
+    of ``table``. ``record`` is the row's model after the write (None after a
+    delete) and ``changes`` the columns the write set.
+    """
+    table: str
+    action: str
+    key: Any
+    record: Optional[Any] = None
+    changes: Dict[str, Any] = field(default_factory=dict)
+
+Listener = Callable[[ChangeEvent], None]
+
+class EventEmitter:
+    """
+    Synchronous change notifications for the database services. Listeners
+    run in the writing thread right after the write succeeds, so they should
+    only hand the event off (e.g. to a queue); a failing listener is logged
+    and never fails the write.
+    """
+
+    def __init__(self):
+        self._listeners: List[Listener] = []
+
+    def subscribe(self, listener: Listener) -> Listener:
+        self._listeners.append(listener)
+        return listener
+
+    def unsubscribe(self, listener: Listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def emit(self, event: ChangeEvent):
+        for listener in list(self._listeners):
+            try:
+                listener(event)
+            except Exception:
+                logger.exception("Change listener failed on %s %s", event.table, event.action)
@@ -0,0 +1,197 @@
+import threading
+import uuid
+from bisect import bisect_left, insort
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .errors import ConstraintViolationError
+from .models import TICKET_PRIORITIES, TICKET_STATUSES
+from .pagination import TICKET_FILTERS
+from .storage import Row, StorageBackend
+
+Key = Tuple[str, int]
+
+class MemoryBackend(StorageBackend):
+    """
+    In-process storage backend with the same indexes as the SQL schema.
+
+    Tickets live in a dict by id, plus one sorted (created_at, id) list for
+    the listing order and one per filterable (column, value) pair, so a
+    filtered keyset page is a bisect followed by a short walk instead of a
+    table scan. Used when Supabase is not available, and by benchmarks that
+    need realistic data without a network. All access is serialized by a lock.
+    """
+    name = "memory"
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.RLock()
+        self._tickets: Dict[int, Row] = {}
+        self._order: List[Key] = []
+        self._by_value: Dict[Tuple[str, object], List[Key]] = {}
+        self._next_ticket_id = 1
+        self._users: Dict[str, Row] = {}
+        self._emails: Dict[str, str] = {}
+        self._knowledge_base: Dict[int, Row] = {}
+        self._next_entry_id = 1
+
+    @staticmethod
+    def _key(row: Row) -> Key:
+        return row.get("created_at") or "", row["id"]
+
+    def _index(self, row: Row):
+        key = self._key(row)
+        insort(self._order, key)
+        for column in TICKET_FILTERS:
+            insort(self._by_value.setdefault((column, row.get(column)), []), key)
+
+    def _unindex(self, row: Row):
+        key = self._key(row)
+        for keys in [self._order] + [self._by_value[(column, row.get(column))] for column in TICKET_FILTERS]:
+            del keys[bisect_left(keys, key)]
+
+    @staticmethod
+    def _check(row: Row):
+        if row.get("priority") not in TICKET_PRIORITIES:
+            raise ConstraintViolationError(f"Invalid priority: {row.get('priority')}")
+        if row.get("status") not in TICKET_STATUSES:
+            raise ConstraintViolationError(f"Invalid status: {row.get('status')}")
+        if row.get("subject") is None:
+            raise ConstraintViolationError("Ticket subject is required")
+
+    # Tickets
+    def list_tickets(self) -> List[Row]:
+        with self._lock:
+            return [dict(row) for row in self._tickets.values()]
+
+    def insert_tickets(self, rows: List[Row]) -> List[Row]:
+        for row in rows:
+            self._check(row)
+        with self._lock:
+            stored = []
+            for row in rows:
+                row = dict(row, id=self._next_ticket_id)
+                self._next_ticket_id += 1
+                self._tickets[row["id"]] = row
+                self._index(row)
+                stored.append(dict(row))
+            return stored
+
+    def get_ticket(self, ticket_id: int) -> Optional[Row]:
+        with self._lock:
+            row = self._tickets.get(ticket_id)
+            return dict(row) if row else None
+
+    def update_ticket(self, ticket_id: int, changes: Row) -> Optional[Row]:
+        with self._lock:
+            row = self._tickets.get(ticket_id)
+            if row is None:
+                return None
+            updated = dict(row, **changes)
+            self._check(updated)
+            self._unindex(row)
+            self._tickets[ticket_id] = updated
+            self._index(updated)
+            return dict(updated)
+
+    def delete_ticket(self, ticket_id: int) -> bool:
+        with self._lock:
+            row = self._tickets.pop(ticket_id, None)
+            if row is None:
+                return False
+            self._unindex(row)
+            return True
+
+    def iter_ticket_rows(self, page_size: int, columns: Optional[List[str]]) -> Iterator[Row]:
+        # Ids are assigned in increasing order, so dict order is id order
+        with self._lock:
+            ids = list(self._tickets)
+        for start in range(0, len(ids), page_size):
+            with self._lock:
+                page = [self._tickets[ticket_id] for ticket_id in ids[start:start + page_size]
+                        if ticket_id in self._tickets]
+                if columns:
+                    page = [{column: row.get(column) for column in columns} for row in page]
+                else:
+                    page = [dict(row) for row in page]
+            yield from page
+
+    def ticket_page(self, filters: Row, keyset: Optional[Tuple[str, int]],
+                    columns: List[str], limit: int) -> List[Row]:
+        with self._lock:
+            # Walk the most selective index; the remaining filters are checked per row
+            candidates = self._order
+            for column, value in filters.items():
+                keys = self._by_value.get((column, value), [])
+                if len(keys) < len(candidates) or candidates is self._order:
+                    candidates = keys
+            position = bisect_left(candidates, tuple(keyset)) if keyset else len(candidates)
+            page = []
+            while position > 0 and len(page) < limit:
+                position -= 1
+                row = self._tickets[candidates[position][1]]
+                if all(row.get(column) == value for column, value in filters.items()):
+                    page.append({column: row.get(column) for column in columns})
+            return page
+
+    def ticket_counts(self, filters: Row, columns: List[str], page_size: int) -> Dict[str, Dict[Any, int]]:
+        with self._lock:
+            if not filters:
+                # The per-value indexes already hold the counts
+                return {column: {value: len(keys) for (name, value), keys in self._by_value.items()
+                                 if name == column and keys} for column in columns}
+            # Walk the most selective index, as ticket_page does
+            candidates = min((self._by_value.get((column, value), []) for column, value in filters.items()), key=len)
+            counts: Dict[str, Dict[Any, int]] = {column: {} for column in columns}
+            for _, ticket_id in candidates:
+                row = self._tickets[ticket_id]
+                if all(row.get(column) == value for column, value in filters.items()):
+                    for column in columns:
+                        value = row.get(column)
+                        counts[column][value] = counts[column].get(value, 0) + 1
+            return counts
+
+    # Users
+    def get_user(self, user_id: str) -> Optional[Row]:
+        with self._lock:
+            row = self._users.get(user_id)
+            return dict(row) if row else None
+
+    def insert_user(self, row: Row) -> Row:
+        with self._lock:
+            if row.get("email") in self._emails:
+                raise ConstraintViolationError(f"Duplicate email: {row.get('email')}")
+            row = dict(row, id=row.get("id") or str(uuid.uuid4()))
+            row.setdefault("created_at", datetime.now().isoformat())
+            self._users[row["id"]] = row
+            self._emails[row["email"]] = row["id"]
+            return dict(row)
+
+    # Knowledge base
+    def knowledge_base_rows(self) -> List[Row]:
+        with self._lock:
+            return [dict(row) for row in self._knowledge_base.values()]
+
+    def insert_knowledge_base_entry(self, row: Row) -> Row:
+        if not row.get("question") or not row.get("answer"):
+            raise ConstraintViolationError("Knowledge base entries need a question and an answer")
+        with self._lock:
+            row = dict(row, id=self._next_entry_id)
+            self._next_entry_id += 1
+            self._knowledge_base[row["id"]] = row
+            return dict(row)
+
+    def update_knowledge_base_entry(self, entry_id: int, changes: Row) -> Optional[Row]:
+        with self._lock:
+            row = self._knowledge_base.get(entry_id)
+            if row is None:
+                return None
+            updated = dict(row, **changes)
+            if not updated.get("question") or not updated.get("answer"):
+                raise ConstraintViolationError("Knowledge base entries need a question and an answer")
+            self._knowledge_base[entry_id] = updated
+            return dict(updated)
+
+    def delete_knowledge_base_entry(self, entry_id: int) -> bool:
+        with self._lock:
+            return self._knowledge_base.pop(entry_id, None) is not None
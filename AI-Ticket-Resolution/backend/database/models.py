@@ -1,7 +1,11 @@
-from dataclasses import dataclass
-from typing import Optional, Dict, Any
+from dataclasses import dataclass, fields, MISSING
+from typing import Optional, Dict, Any, Tuple
 from datetime import datetime
 
+# Same CHECK constraints as schema.sql
+TICKET_PRIORITIES = ("low", "medium", "high", "urgent")
+TICKET_STATUSES = ("open", "in_progress", "resolved", "closed")
+
 @dataclass
 class Ticket:
     """
@@ -39,6 +43,22 @@ class KnowledgeBaseEntry:
     created_at: Optional[str] = None
     updated_at: Optional[str] = None
 
+_MODEL_FIELDS: Dict[type, Tuple[Tuple[str, Any], ...]] = {}
+
+def row_to_model(model: type, row: Dict[str, Any]):
+    """
+    Build a dataclass instance from a database row. Keys missing from the row
+    take the field default; extra keys are ignored. The (name, default) pairs
+    are computed once per model class.
+    """
+    model_fields = _MODEL_FIELDS.get(model)
+    if model_fields is None:
+        model_fields = tuple(
+            (field.name, None if field.default is MISSING else field.default) for field in fields(model)
+        )
+        _MODEL_FIELDS[model] = model_fields
+    return model(**{name: row.get(name, default) for name, default in model_fields})
+
 def ticket_to_dict(ticket: Ticket) -> Dict[str, Any]:
     """
     Convert a Ticket object to a dictionary for database storage
@@ -54,18 +74,21 @@ def ticket_to_dict(ticket: Ticket) -> Dict[str, Any]:
         "user_id": ticket.user_id
     }
 
+def knowledge_base_entry_to_dict(entry: KnowledgeBaseEntry) -> Dict[str, Any]:
+    """
+    Convert a KnowledgeBaseEntry object to a dictionary for database storage
+    """
+    now = datetime.now().isoformat()
+    return {
+        "question": entry.question,
+        "answer": entry.answer,
+        "category": entry.category,
+        "created_at": entry.created_at or now,
+        "updated_at": entry.updated_at or now
+    }
+
 def dict_to_ticket(data: Dict[str, Any]) -> Ticket:
     """
     Convert a dictionary from database to a Ticket object
     """
-    return Ticket(
-        id=data.get("id"),
-        subject=data.get("subject", ""),
-        description=data.get("description", ""),
-        priority=data.get("priority", "medium"),
-        status=data.get("status", "open"),
-        category=data.get("category", "general"),
-        created_at=data.get("created_at"),
-        updated_at=data.get("updated_at"),
-        user_id=data.get("user_id")
-    )
\ No newline at end of file
+    return row_to_model(Ticket, data)
\ No newline at end of file
@@ -0,0 +1,77 @@
+import base64
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from .errors import InvalidQueryError
+
+# Columns clients may request from GET /api/tickets and filter on
+TICKET_COLUMNS = ("id", "subject", "description", "priority", "status", "category",
+                  "created_at", "updated_at", "user_id")
+TICKET_FILTERS = ("status", "priority", "category", "user_id")
+# Columns GET /api/tickets/summary counts tickets by
+TICKET_COUNT_COLUMNS = ("status", "priority", "category")
+# Columns update_ticket may change; anything else in the payload is ignored
+TICKET_UPDATE_COLUMNS = ("subject", "description", "priority", "status", "category", "user_id", "updated_at")
+# Columns update_knowledge_base_entry may change
+KB_UPDATE_COLUMNS = ("question", "answer", "category", "updated_at")
+
+def encode_cursor(created_at: str, ticket_id: int) -> str:
+    """
+    Opaque page token for the (created_at, id) keyset position
+    """
+    raw = json.dumps([created_at, ticket_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """
+    Inverse of encode_cursor; raises InvalidQueryError for malformed tokens
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, ticket_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return str(created_at), int(ticket_id)
+    except Exception:
+        raise InvalidQueryError("Invalid cursor")
+
+def ticket_columns(columns: Optional[List[str]]) -> Optional[List[str]]:
+    """
+    Validate a column projection; None means every column
+    """
+    if columns is None:
+        return None
+    unknown = [column for column in columns if column not in TICKET_COLUMNS]
+    if unknown:
+        raise InvalidQueryError(f"Unsupported column: {', '.join(unknown)}")
+    return list(columns)
+
+def page_query(filters: Optional[Dict[str, Any]],
+               columns: Optional[List[str]]) -> Tuple[Dict[str, Any], List[str], List[str]]:
+    """
+    Validate a page request against the whitelists above.
+
+    Returns the non-empty filters, the requested columns and the columns to
+    select, which always include the (created_at, id) keyset. Raises
+    InvalidQueryError for unknown filters or columns.
+    """
+    filters = {key: value for key, value in (filters or {}).items() if value is not None}
+    unknown = [key for key in filters if key not in TICKET_FILTERS]
+    if unknown:
+        raise InvalidQueryError(f"Unsupported filter: {', '.join(unknown)}")
+    columns = ticket_columns(columns or list(TICKET_COLUMNS))
+    selected = columns + [column for column in ("created_at", "id") if column not in columns]
+    return filters, columns, selected
+
+def finish_page(rows: List[Dict[str, Any]], limit: int, columns: List[str],
+                selected: List[str]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Trim a ``limit + 1`` row fetch to one page, build the next cursor and drop
+    the keyset columns the client did not ask for
+    """
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last["created_at"], last["id"])
+    if selected != columns:
+        rows = [{column: row.get(column) for column in columns} for row in rows]
+    return rows, next_cursor
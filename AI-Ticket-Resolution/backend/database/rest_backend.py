@@ -0,0 +1,254 @@
+import asyncio
+import json
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import aiohttp
+import httpx
+
+from .errors import StorageError, StorageUnavailableError, ConstraintViolationError
+from .storage import Row, StorageBackend, AsyncStorageBackend
+
+# PostgreSQL error classes that mean the row itself was rejected
+CONSTRAINT_CODES = ("23502", "23503", "23505", "23514")
+
+Request = Tuple[str, str, Dict[str, Any], Any]
+
+def request_headers(api_key: Optional[str]) -> Dict[str, str]:
+    """
+    Headers for every request to a PostgREST endpoint (Supabase's REST API or
+    a compatible server)
+    """
+    headers = {"Accept": "application/json"}
+    if api_key:
+        headers["apikey"] = api_key
+        headers["Authorization"] = f"Bearer {api_key}"
+    return headers
+
+class RestQueries:
+    """
+    PostgREST request for every backend operation as (method, path, params, body);
+    shared by the blocking and the asyncio backends
+    """
+
+    @staticmethod
+    def select(table: str, columns: str = "*", **params) -> Request:
+        return "GET", f"/{table}", {"select": columns, **params}, None
+
+    @staticmethod
+    def insert(table: str, rows) -> Request:
+        return "POST", f"/{table}", {}, rows
+
+    @staticmethod
+    def update(table: str, row_id, changes: Row) -> Request:
+        return "PATCH", f"/{table}", {"id": f"eq.{row_id}"}, changes
+
+    @staticmethod
+    def delete(table: str, row_id) -> Request:
+        return "DELETE", f"/{table}", {"id": f"eq.{row_id}"}, None
+
+    @staticmethod
+    def ticket_rows_after(last_id: int, page_size: int, columns: Optional[List[str]]) -> Request:
+        return RestQueries.select("tickets", ",".join(columns) if columns else "*",
+                                  id=f"gt.{last_id}", order="id.asc", limit=str(page_size))
+
+    @staticmethod
+    def ticket_page(filters: Row, keyset: Optional[Tuple[str, int]], columns: List[str], limit: int) -> Request:
+        params = {column: f"eq.{value}" for column, value in filters.items()}
+        if keyset:
+            created_at, ticket_id = keyset
+            params["or"] = f'(created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{ticket_id}))'
+        return RestQueries.select("tickets", ",".join(columns), order="created_at.desc,id.desc",
+                                  limit=str(limit), **params)
+
+def _rows(status: int, content: bytes) -> List[Row]:
+    """
+    Rows of a PostgREST response, or the matching storage error
+    """
+    if status >= 500:
+        raise StorageUnavailableError(f"Database returned HTTP {status}")
+    if status >= 400:
+        try:
+            error = json.loads(content)
+        except ValueError:
+            error = {}
+        message = error.get("message") or f"HTTP {status}"
+        if str(error.get("code", "")) in CONSTRAINT_CODES:
+            raise ConstraintViolationError(message)
+        raise StorageError(f"Database query failed: {message}")
+    return json.loads(content) if content else []
+
+def _write_headers(method: str) -> Dict[str, str]:
+    # Writes echo the affected rows back, so no second round trip is needed
+    return {} if method == "GET" else {"Prefer": "return=representation"}
+
+class RestBackend(StorageBackend):
+    """
+    Storage backend on a PostgREST HTTP endpoint through a blocking,
+    connection-pooled httpx client
+    """
+    name = "rest"
+
+    def __init__(self, base_url: str, api_key: Optional[str] = None, max_connections: int = 100,
+                 timeout: float = 10.0):
+        super().__init__()
+        self.client = httpx.Client(
+            base_url=base_url.rstrip("/"), headers=request_headers(api_key), timeout=httpx.Timeout(timeout),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        )
+
+    def _send(self, request: Request) -> List[Row]:
+        method, path, params, body = request
+        try:
+            response = self.client.request(method, path, params=params, json=body, headers=_write_headers(method))
+        except httpx.TransportError as e:
+            raise StorageUnavailableError(f"Database request failed: {e}") from e
+        return _rows(response.status_code, response.content)
+
+    def close(self):
+        self.client.close()
+
+    def list_tickets(self) -> List[Row]:
+        return self._send(RestQueries.select("tickets", order="id.asc"))
+
+    def insert_tickets(self, rows: List[Row]) -> List[Row]:
+        return self._send(RestQueries.insert("tickets", rows)) if rows else []
+
+    def get_ticket(self, ticket_id: int) -> Optional[Row]:
+        data = self._send(RestQueries.select("tickets", id=f"eq.{ticket_id}"))
+        return data[0] if data else None
+
+    def update_ticket(self, ticket_id: int, changes: Row) -> Optional[Row]:
+        data = self._send(RestQueries.update("tickets", ticket_id, changes))
+        return data[0] if data else None
+
+    def delete_ticket(self, ticket_id: int) -> bool:
+        return bool(self._send(RestQueries.delete("tickets", ticket_id)))
+
+    def iter_ticket_rows(self, page_size: int, columns: Optional[List[str]]) -> Iterator[Row]:
+        last_id = 0
+        while True:
+            data = self._send(RestQueries.ticket_rows_after(last_id, page_size, columns))
+            if not data:
+                return
+            yield from data
+            if len(data) < page_size:
+                return
+            last_id = data[-1]["id"]
+
+    def ticket_page(self, filters: Row, keyset: Optional[Tuple[str, int]],
+                    columns: List[str], limit: int) -> List[Row]:
+        return self._send(RestQueries.ticket_page(filters, keyset, columns, limit))
+
+    def get_user(self, user_id: str) -> Optional[Row]:
+        data = self._send(RestQueries.select("users", id=f"eq.{user_id}"))
+        return data[0] if data else None
+
+    def insert_user(self, row: Row) -> Row:
+        data = self._send(RestQueries.insert("users", row))
+        return data[0] if data else row
+
+    def knowledge_base_rows(self) -> List[Row]:
+        return self._send(RestQueries.select("knowledge_base", order="id.asc"))
+
+    def insert_knowledge_base_entry(self, row: Row) -> Row:
+        data = self._send(RestQueries.insert("knowledge_base", row))
+        return data[0] if data else row
+
+    def update_knowledge_base_entry(self, entry_id: int, changes: Row) -> Optional[Row]:
+        data = self._send(RestQueries.update("knowledge_base", entry_id, changes))
+        return data[0] if data else None
+
+    def delete_knowledge_base_entry(self, entry_id: int) -> bool:
+        return bool(self._send(RestQueries.delete("knowledge_base", entry_id)))
+
+class AsyncRestBackend(AsyncStorageBackend):
+    """
+    Asyncio storage backend on a PostgREST HTTP endpoint.
+
+    One aiohttp session keeps up to ``max_connections`` keep-alive
+    connections open, and a semaphore caps in-flight requests at
+    ``max_concurrency`` so a burst of traffic queues in the app instead of
+    overwhelming the database. Every request is bounded by ``timeout``.
+    (aiohttp rather than httpx here: httpx's async pool slows down sharply
+    with many concurrent connections.)
+    """
+    name = "rest"
+
+    def __init__(self, base_url: str, api_key: Optional[str] = None, max_connections: int = 100,
+                 max_concurrency: int = 64, timeout: float = 10.0):
+        super().__init__()
+        self.base_url = base_url.rstrip("/")
+        self.headers = request_headers(api_key)
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._session = None
+        self._slots = asyncio.Semaphore(max_concurrency)
+
+    def _client(self):
+        # Sessions bind to the running event loop, so open it on first use
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                headers=self.headers,
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def _send(self, request: Request) -> List[Row]:
+        method, path, params, body = request
+        async with self._slots:
+            try:
+                async with self._client().request(method, self.base_url + path, params=params, json=body,
+                                                  headers=_write_headers(method)) as response:
+                    status, content = response.status, await response.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                raise StorageUnavailableError(f"Database request failed: {e}") from e
+        return _rows(status, content)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def list_tickets(self) -> List[Row]:
+        return await self._send(RestQueries.select("tickets", order="id.asc"))
+
+    async def insert_tickets(self, rows: List[Row]) -> List[Row]:
+        return await self._send(RestQueries.insert("tickets", rows)) if rows else []
+
+    async def get_ticket(self, ticket_id: int) -> Optional[Row]:
+        data = await self._send(RestQueries.select("tickets", id=f"eq.{ticket_id}"))
+        return data[0] if data else None
+
+    async def update_ticket(self, ticket_id: int, changes: Row) -> Optional[Row]:
+        data = await self._send(RestQueries.update("tickets", ticket_id, changes))
+        return data[0] if data else None
+
+    async def delete_ticket(self, ticket_id: int) -> bool:
+        return bool(await self._send(RestQueries.delete("tickets", ticket_id)))
+
+    async def ticket_page(self, filters: Row, keyset: Optional[Tuple[str, int]],
+                          columns: List[str], limit: int) -> List[Row]:
+        return await self._send(RestQueries.ticket_page(filters, keyset, columns, limit))
+
+    async def get_user(self, user_id: str) -> Optional[Row]:
+        data = await self._send(RestQueries.select("users", id=f"eq.{user_id}"))
+        return data[0] if data else None
+
+    async def insert_user(self, row: Row) -> Row:
+        data = await self._send(RestQueries.insert("users", row))
+        return data[0] if data else row
+
+    async def knowledge_base_rows(self) -> List[Row]:
+        return await self._send(RestQueries.select("knowledge_base", order="id.asc"))
+
+    async def insert_knowledge_base_entry(self, row: Row) -> Row:
+        data = await self._send(RestQueries.insert("knowledge_base", row))
+        return data[0] if data else row
+
+    async def update_knowledge_base_entry(self, entry_id: int, changes: Row) -> Optional[Row]:
+        data = await self._send(RestQueries.update("knowledge_base", entry_id, changes))
+        return data[0] if data else None
+
+    async def delete_knowledge_base_entry(self, entry_id: int) -> bool:
+        return bool(await self._send(RestQueries.delete("knowledge_base", entry_id)))
@@ -31,6 +31,14 @@ CREATE TABLE IF NOT EXISTS knowledge_base (
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- Indexes for paginated ticket listing: keyset order (created_at, id) with
+-- equality filters on status/priority/category/user_id in front of it
+CREATE INDEX IF NOT EXISTS idx_tickets_created_id ON tickets (created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_tickets_status_created_id ON tickets (status, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_tickets_priority_created_id ON tickets (priority, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_tickets_category_created_id ON tickets (category, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_tickets_user_created_id ON tickets (user_id, created_at DESC, id DESC);
+
 -- Enable Row Level Security (RLS)
 ALTER TABLE tickets ENABLE ROW LEVEL SECURITY;
 ALTER TABLE users ENABLE ROW LEVEL SECURITY;
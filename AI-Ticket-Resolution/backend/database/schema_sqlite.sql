@@ -0,0 +1,60 @@
+-- SQLite translation of schema.sql for the embedded backend
+-- (sqlite_backend.py applies it when the backend is created)
+
+-- Users table
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY DEFAULT (lower(hex(randomblob(16)))),
+    email TEXT UNIQUE NOT NULL,
+    name TEXT,
+    created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now'))
+);
+
+-- Tickets table
+CREATE TABLE IF NOT EXISTS tickets (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    subject TEXT NOT NULL,
+    description TEXT,
+    priority TEXT DEFAULT 'medium' CHECK (priority IN ('low', 'medium', 'high', 'urgent')),
+    status TEXT DEFAULT 'open' CHECK (status IN ('open', 'in_progress', 'resolved', 'closed')),
+    category TEXT DEFAULT 'general',
+    user_id TEXT REFERENCES users(id),
+    created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now')),
+    updated_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now'))
+);
+
+-- Knowledge base table
+CREATE TABLE IF NOT EXISTS knowledge_base (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    question TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    category TEXT,
+    created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now')),
+    updated_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now'))
+);
+
+-- Same keyset/filter indexes as schema.sql
+CREATE INDEX IF NOT EXISTS idx_tickets_created_id ON tickets (created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_tickets_status_created_id ON tickets (status, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_tickets_priority_created_id ON tickets (priority, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_tickets_category_created_id ON tickets (category, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_tickets_user_created_id ON tickets (user_id, created_at DESC, id DESC);
+
+-- Full-text index over the knowledge base, kept in sync by triggers
+CREATE VIRTUAL TABLE IF NOT EXISTS knowledge_base_fts USING fts5(
+    question, answer, content='knowledge_base', content_rowid='id', tokenize='porter unicode61'
+);
+
+CREATE TRIGGER IF NOT EXISTS knowledge_base_ai AFTER INSERT ON knowledge_base BEGIN
+    INSERT INTO knowledge_base_fts (rowid, question, answer) VALUES (new.id, new.question, new.answer);
+END;
+
+CREATE TRIGGER IF NOT EXISTS knowledge_base_ad AFTER DELETE ON knowledge_base BEGIN
+    INSERT INTO knowledge_base_fts (knowledge_base_fts, rowid, question, answer)
+    VALUES ('delete', old.id, old.question, old.answer);
+END;
+
+CREATE TRIGGER IF NOT EXISTS knowledge_base_au AFTER UPDATE ON knowledge_base BEGIN
+    INSERT INTO knowledge_base_fts (knowledge_base_fts, rowid, question, answer)
+    VALUES ('delete', old.id, old.question, old.answer);
+    INSERT INTO knowledge_base_fts (rowid, question, answer) VALUES (new.id, new.question, new.answer);
+END;
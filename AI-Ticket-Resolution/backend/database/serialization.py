@@ -0,0 +1,104 @@
+import dataclasses
+import json
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, Tuple
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # Optional: the stdlib encoder produces the same documents, more slowly
+    orjson = None
+
+from .columnar import ColumnBatch
+
+ENCODER = "orjson" if orjson is not None else "json"
+
+# Model class -> (field names, function building the dict)
+_CONVERTERS: Dict[type, Tuple[Tuple[str, ...], Callable[[Any], Dict[str, Any]]]] = {}
+
+def _converter(model: type) -> Tuple[Tuple[str, ...], Callable[[Any], Dict[str, Any]]]:
+    cached = _CONVERTERS.get(model)
+    if cached is None:
+        names = tuple(field.name for field in dataclasses.fields(model))
+        # A dict display over the fixed field tuple, generated once per class
+        # the way dataclasses generates __init__; several times faster than
+        # a loop or zip over the names
+        items = ", ".join(f"{name!r}: instance.{name}" for name in names)
+        namespace: Dict[str, Any] = {}
+        exec(f"def convert(instance):\n    return {{{items}}}\n", namespace)
+        cached = _CONVERTERS[model] = (names, namespace["convert"])
+    return cached
+
+def model_fields(model: type) -> Tuple[str, ...]:
+    """
+    Field names of a models.py dataclass, in declaration order
+    """
+    return _converter(model)[0]
+
+def to_dict(instance) -> Dict[str, Any]:
+    """
+    Plain dict of a models.py instance (mutable or frozen)
+    """
+    return _converter(type(instance))[1](instance)
+
+def _default(value):
+    # Types neither encoder handles natively
+    if dataclasses.is_dataclass(value):
+        return to_dict(value)
+    if isinstance(value, ColumnBatch):
+        return value.to_dicts()
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+_stdlib_encoder = json.JSONEncoder(default=_default, separators=(",", ":"), ensure_ascii=False)
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(value) -> bytes:
+        """
+        Compact UTF-8 JSON for API payloads: dicts, lists, model instances,
+        columnar batches and numpy values
+        """
+        return orjson.dumps(value, default=_default, option=_ORJSON_OPTIONS)
+else:
+    def dumps(value) -> bytes:
+        """
+        Compact UTF-8 JSON for API payloads: dicts, lists, model instances,
+        columnar batches and numpy values
+        """
+        return _stdlib_encoder.encode(value).encode("utf-8")
+
+def iter_json_array(items: Iterable[Any], chunk_size: int = 100) -> Iterator[bytes]:
+    """
+    A JSON array of ``items``, yielded as byte chunks of ``chunk_size``
+    encoded items, so the whole document never exists in memory at once
+    """
+    iterator = iter(items)
+    yield b"["
+    separator = b""
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            break
+        # One encoder call per chunk; strip the brackets of the encoded list
+        yield separator + dumps(chunk)[1:-1]
+        separator = b","
+    yield b"]"
+
+def iter_json_listing(key: str, items: Iterable[Any], trailer: Dict[str, Any], chunk_size: int = 100) -> Iterator[bytes]:
+    """
+    ``{key: [items...], **trailer}`` streamed like iter_json_array; the
+    trailer members (e.g. a next-page cursor) come after the array
+    """
+    yield b"{" + dumps(key) + b":"
+    yield from iter_json_array(items, chunk_size)
+    for name, value in trailer.items():
+        yield b"," + dumps(name) + b":" + dumps(value)
+    yield b"}"
@@ -0,0 +1,308 @@
+import os
+import re
+import sqlite3
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .errors import StorageError, StorageUnavailableError, ConstraintViolationError
+from .storage import Row, StorageBackend
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "schema_sqlite.sql")
+# sqlite3 keeps this many compiled statements per connection, keyed by SQL text,
+# so the constant statements below are prepared once per thread
+STATEMENT_CACHE_SIZE = 256
+BUSY_TIMEOUT_SECONDS = 30.0
+
+TICKET_INSERT = (
+    "INSERT INTO tickets (subject, description, priority, status, category, created_at, updated_at, user_id) "
+    "VALUES (:subject, :description, :priority, :status, :category, :created_at, :updated_at, :user_id)"
+)
+TICKET_SELECT_ALL = "SELECT * FROM tickets ORDER BY id"
+TICKET_SELECT_BY_ID = "SELECT * FROM tickets WHERE id = ?"
+TICKET_DELETE = "DELETE FROM tickets WHERE id = ?"
+USER_SELECT_BY_ID = "SELECT * FROM users WHERE id = ?"
+USER_SELECT_BY_ROWID = "SELECT * FROM users WHERE rowid = ?"
+USER_INSERT = "INSERT INTO users (email, name, created_at) VALUES (:email, :name, :created_at)"
+KB_SELECT_ALL = "SELECT * FROM knowledge_base ORDER BY id"
+KB_SELECT_BY_ID = "SELECT * FROM knowledge_base WHERE id = ?"
+KB_INSERT = (
+    "INSERT INTO knowledge_base (question, answer, category, created_at, updated_at) "
+    "VALUES (:question, :answer, :category, :created_at, :updated_at)"
+)
+KB_DELETE = "DELETE FROM knowledge_base WHERE id = ?"
+KB_SEARCH = (
+    "SELECT kb.* FROM knowledge_base_fts JOIN knowledge_base kb ON kb.id = knowledge_base_fts.rowid "
+    "WHERE knowledge_base_fts MATCH ? ORDER BY bm25(knowledge_base_fts) LIMIT ?"
+)
+_FTS_TERM = re.compile(r"\w+", re.UNICODE)
+
+def sqlite_path(database_url: str) -> str:
+    """
+    File path of a ``sqlite:///relative.db`` / ``sqlite:////absolute.db`` URL;
+    ``sqlite://`` or ``sqlite:///:memory:`` mean an in-memory database
+    """
+    path = database_url[len("sqlite:"):]
+    if path.startswith("///"):
+        path = path[3:]
+    elif path.startswith("//"):
+        path = path[2:]
+    return path or ":memory:"
+
+def fts_query(text: str) -> str:
+    """
+    Turn free text into an FTS5 query matching any of its words; every term is
+    quoted so user input never reaches the FTS5 query syntax
+    """
+    return " OR ".join(f'"{term}"' for term in _FTS_TERM.findall(text.lower()))
+
+@contextmanager
+def _translate_errors():
+    """
+    Map sqlite3 exceptions onto the storage errors
+    """
+    try:
+        yield
+    except sqlite3.IntegrityError as e:
+        raise ConstraintViolationError(str(e)) from e
+    except sqlite3.OperationalError as e:
+        raise StorageUnavailableError(f"SQLite error: {e}") from e
+    except sqlite3.Error as e:
+        raise StorageError(f"SQLite error: {e}") from e
+
+def _dict_factory(cursor, row):
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+class _Held:
+    # Thread-local holder of a connection; collected when its thread exits
+    __slots__ = ("connection", "__weakref__")
+
+    def __init__(self, connection: sqlite3.Connection):
+        self.connection = connection
+
+def _release(connections: set, lock: threading.Lock, connection: sqlite3.Connection):
+    with lock:
+        if connection not in connections:
+            # Already closed by ThreadConnections.close
+            return
+        connections.discard(connection)
+    connection.close()
+
+class ThreadConnections:
+    """
+    One sqlite3 connection per thread (connections must not be shared
+    across threads), opened by ``connect`` on first use, reused for the
+    thread's lifetime and closed when the thread exits, so short-lived
+    threads do not leak connections
+    """
+
+    def __init__(self, connect: Callable[[], sqlite3.Connection]):
+        self._connect = connect
+        self._local = threading.local()
+        self._open = set()
+        self._lock = threading.Lock()
+
+    def get(self) -> sqlite3.Connection:
+        held = getattr(self._local, "held", None)
+        if held is None:
+            connection = self._connect()
+            held = self._local.held = _Held(connection)
+            with self._lock:
+                self._open.add(connection)
+            weakref.finalize(held, _release, self._open, self._lock, connection)
+        return held.connection
+
+    def __len__(self):
+        return len(self._open)
+
+    def close(self):
+        """
+        Close every open connection; threads open new ones on next use
+        """
+        with self._lock:
+            connections = list(self._open)
+            self._open.clear()
+        for connection in connections:
+            connection.close()
+        self._local = threading.local()
+
+class SQLiteBackend(StorageBackend):
+    """
+    Embedded SQLite storage backend.
+
+    Every thread gets its own connection (ThreadConnections), closed when
+    the thread exits. File databases run in WAL mode so readers never block
+    the writer, and knowledge base search goes through an FTS5 index.
+    """
+    name = "sqlite"
+
+    def __init__(self, path: str = "tickets.db"):
+        super().__init__()
+        self.path = path
+        self._connections = ThreadConnections(self._connect)
+        self._keepalive = None
+        if path == ":memory:":
+            # A named shared-cache database so every thread sees the same data;
+            # one connection outside the threads' is kept open to keep it alive
+            self._target = f"file:tickets_{id(self)}?mode=memory&cache=shared"
+            self._keepalive = sqlite3.connect(self._target, uri=True, check_same_thread=False)
+        else:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            self._target = f"file:{os.path.abspath(path)}"
+        with open(SCHEMA_PATH, encoding="utf-8") as f:
+            schema = f.read()
+        with _translate_errors():
+            self._connection().executescript(schema)
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(
+            self._target, uri=True, timeout=BUSY_TIMEOUT_SECONDS,
+            cached_statements=STATEMENT_CACHE_SIZE, check_same_thread=False
+        )
+        connection.row_factory = _dict_factory
+        if self.path != ":memory:":
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA foreign_keys=ON")
+        return connection
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        This thread's connection, opened and configured on first use
+        """
+        return self._connections.get()
+
+    def _query(self, statement: str, parameters=()) -> List[Row]:
+        with _translate_errors():
+            return self._connection().execute(statement, parameters).fetchall()
+
+    def close(self):
+        """
+        Close every open connection
+        """
+        self._connections.close()
+        if self._keepalive is not None:
+            self._keepalive.close()
+            self._keepalive = None
+
+    # Tickets
+    def list_tickets(self) -> List[Row]:
+        return self._query(TICKET_SELECT_ALL)
+
+    def insert_tickets(self, rows: List[Row]) -> List[Row]:
+        if not rows:
+            return []
+        connection = self._connection()
+        with _translate_errors(), connection:
+            if len(rows) == 1:
+                first_id = connection.execute(TICKET_INSERT, rows[0]).lastrowid
+            else:
+                # AUTOINCREMENT ids of one transaction are consecutive
+                connection.executemany(TICKET_INSERT, rows)
+                first_id = connection.execute("SELECT last_insert_rowid() AS id").fetchone()["id"] - len(rows) + 1
+        return [dict(row, id=first_id + offset) for offset, row in enumerate(rows)]
+
+    def get_ticket(self, ticket_id: int) -> Optional[Row]:
+        data = self._query(TICKET_SELECT_BY_ID, (ticket_id,))
+        return data[0] if data else None
+
+    def update_ticket(self, ticket_id: int, changes: Row) -> Optional[Row]:
+        # Column names come from the whitelist in pagination.py, values are bound
+        assignments = ", ".join(f"{column} = :{column}" for column in changes)
+        connection = self._connection()
+        with _translate_errors(), connection:
+            connection.execute(f"UPDATE tickets SET {assignments} WHERE id = :id", {**changes, "id": ticket_id})
+        return self.get_ticket(ticket_id)
+
+    def delete_ticket(self, ticket_id: int) -> bool:
+        connection = self._connection()
+        with _translate_errors(), connection:
+            return connection.execute(TICKET_DELETE, (ticket_id,)).rowcount > 0
+
+    def iter_ticket_rows(self, page_size: int, columns: Optional[List[str]]) -> Iterator[Row]:
+        statement = f"SELECT {','.join(columns) if columns else '*'} FROM tickets WHERE id > ? ORDER BY id LIMIT ?"
+        last_id = 0
+        while True:
+            data = self._query(statement, (last_id, page_size))
+            if not data:
+                return
+            yield from data
+            if len(data) < page_size:
+                return
+            last_id = data[-1]["id"]
+
+    def ticket_page(self, filters: Row, keyset: Optional[Tuple[str, int]],
+                    columns: List[str], limit: int) -> List[Row]:
+        clauses = [f"{column} = ?" for column in filters]
+        parameters = list(filters.values())
+        if keyset:
+            created_at, ticket_id = keyset
+            clauses.append("(created_at < ? OR (created_at = ? AND id < ?))")
+            parameters.extend([created_at, created_at, ticket_id])
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        statement = (f"SELECT {','.join(columns)} FROM tickets{where} "
+                     f"ORDER BY created_at DESC, id DESC LIMIT ?")
+        parameters.append(limit)
+        return self._query(statement, parameters)
+
+    def ticket_counts(self, filters: Row, columns: List[str], page_size: int) -> Dict[str, Dict[Any, int]]:
+        # One GROUP BY per column; the filters use the same indexes as ticket_page
+        where = f" WHERE {' AND '.join(f'{column} = ?' for column in filters)}" if filters else ""
+        parameters = list(filters.values())
+        return {
+            column: {row["value"]: row["count"] for row in self._query(
+                f"SELECT {column} AS value, COUNT(*) AS count FROM tickets{where} GROUP BY {column}", parameters)}
+            for column in columns
+        }
+
+    # Users
+    def get_user(self, user_id: str) -> Optional[Row]:
+        data = self._query(USER_SELECT_BY_ID, (user_id,))
+        return data[0] if data else None
+
+    def insert_user(self, row: Row) -> Row:
+        connection = self._connection()
+        with _translate_errors(), connection:
+            rowid = connection.execute(USER_INSERT, row).lastrowid
+            return connection.execute(USER_SELECT_BY_ROWID, (rowid,)).fetchone()
+
+    # Knowledge base
+    def knowledge_base_rows(self) -> List[Row]:
+        return self._query(KB_SELECT_ALL)
+
+    def insert_knowledge_base_entry(self, row: Row) -> Row:
+        connection = self._connection()
+        with _translate_errors(), connection:
+            entry_id = connection.execute(KB_INSERT, row).lastrowid
+            return connection.execute(KB_SELECT_BY_ID, (entry_id,)).fetchone()
+
+    def update_knowledge_base_entry(self, entry_id: int, changes: Row) -> Optional[Row]:
+        # Column names come from the whitelist in pagination.py, values are bound
+        assignments = ", ".join(f"{column} = :{column}" for column in changes)
+        connection = self._connection()
+        with _translate_errors(), connection:
+            connection.execute(f"UPDATE knowledge_base SET {assignments} WHERE id = :id", {**changes, "id": entry_id})
+        data = self._query(KB_SELECT_BY_ID, (entry_id,))
+        return data[0] if data else None
+
+    def delete_knowledge_base_entry(self, entry_id: int) -> bool:
+        connection = self._connection()
+        with _translate_errors(), connection:
+            return connection.execute(KB_DELETE, (entry_id,)).rowcount > 0
+
+    def search_knowledge_base(self, query: str, top_k: int) -> List[Row]:
+        """
+        FTS5 search, best BM25 match first; triggers keep the index in sync
+        with the table so there is nothing to cache in-process
+        """
+        match = fts_query(query)
+        if not match:
+            return []
+        return self._query(KB_SEARCH, (match, top_k))
+
+    def refresh_knowledge_base_index(self):
+        """
+        Nothing to rebuild: the FTS5 index is maintained by the database
+        """
@@ -0,0 +1,228 @@
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from utils.segmented_index import SegmentedKnowledgeIndex
+
+Row = Dict[str, Any]
+
+class StorageBackend:
+    """
+    Row-level storage protocol behind DatabaseService.
+
+    Backends deal only in plain dict rows keyed by column name; turning rows
+    into dataclasses, validating projections/filters and building cursors
+    happens once in DatabaseService. Implementations raise the errors from
+    errors.py instead of returning empty results, and are picked once at
+    startup by ``create_database_service``.
+
+    The default knowledge base search builds a segmented BM25 index over
+    ``knowledge_base_rows()`` once, then keeps it current from the
+    DatabaseService's knowledge base change events
+    (``apply_knowledge_base_change``) until
+    ``refresh_knowledge_base_index()`` rebuilds it; backends with native
+    full-text search override both.
+    """
+    name = "base"
+
+    def __init__(self):
+        self._kb_index: Optional[SegmentedKnowledgeIndex] = None
+
+    # Tickets
+    def list_tickets(self) -> List[Row]:
+        raise NotImplementedError
+
+    def insert_tickets(self, rows: List[Row]) -> List[Row]:
+        """
+        Insert rows (without ids) and return them as stored, ids included
+        """
+        raise NotImplementedError
+
+    def get_ticket(self, ticket_id: int) -> Optional[Row]:
+        raise NotImplementedError
+
+    def update_ticket(self, ticket_id: int, changes: Row) -> Optional[Row]:
+        """
+        Apply ``changes`` and return the updated row, or None if there is no such ticket
+        """
+        raise NotImplementedError
+
+    def delete_ticket(self, ticket_id: int) -> bool:
+        raise NotImplementedError
+
+    def iter_ticket_rows(self, page_size: int, columns: Optional[List[str]]) -> Iterator[Row]:
+        """
+        Every ticket in id order, fetched ``page_size`` rows at a time;
+        ``columns`` of None means all columns, otherwise it includes ``id``
+        """
+        raise NotImplementedError
+
+    def ticket_page(self, filters: Row, keyset: Optional[Tuple[str, int]],
+                    columns: List[str], limit: int) -> List[Row]:
+        """
+        Up to ``limit`` rows matching the equality ``filters``, ordered by
+        (created_at, id) descending and starting strictly after ``keyset``
+        """
+        raise NotImplementedError
+
+    def ticket_counts(self, filters: Row, columns: List[str], page_size: int) -> Dict[str, Dict[Any, int]]:
+        """
+        Number of tickets matching the equality ``filters`` per value of each
+        of ``columns``. By default the filtered rows are paged through with
+        ``ticket_page``, selecting only those columns; backends that can
+        group in the database override this.
+        """
+        counts: Dict[str, Dict[Any, int]] = {column: {} for column in columns}
+        selected = list(columns) + [column for column in ("created_at", "id") if column not in columns]
+        keyset = None
+        while True:
+            rows = self.ticket_page(filters, keyset, selected, page_size)
+            for row in rows:
+                for column in columns:
+                    value = row.get(column)
+                    counts[column][value] = counts[column].get(value, 0) + 1
+            if len(rows) < page_size:
+                return counts
+            keyset = (rows[-1]["created_at"], rows[-1]["id"])
+
+    # Users
+    def get_user(self, user_id: str) -> Optional[Row]:
+        raise NotImplementedError
+
+    def insert_user(self, row: Row) -> Row:
+        raise NotImplementedError
+
+    # Knowledge base
+    def knowledge_base_rows(self) -> List[Row]:
+        raise NotImplementedError
+
+    def insert_knowledge_base_entry(self, row: Row) -> Row:
+        """
+        Insert a row (without id) and return it as stored, id included
+        """
+        raise NotImplementedError
+
+    def update_knowledge_base_entry(self, entry_id: int, changes: Row) -> Optional[Row]:
+        """
+        Apply ``changes`` and return the updated row, or None if there is no such entry
+        """
+        raise NotImplementedError
+
+    def delete_knowledge_base_entry(self, entry_id: int) -> bool:
+        raise NotImplementedError
+
+    def search_knowledge_base(self, query: str, top_k: int) -> List[Row]:
+        """
+        Knowledge base rows best matching ``query``, best first
+        """
+        if self._kb_index is None:
+            self.refresh_knowledge_base_index()
+            if self._kb_index is None:
+                return []
+        return [dict(row) for row, _ in self._kb_index.search(query, top_k)]
+
+    def refresh_knowledge_base_index(self):
+        """
+        Rebuild the in-process knowledge base search index from storage
+        """
+        rows = self.knowledge_base_rows()
+        previous = self._kb_index
+        # An empty result is not cached so the next search tries again
+        self._kb_index = SegmentedKnowledgeIndex(rows).start() if rows else None
+        if previous is not None:
+            previous.stop()
+
+    def apply_knowledge_base_change(self, event):
+        """
+        Apply a knowledge base ChangeEvent to the search index as a delta;
+        nothing to do until the index has been built
+        """
+        if self._kb_index is not None:
+            self._kb_index.apply(event)
+
+    def close(self):
+        """
+        Release connections; the default backend holds none
+        """
+
+class AsyncStorageBackend:
+    """
+    Coroutine version of StorageBackend for the ASGI app; same rows, same
+    errors, same default in-process knowledge base search
+    """
+    name = "base"
+
+    def __init__(self):
+        self._kb_index: Optional[SegmentedKnowledgeIndex] = None
+
+    async def list_tickets(self) -> List[Row]:
+        raise NotImplementedError
+
+    async def insert_tickets(self, rows: List[Row]) -> List[Row]:
+        raise NotImplementedError
+
+    async def get_ticket(self, ticket_id: int) -> Optional[Row]:
+        raise NotImplementedError
+
+    async def update_ticket(self, ticket_id: int, changes: Row) -> Optional[Row]:
+        raise NotImplementedError
+
+    async def delete_ticket(self, ticket_id: int) -> bool:
+        raise NotImplementedError
+
+    async def ticket_page(self, filters: Row, keyset: Optional[Tuple[str, int]],
+                          columns: List[str], limit: int) -> List[Row]:
+        raise NotImplementedError
+
+    async def ticket_counts(self, filters: Row, columns: List[str], page_size: int) -> Dict[str, Dict[Any, int]]:
+        counts: Dict[str, Dict[Any, int]] = {column: {} for column in columns}
+        selected = list(columns) + [column for column in ("created_at", "id") if column not in columns]
+        keyset = None
+        while True:
+            rows = await self.ticket_page(filters, keyset, selected, page_size)
+            for row in rows:
+                for column in columns:
+                    value = row.get(column)
+                    counts[column][value] = counts[column].get(value, 0) + 1
+            if len(rows) < page_size:
+                return counts
+            keyset = (rows[-1]["created_at"], rows[-1]["id"])
+
+    async def get_user(self, user_id: str) -> Optional[Row]:
+        raise NotImplementedError
+
+    async def insert_user(self, row: Row) -> Row:
+        raise NotImplementedError
+
+    async def knowledge_base_rows(self) -> List[Row]:
+        raise NotImplementedError
+
+    async def insert_knowledge_base_entry(self, row: Row) -> Row:
+        raise NotImplementedError
+
+    async def update_knowledge_base_entry(self, entry_id: int, changes: Row) -> Optional[Row]:
+        raise NotImplementedError
+
+    async def delete_knowledge_base_entry(self, entry_id: int) -> bool:
+        raise NotImplementedError
+
+    async def search_knowledge_base(self, query: str, top_k: int) -> List[Row]:
+        if self._kb_index is None:
+            await self.refresh_knowledge_base_index()
+            if self._kb_index is None:
+                return []
+        return [dict(row) for row, _ in self._kb_index.search(query, top_k)]
+
+    async def refresh_knowledge_base_index(self):
+        rows = await self.knowledge_base_rows()
+        previous = self._kb_index
+        self._kb_index = SegmentedKnowledgeIndex(rows).start() if rows else None
+        if previous is not None:
+            previous.stop()
+
+    def apply_knowledge_base_change(self, event):
+        if self._kb_index is not None:
+            self._kb_index.apply(event)
+
+    async def close(self):
+        """
+        Release connections; the default backend holds none
+        """
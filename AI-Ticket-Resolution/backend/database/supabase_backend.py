@@ -0,0 +1,101 @@
+from typing import Iterator, List, Optional, Tuple
+
+from .errors import StorageError, StorageUnavailableError, ConstraintViolationError
+from .storage import Row, StorageBackend
+
+# PostgreSQL error classes that mean the row itself was rejected
+_CONSTRAINT_CODES = ("23502", "23503", "23505", "23514")
+
+class SupabaseBackend(StorageBackend):
+    """
+    Storage backend on a Supabase (PostgREST) client
+    """
+    name = "supabase"
+
+    def __init__(self, client):
+        super().__init__()
+        self.client = client
+
+    def _execute(self, query) -> List[Row]:
+        """
+        Run a query builder and return its rows, translating client failures
+        into storage errors
+        """
+        try:
+            response = query.execute()
+        except (ConnectionError, TimeoutError, OSError) as e:
+            raise StorageUnavailableError(f"Supabase request failed: {e}") from e
+        except Exception as e:
+            if str(getattr(e, "code", "")) in _CONSTRAINT_CODES:
+                raise ConstraintViolationError(str(e)) from e
+            raise StorageError(f"Supabase query failed: {e}") from e
+        return response.data or []
+
+    # Tickets
+    def list_tickets(self) -> List[Row]:
+        return self._execute(self.client.from_("tickets").select("*"))
+
+    def insert_tickets(self, rows: List[Row]) -> List[Row]:
+        if not rows:
+            return []
+        return self._execute(self.client.from_("tickets").insert(rows))
+
+    def get_ticket(self, ticket_id: int) -> Optional[Row]:
+        data = self._execute(self.client.from_("tickets").select("*").eq("id", ticket_id))
+        return data[0] if data else None
+
+    def update_ticket(self, ticket_id: int, changes: Row) -> Optional[Row]:
+        data = self._execute(self.client.from_("tickets").update(changes).eq("id", ticket_id))
+        return data[0] if data else None
+
+    def delete_ticket(self, ticket_id: int) -> bool:
+        return bool(self._execute(self.client.from_("tickets").delete().eq("id", ticket_id)))
+
+    def iter_ticket_rows(self, page_size: int, columns: Optional[List[str]]) -> Iterator[Row]:
+        projection = ",".join(columns) if columns else "*"
+        last_id = 0
+        while True:
+            data = self._execute(self.client.from_("tickets").select(projection)
+                                 .gt("id", last_id).order("id").limit(page_size))
+            if not data:
+                return
+            yield from data
+            if len(data) < page_size:
+                return
+            last_id = data[-1]["id"]
+
+    def ticket_page(self, filters: Row, keyset: Optional[Tuple[str, int]],
+                    columns: List[str], limit: int) -> List[Row]:
+        query = self.client.from_("tickets").select(",".join(columns))
+        for column, value in filters.items():
+            query = query.eq(column, value)
+        if keyset:
+            created_at, ticket_id = keyset
+            query = query.or_(
+                f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{ticket_id})'
+            )
+        return self._execute(query.order("created_at", desc=True).order("id", desc=True).limit(limit))
+
+    # Users
+    def get_user(self, user_id: str) -> Optional[Row]:
+        data = self._execute(self.client.from_("users").select("*").eq("id", user_id))
+        return data[0] if data else None
+
+    def insert_user(self, row: Row) -> Row:
+        data = self._execute(self.client.from_("users").insert(row))
+        return data[0] if data else row
+
+    # Knowledge base
+    def knowledge_base_rows(self) -> List[Row]:
+        return self._execute(self.client.from_("knowledge_base").select("*"))
+
+    def insert_knowledge_base_entry(self, row: Row) -> Row:
+        data = self._execute(self.client.from_("knowledge_base").insert(row))
+        return data[0] if data else row
+
+    def update_knowledge_base_entry(self, entry_id: int, changes: Row) -> Optional[Row]:
+        data = self._execute(self.client.from_("knowledge_base").update(changes).eq("id", entry_id))
+        return data[0] if data else None
+
+    def delete_knowledge_base_entry(self, entry_id: int) -> bool:
+        return bool(self._execute(self.client.from_("knowledge_base").delete().eq("id", entry_id)))
@@ -0,0 +1,78 @@
+import functools
+import inspect
+import time
+from typing import Any, Callable, Iterator
+
+from utils.metrics import DB_SECONDS
+
+# Backend methods that are not database calls
+_UNTIMED = {"apply_knowledge_base_change", "close", "name"}
+
+def _table(method: str) -> str:
+    for table in ("knowledge_base", "ticket", "user"):
+        if table in method:
+            return "tickets" if table == "ticket" else "users" if table == "user" else table
+    return "other"
+
+class TimedBackend:
+    """
+    Wraps a StorageBackend or AsyncStorageBackend and records the latency of
+    every call in ``db_call_duration_seconds`` by method, table and outcome
+    (ok/error). Coroutine methods are timed until awaited, generators until
+    consumed. Everything else is passed through untouched.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self.backend, name)
+        if name.startswith("_") or name in _UNTIMED or not callable(attribute):
+            return attribute
+        wrapped = self._wrap(name, attribute)
+        # Cached on the instance: later lookups no longer reach __getattr__
+        setattr(self, name, wrapped)
+        return wrapped
+
+    @staticmethod
+    def _wrap(name: str, method: Callable) -> Callable:
+        table = _table(name)
+        ok = DB_SECONDS.labels(name, table, "ok")
+        # Only created by the first failure, so healthy methods export one series
+        error = functools.partial(DB_SECONDS.labels, name, table, "error")
+
+        if inspect.iscoroutinefunction(method):
+            @functools.wraps(method)
+            async def timed_coroutine(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    result = await method(*args, **kwargs)
+                except Exception:
+                    error().observe(time.perf_counter() - start)
+                    raise
+                ok.observe(time.perf_counter() - start)
+                return result
+            return timed_coroutine
+
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = method(*args, **kwargs)
+            except Exception:
+                error().observe(time.perf_counter() - start)
+                raise
+            if inspect.isgenerator(result):
+                return _timed_generator(result, ok, error, start)
+            ok.observe(time.perf_counter() - start)
+            return result
+        return timed
+
+def _timed_generator(generator: Iterator, ok, error, start: float) -> Iterator:
+    # Generators do their work while being consumed: time until exhausted
+    try:
+        yield from generator
+    except Exception:
+        error().observe(time.perf_counter() - start)
+        raise
+    ok.observe(time.perf_counter() - start)
@@ -0,0 +1,360 @@
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: a single worker process, nothing to serialize against
+    fcntl = None
+
+from .errors import ConstraintViolationError
+from .models import Ticket
+from .serialization import to_dict
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_PATTERN = 'ingest-{:02d}.log'
+# Outcomes of recent provisional ids kept for status lookups
+STATUS_ENTRIES = 10000
+# Seconds between retries of a batch the database did not take, doubled up to the maximum
+RETRY_DELAY = 0.5
+MAX_RETRY_DELAY = 30.0
+# A journal at least this large and mostly done records is rewritten with
+# only its outstanding tickets
+COMPACT_BYTES = 1 << 20
+
+class IngestQueueFull(Exception):
+    """
+    The write-behind queue stayed full for the whole enqueue timeout
+    """
+
+def _lock_journal(path: str):
+    """
+    The journal at ``path`` opened and locked, None if a live process holds it
+    """
+    while True:
+        journal = open(path, 'a+', encoding='utf-8')
+        if fcntl is None:
+            return journal
+        try:
+            fcntl.flock(journal, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            journal.close()
+            return None
+        try:
+            current = os.fstat(journal.fileno()).st_ino == os.stat(path).st_ino
+        except FileNotFoundError:
+            current = False
+        if current:
+            return journal
+        # Its owner compacted it between our open and lock: try the new file
+        journal.close()
+
+def _open_journal(directory: str):
+    # Every worker process appends to its own journal, the first one no other
+    # live process holds; a crashed worker's journal is replayed by the next
+    # process that takes its slot
+    os.makedirs(directory, exist_ok=True)
+    for slot in itertools.count():
+        path = os.path.join(directory, JOURNAL_PATTERN.format(slot))
+        journal = _lock_journal(path)
+        if journal is not None:
+            return path, journal
+
+class WriteBehindQueue:
+    """
+    Write-behind ingestion of new tickets.
+
+    ``submit`` appends the ticket to a local append-only journal, queues it
+    and returns a provisional id at once; a flusher thread takes whatever is
+    queued (up to ``batch_size`` tickets, waiting at most ``linger`` seconds
+    for a batch to fill) and group-commits it with one multi-row insert, then
+    journals the batch as done. When ``max_pending`` tickets are waiting,
+    ``submit`` blocks for up to ``enqueue_timeout`` seconds and then raises
+    IngestQueueFull, so callers can shed load (HTTP 503) instead of queueing
+    without bound.
+
+    On start the journal is replayed: tickets journaled but never marked done
+    (the process died first) are queued again. Delivery is at least once, a
+    crash between the insert and the done record inserts that batch twice.
+    Journal lines are flushed to the OS on every submit, which survives a
+    process crash; ``fsync`` also survives power loss at the cost of a disk
+    sync per ticket. The journal is truncated whenever everything in it has
+    been committed, and rewritten with only the outstanding tickets once it
+    is mostly done records, so it stays bounded under steady load too.
+
+    A batch the database rejects as unavailable is retried with backoff; a
+    batch rejected by a constraint is retried ticket by ticket and only the
+    offending tickets are marked failed. ``status`` reports what became of a
+    recent provisional id in this process.
+    """
+
+    def __init__(self, service, journal_dir: str, max_pending: int = 10000, batch_size: int = 500,
+                 linger: float = 0.01, enqueue_timeout: float = 0.5, fsync: bool = False):
+        self.service = service
+        self.batch_size = batch_size
+        self.linger = linger
+        self.enqueue_timeout = enqueue_timeout
+        self.fsync = fsync
+        self.journal_path, self._journal = _open_journal(journal_dir)
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._slots = threading.Semaphore(max_pending)
+        self._pending: Deque[Tuple[str, Dict[str, Any]]] = deque()
+        # Provisional ids journaled but not yet marked done
+        self._outstanding = 0
+        # Journal line of every outstanding ticket, rewritten by compaction
+        self._lines: Dict[str, str] = {}
+        self._live_bytes = 0
+        # Replayed tickets beyond max_pending, queued without a slot
+        self._unslotted = set()
+        self._statuses: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self.accepted = 0
+        self.committed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.batches = 0
+        self.replayed = 0
+        self.retries = 0
+        self.compactions = 0
+
+    # Journal
+    def _append(self, record: Dict[str, Any]) -> str:
+        line = json.dumps(record) + '\n'
+        self._journal.write(line)
+        self._journal.flush()
+        if self.fsync:
+            os.fsync(self._journal.fileno())
+        return line
+
+    def _track(self, provisional_id: str, line: str):
+        self._lines[provisional_id] = line
+        self._live_bytes += len(line)
+
+    def _compact(self):
+        # Caller holds the lock. The outstanding tickets are written to a new
+        # file that replaces the journal, so a crash at any point leaves one
+        # complete journal behind
+        size = os.fstat(self._journal.fileno()).st_size
+        if size < COMPACT_BYTES or size < 2 * self._live_bytes:
+            return
+        temporary = self.journal_path + '.compact'
+        # Append mode like every journal, so truncating it later is safe
+        journal = open(temporary, 'a+', encoding='utf-8')
+        try:
+            if fcntl is not None:
+                fcntl.flock(journal, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            # Left over from a crash mid-compaction
+            journal.truncate(0)
+            journal.writelines(self._lines.values())
+            journal.flush()
+            if self.fsync:
+                os.fsync(journal.fileno())
+            os.replace(temporary, self.journal_path)
+        except Exception:
+            journal.close()
+            raise
+        self._journal.close()
+        self._journal = journal
+        self.compactions += 1
+
+    def _replay(self):
+        self._journal.seek(0)
+        rows: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        for line in self._journal:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A torn last line from a crash mid-write
+                continue
+            if 'row' in record:
+                rows[record['id']] = record
+            else:
+                for provisional_id in record.get('done', ()):
+                    rows.pop(provisional_id, None)
+        with self._lock:
+            for provisional_id, record in rows.items():
+                # Replayed tickets may overshoot max_pending once; they are
+                # already journaled. Those without a slot release none when done
+                if not self._slots.acquire(blocking=False):
+                    self._unslotted.add(provisional_id)
+                self._pending.append((provisional_id, record['row']))
+                self._track(provisional_id, json.dumps(record) + '\n')
+                self._set_status(provisional_id, {"status": "queued"})
+            self._outstanding = len(rows)
+            if not rows:
+                self._journal.truncate(0)
+            else:
+                self._compact()
+        self.replayed = len(rows)
+        if rows:
+            logger.info("Replaying %d journaled tickets from %s", len(rows), self.journal_path)
+
+    def _set_status(self, provisional_id: str, status: Dict[str, Any]):
+        self._statuses[provisional_id] = status
+        self._statuses.move_to_end(provisional_id)
+        while len(self._statuses) > STATUS_ENTRIES:
+            self._statuses.popitem(last=False)
+
+    # Producer side
+    def submit(self, ticket: Ticket) -> str:
+        """
+        Journal and queue a ticket; returns its provisional id
+        """
+        if not self._slots.acquire(timeout=self.enqueue_timeout):
+            self.rejected += 1
+            raise IngestQueueFull("Ticket queue is full")
+        provisional_id = uuid.uuid4().hex
+        row = to_dict(ticket)
+        del row['id']
+        with self._lock:
+            try:
+                line = self._append({'id': provisional_id, 'row': row})
+            except Exception:
+                self._slots.release()
+                raise
+            self._track(provisional_id, line)
+            self._pending.append((provisional_id, row))
+            self._outstanding += 1
+            self._set_status(provisional_id, {"status": "queued"})
+            self.accepted += 1
+            self._ready.notify()
+        return provisional_id
+
+    def status(self, provisional_id: str) -> Optional[Dict[str, Any]]:
+        """
+        {"status": "queued" | "committed" | "failed", ...} for a recent
+        provisional id, None if this process does not know it
+        """
+        with self._lock:
+            status = self._statuses.get(provisional_id)
+            return dict(status) if status is not None else None
+
+    def __len__(self):
+        with self._lock:
+            return len(self._pending)
+
+    # Flusher
+    def _next_batch(self) -> List[Tuple[str, Dict[str, Any]]]:
+        with self._lock:
+            while not self._pending and not self._stopping:
+                self._ready.wait()
+            # Give concurrent submits a moment to join the batch
+            deadline = time.monotonic() + self.linger
+            while len(self._pending) < self.batch_size and not self._stopping:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._ready.wait(remaining)
+            count = min(len(self._pending), self.batch_size)
+            return [self._pending.popleft() for _ in range(count)]
+
+    def _insert(self, batch: List[Tuple[str, Dict[str, Any]]]) -> List[Tuple[str, Any]]:
+        tickets = [Ticket(**row) for _, row in batch]
+        try:
+            created = self.service.create_tickets(tickets)
+            return [(provisional_id, ticket.id) for (provisional_id, _), ticket in zip(batch, created)]
+        except ConstraintViolationError:
+            if len(batch) == 1:
+                raise
+        # One bad ticket fails only itself
+        outcomes = []
+        for item in batch:
+            try:
+                outcomes.extend(self._insert([item]))
+            except ConstraintViolationError as e:
+                outcomes.append((item[0], e))
+        return outcomes
+
+    def _commit(self, batch: List[Tuple[str, Dict[str, Any]]]):
+        delay = RETRY_DELAY
+        while True:
+            try:
+                outcomes = self._insert(batch)
+                break
+            except ConstraintViolationError as e:
+                outcomes = [(batch[0][0], e)]
+                break
+            except Exception as e:
+                if self._stopping:
+                    # Left in the journal for the next start
+                    logger.warning("Ticket batch not committed at shutdown: %s", e)
+                    return
+                self.retries += 1
+                logger.warning("Ticket batch insert failed, retrying in %.1fs: %s", delay, e)
+                time.sleep(delay)
+                delay = min(delay * 2, MAX_RETRY_DELAY)
+        with self._lock:
+            self._append({'done': [provisional_id for provisional_id, _ in batch]})
+            for provisional_id, outcome in outcomes:
+                if isinstance(outcome, Exception):
+                    self.failed += 1
+                    self._set_status(provisional_id, {"status": "failed", "error": str(outcome)})
+                else:
+                    self.committed += 1
+                    self._set_status(provisional_id, {"status": "committed", "ticket_id": outcome})
+            owned = 0
+            for provisional_id, _ in batch:
+                self._live_bytes -= len(self._lines.pop(provisional_id, ''))
+                if provisional_id in self._unslotted:
+                    self._unslotted.discard(provisional_id)
+                else:
+                    owned += 1
+            self._outstanding -= len(batch)
+            if self._outstanding == 0:
+                self._journal.truncate(0)
+            else:
+                self._compact()
+            self.batches += 1
+        for _ in range(owned):
+            self._slots.release()
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return
+            self._commit(batch)
+
+    def start(self) -> 'WriteBehindQueue':
+        if self._thread is None:
+            self._replay()
+            self._thread = threading.Thread(target=self._run, name="ticket-write-behind", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None):
+        """
+        Commit what is still queued, then stop the flusher
+        """
+        if self._thread is not None:
+            with self._lock:
+                self._stopping = True
+                self._ready.notify()
+            self._thread.join(timeout)
+            self._thread = None
+        self._journal.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "queued": len(self._pending),
+                "outstanding": self._outstanding,
+                "accepted": self.accepted,
+                "committed": self.committed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "batches": self.batches,
+                "replayed": self.replayed,
+                "retries": self.retries,
+                "compactions": self.compactions,
+                "journal": self.journal_path,
+            }
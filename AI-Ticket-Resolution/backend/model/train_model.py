@@ -3,6 +3,13 @@
 
 import pickle
 import os
+import sys
+
+# Add the backend directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config import Config
+from utils.keyword_matcher import KeywordMatcher, save_keyword_model, load_keyword_model
 
 def train_model():
     print("Training AI model for ticket classification...")
@@ -25,6 +32,11 @@ def train_model():
         pickle.dump(model, f)
     
     print(f"Model saved to {model_path}")
+
+    # Memory-mapped copy that app workers open without unpickling
+    artifact_path = Config.path(Config.MODEL_ARTIFACT_PATH)
+    save_keyword_model(artifact_path, model)
+    print(f"Model artifact saved to {artifact_path}")
     
     # Test the model with a sample
     test_text = "I can't access my account"
@@ -34,25 +46,95 @@ def train_model():
     
     return model
 
+def train_vector_index(kb_path=None):
+    """Fit the TF-IDF vectorizer on the knowledge base and persist the normalized KB matrix"""
+    # Imported here so the keyword model can still be trained without numpy/scikit-learn
+    from utils.knowledge_search import read_knowledge_base_csv, entry_text
+    from utils.vector_search import VectorSearchIndex, save_entries
+
+    kb_path = kb_path or Config.path(Config.KNOWLEDGE_BASE_PATH)
+    print(f"Building vector index from {kb_path}...")
+    entries = read_knowledge_base_csv(kb_path)
+    index = VectorSearchIndex.build([entry_text(entry) for entry in entries])
+
+    index.save(Config.path(Config.VECTORIZER_PATH), Config.path(Config.KB_MATRIX_PATH))
+    save_entries(entries, Config.path(Config.KB_ENTRIES_PATH))
+    print(f"Vectorizer saved to {Config.path(Config.VECTORIZER_PATH)}")
+    print(f"KB matrix ({index.matrix.shape[0]} x {index.matrix.shape[1]}) saved to {Config.path(Config.KB_MATRIX_PATH)}")
+
+    # Approximate nearest-neighbour index for large knowledge bases
+    ann = index.build_ann()
+    index.save_ann(Config.path(Config.ANN_INDEX_PATH))
+    print(f"ANN index ({ann.nlist} lists, nprobe={ann.nprobe}) saved to {Config.path(Config.ANN_INDEX_PATH)}")
+
+    # Single memory-mapped artifact (matrix, vocabulary, ANN, packed entry texts) for the workers
+    index.save_artifact(Config.path(Config.KB_ARTIFACT_PATH), entries)
+    print(f"KB artifact saved to {Config.path(Config.KB_ARTIFACT_PATH)}")
+
+    return index
+
+def train_sharded_index(shards, partition=None, from_database=False):
+    """
+    Partition the knowledge base into memory-mapped shards for the
+    multi-process search pool (KB_SEARCH_WORKERS)
+    """
+    from utils.knowledge_search import read_knowledge_base_csv
+    from utils.sharded_search import build_shards
+
+    if from_database:
+        from database.database_service import db_service
+        print("Building sharded KB index from the knowledge_base table...")
+        entries = db_service.get_knowledge_base_batch().to_dicts(("id", "question", "answer", "category"))
+    else:
+        entries = read_knowledge_base_csv(Config.path(Config.KNOWLEDGE_BASE_PATH))
+    directory = Config.path(Config.KB_SHARDS_DIR)
+    manifest = build_shards(entries, directory, shards, partition or Config.KB_SHARD_PARTITION)
+    print(f"{len(entries)} entries in {len(manifest['shards'])} shards "
+          f"({manifest['partition']} partitioning) saved to {directory}")
+    return manifest
+
+def train_linear_model(csv_path=None, epochs=5, batch_size=256, from_database=False):
+    """
+    Train the hashed n-gram logistic regression intent model on historical
+    tickets: a CSV in sample_tickets.csv format, or the tickets table.
+    Mini-batches are streamed, so the data set never has to fit in memory.
+    """
+    from utils.linear_classifier import LinearIntentClassifier, csv_batches, labeled_batches
+    from utils.online_learning import publish_model
+
+    if from_database:
+        from database.database_service import db_service
+        print("Training linear intent model from the tickets table...")
+        batches = lambda: labeled_batches(
+            db_service.iter_ticket_rows(Config.EXPORT_PAGE_SIZE, "subject,description,category"), batch_size)
+    else:
+        csv_path = csv_path or Config.path(Config.TICKETS_CSV_PATH)
+        print(f"Training linear intent model from {csv_path}...")
+        batches = csv_batches(csv_path, batch_size)
+
+    model = LinearIntentClassifier().fit_stream(
+        batches, epochs, on_epoch=lambda epoch, loss: print(f"  epoch {epoch + 1}: log loss {loss:.4f}"))
+    model_path = Config.path(Config.LINEAR_MODEL_PATH)
+    # A fresh version above every published one, so running servers swap it in
+    publish_model(model, Config.path(Config.MODEL_SNAPSHOT_DIR), model_path, Config.MODEL_SNAPSHOTS_KEPT)
+    print(f"Linear model version {model.version} ({len(model.categories)} categories, "
+          f"{model.featurizer.n_features} features) saved to {model_path}")
+    return model
+
 def classify_text(text, model):
     """Simple classification based on keyword matching"""
-    text_lower = text.lower()
-    
-    # Count matches for each category
-    scores = {}
-    for category, keywords in model.items():
-        score = sum(1 for keyword in keywords if keyword in text_lower)
-        scores[category] = score
-    
-    # Return category with highest score, or 'general' if no matches
-    if max(scores.values()) > 0:
-        # Find the key with maximum value
-        return max(scores.items(), key=lambda x: x[1])[0]
-    else:
-        return 'general_inquiry'
+    # Accept either the raw keyword dict or an already compiled matcher
+    if isinstance(model, dict):
+        model = KeywordMatcher(model)
+    return model.classify(text)
 
 def load_model():
     """Load the trained model"""
+    artifact_path = Config.path(Config.MODEL_ARTIFACT_PATH)
+    if os.path.exists(artifact_path):
+        model = load_keyword_model(artifact_path)
+        print("Model loaded successfully")
+        return model
     model_path = '../intent_model.pkl'
     if os.path.exists(model_path):
         with open(model_path, 'rb') as f:
@@ -66,6 +148,15 @@ def load_model():
 if __name__ == "__main__":
     # Train the model
     model = train_model()
+    train_vector_index()
+    # Optional: python train_model.py --linear [tickets.csv | --from-db]
+    if "--linear" in sys.argv:
+        arguments = [argument for argument in sys.argv[1:] if not argument.startswith("--")]
+        train_linear_model(arguments[0] if arguments else None, from_database="--from-db" in sys.argv)
+    # Optional: python train_model.py --shards=N [--partition=hash|category] [--from-db]
+    options = dict(argument[2:].split("=", 1) for argument in sys.argv[1:] if argument.startswith("--") and "=" in argument)
+    if "shards" in options:
+        train_sharded_index(int(options["shards"]), options.get("partition"), from_database="--from-db" in sys.argv)
     
     # Demonstrate usage
     print("\n--- Model Testing ---")
@@ -76,6 +167,7 @@ if __name__ == "__main__":
         "How do I export my data?"
     ]
     
+    matcher = KeywordMatcher(model)
     for query in test_queries:
-        prediction = classify_text(query, model)
+        prediction = classify_text(query, matcher)
         print(f"Query: '{query}' -> Classification: {prediction}")
\ No newline at end of file
@@ -0,0 +1,69 @@
+"""
+Tests for bulk ticket import (database/bulk.py)
+"""
+import sys
+import os
+
+# Add the backend directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+
+from database.bulk import import_tickets
+from database.database_service import DatabaseService
+from database.sqlite_backend import SQLiteBackend
+
+def make_rows(count, bad=()):
+    return [{"subject": f"Ticket {number}", "description": "Printer is broken",
+             "priority": "bogus" if number in bad else "low", "category": "hardware"}
+            for number in range(1, count + 1)]
+
+def classify_all(texts):
+    return ["general_inquiry"] * len(texts)
+
+@pytest.fixture
+def db():
+    service = DatabaseService(SQLiteBackend(":memory:"))
+    yield service
+    service.backend.close()
+
+@pytest.mark.parametrize("batch_size", [1, 2, 3, 500])
+def test_bad_rows_are_rejected_individually(db, batch_size):
+    stats = import_tickets(make_rows(7, bad={4, 7}), db, classify_all, batch_size)
+
+    assert stats["rows"] == 7
+    assert stats["inserted"] == 5
+    assert stats["rejected"] == 2
+    assert [error["row"] for error in stats["errors"]] == [4, 7]
+    assert sorted(ticket.subject for ticket in db.get_all_tickets()) == \
+        sorted(f"Ticket {number}" for number in (1, 2, 3, 5, 6))
+
+def test_single_row_import_of_a_bad_row(db):
+    stats = import_tickets(make_rows(1, bad={1}), db, classify_all, 1)
+
+    assert (stats["inserted"], stats["rejected"]) == (0, 1)
+    assert stats["errors"][0]["row"] == 1
+    assert db.get_all_tickets() == []
+
+def test_rows_without_category_are_classified(db):
+    rows = make_rows(3)
+    rows[1]["category"] = ""
+    import_tickets(rows, db, classify_all, 2)
+
+    categories = {ticket.subject: ticket.category for ticket in db.get_all_tickets()}
+    assert categories == {"Ticket 1": "hardware", "Ticket 2": "general_inquiry", "Ticket 3": "hardware"}
+
+def test_classified_on_subject_and_description(db):
+    texts = []
+
+    def classify(batch):
+        texts.extend(batch)
+        return classify_all(batch)
+
+    import_tickets([{"subject": "Cannot log in", "description": "Password reset fails"}], db, classify)
+    assert texts == ["Cannot log in Password reset fails"]
+
+@pytest.mark.parametrize("batch_size", [0, -1])
+def test_batch_size_must_be_positive(db, batch_size):
+    with pytest.raises(ValueError):
+        import_tickets(make_rows(2), db, classify_all, batch_size)
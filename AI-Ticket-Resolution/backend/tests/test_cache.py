@@ -0,0 +1,153 @@
+"""
+Tests for the read-through cache in front of DatabaseService (database/cache.py)
+"""
+import sys
+import os
+
+# Add the backend directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+
+from database.cache import CachedDatabaseService, MemoryCacheStore, SharedCacheStore
+from database.database_service import DatabaseService
+from database.memory_backend import MemoryBackend
+from database.models import KnowledgeBaseEntry, Ticket
+from database.storage import StorageBackend
+
+class WorkerBackend(StorageBackend):
+    """
+    Another worker's connection to ``storage``: the same knowledge base
+    rows, but a search index of its own, as with the Supabase backend
+    """
+    name = "memory"
+
+    def __init__(self, storage):
+        super().__init__()
+        self.storage = storage
+
+    def knowledge_base_rows(self):
+        return self.storage.knowledge_base_rows()
+
+    def insert_knowledge_base_entry(self, row):
+        return self.storage.insert_knowledge_base_entry(row)
+
+    def update_knowledge_base_entry(self, entry_id, changes):
+        return self.storage.update_knowledge_base_entry(entry_id, changes)
+
+    def delete_knowledge_base_entry(self, entry_id):
+        return self.storage.delete_knowledge_base_entry(entry_id)
+
+class CountingService(DatabaseService):
+    """
+    DatabaseService counting the reads that reach it, i.e. cache misses
+    """
+
+    def __init__(self, backend):
+        super().__init__(backend)
+        self.reads = 0
+
+    def get_ticket_by_id(self, ticket_id):
+        self.reads += 1
+        return super().get_ticket_by_id(ticket_id)
+
+    def get_knowledge_base_entries(self):
+        self.reads += 1
+        return super().get_knowledge_base_entries()
+
+    def search_knowledge_base(self, query, top_k=10):
+        self.reads += 1
+        return super().search_knowledge_base(query, top_k)
+
+def entry(question):
+    return KnowledgeBaseEntry(question=question, answer="See the runbook", category="general")
+
+@pytest.fixture(params=["memory", "shared"])
+def cached(request, tmp_path):
+    store = MemoryCacheStore() if request.param == "memory" else SharedCacheStore(str(tmp_path / "cache.db"))
+    return CachedDatabaseService(CountingService(MemoryBackend()), store)
+
+@pytest.fixture
+def workers(tmp_path):
+    storage = MemoryBackend()
+    storage.insert_knowledge_base_entry({"question": "Printer is out of toner", "answer": "Replace the cartridge",
+                                         "category": "hardware"})
+    path = str(tmp_path / "cache.db")
+    # One store per process, all on the same file
+    return [CachedDatabaseService(DatabaseService(WorkerBackend(storage)), SharedCacheStore(path))
+            for _ in range(2)]
+
+def questions(entries):
+    return [entry.question for entry in entries]
+
+def test_kb_writes_in_one_worker_reach_the_others(workers):
+    writer, reader = workers
+    assert questions(reader.search_knowledge_base("vpn")) == []
+
+    created = writer.create_knowledge_base_entry(entry("VPN connection drops"))
+    assert questions(reader.search_knowledge_base("vpn")) == ["VPN connection drops"]
+    assert reader.foreign_refreshes == 1
+
+    writer.update_knowledge_base_entry(created.id, {"question": "VPN client crashes"})
+    assert questions(reader.search_knowledge_base("vpn")) == ["VPN client crashes"]
+    writer.delete_knowledge_base_entry(created.id)
+    assert questions(reader.search_knowledge_base("vpn")) == []
+    assert writer.foreign_refreshes == 0
+
+def test_a_worker_catches_up_before_its_own_write(workers):
+    first, second = workers
+    first.search_knowledge_base("printer")
+    second.search_knowledge_base("printer")
+
+    second.create_knowledge_base_entry(entry("Laptop battery drains"))
+    first.create_knowledge_base_entry(entry("Laptop screen flickers"))
+    assert sorted(questions(first.search_knowledge_base("laptop"))) == ["Laptop battery drains",
+                                                                        "Laptop screen flickers"]
+
+def test_ticket_reads_are_cached_until_the_ticket_is_written(cached):
+    created = cached.create_ticket(Ticket(subject="Printer broken", priority="low"))
+    assert cached.get_ticket_by_id(created.id).priority == "low"
+    assert cached.get_ticket_by_id(created.id).priority == "low"
+    assert cached.service.reads == 1
+
+    cached.update_ticket(created.id, {"priority": "high"})
+    assert cached.get_ticket_by_id(created.id).priority == "high"
+    assert cached.service.reads == 2
+
+    cached.delete_ticket(created.id)
+    assert cached.get_ticket_by_id(created.id) is None
+
+def test_cached_tickets_are_copies(cached):
+    created = cached.create_ticket(Ticket(subject="Printer broken"))
+    cached.get_ticket_by_id(created.id).subject = "changed by a caller"
+    assert cached.get_ticket_by_id(created.id).subject == "Printer broken"
+
+def test_writes_to_one_ticket_keep_the_others_cached(cached):
+    first, second = cached.create_tickets([Ticket(subject="first"), Ticket(subject="second")])
+    cached.get_ticket_by_id(first.id)
+    cached.get_ticket_by_id(second.id)
+    cached.update_ticket(first.id, {"status": "resolved"})
+
+    reads = cached.service.reads
+    assert cached.get_ticket_by_id(second.id).status == "open"
+    assert cached.service.reads == reads
+    assert cached.get_ticket_by_id(first.id).status == "resolved"
+    assert cached.service.reads == reads + 1
+
+def test_kb_writes_retire_cached_entries_and_searches(cached):
+    created = cached.create_knowledge_base_entry(entry("Printer is out of toner"))
+    assert questions(cached.get_knowledge_base_entries()) == ["Printer is out of toner"]
+    assert questions(cached.search_knowledge_base("toner")) == ["Printer is out of toner"]
+    reads = cached.service.reads
+    cached.get_knowledge_base_entries()
+    cached.search_knowledge_base("toner")
+    assert cached.service.reads == reads
+
+    cached.update_knowledge_base_entry(created.id, {"question": "Printer toner is empty"})
+    assert questions(cached.get_knowledge_base_entries()) == ["Printer toner is empty"]
+    assert questions(cached.search_knowledge_base("toner")) == ["Printer toner is empty"]
+
+    cached.create_knowledge_base_entry(entry("Toner cartridge leaks"))
+    assert len(cached.get_knowledge_base_entries()) == 2
+    cached.delete_knowledge_base_entry(created.id)
+    assert questions(cached.search_knowledge_base("toner")) == ["Toner cartridge leaks"]
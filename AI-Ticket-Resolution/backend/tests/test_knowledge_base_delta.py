@@ -0,0 +1,122 @@
+"""
+Tests for knowledge base writes applied on top of the loaded indexes
+(utils/knowledge_search.py KnowledgeBase.with_change)
+"""
+import sys
+import os
+
+# Add the backend directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+import pytest
+
+from database.database_service import DatabaseService
+from database.events import ChangeEvent
+from database.models import KnowledgeBaseEntry
+from database.sqlite_backend import SQLiteBackend
+from utils.artifact_manager import ArtifactHandle
+from utils.knowledge_search import KnowledgeBase, entry_text, find_similar_questions
+from utils.vector_search import VectorSearchIndex
+
+ENTRIES = [
+    {"id": 1, "question": "How do I reset my password?", "answer": "Use the reset link", "category": "account"},
+    {"id": 2, "question": "Printer is not printing", "answer": "Check the toner", "category": "hardware"},
+    {"id": 3, "question": "VPN connection drops", "answer": "Update the VPN client", "category": "network"},
+    {"id": 4, "question": "Refund for a double charge", "answer": "Open a billing ticket", "category": "billing"},
+]
+
+QUERIES = ["reset password", "printer toner", "vpn connection", "double charge refund", "billing printer"]
+
+def event(action, entry_id, question=None, category="account"):
+    record = None
+    if action != "deleted":
+        record = KnowledgeBaseEntry(id=entry_id, question=question, answer=f"answer {entry_id}", category=category)
+    return ChangeEvent("knowledge_base", action, entry_id, record)
+
+CHANGES = [
+    event("created", 5, "Password expired on the VPN"),
+    event("updated", 2, "Printer toner is empty", "hardware"),
+    event("deleted", 3),
+    event("created", 6, "Refund a printer purchase", "billing"),
+    event("updated", 5, "Password reset email never arrives"),
+]
+
+FINAL = {1: "How do I reset my password?", 2: "Printer toner is empty", 4: "Refund for a double charge",
+         5: "Password reset email never arrives", 6: "Refund a printer purchase"}
+
+@pytest.fixture
+def loaded():
+    vector_index = VectorSearchIndex.build([entry_text(entry) for entry in ENTRIES])
+    return KnowledgeBase(list(ENTRIES), vector_index)
+
+def ids(knowledge_base, hits):
+    return [knowledge_base.entries[doc_id]["id"] for doc_id, _ in hits]
+
+def test_changes_are_served_and_the_loaded_version_is_untouched(loaded):
+    changed = loaded.with_changes(CHANGES)
+
+    assert len(changed) == len(FINAL)
+    live = [changed.position(entry_id) for entry_id in FINAL]
+    assert {changed.entries[position]["question"] for position in live} == set(FINAL.values())
+    assert changed.position(3) is None
+
+    assert len(loaded) == len(ENTRIES)
+    assert loaded.index is loaded._loaded.index
+    assert ids(loaded, loaded.index.search("vpn", 5)) == [3]
+
+def test_vector_scores_match_an_index_of_the_final_entries(loaded):
+    changed = loaded.with_changes(CHANGES)
+    base = loaded.vector_index
+    final = [{"id": entry_id, "question": question, "answer": changed.entries[changed.position(entry_id)]["answer"]}
+             for entry_id, question in FINAL.items()]
+    expected = VectorSearchIndex(base.vectorizer, base.embed([entry_text(entry) for entry in final]))
+
+    for query, hits in zip(QUERIES, changed.vector_index.search_batch(QUERIES, 3)):
+        want = expected.search(query, 3)
+        assert ids(changed, hits) == [final[doc_id]["id"] for doc_id, _ in want]
+        assert [score for _, score in hits] == pytest.approx([score for _, score in want], rel=1e-5)
+
+def test_bm25_and_category_masks_see_only_live_entries(loaded):
+    changed = loaded.with_changes(CHANGES)
+
+    found = set()
+    for query in QUERIES + ["vpn", "password", "printer"]:
+        found.update(ids(changed, changed.index.search(query, 10)))
+    assert found <= set(FINAL)
+    assert 3 not in found and {5, 6} <= found
+
+    masks = changed.category_masks
+    billing = np.flatnonzero(masks["billing"])
+    assert {changed.entries[position]["id"] for position in billing} == {4, 6}
+    hits = changed.vector_index.search_masked("refund", masks["billing"], 5)
+    assert set(ids(changed, hits)) <= {4, 6}
+
+def test_replaying_changes_onto_a_reloaded_version(loaded):
+    changed = loaded.with_changes(CHANGES)
+    reloaded = KnowledgeBase(list(ENTRIES), loaded.vector_index).with_changes(changed.changes)
+    # Replayed twice, e.g. after the retrain that already picked them up
+    twice = reloaded.with_changes(reloaded.changes)
+
+    for knowledge_base in (reloaded, twice):
+        assert len(knowledge_base) == len(FINAL)
+        assert [item["id"] for item in find_similar_questions("printer toner", knowledge_base, 1)] == [2]
+
+def test_service_writes_reach_the_served_handle():
+    db = DatabaseService(SQLiteBackend(":memory:"))
+    handle = ArtifactHandle("knowledge_base", carry=lambda old, new: new.with_changes(old.changes))
+    db.subscribe(lambda change: handle.update(
+        lambda kb: (kb if kb is not None else KnowledgeBase([])).with_change(change)))
+
+    entry = db.create_knowledge_base_entry(KnowledgeBaseEntry(question="Laptop battery drains fast",
+                                                              answer="Lower the brightness", category="hardware"))
+    assert [item["id"] for item in find_similar_questions("battery", handle.value, 1)] == [entry.id]
+    db.update_knowledge_base_entry(entry.id, {"question": "Laptop fan is loud"})
+    assert find_similar_questions("battery", handle.value, 1) == []
+
+    # A reload keeps serving the writes made since startup
+    handle.swap(KnowledgeBase(list(ENTRIES)), handle.version + 1)
+    assert [item["id"] for item in find_similar_questions("laptop fan", handle.value, 1)] == [entry.id]
+    db.delete_knowledge_base_entry(entry.id)
+    assert find_similar_questions("laptop fan", handle.value, 1) == []
+    db.backend.close()
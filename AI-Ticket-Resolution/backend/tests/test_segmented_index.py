@@ -0,0 +1,123 @@
+"""
+Tests for the incrementally maintained knowledge base index
+(utils/segmented_index.py) against a BM25 index built from scratch
+"""
+import sys
+import os
+
+# Add the backend directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import random
+
+import pytest
+
+from database.events import ChangeEvent
+from database.models import KnowledgeBaseEntry
+from utils.bm25_index import BM25Index
+from utils.knowledge_search import entry_text
+from utils.segmented_index import SegmentedKnowledgeIndex
+
+WORDS = ["password", "reset", "printer", "toner", "vpn", "connection", "refund", "charge", "laptop", "battery",
+         "email", "login", "screen", "network", "invoice", "update"]
+
+QUERIES = ["password reset", "printer toner", "vpn connection drops", "refund charge", "laptop battery email",
+           "invoice update", "network login screen"]
+
+def make_row(entry_id, rng):
+    return {"id": entry_id, "question": " ".join(rng.choice(WORDS) for _ in range(4)),
+            "answer": " ".join(rng.choice(WORDS) for _ in range(6)), "category": "general"}
+
+def expected_hits(rows, query, top_k):
+    """
+    Ids and scores of a BM25 index built from scratch over ``rows``
+    """
+    index = BM25Index.build(entry_text(row) for row in rows)
+    return [(rows[doc_id]["id"], score) for doc_id, score in index.search(query, top_k)]
+
+def actual_hits(index, query, top_k):
+    return [(row["id"], score) for row, score in index.search(query, top_k)]
+
+def assert_scores_match(index, rows):
+    for query in QUERIES:
+        # Every hit, so ties at the cut-off cannot pick different rows
+        expected = dict(expected_hits(rows, query, len(rows)))
+        assert dict(actual_hits(index, query, len(rows))) == pytest.approx(expected)
+
+@pytest.fixture
+def workload():
+    """
+    Initial rows plus a mix of inserts, updates and deletes, and the rows left after them
+    """
+    rng = random.Random(7)
+    rows = {entry_id: make_row(entry_id, rng) for entry_id in range(1, 41)}
+    initial = list(rows.values())
+    operations = []
+    for entry_id in range(41, 101):
+        row = make_row(entry_id, rng)
+        rows[entry_id] = row
+        operations.append(("upsert", row))
+        if entry_id % 3 == 0:
+            updated = make_row(rng.choice(list(rows)), rng)
+            rows[updated["id"]] = updated
+            operations.append(("upsert", updated))
+        if entry_id % 4 == 0:
+            victim = rng.choice(list(rows))
+            del rows[victim]
+            operations.append(("delete", victim))
+    return initial, operations, list(rows.values())
+
+def run(index, operations):
+    for operation, argument in operations:
+        if operation == "upsert":
+            index.upsert(argument)
+        else:
+            assert index.delete(argument)
+
+def test_upserts_and_deletes_keep_exactly_the_live_rows(workload):
+    initial, operations, final = workload
+    index = SegmentedKnowledgeIndex(initial, flush_size=8, max_segments=100)
+    run(index, operations)
+
+    assert len(index) == len(final)
+    assert sorted(index.rows(), key=lambda row: row["id"]) == sorted(final, key=lambda row: row["id"])
+    assert index.stats()["deleted"] > 0
+    found = {row["id"] for query in QUERIES for row, _ in index.search(query, 100)}
+    assert found <= {row["id"] for row in final}
+
+def test_compact_scores_like_an_index_built_from_scratch(workload):
+    initial, operations, final = workload
+    index = SegmentedKnowledgeIndex(initial, flush_size=8, max_segments=100)
+    run(index, operations)
+    index.compact()
+
+    assert index.stats()["segments"] == [len(final)]
+    assert index.stats()["deleted"] == 0
+    assert_scores_match(index, final)
+
+def test_merges_keep_the_rows_and_compact_restores_the_scores(workload):
+    initial, operations, final = workload
+    index = SegmentedKnowledgeIndex(initial, flush_size=4, max_segments=3, merge_factor=2)
+    run(index, operations)
+    while index.merge_once():
+        pass
+
+    stats = index.stats()
+    assert len(stats["segments"]) <= 3
+    assert stats["merges"] > 0
+    assert len(index) == len(final)
+    index.compact()
+    assert_scores_match(index, final)
+
+def test_change_events_are_applied():
+    index = SegmentedKnowledgeIndex([{"id": 1, "question": "printer toner", "answer": "replace it"}])
+    index.apply(ChangeEvent("knowledge_base", "created", 2,
+                            KnowledgeBaseEntry(id=2, question="vpn drops", answer="update the client")))
+    index.apply(ChangeEvent("knowledge_base", "updated", 1,
+                            KnowledgeBaseEntry(id=1, question="laptop battery", answer="calibrate it")))
+    index.apply(ChangeEvent("tickets", "deleted", 2))
+
+    assert [row["id"] for row, _ in index.search("vpn", 5)] == [2]
+    assert index.search("printer", 5) == []
+    index.apply(ChangeEvent("knowledge_base", "deleted", 2))
+    assert [row["id"] for row in index.rows()] == [1]
@@ -0,0 +1,73 @@
+"""
+Tests for ticket counts computed by the storage backends (GET /api/tickets/summary)
+"""
+import sys
+import os
+
+# Add the backend directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from collections import Counter
+
+import pytest
+
+from database.database_service import DatabaseService
+from database.memory_backend import MemoryBackend
+from database.models import Ticket, User
+from database.pagination import TICKET_COUNT_COLUMNS
+from database.sqlite_backend import SQLiteBackend
+from database.storage import StorageBackend
+
+PRIORITIES = ["low", "medium", "high", "urgent"]
+STATUSES = ["open", "in_progress", "resolved"]
+CATEGORIES = ["billing", "hardware", "network"]
+
+def make_tickets(count, user_ids):
+    return [Ticket(subject=f"Ticket {number}", priority=PRIORITIES[number % 4], status=STATUSES[number % 3],
+                   category=CATEGORIES[number % 5 % 3], user_id=user_ids[number % 2],
+                   created_at=f"2024-01-01T00:00:{number % 7:02d}")
+            for number in range(count)]
+
+def expected_counts(tickets, filters):
+    matching = [ticket for ticket in tickets
+                if all(getattr(ticket, column) == value for column, value in filters.items())]
+    counts = {column: dict(Counter(getattr(ticket, column) for ticket in matching))
+              for column in TICKET_COUNT_COLUMNS}
+    return {"total": len(matching), **counts}
+
+class PagedMemoryBackend(MemoryBackend):
+    """
+    In-memory backend counting the way Supabase and REST do, through ticket_page
+    """
+    ticket_counts = StorageBackend.ticket_counts
+
+@pytest.fixture(params=["memory", "sqlite", "paged"])
+def db(request):
+    backend = {"memory": MemoryBackend, "sqlite": lambda: SQLiteBackend(":memory:"),
+               "paged": PagedMemoryBackend}[request.param]()
+    service = DatabaseService(backend)
+    users = [service.create_user(User(email=f"user{number}@example.com", name=f"User {number}"))
+             for number in range(2)]
+    tickets = make_tickets(50, [user.id for user in users])
+    service.create_tickets(tickets)
+    yield service, tickets, users
+    backend.close()
+
+@pytest.mark.parametrize("filters", [{}, {"status": "open"}, {"priority": "high", "user_id": 0},
+                                     {"category": "network", "status": "resolved"}, {"status": "closed"}])
+def test_counts_match_the_tickets(db, filters):
+    service, tickets, users = db
+    if "user_id" in filters:
+        filters = dict(filters, user_id=users[filters["user_id"]].id)
+    # A small page size makes the paged count take several pages
+    assert service.get_ticket_counts(filters, page_size=7) == expected_counts(tickets, filters)
+
+def test_counts_follow_updates_and_deletes(db):
+    service, tickets, _ = db
+    stored = service.get_all_tickets()
+    service.update_ticket(stored[0].id, {"status": "closed"})
+    service.delete_ticket(stored[1].id)
+
+    counts = service.get_ticket_counts({"status": "closed"})
+    assert counts["total"] == 1
+    assert service.get_ticket_counts()["total"] == len(tickets) - 1
@@ -0,0 +1,132 @@
+"""
+Tests for the journaled write-behind ticket queue (database/write_behind.py)
+"""
+import sys
+import os
+
+# Add the backend directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import dataclasses
+import json
+import threading
+import time
+
+import pytest
+
+from database import write_behind
+from database.database_service import DatabaseService
+from database.models import Ticket
+from database.sqlite_backend import SQLiteBackend
+from database.write_behind import WriteBehindQueue, IngestQueueFull, JOURNAL_PATTERN
+
+class GatedService:
+    """
+    Accepts every batch, but only while ``gate`` is set
+    """
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.gate.set()
+        self.subjects = []
+        self._lock = threading.Lock()
+
+    def create_tickets(self, tickets):
+        self.gate.wait()
+        with self._lock:
+            created = []
+            for ticket in tickets:
+                self.subjects.append(ticket.subject)
+                created.append(dataclasses.replace(ticket, id=len(self.subjects)))
+            return created
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+def write_journal(directory, count, done=()):
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, JOURNAL_PATTERN.format(0)), 'w', encoding='utf-8') as f:
+        for number in range(count):
+            row = {"subject": f"replayed {number}", "description": "", "priority": "low", "status": "open",
+                   "category": "general", "created_at": None, "updated_at": None, "user_id": None}
+            f.write(json.dumps({'id': f"id-{number}", 'row': row}) + '\n')
+        f.write(json.dumps({'done': [f"id-{number}" for number in done]}) + '\n')
+
+def journal_lines(queue):
+    with open(queue.journal_path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+def test_replay_commits_only_unfinished_tickets(tmp_path):
+    write_journal(str(tmp_path), 5, done=[0, 1])
+    service = GatedService()
+    queue = WriteBehindQueue(service, str(tmp_path)).start()
+    wait_for(lambda: queue.stats()["committed"] == 3)
+    queue.stop()
+
+    assert sorted(service.subjects) == ["replayed 2", "replayed 3", "replayed 4"]
+    assert queue.stats()["replayed"] == 3
+    assert queue.status("id-4")["status"] == "committed"
+    assert os.path.getsize(queue.journal_path) == 0
+
+def test_replay_beyond_max_pending_keeps_the_bound(tmp_path):
+    write_journal(str(tmp_path), 10)
+    service = GatedService()
+    queue = WriteBehindQueue(service, str(tmp_path), max_pending=3, batch_size=1, enqueue_timeout=0.05).start()
+    wait_for(lambda: queue.stats()["committed"] == 10)
+
+    # The flusher holds the first new ticket in flight, so 3 submits fill the queue
+    service.gate.clear()
+    for number in range(3):
+        queue.submit(Ticket(subject=f"new {number}"))
+    with pytest.raises(IngestQueueFull):
+        queue.submit(Ticket(subject="one too many"))
+    service.gate.set()
+    queue.stop()
+    assert queue.stats()["rejected"] == 1
+
+def test_constraint_violation_fails_only_the_bad_ticket(tmp_path):
+    service = DatabaseService(SQLiteBackend(":memory:"))
+    queue = WriteBehindQueue(service, str(tmp_path), batch_size=10, linger=0.2).start()
+    ids = [queue.submit(Ticket(subject=f"ticket {number}", priority="bogus" if number == 2 else "low"))
+           for number in range(5)]
+    queue.stop()
+
+    statuses = [queue.status(provisional_id)["status"] for provisional_id in ids]
+    assert statuses == ["committed", "committed", "failed", "committed", "committed"]
+    assert sorted(ticket.subject for ticket in service.get_all_tickets()) == \
+        ["ticket 0", "ticket 1", "ticket 3", "ticket 4"]
+    assert queue.stats()["failed"] == 1
+
+def test_submit_times_out_when_full(tmp_path):
+    service = GatedService()
+    service.gate.clear()
+    queue = WriteBehindQueue(service, str(tmp_path), max_pending=2, batch_size=1, enqueue_timeout=0.05).start()
+    queue.submit(Ticket(subject="first"))
+    queue.submit(Ticket(subject="second"))
+    with pytest.raises(IngestQueueFull):
+        queue.submit(Ticket(subject="third"))
+    service.gate.set()
+    queue.stop()
+    assert service.subjects == ["first", "second"]
+
+def test_journal_is_compacted_to_outstanding_tickets(tmp_path, monkeypatch):
+    monkeypatch.setattr(write_behind, "COMPACT_BYTES", 1)
+    write_journal(str(tmp_path), 100, done=range(90))
+    service = GatedService()
+    service.gate.clear()
+    queue = WriteBehindQueue(service, str(tmp_path)).start()
+
+    # Compacted on replay: the done records and their tickets are gone
+    records = journal_lines(queue)
+    assert [record['id'] for record in records] == [f"id-{number}" for number in range(90, 100)]
+    assert queue.stats()["compactions"] == 1
+
+    # Still the journal: new tickets are appended to it
+    queue.submit(Ticket(subject="new"))
+    assert journal_lines(queue)[-1]['row']['subject'] == "new"
+    service.gate.set()
+    queue.stop()
+    assert len(service.subjects) == 11
@@ -0,0 +1,221 @@
+import math
+from typing import Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+ANN_FORMAT_VERSION = 1
+# Inserted vectors are folded into the contiguous lists once this many are pending
+MERGE_THRESHOLD = 4096
+# Rows per chunk when assigning vectors to centroids
+ASSIGN_CHUNK = 8192
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+def random_projection(n_features: int, n_components: int, seed: int = 0) -> sparse.csr_matrix:
+    """
+    Very sparse random projection (Li et al.) from ``n_features`` sparse
+    dimensions down to ``n_components`` dense ones; cosine similarities are
+    approximately preserved, which is all the coarse ANN stage needs
+    """
+    rng = np.random.default_rng(seed)
+    density = 1.0 / math.sqrt(max(n_features, 1))
+    nnz_per_row = rng.binomial(n_components, density, size=n_features)
+    rows = np.repeat(np.arange(n_features), nnz_per_row)
+    cols = rng.integers(0, n_components, size=rows.shape[0])
+    values = rng.choice(np.array([-1.0, 1.0], dtype=np.float32), size=rows.shape[0])
+    values /= math.sqrt(density * n_components)
+    return sparse.csr_matrix((values, (rows, cols)), shape=(n_features, n_components), dtype=np.float32)
+
+def assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """
+    Nearest centroid (max inner product) for every row
+    """
+    labels = np.empty(vectors.shape[0], dtype=np.int64)
+    for start in range(0, vectors.shape[0], ASSIGN_CHUNK):
+        block = vectors[start:start + ASSIGN_CHUNK]
+        labels[start:start + ASSIGN_CHUNK] = np.argmax(block @ centroids.T, axis=1)
+    return labels
+
+def spherical_kmeans(vectors: np.ndarray, clusters: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """
+    Lloyd iterations on the unit sphere; returns normalized centroids
+    """
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(vectors.shape[0], clusters, replace=False)].copy()
+    for _ in range(iterations):
+        labels = assign(vectors, centroids)
+        order = np.argsort(labels, kind='stable')
+        counts = np.bincount(labels, minlength=clusters)
+        sums = np.zeros_like(centroids)
+        present = np.nonzero(counts)[0]
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[present]
+        sums[present] = np.add.reduceat(vectors[order], starts, axis=0)
+        empty = np.nonzero(counts == 0)[0]
+        if len(empty):
+            # Re-seed empty clusters on random points so every list stays useful
+            sums[empty] = vectors[rng.choice(vectors.shape[0], len(empty), replace=False)]
+        centroids = normalize_rows(sums)
+    return centroids
+
+class IVFIndex:
+    """
+    Inverted-file ANN index over L2-normalised dense vectors (cosine / inner product).
+
+    Vectors are partitioned by a spherical k-means coarse quantizer and stored
+    contiguously per list. A query only scans the ``nprobe`` lists whose
+    centroids are closest, so ``nprobe`` trades recall for latency: 1 is the
+    fastest, ``nlist`` is an exact scan. New vectors can be added at any time;
+    they are searched from a small pending area until the next merge.
+    """
+
+    def __init__(self, centroids: np.ndarray, nprobe: int = 8):
+        self.centroids = normalize_rows(centroids)
+        self.nprobe = nprobe
+        self.dim = self.centroids.shape[1]
+        self._vectors = np.empty((0, self.dim), dtype=np.float32)
+        self._ids = np.empty(0, dtype=np.int64)
+        self._offsets = np.zeros(self.nlist + 1, dtype=np.int64)
+        self._pending_vectors = []
+        self._pending_ids = []
+        self._pending_labels = []
+        self._pending_count = 0
+        self.extra = {}
+
+    @property
+    def nlist(self) -> int:
+        return self.centroids.shape[0]
+
+    def __len__(self):
+        return self._ids.shape[0] + self._pending_count
+
+    @classmethod
+    def train(cls, vectors: np.ndarray, nlist: Optional[int] = None, nprobe: int = 8,
+              iterations: int = 10, seed: int = 0, max_training_points: int = 256) -> 'IVFIndex':
+        """
+        Fit the coarse quantizer on (a sample of) ``vectors`` and add them all
+        """
+        vectors = normalize_rows(vectors)
+        count = vectors.shape[0]
+        if count == 0:
+            raise ValueError("Cannot train an IVF index without vectors")
+        if nlist is None:
+            nlist = int(4 * math.sqrt(count))
+        nlist = max(1, min(nlist, count))
+        sample = vectors
+        if count > nlist * max_training_points:
+            rng = np.random.default_rng(seed)
+            sample = vectors[rng.choice(count, nlist * max_training_points, replace=False)]
+        index = cls(spherical_kmeans(sample, nlist, iterations, seed), nprobe)
+        index.add(vectors)
+        index.merge()
+        return index
+
+    def add(self, vectors: np.ndarray, ids: Optional[np.ndarray] = None):
+        """
+        Insert vectors; ids default to consecutive numbers after the current size
+        """
+        vectors = normalize_rows(np.atleast_2d(vectors))
+        if ids is None:
+            ids = np.arange(len(self), len(self) + vectors.shape[0], dtype=np.int64)
+        self._pending_vectors.append(vectors)
+        self._pending_ids.append(np.asarray(ids, dtype=np.int64))
+        self._pending_labels.append(assign(vectors, self.centroids))
+        self._pending_count += vectors.shape[0]
+        if self._pending_count >= MERGE_THRESHOLD:
+            self.merge()
+
+    def merge(self):
+        """
+        Fold pending inserts into the contiguous per-list storage
+        """
+        if not self._pending_count:
+            return
+        current_labels = np.repeat(np.arange(self.nlist), np.diff(self._offsets))
+        labels = np.concatenate([current_labels] + self._pending_labels)
+        vectors = np.concatenate([self._vectors] + self._pending_vectors)
+        ids = np.concatenate([self._ids] + self._pending_ids)
+        order = np.argsort(labels, kind='stable')
+        self._vectors = np.ascontiguousarray(vectors[order])
+        self._ids = ids[order]
+        self._offsets = np.concatenate(([0], np.cumsum(np.bincount(labels, minlength=self.nlist))))
+        self._pending_vectors, self._pending_ids, self._pending_labels = [], [], []
+        self._pending_count = 0
+
+    def search(self, queries: np.ndarray, top_k: int = 5,
+               nprobe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Approximate top-k for each query: ``(ids, scores)`` arrays of shape
+        ``queries x top_k``, best first; missing slots have id -1
+        """
+        queries = normalize_rows(np.atleast_2d(queries))
+        nprobe = max(1, min(nprobe or self.nprobe, self.nlist))
+        result_ids = np.full((queries.shape[0], top_k), -1, dtype=np.int64)
+        result_scores = np.full((queries.shape[0], top_k), -np.inf, dtype=np.float32)
+        if top_k <= 0 or len(self) == 0:
+            return result_ids, result_scores
+
+        coarse = queries @ self.centroids.T
+        if nprobe < self.nlist:
+            probes = np.argpartition(-coarse, nprobe - 1, axis=1)[:, :nprobe]
+        else:
+            probes = np.broadcast_to(np.arange(self.nlist), coarse.shape)
+        pending_vectors = np.concatenate(self._pending_vectors) if self._pending_count else None
+        if pending_vectors is not None:
+            pending_ids = np.concatenate(self._pending_ids)
+            pending_labels = np.concatenate(self._pending_labels)
+
+        offsets = self._offsets
+        for row, query in enumerate(queries):
+            lists = probes[row]
+            spans = [(offsets[label], offsets[label + 1]) for label in lists]
+            candidate_ids = [self._ids[start:stop] for start, stop in spans]
+            candidate_scores = [self._vectors[start:stop] @ query for start, stop in spans]
+            if pending_vectors is not None:
+                mask = np.isin(pending_labels, lists)
+                candidate_ids.append(pending_ids[mask])
+                candidate_scores.append(pending_vectors[mask] @ query)
+            ids = np.concatenate(candidate_ids)
+            scores = np.concatenate(candidate_scores)
+            if ids.shape[0] > top_k:
+                best = np.argpartition(-scores, top_k - 1)[:top_k]
+                ids, scores = ids[best], scores[best]
+            order = np.argsort(-scores, kind='stable')
+            result_ids[row, :ids.shape[0]] = ids[order]
+            result_scores[row, :ids.shape[0]] = scores[order]
+        return result_ids, result_scores
+
+    def save(self, path: str, **extra_arrays):
+        """
+        Persist centroids, per-list vectors/ids and offsets to an ``.npz`` file;
+        ``extra_arrays`` are stored alongside and come back in ``load(...).extra``
+        """
+        self.merge()
+        np.savez(
+            path,
+            **extra_arrays,
+            version=np.array(ANN_FORMAT_VERSION),
+            nprobe=np.array(self.nprobe),
+            centroids=self.centroids,
+            vectors=self._vectors,
+            ids=self._ids,
+            offsets=self._offsets,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> 'IVFIndex':
+        with np.load(path) as data:
+            if int(data['version']) != ANN_FORMAT_VERSION:
+                raise ValueError(f"Unsupported ANN index version {int(data['version'])}")
+            index = cls(data['centroids'], int(data['nprobe']))
+            index._vectors = data['vectors']
+            index._ids = data['ids']
+            index._offsets = data['offsets']
+            index.extra = {key: data[key] for key in data.files if key not in _INDEX_ARRAYS}
+        return index
+
+_INDEX_ARRAYS = ('version', 'nprobe', 'centroids', 'vectors', 'ids', 'offsets')
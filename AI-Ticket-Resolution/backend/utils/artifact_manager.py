@@ -0,0 +1,201 @@
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+Fingerprint = Tuple[Optional[Tuple[int, int]], ...]
+
+class ArtifactHandle:
+    """
+    A loaded artifact (model, knowledge base) as served right now. ``swap``
+    replaces it with a single reference assignment: a request that read
+    ``value`` keeps using that object until it finishes, later requests see
+    the new one, and readers take no lock. ``update`` derives the next
+    value from the current one (e.g. a knowledge base with a new entry) and
+    is serialized with ``swap``, so a reload cannot lose an update or be
+    overwritten by one made from the version it replaced. ``carry(old,
+    new)``, if given, moves such updates from the serving value onto a newly
+    loaded one.
+    """
+
+    def __init__(self, name: str, value: Any = None, version: int = 0,
+                 carry: Optional[Callable[[Any, Any], Any]] = None):
+        self.name = name
+        self.carry = carry
+        self._state: Tuple[Any, int] = (value, version)
+        self.generation = 0
+        self.loaded_at: Optional[float] = time.time() if value is not None else None
+        self._swap_listeners: List[Callable[[Any], None]] = []
+        self._lock = threading.RLock()
+
+    @property
+    def value(self) -> Any:
+        return self._state[0]
+
+    @property
+    def version(self) -> int:
+        return self._state[1]
+
+    def on_swap(self, listener: Callable[[Any], None]):
+        self._swap_listeners.append(listener)
+
+    def swap(self, value: Any, version: int):
+        with self._lock:
+            if self.carry is not None and self.value is not None and value is not None:
+                value = self.carry(self.value, value)
+            self._set(value, version)
+
+    def update(self, change: Callable[[Any], Any]):
+        """
+        Swap in ``change(value)``, keeping the version: the files it was loaded from are unchanged
+        """
+        with self._lock:
+            self._set(change(self.value), self.version)
+
+    def _set(self, value: Any, version: int):
+        self._state = (value, version)
+        self.generation += 1
+        self.loaded_at = time.time()
+        for listener in self._swap_listeners:
+            listener(value)
+
+def fingerprint(paths: Sequence[str]) -> Fingerprint:
+    """
+    (mtime_ns, size) of every path, None for missing files
+    """
+    stats = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            stats.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            stats.append(None)
+    return tuple(stats)
+
+class WatchedArtifact:
+    def __init__(self, handle: ArtifactHandle, paths: Sequence[str], loader: Callable[[], Any],
+                 validator: Optional[Callable[[Any], None]] = None):
+        self.handle = handle
+        self.paths = list(paths)
+        self.loader = loader
+        self.validator = validator
+        self.loaded_fingerprint: Optional[Fingerprint] = None
+        self.pending_fingerprint: Optional[Fingerprint] = None
+        self.load_seconds: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+class ArtifactManager:
+    """
+    Reloads artifacts when their files change, without a restart.
+
+    Every ``poll_interval`` seconds a daemon thread compares the mtime and
+    size of each registered artifact's files with those it last loaded. A
+    change has to be seen on two consecutive polls (so a multi-file rewrite
+    such as vectorizer + matrix + entries has settled) before the loader
+    runs, on the watcher thread. The new object is swapped into the handle
+    only if the validator accepts it; otherwise the old version keeps
+    serving and the error is reported by ``status``.
+    """
+
+    def __init__(self, poll_interval: float = 2.0):
+        self.poll_interval = poll_interval
+        self.artifacts: Dict[str, WatchedArtifact] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def register(self, handle: ArtifactHandle, paths: Sequence[str], loader: Callable[[], Any],
+                 validator: Optional[Callable[[Any], None]] = None) -> ArtifactHandle:
+        """
+        Watch ``paths`` for ``handle``; loads the artifact now if the handle is empty
+        """
+        artifact = WatchedArtifact(handle, paths, loader, validator)
+        self.artifacts[handle.name] = artifact
+        if handle.value is None:
+            self.reload(artifact)
+        else:
+            artifact.loaded_fingerprint = fingerprint(artifact.paths)
+        return handle
+
+    def reload(self, artifact: WatchedArtifact) -> bool:
+        """
+        Load, validate and swap in one artifact; False (old version kept) on failure
+        """
+        current = fingerprint(artifact.paths)
+        start = time.perf_counter()
+        try:
+            value = artifact.loader()
+            if artifact.validator is not None and value is not None:
+                artifact.validator(value)
+        except Exception as e:
+            artifact.last_error = f"{type(e).__name__}: {e}"
+            # Do not retry the same broken files on every poll
+            artifact.loaded_fingerprint = current
+            logger.error("Reloading %s failed, keeping the loaded version: %s", artifact.handle.name, artifact.last_error)
+            return False
+        artifact.loaded_fingerprint = current
+        artifact.load_seconds = time.perf_counter() - start
+        artifact.last_error = None
+        handle = artifact.handle
+        version = getattr(value, "version", None)
+        if version is not None and version == handle.version and type(value) is type(handle.value):
+            # Already serving this version (e.g. swapped in by the online trainer that wrote it)
+            return True
+        handle.swap(value, version if version is not None else handle.version + 1)
+        logger.info("Loaded %s version %s in %.1f ms", handle.name, handle.version, artifact.load_seconds * 1e3)
+        return True
+
+    def check(self):
+        """
+        One poll: reload every artifact whose files changed and have settled
+        """
+        for artifact in self.artifacts.values():
+            current = fingerprint(artifact.paths)
+            if current == artifact.loaded_fingerprint:
+                artifact.pending_fingerprint = None
+            elif current == artifact.pending_fingerprint:
+                artifact.pending_fingerprint = None
+                self.reload(artifact)
+            else:
+                artifact.pending_fingerprint = current
+
+    def _run(self):
+        while not self._stopped.wait(self.poll_interval):
+            try:
+                self.check()
+            except Exception:
+                logger.exception("Artifact watcher error")
+
+    def start(self) -> 'ArtifactManager':
+        if self._thread is None and self.poll_interval > 0:
+            self._thread = threading.Thread(target=self._run, name="artifact-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def status(self) -> List[Dict[str, Any]]:
+        report = []
+        for name, artifact in self.artifacts.items():
+            handle = artifact.handle
+            files = {}
+            for path, stat in zip(artifact.paths, artifact.loaded_fingerprint or [None] * len(artifact.paths)):
+                files[path] = datetime.fromtimestamp(stat[0] / 1e9).isoformat() if stat else None
+            report.append({
+                "name": name,
+                "type": type(handle.value).__name__ if handle.value is not None else None,
+                "version": handle.version,
+                "generation": handle.generation,
+                "loaded_at": datetime.fromtimestamp(handle.loaded_at).isoformat() if handle.loaded_at else None,
+                "load_ms": round(artifact.load_seconds * 1e3, 1) if artifact.load_seconds is not None else None,
+                "files": files,
+                "last_error": artifact.last_error,
+            })
+        return report
@@ -0,0 +1,173 @@
+import json
+import mmap
+import os
+import struct
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+ARTIFACT_MAGIC = b'TKTART\x00\x00'
+ARTIFACT_VERSION = 1
+# Every section starts on a 64-byte boundary so arrays map cleanly onto pages/cache lines
+ALIGNMENT = 64
+_PREAMBLE = struct.Struct('<8sII')
+
+class ArtifactError(Exception):
+    """
+    Raised when an artifact file is missing, truncated or of an unknown version
+    """
+
+def _align(position: int) -> int:
+    return (position + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+def pack_strings(strings: Iterable[str]):
+    """
+    Pack strings into a UTF-8 blob plus an ``n + 1`` offsets table
+    """
+    encoded = [string.encode('utf-8') for string in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.uint64)
+    np.cumsum(np.array([len(item) for item in encoded], dtype=np.uint64), out=offsets[1:])
+    blob = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+    return offsets, blob
+
+def write_artifact(path: str, arrays: Optional[Dict[str, np.ndarray]] = None,
+                   strings: Optional[Dict[str, Sequence[str]]] = None,
+                   meta: Optional[Dict] = None):
+    """
+    Write named arrays and string tables to a single versioned binary file.
+
+    Layout: magic, format version, header length, a JSON header describing
+    every section (offset, dtype, shape), then the aligned raw sections.
+    The file is written next to ``path`` and renamed into place so readers
+    never observe a half-written artifact.
+    """
+    sections: Dict[str, np.ndarray] = {}
+    for name, array in (arrays or {}).items():
+        sections[name] = np.ascontiguousarray(array)
+    for name, values in (strings or {}).items():
+        offsets, blob = pack_strings(values)
+        sections[f"{name}.offsets"] = offsets
+        sections[f"{name}.blob"] = blob
+
+    # The header size depends on the offsets it contains, so lay out twice
+    header_length = 0
+    for _ in range(2):
+        position = _align(_PREAMBLE.size + header_length)
+        layout = {}
+        for name, array in sections.items():
+            layout[name] = {
+                'offset': position,
+                'dtype': array.dtype.str,
+                'shape': list(array.shape),
+            }
+            position = _align(position + array.nbytes)
+        header = json.dumps({
+            'sections': layout,
+            'strings': sorted((strings or {}).keys()),
+            'meta': meta or {},
+        }).encode('utf-8')
+        if len(header) <= header_length:
+            break
+        header_length = len(header) + 256
+    header = header.ljust(header_length, b' ')
+
+    temporary_path = f"{path}.tmp{os.getpid()}"
+    with open(temporary_path, 'wb') as f:
+        f.write(_PREAMBLE.pack(ARTIFACT_MAGIC, ARTIFACT_VERSION, header_length))
+        f.write(header)
+        for name, array in sections.items():
+            f.seek(layout[name]['offset'])
+            f.write(array.tobytes())
+        f.truncate(position)
+    os.replace(temporary_path, path)
+
+class PackedStrings(Sequence):
+    """
+    Read-only sequence of strings backed by an offsets table and a UTF-8 blob;
+    items are decoded on access only
+    """
+
+    def __init__(self, offsets: np.ndarray, blob: np.ndarray):
+        self._offsets = offsets
+        self._blob = blob
+
+    def __len__(self):
+        return self._offsets.shape[0] - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        start, stop = int(self._offsets[index]), int(self._offsets[index + 1])
+        return self._blob[start:stop].tobytes().decode('utf-8')
+
+    def raw(self, index: int) -> bytes:
+        """
+        Undecoded UTF-8 bytes of an item, for bisecting sorted tables
+        """
+        start, stop = int(self._offsets[index]), int(self._offsets[index + 1])
+        return self._blob[start:stop].tobytes()
+
+    def find(self, value: str) -> int:
+        """
+        Position of ``value`` in a table written in sorted order, or -1
+        """
+        target = value.encode('utf-8')
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if self.raw(middle) < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(self) and self.raw(low) == target:
+            return low
+        return -1
+
+class Artifact:
+    """
+    Memory-mapped reader for files produced by ``write_artifact``.
+
+    Arrays are zero-copy views on a shared read-only mapping, so every worker
+    process that opens the same file shares its pages through the OS page
+    cache and opening costs only the header parse.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        try:
+            with open(path, 'rb') as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise ArtifactError(f"Cannot open artifact {path}: {e}")
+        if len(self._mmap) < _PREAMBLE.size:
+            raise ArtifactError(f"Artifact {path} is truncated")
+        magic, version, header_length = _PREAMBLE.unpack_from(self._mmap, 0)
+        if magic != ARTIFACT_MAGIC:
+            raise ArtifactError(f"{path} is not an artifact file")
+        if version != ARTIFACT_VERSION:
+            raise ArtifactError(f"Unsupported artifact version {version} in {path}")
+        header = json.loads(self._mmap[_PREAMBLE.size:_PREAMBLE.size + header_length])
+        self.sections: Dict = header['sections']
+        self.meta: Dict = header['meta']
+        self._string_tables: List[str] = header['strings']
+        for name, section in self.sections.items():
+            end = section['offset'] + np.dtype(section['dtype']).itemsize * int(np.prod(section['shape']))
+            if end > len(self._mmap):
+                raise ArtifactError(f"Artifact {path} is truncated in section {name}")
+
+    def __contains__(self, name: str):
+        return name in self.sections or name in self._string_tables
+
+    def array(self, name: str) -> np.ndarray:
+        section = self.sections[name]
+        dtype = np.dtype(section['dtype'])
+        count = int(np.prod(section['shape']))
+        array = np.frombuffer(self._mmap, dtype=dtype, count=count, offset=section['offset'])
+        return array.reshape(section['shape'])
+
+    def strings(self, name: str) -> PackedStrings:
+        return PackedStrings(self.array(f"{name}.offsets"), self.array(f"{name}.blob"))
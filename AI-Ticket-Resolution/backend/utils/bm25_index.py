@@ -0,0 +1,163 @@
+import math
+import heapq
+from array import array
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .preprocess import preprocess_pipeline
+
+class BM25Index:
+    """
+    In-process BM25 inverted index with MaxScore top-k retrieval.
+
+    Each term keeps two compact parallel arrays: the ascending document ids
+    that contain it and the term frequency in each. Per-document length
+    normalisation is precomputed, and so is the maximum contribution every
+    term can make to a score. At query time those upper bounds let whole
+    postings lists be skipped once the top-k threshold can no longer be beaten,
+    so common low-idf terms (``how``, ``my``, ...) are only probed for documents
+    that are already competitive.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75,
+                 tokenizer: Callable[[str], List[str]] = preprocess_pipeline):
+        self.k1 = k1
+        self.b = b
+        self.tokenizer = tokenizer
+        self._doc_ids: Dict[str, array] = {}
+        self._freqs: Dict[str, array] = {}
+        self._lengths = array('I')
+        self._norms = array('f')
+        self._idf: Dict[str, float] = {}
+        self._upper_bounds: Dict[str, float] = {}
+
+    def __len__(self):
+        return len(self._lengths)
+
+    @classmethod
+    def build(cls, texts: Iterable[str], **kwargs) -> 'BM25Index':
+        """
+        Build an index over ``texts``; document ids are the positions in the iterable
+        """
+        index = cls(**kwargs)
+        for text in texts:
+            index._add(text)
+        index._finalize()
+        return index
+
+    def _add(self, text: str):
+        doc_id = len(self._lengths)
+        counts: Dict[str, int] = {}
+        tokens = self.tokenizer(text)
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        for term, count in counts.items():
+            if term not in self._doc_ids:
+                self._doc_ids[term] = array('I')
+                self._freqs[term] = array('H')
+            self._doc_ids[term].append(doc_id)
+            self._freqs[term].append(min(count, 0xFFFF))
+        self._lengths.append(len(tokens))
+
+    def _finalize(self):
+        total = len(self._lengths)
+        average = (sum(self._lengths) / total) if total else 0.0
+        k1, b = self.k1, self.b
+        self._norms = array('f', (
+            k1 * (1 - b + b * (length / average if average else 0.0)) for length in self._lengths
+        ))
+        norms = self._norms
+        for term, doc_ids in self._doc_ids.items():
+            df = len(doc_ids)
+            idf = math.log(1 + (total - df + 0.5) / (df + 0.5))
+            self._idf[term] = idf
+            freqs = self._freqs[term]
+            self._upper_bounds[term] = max(
+                idf * tf * (k1 + 1) / (tf + norms[doc_id]) for doc_id, tf in zip(doc_ids, freqs)
+            )
+
+    def search(self, query: str, top_k: int = 5, allowed: Optional[Sequence[bool]] = None) -> List[Tuple[int, float]]:
+        """
+        Return up to ``top_k`` ``(doc_id, score)`` pairs, best first. With
+        ``allowed`` (a per-document boolean mask) only documents whose flag is
+        set are scored.
+        """
+        if top_k <= 0:
+            return []
+        query_counts: Dict[str, int] = {}
+        for token in self.tokenizer(query):
+            if token in self._doc_ids:
+                query_counts[token] = query_counts.get(token, 0) + 1
+        if not query_counts:
+            return []
+
+        # Terms ordered by their maximum possible contribution, smallest first
+        terms = sorted(query_counts, key=lambda term: query_counts[term] * self._upper_bounds[term])
+        weights = [query_counts[term] * self._idf[term] for term in terms]
+        bounds = [query_counts[term] * self._upper_bounds[term] for term in terms]
+        doc_lists = [self._doc_ids[term] for term in terms]
+        freq_lists = [self._freqs[term] for term in terms]
+        # prefix[i] = best score achievable from terms[0..i]
+        prefix = []
+        running = 0.0
+        for bound in bounds:
+            running += bound
+            prefix.append(running)
+
+        norms = self._norms
+        k1_plus_one = self.k1 + 1
+        cursors = [0] * len(terms)
+        lengths = [len(doc_ids) for doc_ids in doc_lists]
+        heap: List[Tuple[float, int]] = []
+        threshold = 0.0
+        # Terms below ``essential`` cannot lift a document into the top-k on their own
+        essential = 0
+
+        while True:
+            candidate = None
+            for i in range(essential, len(terms)):
+                position = cursors[i]
+                if position < lengths[i]:
+                    doc_id = doc_lists[i][position]
+                    if candidate is None or doc_id < candidate:
+                        candidate = doc_id
+            if candidate is None:
+                break
+            if allowed is not None and not allowed[candidate]:
+                for i in range(essential, len(terms)):
+                    position = cursors[i]
+                    if position < lengths[i] and doc_lists[i][position] == candidate:
+                        cursors[i] = position + 1
+                continue
+
+            norm = norms[candidate]
+            score = 0.0
+            for i in range(essential, len(terms)):
+                position = cursors[i]
+                if position < lengths[i] and doc_lists[i][position] == candidate:
+                    tf = freq_lists[i][position]
+                    score += weights[i] * tf * k1_plus_one / (tf + norm)
+                    cursors[i] = position + 1
+
+            for i in range(essential - 1, -1, -1):
+                if score + prefix[i] <= threshold:
+                    break
+                position = bisect_left(doc_lists[i], candidate, cursors[i])
+                cursors[i] = position
+                if position < lengths[i] and doc_lists[i][position] == candidate:
+                    tf = freq_lists[i][position]
+                    score += weights[i] * tf * k1_plus_one / (tf + norm)
+
+            if len(heap) < top_k:
+                heapq.heappush(heap, (score, -candidate))
+            elif score > threshold:
+                heapq.heapreplace(heap, (score, -candidate))
+            else:
+                continue
+            if len(heap) == top_k:
+                threshold = heap[0][0]
+                while essential < len(terms) and prefix[essential] <= threshold:
+                    essential += 1
+
+        results = sorted(heap, key=lambda item: (-item[0], -item[1]))
+        return [(-negative_id, score) for score, negative_id in results]
@@ -0,0 +1,192 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Rank offset of reciprocal rank fusion (Cormack et al. use 60)
+RRF_K = 60
+# Candidates fetched from each retriever per requested result before fusion
+CANDIDATE_FACTOR = 4
+
+Hits = List[Tuple[int, float]]
+
+# Threads for parallel candidate generation; only the vector stage's sparse
+# products release the GIL, the BM25 loop and query vectorization do not
+_executor: Optional[ThreadPoolExecutor] = None
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="kb-search")
+    return _executor
+
+@dataclass
+class HybridResult:
+    """
+    Scored top-k entries (best first) of a hybrid search and the time spent
+    in every stage, in milliseconds
+    """
+    items: List[dict]
+    category: Optional[str] = None
+    category_mode: Optional[str] = None
+    candidates: int = 0
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return {
+            "results": self.items,
+            "category": self.category,
+            "category_mode": self.category_mode,
+            "candidates": self.candidates,
+            "timings_ms": {stage: round(ms, 3) for stage, ms in self.timings.items()},
+        }
+
+def reciprocal_rank_fusion(rankings: Dict[str, Hits], k: int = RRF_K) -> Dict[int, float]:
+    """
+    Sum over rankings of 1 / (k + rank); only ranks matter, not the score scales
+    """
+    fused: Dict[int, float] = {}
+    for hits in rankings.values():
+        for rank, (doc_id, _) in enumerate(hits, 1):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return fused
+
+def weighted_fusion(rankings: Dict[str, Hits], weights: Dict[str, float]) -> Dict[int, float]:
+    """
+    Weighted sum of each ranking's scores min-max normalized to [0, 1]; a
+    document missing from a ranking gets 0 from it
+    """
+    fused: Dict[int, float] = {}
+    for name, hits in rankings.items():
+        if not hits:
+            continue
+        scores = [score for _, score in hits]
+        low, high = min(scores), max(scores)
+        span = high - low
+        weight = weights.get(name, 1.0)
+        for doc_id, score in hits:
+            normalized = (score - low) / span if span > 0 else 1.0
+            fused[doc_id] = fused.get(doc_id, 0.0) + weight * normalized
+    return fused
+
+class HybridRetriever:
+    """
+    Knowledge base search fusing BM25 (lexical) and TF-IDF cosine (vector)
+    candidates.
+
+    Both retrievers fetch ``top_k * CANDIDATE_FACTOR`` candidates and the
+    lists are fused with reciprocal rank fusion (``fusion='rrf'``) or a
+    weighted sum of normalized scores (``fusion='weighted'``,
+    ``vector_weight`` in [0, 1]). With ``parallel`` the two retrievers run on
+    separate threads; that only pays off when the vector stage's matrix
+    product dominates, since BM25 holds the GIL.
+
+    The query's predicted category narrows the search: ``category_mode =
+    'filter'`` only scores that category's entries (falling back to the whole
+    knowledge base if none match), ``'boost'`` searches everything and
+    multiplies the fused score of same-category entries by
+    ``1 + category_boost``. Unknown categories (e.g. general_inquiry, which
+    has no entries) leave the search unrestricted.
+    """
+
+    def __init__(self, fusion: str = 'rrf', vector_weight: float = 0.5, category_mode: Optional[str] = 'boost',
+                 category_boost: float = 0.5, parallel: bool = False):
+        if fusion not in ('rrf', 'weighted'):
+            raise ValueError(f"Unknown fusion method: {fusion}")
+        if category_mode not in (None, 'filter', 'boost'):
+            raise ValueError(f"Unknown category mode: {category_mode}")
+        self.fusion = fusion
+        self.vector_weight = vector_weight
+        self.category_mode = category_mode
+        self.category_boost = category_boost
+        self.parallel = parallel
+
+    def _bm25(self, query: str, knowledge_base, count: int, allowed: Optional[np.ndarray]) -> Tuple[Hits, float]:
+        start = time.perf_counter()
+        hits = knowledge_base.index.search(query, count, allowed)
+        return hits, (time.perf_counter() - start) * 1e3
+
+    def _vector(self, query: str, knowledge_base, count: int, allowed: Optional[np.ndarray]) -> Tuple[Hits, float]:
+        start = time.perf_counter()
+        if allowed is not None:
+            hits = knowledge_base.vector_index.search_masked(query, allowed, count)
+        else:
+            hits = knowledge_base.vector_index.search(query, count)
+        return hits, (time.perf_counter() - start) * 1e3
+
+    def _retrieve(self, query: str, knowledge_base, count: int, allowed: Optional[np.ndarray],
+                  timings: Dict[str, float]) -> Dict[str, Hits]:
+        rankings: Dict[str, Hits] = {}
+        if knowledge_base.vector_index is None:
+            rankings['bm25'], timings['bm25'] = self._bm25(query, knowledge_base, count, allowed)
+            return rankings
+        if self.parallel:
+            executor = _get_executor()
+            bm25 = executor.submit(self._bm25, query, knowledge_base, count, allowed)
+            vector = executor.submit(self._vector, query, knowledge_base, count, allowed)
+            rankings['bm25'], timings['bm25'] = bm25.result()
+            rankings['vector'], timings['vector'] = vector.result()
+        else:
+            rankings['bm25'], timings['bm25'] = self._bm25(query, knowledge_base, count, allowed)
+            rankings['vector'], timings['vector'] = self._vector(query, knowledge_base, count, allowed)
+        return rankings
+
+    def search(self, query: str, knowledge_base, top_k: int = 5, category: Optional[str] = None,
+               classify: Optional[Callable[[str], str]] = None) -> HybridResult:
+        """
+        Scored top-k entries for ``query``. The category is ``category`` if
+        given, otherwise ``classify(query)`` when a classifier is passed
+        """
+        started = time.perf_counter()
+        timings: Dict[str, float] = {}
+        if category is None and classify is not None:
+            start = time.perf_counter()
+            category = classify(query)
+            timings['classify'] = (time.perf_counter() - start) * 1e3
+        if not knowledge_base or top_k <= 0:
+            timings['total'] = (time.perf_counter() - started) * 1e3
+            return HybridResult([], category, None, 0, timings)
+
+        start = time.perf_counter()
+        mask = knowledge_base.category_masks.get(category) if self.category_mode and category else None
+        mode = self.category_mode if mask is not None else None
+        timings['prefilter'] = (time.perf_counter() - start) * 1e3
+
+        count = top_k * CANDIDATE_FACTOR
+        start = time.perf_counter()
+        rankings = self._retrieve(query, knowledge_base, count, mask if mode == 'filter' else None, timings)
+        timings['retrieve'] = (time.perf_counter() - start) * 1e3
+        if mode == 'filter' and not any(rankings.values()):
+            # Nothing in the predicted category matches: search the whole knowledge base
+            mode = None
+            start = time.perf_counter()
+            rankings = self._retrieve(query, knowledge_base, count, None, timings)
+            timings['retrieve'] += (time.perf_counter() - start) * 1e3
+
+        start = time.perf_counter()
+        if self.fusion == 'rrf':
+            fused = reciprocal_rank_fusion(rankings)
+        else:
+            fused = weighted_fusion(rankings, {'vector': self.vector_weight, 'bm25': 1.0 - self.vector_weight})
+        if mode == 'boost':
+            factor = 1.0 + self.category_boost
+            for doc_id in fused:
+                if mask[doc_id]:
+                    fused[doc_id] *= factor
+        best = sorted(fused.items(), key=lambda item: (-item[1], item[0]))[:top_k]
+        stage_scores = {name: dict(hits) for name, hits in rankings.items()}
+        stage_ranks = {name: {doc_id: rank for rank, (doc_id, _) in enumerate(hits, 1)}
+                       for name, hits in rankings.items()}
+        items = []
+        for doc_id, score in best:
+            item = dict(knowledge_base.entries[doc_id])
+            item['score'] = score
+            for name in rankings:
+                item[f'{name}_score'] = stage_scores[name].get(doc_id)
+                item[f'{name}_rank'] = stage_ranks[name].get(doc_id)
+            items.append(item)
+        timings['fusion'] = (time.perf_counter() - start) * 1e3
+        timings['total'] = (time.perf_counter() - started) * 1e3
+        return HybridResult(items, category, mode, len(fused), timings)
@@ -0,0 +1,149 @@
+import re
+from typing import Dict, List, Iterable
+
+# Below this many distinct keywords a plain ``in`` check per keyword is cheaper
+# than a regex scan, so small models skip the compiled pattern
+SUBSTRING_SCAN_LIMIT = 64
+
+class KeywordMatcher:
+    """
+    Compiled multi-pattern matcher for the keyword intent model.
+
+    The model is a dict of ``category -> [keywords]``. Classification keeps the
+    original semantics: a category scores one point for every keyword in its
+    list that occurs anywhere in the lowercased text (plain substring match),
+    the highest score wins and ties go to the category listed first.
+
+    Instead of running ``keyword in text`` once per keyword, all keywords are
+    compiled into a single trie-shaped regex that is scanned over the text
+    once. The regex sits inside a lookahead so overlapping keywords are found,
+    and since it always reports the longest keyword starting at a position,
+    every keyword that is a prefix of it is credited as well.
+    """
+
+    def __init__(self, model: Dict[str, List[str]], default: str = 'general_inquiry'):
+        self.model = model
+        self.default = default
+        self.categories = list(model.keys())
+
+        # keyword -> list of category indexes (one entry per occurrence in a list)
+        self._keyword_categories: Dict[str, List[int]] = {}
+        for index, keywords in enumerate(model.values()):
+            for keyword in keywords:
+                self._keyword_categories.setdefault(keyword, []).append(index)
+
+        # Keywords credited when a given keyword is the longest match at a position
+        keywords = [keyword for keyword in self._keyword_categories if keyword]
+        keyword_set = set(keywords)
+        self._implied: Dict[str, List[str]] = {
+            keyword: [keyword[:end] for end in range(1, len(keyword) + 1) if keyword[:end] in keyword_set]
+            for keyword in keywords
+        }
+        # The empty string is a substring of every text
+        self._always = [''] if '' in self._keyword_categories else []
+
+        self._keywords = keywords
+        self._pattern = None
+        if len(keywords) > SUBSTRING_SCAN_LIMIT:
+            self._pattern = re.compile('(?=(%s))' % _trie_regex(keywords))
+
+    def find_keywords(self, text: str) -> set:
+        """
+        Return the set of keywords occurring in ``text`` (already lowercased)
+        """
+        found = set(self._always)
+        if self._pattern is None:
+            found.update(keyword for keyword in self._keywords if keyword in text)
+            return found
+        longest = set(match.group(1) for match in self._pattern.finditer(text))
+        for keyword in longest:
+            found.update(self._implied[keyword])
+        return found
+
+    def score(self, text: str) -> List[int]:
+        """
+        Score every category in a single pass, in model order
+        """
+        scores = [0] * len(self.categories)
+        for keyword in self.find_keywords(text.lower()):
+            for index in self._keyword_categories[keyword]:
+                scores[index] += 1
+        return scores
+
+    def classify(self, text: str) -> str:
+        """
+        Return the best scoring category, or the default if nothing matched
+        """
+        scores = self.score(text)
+        best_score = max(scores)
+        if best_score > 0:
+            # list.index returns the first maximum, matching max() over dict items
+            return self.categories[scores.index(best_score)]
+        return self.default
+
+    def classify_batch(self, texts: Iterable[str]) -> List[str]:
+        """
+        Classify several texts with the same compiled pattern
+        """
+        return [self.classify(text) for text in texts]
+
+def _trie_regex(keywords: List[str]) -> str:
+    """
+    Build a regex alternation shaped like a trie so that the engine only
+    explores branches sharing the prefix seen so far, longest keyword first
+    """
+    trie: Dict = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = True
+    return _node_regex(trie)
+
+def _node_regex(node: Dict) -> str:
+    branches = []
+    for char in sorted(key for key in node if key):
+        branches.append(re.escape(char) + _node_regex(node[char]))
+    if '' in node:
+        # Terminal node: prefer the longer continuations, then stop here
+        if not branches:
+            return ''
+        return '(?:%s)?' % '|'.join(branches)
+    if len(branches) == 1:
+        return branches[0]
+    return '(?:%s)' % '|'.join(branches)
+
+def save_keyword_model(path: str, model: Dict[str, List[str]]):
+    """
+    Write the keyword model as a memory-mappable artifact instead of a pickle
+    """
+    import numpy as np
+    from .artifact_store import write_artifact
+
+    keywords = [keyword for category_keywords in model.values() for keyword in category_keywords]
+    offsets = [0]
+    for category_keywords in model.values():
+        offsets.append(offsets[-1] + len(category_keywords))
+    write_artifact(
+        path,
+        arrays={'keyword_offsets': np.array(offsets, dtype=np.int64)},
+        strings={'categories': list(model.keys()), 'keywords': keywords},
+        meta={'kind': 'keyword_model'},
+    )
+
+def load_keyword_model(path: str) -> Dict[str, List[str]]:
+    """
+    Read a keyword model written by ``save_keyword_model``
+    """
+    from .artifact_store import Artifact
+
+    artifact = Artifact(path)
+    if artifact.meta.get('kind') != 'keyword_model':
+        raise ValueError(f"{path} is not a keyword model artifact")
+    categories = artifact.strings('categories')
+    keywords = artifact.strings('keywords')
+    offsets = artifact.array('keyword_offsets')
+    return {
+        categories[index]: keywords[int(offsets[index]):int(offsets[index + 1])]
+        for index in range(len(categories))
+    }
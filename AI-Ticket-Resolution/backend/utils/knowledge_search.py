@@ -1,37 +1,426 @@
-# Simplified version without external dependencies to avoid import errors
-# In a real implementation, you would use pandas, numpy, and sklearn
+import csv
+import logging
+import os
+from collections.abc import Sequence
+
+from .bm25_index import BM25Index
+
+logger = logging.getLogger(__name__)
+
+class KnowledgeBase:
+    """
+    Knowledge base entries together with the BM25 index built over them and,
+    when trained artifacts are available, the TF-IDF vector index.
+
+    Entries created, updated or deleted after loading go into a small delta
+    instead of the loaded indexes: ``with_change`` returns a new knowledge
+    base sharing everything loaded, plus the changed rows appended (with a
+    BM25 index and TF-IDF rows of their own) and the replaced or deleted
+    positions tombstoned. Nothing is ever modified in place, so searches
+    running on the previous version are unaffected, and positions (doc ids)
+    stay valid across versions. Appended rows are scored by BM25 with their
+    own statistics, like the segments of a SegmentedKnowledgeIndex, and with
+    the loaded vectorizer, so terms unseen at training time only count after
+    the next retrain. ``changes`` keeps the applied events, so they can be
+    replayed onto a freshly loaded knowledge base with ``with_changes``.
+    """
+    def __init__(self, entries, vector_index=None):
+        self._loaded = _Loaded(entries, vector_index)
+        self.added = ()
+        self.deleted = frozenset()
+        self.changes = ()
+        self._views = {}
+
+    @property
+    def entries(self):
+        if not self.added:
+            return self._loaded.entries
+        return self._view('entries', lambda: ChainedEntries(self._loaded.entries, self.added))
+
+    @property
+    def vector_index(self):
+        loaded = self._loaded.vector_index
+        if loaded is None or not (self.added or self.deleted):
+            return loaded
+        return self._view('vector_index', lambda: DeltaVectorIndex(
+            loaded, loaded.embed([entry_text(entry) for entry in self.added]), self._alive()))
+
+    @property
+    def index(self):
+        """
+        BM25 index, built on first use so memory-mapped knowledge bases that
+        only need vector search open without touching every entry
+        """
+        if not (self.added or self.deleted):
+            return self._loaded.index
+        return self._view('index', lambda: DeltaBM25Index(
+            self._loaded.index, BM25Index.build(entry_text(entry) for entry in self.added), self._alive()))
+
+    def __len__(self):
+        return len(self._loaded.entries) + len(self.added) - len(self.deleted)
+
+    @property
+    def category_masks(self):
+        """
+        Boolean entry mask of every category, built on first use
+        """
+        if not self.added:
+            return self._loaded.category_masks
+        return self._view('category_masks', self._build_category_masks)
+
+    def _build_category_masks(self):
+        import numpy as np
+        loaded = self._loaded.category_masks
+        labels = [entry.get('category') or '' for entry in self.added]
+        size = len(self._loaded.entries)
+        masks = {}
+        for name in set(loaded) | set(labels):
+            added = np.fromiter((label == name for label in labels), dtype=bool, count=len(labels))
+            masks[name] = np.concatenate((loaded.get(name, np.zeros(size, dtype=bool)), added))
+        return masks
+
+    def _view(self, name, build):
+        # Built once per version; a race only builds the same view twice
+        view = self._views.get(name)
+        if view is None:
+            view = self._views[name] = build()
+        return view
+
+    def _alive(self):
+        import numpy as np
+        alive = np.ones(len(self._loaded.entries) + len(self.added), dtype=bool)
+        alive[list(self.deleted)] = False
+        return alive
+
+    def position(self, entry_id):
+        """
+        Position of the live entry with ``entry_id``, None if there is none
+        """
+        if entry_id is None:
+            return None
+        size = len(self._loaded.entries)
+        for offset in range(len(self.added) - 1, -1, -1):
+            if self.added[offset].get('id') == entry_id and size + offset not in self.deleted:
+                return size + offset
+        position = self._loaded.positions.get(entry_id)
+        return position if position not in self.deleted else None
+
+    def with_change(self, event):
+        """
+        This knowledge base with a ``knowledge_base`` ChangeEvent applied
+        """
+        if event.table != "knowledge_base":
+            return self
+        changed = KnowledgeBase.__new__(KnowledgeBase)
+        changed._loaded = self._loaded
+        changed._views = {}
+        changed.changes = self.changes + (event,)
+        position = self.position(event.key)
+        changed.deleted = self.deleted | {position} if position is not None else self.deleted
+        changed.added = self.added
+        if event.action != "deleted" and event.record is not None:
+            record = event.record
+            row = dict(record) if isinstance(record, dict) else {
+                "id": record.id, "question": record.question, "answer": record.answer, "category": record.category
+            }
+            changed.added = self.added + (row,)
+        return changed
+
+    def with_changes(self, events):
+        """
+        This knowledge base with ``events`` applied in order. An entry that is
+        already loaded is replaced, so replaying a change is harmless.
+        """
+        knowledge_base = self
+        for event in events:
+            knowledge_base = knowledge_base.with_change(event)
+        return knowledge_base
+
+class _Loaded:
+    """
+    Entries and indexes as loaded, shared by every version of a knowledge
+    base; the BM25 index, category masks and id lookup are built on first use
+    """
+    def __init__(self, entries, vector_index):
+        self.entries = entries
+        self.vector_index = vector_index
+        self._index = None
+        self._categories = None
+        self._positions = None
+
+    @property
+    def index(self):
+        if self._index is None:
+            # Questions and answers are indexed together so a query can match either
+            self._index = BM25Index.build(entry_text(entry) for entry in self.entries)
+        return self._index
+
+    @property
+    def category_masks(self):
+        if self._categories is None:
+            import numpy as np
+            labels = [entry.get('category') or '' for entry in self.entries]
+            names = sorted(set(labels))
+            codes = np.fromiter(map({name: code for code, name in enumerate(names)}.get, labels),
+                                dtype=np.int32, count=len(labels))
+            self._categories = {name: codes == code for code, name in enumerate(names)}
+        return self._categories
+
+    @property
+    def positions(self):
+        if self._positions is None:
+            self._positions = {entry.get('id'): position for position, entry in enumerate(self.entries)
+                               if entry.get('id') is not None}
+        return self._positions
+
+def _merge_hits(loaded_hits, added_hits, offset, alive, top_k):
+    hits = [(doc_id, score) for doc_id, score in loaded_hits if alive[doc_id]]
+    hits.extend((offset + doc_id, score) for doc_id, score in added_hits)
+    hits.sort(key=lambda hit: (-hit[1], hit[0]))
+    return hits[:top_k]
+
+class DeltaBM25Index:
+    """
+    The loaded BM25 index plus one over the rows appended since, searched
+    together with the tombstoned positions left out
+    """
+    def __init__(self, loaded, added, alive):
+        self.loaded = loaded
+        self.added = added
+        self.alive = alive
+        self.offset = len(loaded)
+
+    def __len__(self):
+        return len(self.alive)
+
+    def search(self, query, top_k=5, allowed=None):
+        mask = self.alive if allowed is None else self.alive & allowed
+        offset = self.offset
+        loaded = self.loaded.search(query, top_k, mask[:offset])
+        added = self.added.search(query, top_k, mask[offset:])
+        return _merge_hits(loaded, added, offset, self.alive, top_k)
+
+class DeltaVectorIndex:
+    """
+    The loaded TF-IDF index plus the rows appended since (embedded with the
+    loaded vectorizer), searched together with the tombstoned positions left
+    out
+    """
+    def __init__(self, loaded, added, alive):
+        self.loaded = loaded
+        self.added = added
+        self.alive = alive
+        self.offset = len(loaded)
+        self._added_t = added.T.tocsr()
+        # Tombstoned loaded rows the loaded index may still return
+        self._dead = int(self.offset - alive[:self.offset].sum())
+
+    def __len__(self):
+        return len(self.alive)
+
+    def embed(self, queries):
+        return self.loaded.embed(queries)
+
+    def _added_hits(self, vectors, top_k, allowed=None):
+        from .vector_search import top_k_rows
+        if not self.added.shape[0]:
+            return [[] for _ in range(vectors.shape[0])]
+        scores = (vectors @ self._added_t).toarray()
+        mask = self.alive[self.offset:] if allowed is None else self.alive[self.offset:] & allowed
+        scores[:, ~mask] = 0
+        ids, best = top_k_rows(scores, min(top_k, scores.shape[1]))
+        return [[(int(doc_id), float(score)) for doc_id, score in zip(row_ids, row_scores) if score > 0]
+                for row_ids, row_scores in zip(ids, best)]
+
+    def search(self, query, top_k=5):
+        return self.search_batch([query], top_k)[0]
+
+    def search_batch(self, queries, top_k=5):
+        if not len(queries):
+            return []
+        if top_k <= 0:
+            return [[] for _ in queries]
+        loaded = self.loaded.search_batch(queries, top_k + self._dead)
+        added = self._added_hits(self.embed(queries), top_k)
+        return [_merge_hits(loaded_hits, added_hits, self.offset, self.alive, top_k)
+                for loaded_hits, added_hits in zip(loaded, added)]
+
+    def search_masked(self, query, allowed, top_k=5):
+        if top_k <= 0:
+            return []
+        offset = self.offset
+        loaded = self.loaded.search_masked(query, allowed[:offset] & self.alive[:offset], top_k)
+        added = self._added_hits(self.embed([query]), top_k, allowed[offset:])[0]
+        return _merge_hits(loaded, added, offset, self.alive, top_k)
+
+class ChainedEntries(Sequence):
+    """
+    Loaded entries followed by the rows appended since
+    """
+    def __init__(self, loaded, added):
+        self._loaded = loaded
+        self._added = added
+
+    def __len__(self):
+        return len(self._loaded) + len(self._added)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if index >= len(self._loaded):
+            return self._added[index - len(self._loaded)]
+        return self._loaded[index]
+
+class PackedEntries(Sequence):
+    """
+    Knowledge base rows read lazily from the packed string tables of a
+    memory-mapped artifact
+    """
+    def __init__(self, artifact):
+        self._ids = artifact.array('entry_ids')
+        self._questions = artifact.strings('questions')
+        self._answers = artifact.strings('answers')
+        self._categories = artifact.strings('categories')
+
+    def __len__(self):
+        return len(self._questions)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        entry_id = int(self._ids[index])
+        return {
+            "id": entry_id if entry_id >= 0 else None,
+            "question": self._questions[index],
+            "answer": self._answers[index],
+            "category": self._categories[index]
+        }
+
+def entry_text(entry):
+    """
+    Text of a knowledge base entry (dict row) that gets indexed
+    """
+    return f"{entry.get('question', '')} {entry.get('answer', '')}"
+
+def read_knowledge_base_csv(filepath):
+    """
+    Read knowledge base rows (question, answer, category) from a CSV file
+    """
+    with open(filepath, newline='', encoding='utf-8') as f:
+        return [dict(row) for row in csv.DictReader(f)]
 
 def load_knowledge_base(filepath):
     """
     Load knowledge base from CSV file
     """
-    # Placeholder - in reality, you would load from the CSV file
-    # For now, we'll return a simple data structure
-    print(f"Loading knowledge base from {filepath}")
-    # This would normally use pandas to read CSV
-    # df = pd.read_csv(filepath)
-    # return df
-    return {}
+    logger.info("Loading knowledge base from %s", filepath)
+    return KnowledgeBase(read_knowledge_base_csv(filepath))
 
-def find_similar_questions(query, knowledge_base, top_k=5):
+def load_vector_knowledge_base(vectorizer_path=None, matrix_path=None, entries_path=None, ann_path=None,
+                               artifact_path=None):
     """
-    Find similar questions in knowledge base
+    Load the vectorizer, normalized KB matrix, entries and (if present) the
+    ANN index written by train_model.py. When the memory-mapped artifact
+    exists it is used instead of the pickle/npz files.
+    """
+    from config import Config
+    from .vector_search import VectorSearchIndex, load_entries
+
+    artifact_path = artifact_path or Config.path(Config.KB_ARTIFACT_PATH)
+    if os.path.exists(artifact_path):
+        return open_knowledge_base_artifact(artifact_path)
+
+    vectorizer_path = vectorizer_path or Config.path(Config.VECTORIZER_PATH)
+    matrix_path = matrix_path or Config.path(Config.KB_MATRIX_PATH)
+    entries_path = entries_path or Config.path(Config.KB_ENTRIES_PATH)
+    ann_path = ann_path or Config.path(Config.ANN_INDEX_PATH)
+    logger.info("Loading vector index from %s", matrix_path)
+    vector_index = VectorSearchIndex.load(vectorizer_path, matrix_path)
+    if os.path.exists(ann_path):
+        vector_index.load_ann(ann_path)
+    entries = load_entries(entries_path)
+    if len(entries) != len(vector_index):
+        raise ValueError(f"KB matrix has {len(vector_index)} rows but {len(entries)} entries")
+    return KnowledgeBase(entries, vector_index)
+
+def open_knowledge_base_artifact(path):
+    """
+    Open a knowledge base artifact; arrays and strings stay memory-mapped and
+    are shared between worker processes through the page cache
+    """
+    from .artifact_store import Artifact
+    from .vector_search import VectorSearchIndex
+
+    logger.info("Opening knowledge base artifact %s", path)
+    artifact = Artifact(path)
+    if artifact.meta.get('kind') != 'knowledge_base':
+        raise ValueError(f"{path} is not a knowledge base artifact")
+    return KnowledgeBase(PackedEntries(artifact), VectorSearchIndex.from_artifact(artifact))
+
+def build_knowledge_base(entries):
+    """
+    Build a knowledge base from KnowledgeBaseEntry objects, e.g. the result of
+    db_service.get_knowledge_base_entries()
     """
-    # Placeholder for similarity search logic
-    # This would use vector embeddings and cosine similarity to find similar questions
-    print(f"Searching for similar questions to: {query}")
+    return KnowledgeBase([
+        {
+            "id": entry.id,
+            "question": entry.question,
+            "answer": entry.answer,
+            "category": entry.category
+        }
+        for entry in entries
+    ])
+
+def _to_items(knowledge_base, hits):
     similar_items = []
+    for doc_id, score in hits:
+        item = dict(knowledge_base.entries[doc_id])
+        item['score'] = score
+        similar_items.append(item)
     return similar_items
 
-def get_best_answer(query, knowledge_base):
+def find_similar_questions(query, knowledge_base, top_k=5):
     """
-    Retrieve the best answer for a given query
+    Find similar questions in knowledge base
     """
+    if not knowledge_base:
+        return []
+    if knowledge_base.vector_index is not None:
+        hits = knowledge_base.vector_index.search(query, top_k)
+    else:
+        hits = knowledge_base.index.search(query, top_k)
+    return _to_items(knowledge_base, hits)
+
+def find_similar_questions_batch(queries, knowledge_base, top_k=5):
+    """
+    Find similar questions for many queries; with a vector index the whole
+    batch is scored with a single matrix product
+    """
+    if not knowledge_base:
+        return [[] for _ in queries]
+    if knowledge_base.vector_index is not None:
+        hits_per_query = knowledge_base.vector_index.search_batch(queries, top_k)
+    else:
+        hits_per_query = [knowledge_base.index.search(query, top_k) for query in queries]
+    return [_to_items(knowledge_base, hits) for hits in hits_per_query]
+
+def get_best_answer(query, knowledge_base, category=None, retriever=None):
+    """
+    Retrieve the best answer for a given query; ``category`` (the query's
+    predicted category) narrows the hybrid search
+    """
+    from .hybrid_search import HybridRetriever
+
     # Find similar questions
-    similar_questions = find_similar_questions(query, knowledge_base)
-    
+    similar_questions = (retriever or HybridRetriever()).search(query, knowledge_base, 1, category).items
+
     # Return the answer to the most similar question
     if similar_questions:
         return similar_questions[0].get('answer', 'No answer found')
-    
-    return 'Sorry, I could not find a relevant answer to your question.'
\ No newline at end of file
+
+    return 'Sorry, I could not find a relevant answer to your question.'
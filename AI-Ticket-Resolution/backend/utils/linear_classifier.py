@@ -0,0 +1,264 @@
+import csv
+import zlib
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from .artifact_store import Artifact, write_artifact
+from .preprocess import preprocess_batch, preprocess_pipeline
+
+# Hashed feature space; a power of two so the bucket is a bit mask
+N_FEATURES = 1 << 18
+# Word n-grams hashed into features (unigrams and bigrams, as make_vectorizer)
+NGRAM_RANGE = (1, 2)
+_SIGN_BIT = 1 << 31
+
+Batch = Tuple[List[str], List[str]]
+
+class HashedNgramFeaturizer:
+    """
+    Stateless text -> sparse vector transform: every word n-gram of
+    ``preprocess_pipeline(text)`` is hashed (crc32) into one of
+    ``n_features`` buckets with a sign taken from the hash, and the vector is
+    L2-normalized. No vocabulary is kept, so training can stream over
+    datasets of any size and new words need no refit.
+    """
+
+    def __init__(self, n_features: int = N_FEATURES, ngram_range: Tuple[int, int] = NGRAM_RANGE):
+        if n_features & (n_features - 1):
+            raise ValueError("n_features must be a power of two")
+        self.n_features = n_features
+        self.ngram_range = ngram_range
+        self._mask = n_features - 1
+
+    def ngrams(self, tokens: List[str]) -> Iterator[str]:
+        low, high = self.ngram_range
+        for n in range(low, high + 1):
+            if n == 1:
+                yield from tokens
+            else:
+                for start in range(len(tokens) - n + 1):
+                    yield ' '.join(tokens[start:start + n])
+
+    def transform_one(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (feature indexes, values) of one text
+        """
+        return self._hash_tokens(preprocess_pipeline(text))
+
+    def _hash_tokens(self, tokens: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        weights: Dict[int, float] = {}
+        mask = self._mask
+        for gram in self.ngrams(tokens):
+            h = zlib.crc32(gram.encode('utf-8'))
+            index = h & mask
+            weights[index] = weights.get(index, 0.0) + (-1.0 if h & _SIGN_BIT else 1.0)
+        indices = np.fromiter(weights.keys(), dtype=np.int32, count=len(weights))
+        values = np.fromiter(weights.values(), dtype=np.float32, count=len(weights))
+        norm = np.sqrt(np.dot(values, values))
+        if norm > 0:
+            values /= norm
+        return indices, values
+
+    def transform(self, texts: Sequence[str]) -> sparse.csr_matrix:
+        """
+        CSR matrix with one row per text
+        """
+        rows = [self._hash_tokens(tokens) for tokens in preprocess_batch(texts)]
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum([indices.shape[0] for indices, _ in rows], out=indptr[1:])
+        indices = np.concatenate([row[0] for row in rows]) if rows else np.zeros(0, dtype=np.int32)
+        values = np.concatenate([row[1] for row in rows]) if rows else np.zeros(0, dtype=np.float32)
+        return sparse.csr_matrix((values, indices, indptr), shape=(len(rows), self.n_features))
+
+def _softmax(scores: np.ndarray) -> np.ndarray:
+    scores = scores - scores.max(axis=1, keepdims=True)
+    np.exp(scores, out=scores)
+    scores /= scores.sum(axis=1, keepdims=True)
+    return scores
+
+class LinearIntentClassifier:
+    """
+    Multinomial logistic regression over hashed n-gram features.
+
+    The weights are a dense ``n_features x n_categories`` float32 matrix, so
+    classifying one text gathers only the rows of its (few dozen) non-zero
+    features: a single sparse dot product. ``classify_batch`` is one sparse
+    matrix multiply. Training is mini-batch SGD through ``partial_fit`` with
+    L2 regularization applied to the rows a batch touches; categories are
+    added as they first appear in the labels.
+
+    Drop-in for KeywordMatcher: ``classify`` / ``classify_batch``.
+    """
+
+    def __init__(self, categories: Optional[List[str]] = None, featurizer: Optional[HashedNgramFeaturizer] = None,
+                 weights: Optional[np.ndarray] = None, bias: Optional[np.ndarray] = None,
+                 default: str = 'general_inquiry', learning_rate: float = 0.5, alpha: float = 1e-5):
+        self.featurizer = featurizer or HashedNgramFeaturizer()
+        self.categories = list(categories or [])
+        n_categories = len(self.categories)
+        self.weights = weights if weights is not None else \
+            np.zeros((self.featurizer.n_features, n_categories), dtype=np.float32)
+        self.bias = bias if bias is not None else np.zeros(n_categories, dtype=np.float32)
+        self.default = default
+        self.learning_rate = learning_rate
+        self.alpha = alpha
+        self.steps = 0
+        # Snapshot number, bumped by the online trainer on every published update
+        self.version = 0
+        self._category_index = {category: index for index, category in enumerate(self.categories)}
+
+    def copy(self) -> 'LinearIntentClassifier':
+        """
+        Independent, writable copy (a loaded model's weights are a read-only mapping)
+        """
+        model = LinearIntentClassifier(list(self.categories), self.featurizer, np.array(self.weights),
+                                       np.array(self.bias), self.default, self.learning_rate, self.alpha)
+        model.steps = self.steps
+        model.version = self.version
+        return model
+
+    def _add_categories(self, labels: Iterable[str]):
+        new = [label for label in dict.fromkeys(labels) if label not in self._category_index]
+        if not new:
+            return
+        for label in new:
+            self._category_index[label] = len(self.categories)
+            self.categories.append(label)
+        self.weights = np.hstack([self.weights, np.zeros((self.weights.shape[0], len(new)), dtype=np.float32)])
+        self.bias = np.concatenate([self.bias, np.zeros(len(new), dtype=np.float32)])
+
+    def partial_fit(self, texts: Sequence[str], labels: Sequence[str]) -> float:
+        """
+        One SGD step on a mini-batch; returns the batch's mean log loss
+        """
+        if not texts:
+            return 0.0
+        self._add_categories(labels)
+        features = self.featurizer.transform(texts)
+        targets = np.fromiter((self._category_index[label] for label in labels), dtype=np.int64, count=len(labels))
+        probabilities = _softmax(np.asarray(features @ self.weights) + self.bias)
+        rows = np.arange(len(texts))
+        loss = float(-np.log(np.maximum(probabilities[rows, targets], 1e-12)).mean())
+
+        # Gradient of the mean log loss: (p - onehot) / n, pushed back onto only the touched feature rows
+        probabilities[rows, targets] -= 1.0
+        probabilities /= len(texts)
+        transposed = features.T.tocsr()
+        touched = np.flatnonzero(np.diff(transposed.indptr))
+        rate = self.learning_rate / np.sqrt(1.0 + self.steps * 0.01)
+        gradient = np.asarray(transposed[touched] @ probabilities, dtype=np.float32)
+        self.weights[touched] *= np.float32(1.0 - rate * self.alpha)
+        self.weights[touched] -= np.float32(rate) * gradient
+        self.bias -= np.float32(rate) * probabilities.sum(axis=0).astype(np.float32)
+        self.steps += 1
+        return loss
+
+    def fit_stream(self, batches: Callable[[], Iterable[Batch]], epochs: int = 5,
+                   on_epoch: Optional[Callable[[int, float], None]] = None) -> 'LinearIntentClassifier':
+        """
+        Train over a re-iterable stream of (texts, labels) mini-batches;
+        ``batches()`` is called once per epoch so the data never has to fit
+        in memory
+        """
+        for epoch in range(epochs):
+            total, count = 0.0, 0
+            for texts, labels in batches():
+                total += self.partial_fit(texts, labels) * len(texts)
+                count += len(texts)
+            if on_epoch:
+                on_epoch(epoch, total / count if count else 0.0)
+        return self
+
+    def _label(self, scores: np.ndarray) -> str:
+        if not self.categories:
+            return self.default
+        return self.categories[int(scores.argmax())]
+
+    def classify(self, text: str) -> str:
+        """
+        Best scoring category of one text
+        """
+        indices, values = self.featurizer.transform_one(text)
+        if indices.shape[0] == 0:
+            return self.default
+        return self._label(values @ self.weights[indices] + self.bias)
+
+    def classify_batch(self, texts: Iterable[str]) -> List[str]:
+        """
+        Classify several texts with one sparse matrix multiply
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+        features = self.featurizer.transform(texts)
+        scores = np.asarray(features @ self.weights) + self.bias
+        best = scores.argmax(axis=1) if self.categories else None
+        empty = np.diff(features.indptr) == 0
+        return [self.default if empty[row] or best is None else self.categories[best[row]]
+                for row in range(len(texts))]
+
+    def save(self, path: str):
+        """
+        Write the model as a memory-mappable artifact
+        """
+        write_artifact(
+            path,
+            arrays={'weights': self.weights, 'bias': self.bias},
+            strings={'categories': self.categories},
+            meta={'kind': 'linear_intent_model', 'n_features': self.featurizer.n_features,
+                  'ngram_range': list(self.featurizer.ngram_range), 'default': self.default,
+                  'steps': self.steps, 'version': self.version},
+        )
+
+    @classmethod
+    def load(cls, path: str) -> 'LinearIntentClassifier':
+        """
+        Open a model written by ``save``; the weights stay a read-only view on
+        the mapped file, shared by every worker process
+        """
+        artifact = Artifact(path)
+        meta = artifact.meta
+        if meta.get('kind') != 'linear_intent_model':
+            raise ValueError(f"{path} is not a linear intent model artifact")
+        featurizer = HashedNgramFeaturizer(meta['n_features'], tuple(meta['ngram_range']))
+        model = cls(list(artifact.strings('categories')), featurizer, artifact.array('weights'),
+                    artifact.array('bias'), meta.get('default', 'general_inquiry'))
+        model.steps = meta.get('steps', 0)
+        model.version = meta.get('version', 0)
+        return model
+
+def ticket_text(row: Dict[str, str]) -> str:
+    """
+    Training text of a ticket row: subject and description
+    """
+    return f"{row.get('subject') or ''} {row.get('description') or ''}".strip()
+
+def labeled_batches(rows: Iterable[Dict[str, str]], batch_size: int = 256,
+                    text: Callable[[Dict[str, str]], str] = ticket_text) -> Iterator[Batch]:
+    """
+    Group labeled rows (anything with a ``category``) into (texts, labels)
+    mini-batches, skipping unlabeled rows
+    """
+    texts, labels = [], []
+    for row in rows:
+        if not row.get('category'):
+            continue
+        texts.append(text(row))
+        labels.append(row['category'])
+        if len(texts) == batch_size:
+            yield texts, labels
+            texts, labels = [], []
+    if texts:
+        yield texts, labels
+
+def csv_batches(path: str, batch_size: int = 256) -> Callable[[], Iterator[Batch]]:
+    """
+    Re-iterable mini-batch stream over a ticket CSV (sample_tickets.csv
+    columns); the file is read row by row on every epoch
+    """
+    def batches():
+        with open(path, newline='', encoding='utf-8') as f:
+            yield from labeled_batches(csv.DictReader(f), batch_size)
+    return batches
@@ -0,0 +1,117 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+# Attributes every LogRecord has; anything else came in through ``extra``
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line: time, level, logger, message, the ``extra``
+    fields of the call, and the exception if there is one
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        document = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS:
+                document[key] = value
+        if record.exc_info:
+            document["exc"] = self.formatException(record.exc_info)
+        return json.dumps(document, default=str)
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps logging cheap under load. Records below WARNING are kept with
+    probability ``sample_rate``. Every call site (logger and message
+    template) may emit at most ``burst`` records per ``window`` seconds; the
+    rest are dropped and counted, and the next record let through from that
+    site carries the count as ``suppressed``.
+    """
+
+    def __init__(self, sample_rate: float = 1.0, burst: int = 20, window: float = 10.0):
+        super().__init__()
+        self.sample_rate = sample_rate
+        self.burst = burst
+        self.window = window
+        # (logger, template) -> [window start, emitted in window, suppressed]
+        self._sites: Dict[Tuple[str, str], list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.WARNING and self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return False
+        site = (record.name, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            state = self._sites.get(site)
+            if state is None:
+                state = self._sites[site] = [now, 0, 0]
+            if now - state[0] >= self.window:
+                state[0], state[1] = now, 0
+            if state[1] >= self.burst:
+                state[2] += 1
+                return False
+            state[1] += 1
+            if state[2]:
+                record.suppressed = state[2]
+                state[2] = 0
+        return True
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The listener runs in this process, so the record is passed on whole
+        # (the stdlib version copies and pre-formats it, folding the traceback
+        # into msg); only the message is rendered now, while its arguments
+        # are current. This is the root's only handler, so no copy is needed
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # Losing a log line beats stalling the request that wrote it
+            pass
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+def configure_logging(level: str = "INFO", fmt: str = "json", sample_rate: float = 1.0, burst: int = 20,
+                      window: float = 10.0, max_queue: int = 10000):
+    """
+    Route the root logger through a bounded in-memory queue drained by a
+    background thread, so request threads never block on writing to stderr.
+    Records are sampled and rate limited (SamplingFilter) before they are
+    queued, and dropped when the queue is full.
+    """
+    global _listener
+    if _listener is not None:
+        return
+    handler = logging.StreamHandler()
+    if fmt == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    # Neither format prints them, and looking them up is a third of the
+    # cost of creating every record
+    logging.logThreads = logging.logProcesses = logging.logMultiprocessing = False
+    queue_handler = _DroppingQueueHandler(queue.Queue(max_queue))
+    queue_handler.addFilter(SamplingFilter(sample_rate, burst, window))
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(level.upper())
+    _listener = logging.handlers.QueueListener(queue_handler.queue, handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
@@ -0,0 +1,230 @@
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, 100 us to 10 s
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+                   2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelValues = Tuple[str, ...]
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _label_text(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Metric:
+    """
+    A named metric family with optional labels, rendered in the Prometheus
+    text exposition format. Children (one per label combination) are
+    created on first use and kept for the life of the process, so label
+    values must come from a small fixed set (route templates, stage names),
+    never from request data.
+    """
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[LabelValues, object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str):
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._children[values] = self._new_child()
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+class _CounterChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+class Counter(Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def samples(self) -> Iterator[str]:
+        for values, child in list(self._children.items()):
+            yield f"{self.name}_total{_label_text(self.labelnames, values)} {_number(child.value)}"
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "total", "count", "_lock")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        position = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[position] += 1
+            self.total += value
+            self.count += 1
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+class Histogram(Metric):
+    """
+    Cumulative buckets plus sum and count, like prometheus_client's
+    Histogram; observing is a bisect and three additions under a lock
+    """
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def samples(self) -> Iterator[str]:
+        for values, child in list(self._children.items()):
+            with child._lock:
+                counts, total, count = list(child.counts), child.total, child.count
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                labels = _label_text(self.labelnames, values, f'le="{_number(bound)}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _label_text(self.labelnames, values)
+            yield f"{self.name}_sum{labels} {_number(total)}"
+            yield f"{self.name}_count{labels} {count}"
+
+class CallbackGauge(Metric):
+    """
+    Gauge read at scrape time from callbacks, for values that already live
+    elsewhere (queue lengths, cache counters); a callback returns one value
+    per label combination, or None to skip it
+    """
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._callbacks: List[Callable[[], Dict[LabelValues, Optional[float]]]] = []
+
+    def add_callback(self, callback: Callable[[], Dict[LabelValues, Optional[float]]]):
+        self._callbacks.append(callback)
+        return callback
+
+    def samples(self) -> Iterator[str]:
+        for callback in list(self._callbacks):
+            try:
+                values = callback()
+            except Exception:
+                # A broken source must not take the whole scrape down
+                continue
+            for labels, value in values.items():
+                if value is not None:
+                    yield f"{self.name}{_label_text(self.labelnames, labels)} {_number(value)}"
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """
+        Every metric in the Prometheus text format (version 0.0.4)
+        """
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+REGISTRY = Registry()
+
+# Metrics of this process. With several worker processes every worker
+# exposes its own, so scrape them individually (or sum in the query).
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "Time to produce the response (headers for streamed bodies) per route",
+    ("route", "method", "status")))
+CLASSIFY_SECONDS = REGISTRY.register(Histogram(
+    "classify_duration_seconds", "Intent classification time per call", ("model", "mode")))
+KB_SEARCH_SECONDS = REGISTRY.register(Histogram(
+    "kb_search_stage_duration_seconds", "Knowledge base search time per stage", ("stage",)))
+DB_SECONDS = REGISTRY.register(Histogram(
+    "db_call_duration_seconds", "Storage backend call latency per method and table", ("method", "table", "outcome")))
+CACHE_LOOKUPS = REGISTRY.register(CallbackGauge(
+    "cache_lookups", "Cache lookups since start per cache and result (hit, miss)", ("cache", "result")))
+CACHE_HIT_RATIO = REGISTRY.register(CallbackGauge(
+    "cache_hit_ratio", "Share of cache lookups that were hits", ("cache",)))
+QUEUE_DEPTH = REGISTRY.register(CallbackGauge(
+    "queue_depth", "Items waiting in background queues", ("queue",)))
+
+# Methods kept as request labels; any other client-sent method is "other"
+HTTP_METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"))
+
+def method_label(method: str) -> str:
+    """
+    ``method`` as a request label, bounded to the standard methods
+    """
+    return method if method in HTTP_METHODS else "other"
+
+def watch_cache(name: str, stats: Callable[[], Dict]):
+    """
+    Export a cache's ``stats()`` (hits, misses, hit_ratio) on /metrics
+    """
+    def lookups():
+        current = stats()
+        return {(name, "hit"): current.get("hits", 0) + current.get("near_hits", 0),
+                (name, "miss"): current.get("misses", 0)}
+
+    CACHE_LOOKUPS.add_callback(lookups)
+    CACHE_HIT_RATIO.add_callback(lambda: {(name,): stats().get("hit_ratio")})
+
+def watch_queue(name: str, depth: Callable[[], int]):
+    QUEUE_DEPTH.add_callback(lambda: {(name,): depth()})
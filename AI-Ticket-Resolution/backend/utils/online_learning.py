@@ -0,0 +1,205 @@
+import logging
+import os
+import queue
+import re
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: a single worker process, nothing to serialize against
+    fcntl = None
+
+from .artifact_manager import ArtifactHandle
+from .artifact_store import ArtifactError
+from .linear_classifier import LinearIntentClassifier
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_PATTERN = re.compile(r'^intent_linear-(\d+)\.bin$')
+
+def snapshot_path(directory: str, version: int) -> str:
+    return os.path.join(directory, f"intent_linear-{version:08d}.bin")
+
+def latest_snapshot(directory: str) -> int:
+    """
+    Highest snapshot version in ``directory``, 0 if there is none
+    """
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return 0
+    versions = [int(match.group(1)) for match in map(SNAPSHOT_PATTERN.match, names) if match]
+    return max(versions, default=0)
+
+@contextmanager
+def _snapshot_lock(directory: str):
+    # Serializes load-latest/train/publish across worker processes, so two
+    # workers never publish the same version or drop each other's updates
+    if fcntl is None:
+        yield
+        return
+    with open(os.path.join(directory, '.lock'), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+def _publish(model: LinearIntentClassifier, snapshot_dir: str, model_path: str, keep: int, latest: int) -> str:
+    # Caller holds the snapshot lock
+    model.version = max(latest, model.version) + 1
+    path = snapshot_path(snapshot_dir, model.version)
+    model.save(path)
+    model.save(model_path)
+    versions = sorted(int(match.group(1)) for match in map(SNAPSHOT_PATTERN.match, os.listdir(snapshot_dir)) if match)
+    for version in versions[:-keep]:
+        os.remove(snapshot_path(snapshot_dir, version))
+    return path
+
+def publish_model(model: LinearIntentClassifier, snapshot_dir: str, model_path: str, keep: int = 5) -> str:
+    """
+    Publish a newly trained model as the next numbered snapshot and as
+    ``model_path``. Its version is above every published one (snapshots
+    and the model file), so the artifact watcher swaps it in and online
+    learning continues from it instead of from an older snapshot.
+    """
+    os.makedirs(snapshot_dir, exist_ok=True)
+    with _snapshot_lock(snapshot_dir):
+        latest = latest_snapshot(snapshot_dir)
+        try:
+            latest = max(latest, LinearIntentClassifier.load(model_path).version)
+        except (ArtifactError, ValueError):
+            # No readable model file yet
+            pass
+        model.version = 0
+        return _publish(model, snapshot_dir, model_path, keep, latest)
+
+class OnlineTrainer:
+    """
+    Background partial_fit updates of a LinearIntentClassifier.
+
+    ``submit`` queues a labeled example and returns at once (examples are
+    dropped, and counted, when ``max_pending`` are already waiting). A daemon
+    thread collects up to ``batch_size`` examples, or whatever arrived within
+    ``flush_interval`` seconds, and under a lock shared by all workers:
+    picks up the newest snapshot on disk, applies one SGD step, and writes it
+    as the next numbered snapshot (plus ``model_path``). The new snapshot is
+    then swapped into ``handle``. While idle the thread also swaps in
+    snapshots published by other workers, so every process converges on the
+    latest version without a restart. The newest ``keep`` snapshots are kept.
+    """
+
+    def __init__(self, handle: ArtifactHandle, snapshot_dir: str, model_path: str, batch_size: int = 32,
+                 flush_interval: float = 5.0, keep: int = 5, max_pending: int = 10000):
+        self.handle = handle
+        self.snapshot_dir = snapshot_dir
+        self.model_path = model_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.keep = keep
+        self._pending: "queue.Queue[Optional[Tuple[str, str]]]" = queue.Queue(max_pending)
+        self._working: Optional[LinearIntentClassifier] = None
+        self._thread: Optional[threading.Thread] = None
+        self.examples = 0
+        self.updates = 0
+        self.dropped = 0
+        self.errors = 0
+        os.makedirs(snapshot_dir, exist_ok=True)
+
+    def start(self) -> 'OnlineTrainer':
+        if self._thread is None:
+            # Catch up with snapshots published while this worker was down
+            self.refresh()
+            self._thread = threading.Thread(target=self._run, name="online-trainer", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None):
+        """
+        Train on what is still queued, then stop the thread
+        """
+        if self._thread is not None:
+            self._pending.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def submit(self, text: str, label: str) -> bool:
+        try:
+            self._pending.put_nowait((text, label))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _next_batch(self) -> Tuple[List[Tuple[str, str]], bool]:
+        batch: List[Tuple[str, str]] = []
+        try:
+            item = self._pending.get(timeout=self.flush_interval)
+        except queue.Empty:
+            return batch, False
+        while item is not None:
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                return batch, False
+            try:
+                item = self._pending.get(timeout=self.flush_interval)
+            except queue.Empty:
+                return batch, False
+        return batch, True
+
+    def _run(self):
+        while True:
+            batch, stopping = self._next_batch()
+            try:
+                if batch:
+                    self.train(batch)
+                else:
+                    self.refresh()
+            except Exception as e:
+                self.errors += 1
+                logger.exception("Online model update failed")
+            if stopping:
+                return
+
+    def _load_working(self, version: int):
+        if self._working is None or self._working.version < version:
+            if version > 0:
+                self._working = LinearIntentClassifier.load(snapshot_path(self.snapshot_dir, version)).copy()
+            else:
+                self._working = self.handle.value.copy()
+
+    def train(self, batch: List[Tuple[str, str]]):
+        """
+        Apply one update and publish it as a new snapshot
+        """
+        texts = [text for text, _ in batch]
+        labels = [label for _, label in batch]
+        with _snapshot_lock(self.snapshot_dir):
+            latest = latest_snapshot(self.snapshot_dir)
+            self._load_working(latest)
+            self._working.partial_fit(texts, labels)
+            path = _publish(self._working, self.snapshot_dir, self.model_path, self.keep, latest)
+        self.examples += len(batch)
+        self.updates += 1
+        # Serve the snapshot file itself: a read-only mapping, shared with the other workers
+        self.handle.swap(LinearIntentClassifier.load(path), self._working.version)
+
+    def refresh(self):
+        """
+        Swap in a newer snapshot published by another worker
+        """
+        latest = latest_snapshot(self.snapshot_dir)
+        if latest > self.handle.version:
+            self.handle.swap(LinearIntentClassifier.load(snapshot_path(self.snapshot_dir, latest)), latest)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "version": self.handle.version,
+            "pending": self._pending.qsize(),
+            "examples": self.examples,
+            "updates": self.updates,
+            "dropped": self.dropped,
+            "errors": self.errors,
+        }
@@ -1,33 +1,244 @@
-import re
 import string
+import sys
+import unicodedata
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+# Built once instead of on every call
+_PUNCTUATION_TABLE = str.maketrans('', '', string.punctuation)
+# Texts are joined with this separator so a whole batch is lowercased and
+# translated by two C calls; it is neither whitespace nor punctuation
+_BATCH_SEPARATOR = '\x00'
+# Distinct tokens whose stems are memoized per preprocessor
+MAX_STEM_CACHE = 100000
+
+ENGLISH_STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being below between
+both but by can could did do does doing down during each few for from further had has have having he her
+here hers herself him himself his how i if in into is it its itself just me more most my myself no nor not
+now of off on once only or other our ours ourselves out over own same she should so some such than that
+the their theirs them themselves then there these they this those through to too under until up very was
+we were what when where which while who whom why will with would you your yours yourself yourselves
+""".split())
+
+def _unicode_punctuation_table() -> Dict[int, None]:
+    """
+    Translate table deleting every Unicode punctuation character (categories P*)
+    """
+    return {code: None for code in range(sys.maxunicode + 1)
+            if unicodedata.category(chr(code)).startswith('P')}
+
+_UNICODE_PUNCTUATION_TABLE: Optional[Dict[int, None]] = None
 
 def clean_text(text):
     """
-    Clean and preprocess text data
+    Clean and preprocess text data: lowercase, strip ASCII punctuation and
+    collapse whitespace
     """
-    # Convert to lowercase
-    text = text.lower()
-    
-    # Remove punctuation
-    text = text.translate(str.maketrans('', '', string.punctuation))
-    
-    # Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text).strip()
-    
-    return text
+    # str.split() splits on exactly the characters the old \s+ regex matched
+    return ' '.join(text.lower().translate(_PUNCTUATION_TABLE).split())
 
 def tokenize_text(text):
     """
     Tokenize text into words
     """
     # Simple tokenization by splitting on whitespace
-    tokens = text.split()
-    return tokens
+    return text.split()
 
 def preprocess_pipeline(text):
     """
-    Complete preprocessing pipeline
+    Complete preprocessing pipeline: the tokens of clean_text(text)
+
+    The fitted vectorizer pickle refers to this function by name, so its
+    name and output must not change.
+    """
+    # Same tokens as tokenize_text(clean_text(text)) without the joined intermediate string
+    return text.lower().translate(_PUNCTUATION_TABLE).split()
+
+_STEM_SUFFIXES = ('ational', 'ization', 'fulness', 'iveness', 'ations', 'ation', 'ments', 'ingly',
+                  'ness', 'ment', 'ing', 'ies', 'ied', 'ers', 'ed', 'es', 'er', 'ly', 's')
+_STEM_REPLACEMENTS = {'ational': 'ate', 'ization': 'ize', 'ations': 'ate', 'ation': 'ate', 'ies': 'y', 'ied': 'y'}
+
+def light_stem(token: str) -> str:
+    """
+    Lightweight suffix-stripping stemmer ("charges", "charged", "charging" ->
+    "charg"): strips the longest known suffix while keeping a stem of at
+    least three characters; short words and words ending in "ss" are kept
+    """
+    if len(token) <= 3 or token.endswith('ss'):
+        return token
+    for suffix in _STEM_SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            stem = token[:-len(suffix)] + _STEM_REPLACEMENTS.get(suffix, '')
+            # "charge"/"charges" and "charged" should meet: drop a trailing e
+            return stem[:-1] if stem.endswith('e') and len(stem) > 3 else stem
+    return token[:-1] if token.endswith('e') and len(token) > 4 else token
+
+class Vocabulary:
+    """
+    Token <-> integer id table. Tokens are interned, so the many copies of
+    a common word share one string object, and documents can be handled as
+    compact int32 arrays. A frozen vocabulary maps unknown tokens to -1
+    instead of growing.
+    """
+
+    def __init__(self, tokens: Iterable[str] = (), frozen: bool = False):
+        self.ids: Dict[str, int] = {}
+        self.tokens: List[str] = []
+        for token in tokens:
+            self.add(token)
+        self.frozen = frozen
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def __contains__(self, token: str):
+        return token in self.ids
+
+    def add(self, token: str) -> int:
+        token_id = self.ids.get(token)
+        if token_id is None:
+            token = sys.intern(token)
+            token_id = self.ids[token] = len(self.tokens)
+            self.tokens.append(token)
+        return token_id
+
+    def encode(self, tokens: Sequence[str]):
+        """
+        int32 numpy array of the ids of ``tokens`` (-1 for unknown tokens of a
+        frozen vocabulary)
+        """
+        import numpy as np
+        if self.frozen:
+            get = self.ids.get
+            return np.fromiter((get(token, -1) for token in tokens), dtype=np.int32, count=len(tokens))
+        add = self.add
+        return np.fromiter((add(token) for token in tokens), dtype=np.int32, count=len(tokens))
+
+    def decode(self, ids: Iterable[int]) -> List[str]:
+        return [self.tokens[token_id] for token_id in ids if token_id >= 0]
+
+class TextPreprocessor:
+    """
+    Configurable preprocessing with everything precompiled at construction.
+
+    The default configuration produces exactly preprocess_pipeline's tokens.
+    Options: ``normalize`` ('NFKC', 'NFKD', ...) applies Unicode
+    normalization first and then also deletes non-ASCII punctuation;
+    ``strip_accents`` folds "café" to "cafe"; ``stopwords`` (True for the
+    built-in English list, or any set) drops those tokens; ``stem`` applies
+    light_stem (memoized per distinct token). ``vocabulary`` lets
+    ``encode`` return token ids instead of strings.
+    """
+
+    def __init__(self, normalize: Optional[str] = None, strip_accents: bool = False, stopwords=None,
+                 stem: bool = False, vocabulary: Optional[Vocabulary] = None):
+        global _UNICODE_PUNCTUATION_TABLE
+        self.normalize = normalize
+        self.strip_accents = strip_accents
+        self.stopwords = ENGLISH_STOPWORDS if stopwords is True else frozenset(stopwords or ())
+        self.stem = stem
+        self.vocabulary = vocabulary
+        if normalize or strip_accents:
+            if _UNICODE_PUNCTUATION_TABLE is None:
+                _UNICODE_PUNCTUATION_TABLE = _unicode_punctuation_table()
+            self._table = _UNICODE_PUNCTUATION_TABLE
+        else:
+            self._table = _PUNCTUATION_TABLE
+        self._stems: Dict[str, str] = {}
+        self._plain = not (normalize or strip_accents or self.stopwords or stem)
+
+    def _normalize(self, text: str) -> str:
+        if self.strip_accents:
+            text = unicodedata.normalize('NFKD', text)
+            text = ''.join(char for char in text if not unicodedata.combining(char))
+        if self.normalize:
+            text = unicodedata.normalize(self.normalize, text)
+        return text
+
+    def _filter(self, tokens: List[str]) -> List[str]:
+        if self.stopwords:
+            stopwords = self.stopwords
+            tokens = [token for token in tokens if token not in stopwords]
+        if self.stem:
+            stems = self._stems
+            stemmed = []
+            for token in tokens:
+                stem = stems.get(token)
+                if stem is None:
+                    if len(stems) >= MAX_STEM_CACHE:
+                        stems.clear()
+                    stem = stems[token] = light_stem(token)
+                stemmed.append(stem)
+            tokens = stemmed
+        return tokens
+
+    def __call__(self, text: str) -> List[str]:
+        """
+        Tokens of one text
+        """
+        if self._plain:
+            return text.lower().translate(self._table).split()
+        if self.normalize or self.strip_accents:
+            text = self._normalize(text)
+        return self._filter(text.lower().translate(self._table).split())
+
+    def batch(self, texts: Sequence[str]) -> List[List[str]]:
+        """
+        Tokens of many texts: the batch is joined so lowercasing, (Unicode
+        normalization) and punctuation removal run once over one string
+        """
+        if not texts:
+            return []
+        joined = _BATCH_SEPARATOR.join(texts)
+        if self.normalize or self.strip_accents:
+            joined = self._normalize(joined)
+        pieces = joined.lower().translate(self._table).split(_BATCH_SEPARATOR)
+        if len(pieces) != len(texts):
+            # A text contained the separator itself
+            return [self(text) for text in texts]
+        if self._plain:
+            return [piece.split() for piece in pieces]
+        return [self._filter(piece.split()) for piece in pieces]
+
+    def stream(self, texts: Iterable[str], batch_size: int = 1024) -> Iterator[List[str]]:
+        """
+        Lazily yield the tokens of each text of an iterable of any length,
+        processing it ``batch_size`` texts at a time
+        """
+        chunk = []
+        for text in texts:
+            chunk.append(text)
+            if len(chunk) == batch_size:
+                yield from self.batch(chunk)
+                chunk = []
+        if chunk:
+            yield from self.batch(chunk)
+
+    def encode(self, text: str):
+        """
+        Token ids of one text through the preprocessor's vocabulary
+        """
+        if self.vocabulary is None:
+            self.vocabulary = Vocabulary()
+        return self.vocabulary.encode(self(text))
+
+    def encode_batch(self, texts: Sequence[str]) -> list:
+        if self.vocabulary is None:
+            self.vocabulary = Vocabulary()
+        return [self.vocabulary.encode(tokens) for tokens in self.batch(texts)]
+
+# preprocess_pipeline's configuration, for the batch and streaming helpers below
+DEFAULT_PREPROCESSOR = TextPreprocessor()
+
+def preprocess_batch(texts, preprocessor=None):
+    """
+    preprocess_pipeline over many texts at once
+    """
+    return (preprocessor or DEFAULT_PREPROCESSOR).batch(texts)
+
+def preprocess_stream(texts, batch_size=1024, preprocessor=None):
+    """
+    Generator of preprocess_pipeline tokens for an iterable of texts (e.g.
+    rows read from a file), holding at most ``batch_size`` texts at a time
     """
-    cleaned = clean_text(text)
-    tokens = tokenize_text(cleaned)
-    return tokens
\ No newline at end of file
+    return (preprocessor or DEFAULT_PREPROCESSOR).stream(texts, batch_size)
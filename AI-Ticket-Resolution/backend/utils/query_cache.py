@@ -0,0 +1,148 @@
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+import numpy as np
+
+from utils.preprocess import clean_text
+
+# MinHash over the query's token set: NUM_PERMUTATIONS hash functions split
+# into LSH_BANDS bands; two queries become near-duplicate candidates when all
+# rows of any one band agree
+NUM_PERMUTATIONS = 32
+LSH_BANDS = 8
+# Universal hashing modulo a Mersenne prime; crc32 values and coefficients
+# below 2**31 keep every product inside 64 bits
+_PRIME = (1 << 31) - 1
+
+def query_tokens(text: str) -> FrozenSet[str]:
+    """
+    Token set of a query after clean_text
+    """
+    return frozenset(clean_text(text).split())
+
+def canonical_query(tokens: FrozenSet[str]) -> str:
+    """
+    Order-independent cache key: "reset my password!" and "My password,
+    reset" give the same key
+    """
+    return " ".join(sorted(tokens))
+
+class QueryCache:
+    """
+    Bounded LRU of results keyed on normalized query text, with a MinHash
+    near-duplicate lookup.
+
+    ``get`` first looks up the exact canonical key. On a miss the query's
+    MinHash signature is bucketed by LSH band, and the cached query sharing a
+    bucket with the highest token-set Jaccard similarity is returned if it
+    reaches ``similarity``, so paraphrases such as "how can i reset my
+    password" / "how do i reset my password" share an entry. At most
+    ``max_entries`` results are kept; the least recently used is evicted.
+    """
+
+    def __init__(self, max_entries: int = 10000, similarity: float = 0.8, seed: int = 13):
+        self.max_entries = max_entries
+        self.similarity = similarity
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, _PRIME, size=NUM_PERMUTATIONS).astype(np.uint64)
+        self._b = rng.randint(0, _PRIME, size=NUM_PERMUTATIONS).astype(np.uint64)
+        self._rows = NUM_PERMUTATIONS // LSH_BANDS
+        # key -> (value, tokens, band keys)
+        self._entries: "OrderedDict[str, Tuple[Any, FrozenSet[str], List[Tuple[int, bytes]]]]" = OrderedDict()
+        self._buckets: Dict[Tuple[int, bytes], set] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _bands(self, tokens: FrozenSet[str]) -> List[Tuple[int, bytes]]:
+        hashes = np.fromiter((zlib.crc32(token.encode("utf-8")) for token in tokens),
+                             dtype=np.uint64, count=len(tokens))
+        signature = ((np.outer(self._a, hashes) + self._b[:, None]) % _PRIME).min(axis=1)
+        return [(band, signature[band * self._rows:(band + 1) * self._rows].tobytes())
+                for band in range(LSH_BANDS)]
+
+    def _near_duplicate(self, tokens: FrozenSet[str]) -> Optional[str]:
+        candidates = set()
+        for band in self._bands(tokens):
+            candidates.update(self._buckets.get(band, ()))
+        best_key, best_similarity = None, self.similarity
+        for key in candidates:
+            other = self._entries[key][1]
+            similarity = len(tokens & other) / len(tokens | other)
+            if similarity >= best_similarity:
+                best_key, best_similarity = key, similarity
+        return best_key
+
+    def get(self, text: str) -> Any:
+        """
+        Cached result for ``text`` or a near-duplicate of it, else None
+        """
+        tokens = query_tokens(text)
+        key = canonical_query(tokens)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry[0]
+            match = self._near_duplicate(tokens) if tokens else None
+            if match is None:
+                self.misses += 1
+                return None
+            self.near_hits += 1
+            value = self._entries[match][0]
+            self._entries.move_to_end(match)
+            # Remember the paraphrase under its own key, so the next time it
+            # is an exact hit and skips the MinHash lookup
+            self._insert(key, tokens, value)
+            return value
+
+    def put(self, text: str, value: Any):
+        tokens = query_tokens(text)
+        with self._lock:
+            self._insert(canonical_query(tokens), tokens, value)
+
+    def _insert(self, key: str, tokens: FrozenSet[str], value: Any):
+        if key in self._entries:
+            self._entries[key] = (value,) + self._entries[key][1:]
+            self._entries.move_to_end(key)
+            return
+        bands = self._bands(tokens) if tokens else []
+        self._entries[key] = (value, tokens, bands)
+        for band in bands:
+            self._buckets.setdefault(band, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._evict()
+
+    def _evict(self):
+        key, (_, _, bands) = self._entries.popitem(last=False)
+        for band in bands:
+            bucket = self._buckets[band]
+            bucket.discard(key)
+            if not bucket:
+                del self._buckets[band]
+        self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.near_hits + self.misses
+        return {
+            "entries": len(self),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "near_hits": self.near_hits,
+            "misses": self.misses,
+            "hit_ratio": round((self.hits + self.near_hits) / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,279 @@
+import dataclasses
+import heapq
+import itertools
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .bm25_index import BM25Index
+from .knowledge_search import entry_text
+
+logger = logging.getLogger(__name__)
+
+# Rows buffered in the writable memtable before it is frozen into a segment
+FLUSH_SIZE = 256
+# More segments than this are merged in the background, smallest first
+MAX_SEGMENTS = 8
+# Segments merged together in one step
+MERGE_FACTOR = 4
+# A segment with more than this share of deleted rows is rewritten on its own
+MAX_DELETED_RATIO = 0.5
+
+Row = Dict[str, Any]
+
+class Segment:
+    """
+    Immutable BM25 index over a batch of knowledge base rows. Deleted (or
+    superseded) rows are tombstoned in the ``alive`` mask; the index itself
+    never changes, masked rows are just skipped by the search.
+    """
+    _numbers = itertools.count()
+
+    def __init__(self, rows: List[Row]):
+        self.number = next(self._numbers)
+        self.rows = rows
+        self.index = BM25Index.build(entry_text(row) for row in rows)
+        self.alive = np.ones(len(rows), dtype=bool)
+        self.deleted = 0
+
+    def __len__(self):
+        return len(self.rows)
+
+    def tombstone(self, position: int):
+        if self.alive[position]:
+            self.alive[position] = False
+            self.deleted += 1
+
+    def search(self, query: str, top_k: int) -> List[Tuple[int, float]]:
+        return self.index.search(query, top_k, self.alive if self.deleted else None)
+
+class SegmentedKnowledgeIndex:
+    """
+    Knowledge base search index maintained incrementally, LSM-style.
+
+    Writes go to a small in-memory memtable; once it holds ``flush_size``
+    rows it is frozen into an immutable BM25 segment. Updates and deletes
+    tombstone the row's previous version wherever it lives (an update then
+    adds the new version to the memtable), so no segment is ever rebuilt on
+    the write path. Searches query every segment with its tombstone mask and
+    merge the per-segment top-k by score.
+
+    A background thread merges segments when there are more than
+    ``max_segments`` (the ``merge_factor`` smallest at a time) or one is
+    mostly tombstones. The merged segment is built without holding the lock
+    and swapped in atomically, carrying over deletes that happened meanwhile,
+    so searches never wait for a rebuild. Rows are identified by their
+    ``id``. Every segment scores with its own BM25 statistics, which merging
+    brings back in line with a single index over the same rows.
+    """
+
+    def __init__(self, rows: Iterable[Row] = (), flush_size: int = FLUSH_SIZE, max_segments: int = MAX_SEGMENTS,
+                 merge_factor: int = MERGE_FACTOR):
+        self.flush_size = flush_size
+        self.max_segments = max_segments
+        self.merge_factor = merge_factor
+        self._lock = threading.RLock()
+        # One merge at a time, so two merges never pick the same segment
+        self._merge_lock = threading.Lock()
+        self._segments: List[Segment] = []
+        # Row id -> (segment, position) for rows in segments
+        self._locations: Dict[Any, Tuple[Segment, int]] = {}
+        self._memtable: Dict[Any, Row] = {}
+        self._memtable_segment: Optional[Segment] = None
+        self._merge_wanted = threading.Event()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+        self._anonymous = itertools.count(-1, -1)
+        self.merges = 0
+        rows = list(rows)
+        if rows:
+            self._add_segment(Segment([self._keyed(row) for row in rows]))
+
+    def _keyed(self, row: Row) -> Row:
+        # Rows without an id (e.g. read from a CSV) get a private negative one
+        if row.get('id') is None:
+            row = dict(row, id=next(self._anonymous))
+        return row
+
+    def __len__(self):
+        with self._lock:
+            return len(self._locations) + len(self._memtable)
+
+    def _add_segment(self, segment: Segment):
+        self._segments.append(segment)
+        for position, row in enumerate(segment.rows):
+            if segment.alive[position]:
+                self._locations[row['id']] = (segment, position)
+
+    def _remove(self, key) -> bool:
+        if self._memtable.pop(key, None) is not None:
+            self._memtable_segment = None
+            return True
+        location = self._locations.pop(key, None)
+        if location is None:
+            return False
+        segment, position = location
+        segment.tombstone(position)
+        if segment.deleted > len(segment) * MAX_DELETED_RATIO:
+            self._merge_wanted.set()
+        return True
+
+    # Writes
+    def upsert(self, row: Row):
+        """
+        Index a new row, or a new version of an existing one
+        """
+        row = self._keyed(dict(row))
+        with self._lock:
+            self._remove(row['id'])
+            self._memtable[row['id']] = row
+            self._memtable_segment = None
+            if len(self._memtable) >= self.flush_size:
+                self.flush()
+
+    def delete(self, key) -> bool:
+        with self._lock:
+            return self._remove(key)
+
+    def flush(self):
+        """
+        Freeze the memtable into an immutable segment
+        """
+        with self._lock:
+            if not self._memtable:
+                return
+            segment = self._memtable_segment or Segment(list(self._memtable.values()))
+            self._memtable = {}
+            self._memtable_segment = None
+            self._add_segment(segment)
+            if len(self._segments) > self.max_segments:
+                self._merge_wanted.set()
+
+    def apply(self, event):
+        """
+        ChangeEvent listener for ``knowledge_base`` writes
+        """
+        if event.table != "knowledge_base":
+            return
+        if event.action == "deleted":
+            self.delete(event.key)
+        elif event.record is not None:
+            record = event.record
+            self.upsert(record if isinstance(record, dict) else dataclasses.asdict(record))
+
+    # Reads
+    def search(self, query: str, top_k: int = 5) -> List[Tuple[Row, float]]:
+        """
+        Up to ``top_k`` (row, score) pairs over every live row, best first
+        """
+        if top_k <= 0:
+            return []
+        with self._lock:
+            if self._memtable and self._memtable_segment is None:
+                self._memtable_segment = Segment(list(self._memtable.values()))
+            segments = list(self._segments)
+            if self._memtable:
+                segments.append(self._memtable_segment)
+        hits = []
+        for segment in segments:
+            for position, score in segment.search(query, top_k):
+                hits.append((score, segment.number, position, segment))
+        best = heapq.nsmallest(top_k, hits, key=lambda hit: (-hit[0], hit[1], hit[2]))
+        return [(segment.rows[position], score) for score, _, position, segment in best]
+
+    def rows(self) -> List[Row]:
+        with self._lock:
+            rows = [segment.rows[position] for segment, position in self._locations.values()]
+            return rows + list(self._memtable.values())
+
+    # Merging
+    def _pick_merge(self) -> List[Segment]:
+        with self._lock:
+            segments = self._segments
+            for segment in segments:
+                if segment.deleted > len(segment) * MAX_DELETED_RATIO:
+                    return [segment]
+            if len(segments) <= self.max_segments:
+                return []
+            return sorted(segments, key=lambda segment: len(segment) - segment.deleted)[:self.merge_factor]
+
+    def merge_once(self) -> bool:
+        """
+        Run one merge step if the policy calls for one; True if segments were merged
+        """
+        with self._merge_lock:
+            chosen = self._pick_merge()
+            if not chosen:
+                return False
+            self._merge(chosen)
+            return True
+
+    def compact(self):
+        """
+        Flush the memtable and merge every segment into one, which scores
+        exactly like a BM25 index built from scratch over the live rows
+        """
+        with self._merge_lock:
+            self.flush()
+            with self._lock:
+                chosen = list(self._segments)
+            if len(chosen) > 1 or any(segment.deleted for segment in chosen):
+                self._merge(chosen)
+
+    def _merge(self, chosen: List[Segment]):
+        with self._lock:
+            sources = [(segment, position) for segment in chosen for position in np.flatnonzero(segment.alive)]
+        # The expensive part runs without the lock; searches keep using the old segments
+        merged = Segment([segment.rows[position] for segment, position in sources]) if sources else None
+        with self._lock:
+            # Rows deleted or updated while merging stay dead in the merged segment
+            for position, (segment, source) in enumerate(sources):
+                if not segment.alive[source]:
+                    merged.tombstone(position)
+            chosen_numbers = {segment.number for segment in chosen}
+            self._segments = [segment for segment in self._segments if segment.number not in chosen_numbers]
+            if merged is not None:
+                self._add_segment(merged)
+            self.merges += 1
+
+    def _run(self):
+        while True:
+            self._merge_wanted.wait()
+            self._merge_wanted.clear()
+            if self._stopped:
+                return
+            try:
+                while self.merge_once():
+                    pass
+            except Exception:
+                logger.exception("Knowledge base index merge failed")
+
+    def start(self) -> 'SegmentedKnowledgeIndex':
+        """
+        Start the background merge thread
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="kb-index-merge", daemon=True)
+            self._thread.start()
+            if self._pick_merge():
+                self._merge_wanted.set()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._stopped = True
+            self._merge_wanted.set()
+            self._thread.join()
+            self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "rows": len(self._locations) + len(self._memtable),
+                "memtable": len(self._memtable),
+                "segments": [len(segment) for segment in self._segments],
+                "deleted": sum(segment.deleted for segment in self._segments),
+                "merges": self.merges,
+            }
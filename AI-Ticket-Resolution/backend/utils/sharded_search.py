@@ -0,0 +1,220 @@
+import heapq
+import json
+import math
+import multiprocessing
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .knowledge_search import entry_text, open_knowledge_base_artifact
+
+MANIFEST_NAME = 'manifest.json'
+SHARD_PATTERN = 'shard-{:04d}.bin'
+
+Partial = Tuple[float, int, int]
+
+def partition_entries(entries: Sequence[dict], shards: int, partition: str = 'hash') -> List[List[int]]:
+    """
+    Row numbers of ``entries`` in each shard. 'hash' spreads entries evenly
+    by a stable hash of their id (or question); 'category' keeps every
+    category in a single shard, largest categories placed first on the
+    least loaded shard
+    """
+    if shards < 1:
+        raise ValueError("shards must be at least 1")
+    parts: List[List[int]] = [[] for _ in range(shards)]
+    if partition == 'hash':
+        for row, entry in enumerate(entries):
+            key = str(entry.get('id') or entry.get('question', ''))
+            parts[zlib.crc32(key.encode('utf-8')) % shards].append(row)
+    elif partition == 'category':
+        categories: Dict[str, List[int]] = {}
+        for row, entry in enumerate(entries):
+            categories.setdefault(entry.get('category') or '', []).append(row)
+        loads = [(0, shard) for shard in range(shards)]
+        for rows in sorted(categories.values(), key=len, reverse=True):
+            load, shard = heapq.heappop(loads)
+            parts[shard].extend(rows)
+            heapq.heappush(loads, (load + len(rows), shard))
+        for rows in parts:
+            rows.sort()
+    else:
+        raise ValueError(f"Unknown partition scheme: {partition}")
+    return parts
+
+def build_shards(entries: Sequence[dict], directory: str, shards: int, partition: str = 'hash') -> dict:
+    """
+    Index ``entries`` (knowledge base rows) as ``shards`` memory-mappable
+    KB artifacts plus a manifest in ``directory``.
+
+    One vectorizer is fitted over all entries and shared by every shard, so
+    cosine scores from different shards are directly comparable when the
+    partial top-k lists are merged. Shards are scanned exactly, without an
+    ANN index: each is a slice of the knowledge base, and the batched exact
+    product is faster than the per-query ANN re-scoring at shard sizes.
+    """
+    from .vector_search import VectorSearchIndex
+
+    os.makedirs(directory, exist_ok=True)
+    full = VectorSearchIndex.build([entry_text(entry) for entry in entries])
+    manifest = {'partition': partition, 'entries': len(entries), 'shards': []}
+    for number, rows in enumerate(partition_entries(entries, shards, partition)):
+        shard_entries = [entries[row] for row in rows]
+        index = VectorSearchIndex(full.vectorizer, full.matrix[rows])
+        name = SHARD_PATTERN.format(number)
+        index.save_artifact(os.path.join(directory, name), shard_entries)
+        manifest['shards'].append({
+            'path': name,
+            'entries': len(rows),
+            'categories': sorted({entry.get('category') or '' for entry in shard_entries}),
+        })
+    manifest_path = os.path.join(directory, MANIFEST_NAME)
+    temporary_path = f"{manifest_path}.tmp{os.getpid()}"
+    with open(temporary_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    os.replace(temporary_path, manifest_path)
+    # Shards of an earlier build with more shards; workers that still map them keep their pages
+    current = {shard['path'] for shard in manifest['shards']}
+    for name in os.listdir(directory):
+        if name.startswith('shard-') and name.endswith('.bin') and name not in current:
+            os.remove(os.path.join(directory, name))
+    return manifest
+
+# Shards opened by this worker process: path -> (file mtime_ns, knowledge base)
+_open_shards: Dict[str, tuple] = {}
+
+def _search_shard(number: int, path: str, stamp: int, queries: List[str], top_k: int) -> List[List[Partial]]:
+    """
+    Worker task: top-k of one shard for a chunk of queries. The shard is
+    mapped on first use and reopened when its file is replaced
+    """
+    cached = _open_shards.get(path)
+    if cached is None or cached[0] != stamp:
+        cached = _open_shards[path] = (stamp, open_knowledge_base_artifact(path))
+    knowledge_base = cached[1]
+    results = []
+    for hits in knowledge_base.vector_index.search_batch(queries, top_k):
+        results.append([(score, number, doc_id) for doc_id, score in hits])
+    return results
+
+def _warm_up(paths: List[Tuple[str, int]]) -> int:
+    for path, stamp in paths:
+        if path not in _open_shards or _open_shards[path][0] != stamp:
+            _open_shards[path] = (stamp, open_knowledge_base_artifact(path))
+    return os.getpid()
+
+class ShardedKnowledgeBase:
+    """
+    Knowledge base search fanned out over a process pool.
+
+    The shards written by ``build_shards`` are memory-mapped by every worker,
+    so the index pages are shared through the page cache rather than copied
+    into each process. A batch of queries is split into one task per
+    (shard, query chunk), enough tasks to keep every worker busy. Workers
+    send back only (score, shard, row) triples; the partial top-k lists are
+    merged by score and the winning entries read from this process's own
+    mapping of the shards. With category partitioning a
+    query's predicted category routes it to the shard holding that category.
+
+    The manifest is re-read when it changes on disk, so a rebuilt index is
+    picked up without restarting the pool.
+    """
+
+    def __init__(self, directory: str, workers: Optional[int] = None):
+        self.directory = directory
+        self.workers = workers or os.cpu_count() or 1
+        self._manifest_stamp: Optional[int] = None
+        # (manifest, shards, entries, category -> shard numbers), replaced as a whole on refresh
+        self._state: tuple = ({}, [], [], {})
+        self.refresh()
+        # Forked workers inherit the imported modules instead of re-importing scikit-learn
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+        self._executor = ProcessPoolExecutor(self.workers, mp_context=context)
+
+    def __len__(self):
+        return self.manifest.get('entries', 0)
+
+    @property
+    def manifest(self) -> dict:
+        return self._state[0]
+
+    def refresh(self) -> bool:
+        """
+        Reload the manifest if it changed; True when it did
+        """
+        manifest_path = os.path.join(self.directory, MANIFEST_NAME)
+        stamp = os.stat(manifest_path).st_mtime_ns
+        if stamp == self._manifest_stamp:
+            return False
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+        shards, entries, category_shards = [], [], {}
+        for number, shard in enumerate(manifest['shards']):
+            path = os.path.join(self.directory, shard['path'])
+            shards.append((number, path, os.stat(path).st_mtime_ns))
+            entries.append(open_knowledge_base_artifact(path).entries)
+            for category in shard['categories']:
+                category_shards.setdefault(category, []).append(number)
+        self._state = (manifest, shards, entries, category_shards)
+        self._manifest_stamp = stamp
+        return True
+
+    def warm_up(self):
+        """
+        Start every worker and map the shards before the first query
+        """
+        paths = [(path, stamp) for _, path, stamp in self._state[1]]
+        pids = set()
+        for future in [self._executor.submit(_warm_up, paths) for _ in range(self.workers)]:
+            pids.add(future.result())
+        return len(pids)
+
+    @staticmethod
+    def _route(state: tuple, category: Optional[str]) -> List[Tuple[int, str, int]]:
+        manifest, shards, _, category_shards = state
+        if category is not None and manifest.get('partition') == 'category':
+            numbers = category_shards.get(category)
+            if numbers:
+                return [shards[number] for number in numbers]
+        return shards
+
+    def search_batch(self, queries: Sequence[str], top_k: int = 5, category: Optional[str] = None) -> List[List[dict]]:
+        """
+        Top-k entries (dicts with ``score`` and ``shard``) for every query
+        """
+        queries = list(queries)
+        if not queries or top_k <= 0:
+            return [[] for _ in queries]
+        self.refresh()
+        state = self._state
+        shards = self._route(state, category)
+        chunks = min(len(queries), max(1, math.ceil(self.workers / len(shards))))
+        size = math.ceil(len(queries) / chunks)
+        tasks = []
+        for start in range(0, len(queries), size):
+            chunk = queries[start:start + size]
+            for number, path, stamp in shards:
+                tasks.append((start, self._executor.submit(_search_shard, number, path, stamp, chunk, top_k)))
+        partials: List[List[Partial]] = [[] for _ in queries]
+        for start, future in tasks:
+            for offset, hits in enumerate(future.result()):
+                partials[start + offset].extend(hits)
+        results = []
+        entries = state[2]
+        for hits in partials:
+            items = []
+            for score, number, doc_id in heapq.nsmallest(top_k, hits, key=lambda hit: (-hit[0], hit[1], hit[2])):
+                item = dict(entries[number][doc_id])
+                item['score'] = score
+                item['shard'] = number
+                items.append(item)
+            results.append(items)
+        return results
+
+    def search(self, query: str, top_k: int = 5, category: Optional[str] = None) -> List[dict]:
+        return self.search_batch([query], top_k, category)[0]
+
+    def close(self):
+        self._executor.shutdown()
@@ -0,0 +1,347 @@
+import json
+import pickle
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+from .ann_index import IVFIndex, random_projection
+from .artifact_store import Artifact, PackedStrings, write_artifact
+from .preprocess import preprocess_pipeline
+
+# Upper bound on the dense (queries x entries) score block materialised at once
+MAX_SCORE_BLOCK = 16 * 1024 * 1024
+# Dimensions of the dense projection the ANN index is built on
+ANN_DIMENSIONS = 256
+# ANN candidates fetched per requested result before exact re-scoring
+RERANK_FACTOR = 4
+# Below this many entries an exact scan is cheap enough that the ANN index is skipped
+ANN_MIN_ENTRIES = 10000
+
+def make_vectorizer() -> TfidfVectorizer:
+    """
+    TF-IDF vectorizer sharing the tokenizer used everywhere else in the backend
+    """
+    return TfidfVectorizer(
+        tokenizer=preprocess_pipeline,
+        lowercase=False,
+        token_pattern=None,
+        ngram_range=(1, 2),
+        sublinear_tf=True,
+    )
+
+def _csr_arrays(prefix: str, matrix: sparse.csr_matrix) -> dict:
+    return {
+        f"{prefix}.data": matrix.data,
+        f"{prefix}.indices": matrix.indices,
+        f"{prefix}.indptr": matrix.indptr,
+        f"{prefix}.shape": np.array(matrix.shape, dtype=np.int64),
+    }
+
+def _csr_from_artifact(artifact: Artifact, prefix: str) -> sparse.csr_matrix:
+    shape = tuple(int(value) for value in artifact.array(f"{prefix}.shape"))
+    return sparse.csr_matrix(
+        (artifact.array(f"{prefix}.data"), artifact.array(f"{prefix}.indices"), artifact.array(f"{prefix}.indptr")),
+        shape=shape,
+        copy=False,
+    )
+
+class ArtifactVectorizer:
+    """
+    Query-side TF-IDF transform rebuilt from an artifact (sorted vocabulary
+    table plus idf weights), so workers never unpickle the fitted vectorizer.
+    Produces the same vectors as ``make_vectorizer()``'s ``transform``.
+    """
+
+    def __init__(self, vocabulary: PackedStrings, idf: np.ndarray, ngram_range=(1, 2), sublinear_tf=True):
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.ngram_range = tuple(ngram_range)
+        self.sublinear_tf = sublinear_tf
+        self._columns = {}
+
+    def _column(self, term: str) -> int:
+        column = self._columns.get(term)
+        if column is None:
+            column = self.vocabulary.find(term)
+            if len(self._columns) < 100000:
+                self._columns[term] = column
+        return column
+
+    def transform(self, texts: Sequence[str]) -> sparse.csr_matrix:
+        min_n, max_n = self.ngram_range
+        indptr = [0]
+        indices = []
+        data = []
+        for text in texts:
+            tokens = preprocess_pipeline(text)
+            counts = {}
+            for n in range(min_n, max_n + 1):
+                for start in range(len(tokens) - n + 1):
+                    column = self._column(' '.join(tokens[start:start + n]))
+                    if column >= 0:
+                        counts[column] = counts.get(column, 0) + 1
+            for column, count in counts.items():
+                indices.append(column)
+                data.append(count)
+            indptr.append(len(indices))
+        values = np.asarray(data, dtype=np.float32)
+        if self.sublinear_tf:
+            values = np.log(values) + 1
+        columns = np.asarray(indices, dtype=np.int32)
+        values *= self.idf[columns]
+        shape = (len(texts), len(self.vocabulary))
+        return normalize(sparse.csr_matrix((values, columns, np.asarray(indptr)), shape=shape))
+
+class VectorSearchIndex:
+    """
+    Cosine similarity search over an L2-normalised TF-IDF matrix.
+
+    Queries are vectorized together and scored against every entry with one
+    sparse matrix product; the top-k per query is then selected with
+    ``argpartition`` so no per-row Python loop is involved.
+
+    For large knowledge bases an IVF index over a random projection of the
+    matrix can be attached (``build_ann``/``load_ann``). Searches then only
+    score the ANN candidates exactly, with ``nprobe`` as the recall knob.
+    """
+
+    def __init__(self, vectorizer, matrix: sparse.csr_matrix, matrix_t: Optional[sparse.csr_matrix] = None):
+        self.vectorizer = vectorizer
+        self.matrix = matrix
+        # Stored transposed so query @ matrix_t is a CSR x CSR product
+        self._matrix_t = matrix_t if matrix_t is not None else matrix.T.tocsr()
+        self.ann: Optional[IVFIndex] = None
+        self._projection: Optional[sparse.csr_matrix] = None
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    @classmethod
+    def build(cls, texts: Sequence[str]) -> 'VectorSearchIndex':
+        """
+        Fit a new vectorizer on ``texts`` and index them
+        """
+        vectorizer = make_vectorizer()
+        matrix = normalize(vectorizer.fit_transform(texts).astype(np.float32)).tocsr()
+        return cls(vectorizer, matrix)
+
+    def save(self, vectorizer_path: str, matrix_path: str):
+        with open(vectorizer_path, 'wb') as f:
+            pickle.dump(self.vectorizer, f)
+        sparse.save_npz(matrix_path, self.matrix)
+
+    @classmethod
+    def load(cls, vectorizer_path: str, matrix_path: str) -> 'VectorSearchIndex':
+        with open(vectorizer_path, 'rb') as f:
+            vectorizer = pickle.load(f)
+        matrix = sparse.load_npz(matrix_path).tocsr()
+        return cls(vectorizer, matrix)
+
+    def save_artifact(self, path: str, entries: Sequence[dict], ann_dtype=np.float16):
+        """
+        Write the index, its query transform and the entry texts to one
+        memory-mappable artifact (see ``utils.artifact_store``)
+        """
+        vectorizer = self.vectorizer
+        if isinstance(vectorizer, ArtifactVectorizer):
+            vocabulary, idf = list(vectorizer.vocabulary), vectorizer.idf
+        else:
+            vocabulary, idf = vectorizer.get_feature_names_out().tolist(), vectorizer.idf_
+        # Column ids are the positions in the sorted table; lookups bisect it
+        if any(vocabulary[i] > vocabulary[i + 1] for i in range(len(vocabulary) - 1)):
+            raise ValueError("Vectorizer vocabulary is not in sorted column order")
+        arrays = {'idf': np.asarray(idf, dtype=np.float32)}
+        arrays.update(_csr_arrays('matrix', self.matrix))
+        arrays.update(_csr_arrays('matrix_t', self._matrix_t))
+        arrays['entry_ids'] = np.array([entry.get('id') or -1 for entry in entries], dtype=np.int64)
+        meta = {
+            'kind': 'knowledge_base',
+            'ngram_range': list(vectorizer.ngram_range),
+            'sublinear_tf': vectorizer.sublinear_tf,
+            'has_ann': self.ann is not None,
+        }
+        if self.ann is not None:
+            self.ann.merge()
+            arrays.update({
+                'ann.centroids': self.ann.centroids,
+                'ann.vectors': self.ann._vectors.astype(ann_dtype),
+                'ann.ids': self.ann._ids,
+                'ann.offsets': self.ann._offsets,
+            })
+            arrays.update(_csr_arrays('projection', self._projection))
+            meta['nprobe'] = self.ann.nprobe
+        strings = {
+            'vocabulary': vocabulary,
+            'questions': [entry.get('question', '') for entry in entries],
+            'answers': [entry.get('answer', '') for entry in entries],
+            'categories': [entry.get('category', '') or '' for entry in entries],
+        }
+        write_artifact(path, arrays, strings, meta)
+
+    @classmethod
+    def from_artifact(cls, artifact: Artifact) -> 'VectorSearchIndex':
+        """
+        Open an index on memory-mapped arrays; nothing is copied or unpickled
+        """
+        meta = artifact.meta
+        vectorizer = ArtifactVectorizer(
+            artifact.strings('vocabulary'),
+            artifact.array('idf'),
+            meta['ngram_range'],
+            meta['sublinear_tf'],
+        )
+        index = cls(vectorizer, _csr_from_artifact(artifact, 'matrix'), _csr_from_artifact(artifact, 'matrix_t'))
+        if meta.get('has_ann'):
+            ann = IVFIndex(artifact.array('ann.centroids'), meta['nprobe'])
+            ann._vectors = artifact.array('ann.vectors')
+            ann._ids = artifact.array('ann.ids')
+            ann._offsets = artifact.array('ann.offsets')
+            index.ann = ann
+            index._projection = _csr_from_artifact(artifact, 'projection')
+        return index
+
+    def embed(self, queries: Sequence[str]) -> sparse.csr_matrix:
+        """
+        Vectorize queries into L2-normalised rows in the index space
+        """
+        return normalize(self.vectorizer.transform(queries).astype(np.float32)).tocsr()
+
+    def search(self, query: str, top_k: int = 5) -> List[Tuple[int, float]]:
+        """
+        Return up to ``top_k`` ``(doc_id, score)`` pairs, best first
+        """
+        return self.search_batch([query], top_k)[0]
+
+    def search_batch(self, queries: Sequence[str], top_k: int = 5) -> List[List[Tuple[int, float]]]:
+        """
+        Score a batch of queries against the whole index at once
+        """
+        if not len(queries):
+            return []
+        if top_k <= 0 or len(self) == 0:
+            return [[] for _ in queries]
+        if self.ann is not None and len(self) >= ANN_MIN_ENTRIES:
+            ids, scores = self.search_vectors_ann(self.embed(queries), top_k)
+        else:
+            ids, scores = self.search_vectors(self.embed(queries), top_k)
+        results = []
+        for row_ids, row_scores in zip(ids, scores):
+            results.append([
+                (int(doc_id), float(score)) for doc_id, score in zip(row_ids, row_scores) if score > 0
+            ])
+        return results
+
+    def search_masked(self, query: str, allowed: np.ndarray, top_k: int = 5) -> List[Tuple[int, float]]:
+        """
+        Like ``search`` but only entries whose flag in the boolean mask
+        ``allowed`` is set can be returned (e.g. the entries of one category);
+        always an exact scan, the ANN index is not used
+        """
+        if top_k <= 0 or len(self) == 0:
+            return []
+        scores = (self.embed([query]) @ self._matrix_t).toarray()
+        scores[0, ~allowed] = 0
+        ids, best = top_k_rows(scores, min(top_k, len(self)))
+        return [(int(doc_id), float(score)) for doc_id, score in zip(ids[0], best[0]) if score > 0]
+
+    def search_vectors(self, vectors: sparse.csr_matrix, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k ids and scores (both ``queries x k`` arrays) for pre-embedded queries
+        """
+        count = len(self)
+        top_k = min(top_k, count)
+        rows = vectors.shape[0]
+        ids = np.empty((rows, top_k), dtype=np.int64)
+        scores = np.empty((rows, top_k), dtype=np.float32)
+        block = max(1, MAX_SCORE_BLOCK // count)
+        for start in range(0, rows, block):
+            stop = min(start + block, rows)
+            dense = (vectors[start:stop] @ self._matrix_t).toarray()
+            block_ids, block_scores = top_k_rows(dense, top_k)
+            ids[start:stop] = block_ids
+            scores[start:stop] = block_scores
+        return ids, scores
+
+    def project(self, vectors: sparse.csr_matrix) -> np.ndarray:
+        """
+        Dense, low-dimensional view of TF-IDF rows used by the ANN index
+        """
+        return (vectors @ self._projection).toarray().astype(np.float32, copy=False)
+
+    def build_ann(self, nlist: Optional[int] = None, nprobe: int = 8,
+                  dimensions: int = ANN_DIMENSIONS, seed: int = 0) -> IVFIndex:
+        """
+        Train and attach an IVF index over the projected KB matrix
+        """
+        self._projection = random_projection(self.matrix.shape[1], dimensions, seed)
+        self.ann = IVFIndex.train(self.project(self.matrix), nlist=nlist, nprobe=nprobe, seed=seed)
+        return self.ann
+
+    def save_ann(self, path: str):
+        projection = self._projection
+        self.ann.save(
+            path,
+            projection_data=projection.data,
+            projection_indices=projection.indices,
+            projection_indptr=projection.indptr,
+            projection_shape=np.array(projection.shape),
+        )
+
+    def load_ann(self, path: str) -> IVFIndex:
+        ann = IVFIndex.load(path)
+        extra = ann.extra
+        projection = sparse.csr_matrix(
+            (extra['projection_data'], extra['projection_indices'], extra['projection_indptr']),
+            shape=tuple(extra['projection_shape']),
+        )
+        if projection.shape[0] != self.matrix.shape[1]:
+            raise ValueError("ANN projection does not match the vectorizer vocabulary")
+        self._projection = projection
+        self.ann = ann
+        return ann
+
+    def search_vectors_ann(self, vectors: sparse.csr_matrix, top_k: int,
+                           nprobe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Like ``search_vectors`` but only the ANN candidates are scored exactly
+        """
+        candidates, _ = self.ann.search(self.project(vectors), top_k * RERANK_FACTOR, nprobe)
+        top_k = min(top_k, candidates.shape[1])
+        ids = np.full((vectors.shape[0], top_k), -1, dtype=np.int64)
+        scores = np.zeros((vectors.shape[0], top_k), dtype=np.float32)
+        for row in range(vectors.shape[0]):
+            row_candidates = candidates[row][candidates[row] >= 0]
+            if not row_candidates.shape[0]:
+                continue
+            exact = (self.matrix[row_candidates] @ vectors[row].T).toarray().ravel()
+            order = np.lexsort((row_candidates, -exact))[:top_k]
+            ids[row, :order.shape[0]] = row_candidates[order]
+            scores[row, :order.shape[0]] = exact[order]
+        return ids, scores
+
+def top_k_rows(scores: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Row-wise top-k of a dense score matrix, sorted best first
+    """
+    if top_k < scores.shape[1]:
+        candidates = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+    else:
+        candidates = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+    order = np.lexsort((candidates, -candidate_scores), axis=1)
+    ids = np.take_along_axis(candidates, order, axis=1)
+    return ids, np.take_along_axis(candidate_scores, order, axis=1)
+
+def save_entries(entries: List[dict], path: str):
+    """
+    Persist the entry rows that line up with the matrix rows
+    """
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(entries, f)
+
+def load_entries(path: str) -> List[dict]:
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
@@ -114,7 +114,7 @@ function displayAIResponse(response) {
 // Load ticket history
 async function loadTicketHistory() {
     try {
-        const response = await fetch(`${API_BASE_URL}/api/tickets`);
+        const response = await fetch(`${API_BASE_URL}/api/tickets?fields=id,subject,description,priority&limit=50`);
         
         if (!response.ok) {
             throw new Error('Failed to load tickets');